@@ -93,6 +93,7 @@ class CostSchedulesData:
     @classmethod
     def cost_items(cls):
         cls._cost_values = {}
+        cls._evaluator = ifcopenshell.util.cost.CostEvaluator()
         results = {}
         for cost_item in tool.Ifc.get().by_type("IfcCostItem"):
             data = {}
@@ -224,7 +225,7 @@ class CostSchedulesData:
         if value_data["FixedUntilDate"]:
             value_data["FixedUntilDate"] = ifcopenshell.util.date.ifc2datetime(value_data["FixedUntilDate"])
         value_data["Components"] = [c.id() for c in value_data["Components"] or []]
-        value_data["AppliedValue"] = ifcopenshell.util.cost.calculate_applied_value(root_element, cost_value)
+        value_data["AppliedValue"] = cls._evaluator.get_applied_value(root_element, cost_value)
 
         if cost_value.Category not in [None, "*"]:
             root_element_data["CategoryValues"].setdefault(cost_value.Category, 0)
@@ -0,0 +1,122 @@
+# Ifc4D - IFC scheduling utility
+# Copyright (C) 2024 Dion Moult <dion@thinkmoult.com>
+#
+# This file is part of Ifc4D.
+#
+# Ifc4D is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ifc4D is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Ifc4D.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Benchmarks importing a synthetic Primavera P6 XML schedule
+
+Activities are grouped into WBS nodes and chained with finish to start
+relationships within each node, which is typical of real schedules.
+
+~~~
+python -m ifc4d.benchmark --activities 60000 --per-wbs 50
+~~~
+"""
+
+import os
+import time
+import argparse
+import datetime
+import tempfile
+import ifcopenshell
+import xml.etree.ElementTree as ET
+from ifc4d.p62ifc import P62Ifc
+
+NAMESPACE = "http://xmlns.oracle.com/Primavera/P6/V8.3/API/BusinessObjects"
+
+
+def create_p6_xml(filepath, total_activities, activities_per_wbs):
+    def add(parent, tag, text=None):
+        element = ET.SubElement(parent, f"{{{NAMESPACE}}}{tag}")
+        element.text = text
+        return element
+
+    root = ET.Element(f"{{{NAMESPACE}}}APIBusinessObjects")
+    project = add(root, "Project")
+    add(project, "Name", "Benchmark")
+
+    calendar = add(project, "Calendar")
+    add(calendar, "ObjectId", "1")
+    add(calendar, "Name", "Standard")
+    add(calendar, "Type", "Global")
+    add(calendar, "HoursPerDay", "8")
+    week = add(calendar, "StandardWorkWeek")
+    for day in ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"):
+        hours = add(week, "StandardWorkHours")
+        add(hours, "DayOfWeek", day)
+        if day not in ("Saturday", "Sunday"):
+            work_time = add(hours, "WorkTime")
+            add(work_time, "Start", "08:00:00")
+            add(work_time, "Finish", "16:00:00")
+
+    start = datetime.datetime(2024, 1, 1, 8)
+    total_wbs = -(-total_activities // activities_per_wbs)
+    for i in range(total_wbs):
+        wbs = add(project, "WBS")
+        add(wbs, "ObjectId", f"W{i}")
+        add(wbs, "Name", f"WBS {i}")
+        add(wbs, "Code", str(i))
+        add(wbs, "ParentObjectId")
+
+    for i in range(total_activities):
+        activity = add(project, "Activity")
+        add(activity, "Type", "Task Dependent")
+        add(activity, "ObjectId", f"A{i}")
+        add(activity, "WBSObjectId", f"W{i // activities_per_wbs}")
+        add(activity, "Name", f"Activity {i}")
+        add(activity, "Id", f"A{i}")
+        day = start + datetime.timedelta(days=i % activities_per_wbs)
+        add(activity, "StartDate", day.isoformat())
+        add(activity, "FinishDate", (day + datetime.timedelta(hours=8)).isoformat())
+        add(activity, "PlannedDuration", "8")
+        add(activity, "Status", "Not Started")
+        add(activity, "CalendarObjectId", "1")
+
+    for i in range(total_activities):
+        if i % activities_per_wbs == 0:
+            continue
+        relationship = add(project, "Relationship")
+        add(relationship, "ObjectId", f"R{i}")
+        add(relationship, "PredecessorActivityObjectId", f"A{i - 1}")
+        add(relationship, "SuccessorActivityObjectId", f"A{i}")
+        add(relationship, "Type", "Finish to Start")
+        add(relationship, "Lag", "0")
+
+    ET.ElementTree(root).write(filepath, xml_declaration=True, encoding="utf-8")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks importing a synthetic P6 XML schedule")
+    parser.add_argument("-a", "--activities", type=int, default=10000, help="The number of activities")
+    parser.add_argument("-w", "--per-wbs", type=int, default=50, help="The number of activities per WBS node")
+    parser.add_argument("-o", "--output", type=str, help="An optional IFC file to write the imported schedule to")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        xml = os.path.join(directory, "schedule.xml")
+        start = time.perf_counter()
+        create_p6_xml(xml, args.activities, args.per_wbs)
+        print(f"Generated {args.activities} activities in {time.perf_counter() - start:.2f}s")
+
+        p62ifc = P62Ifc()
+        p62ifc.xml = xml
+        p62ifc.file = ifcopenshell.file(schema="IFC4")
+        p62ifc.file.create_entity("IfcProject")
+        p62ifc.output = args.output
+        start = time.perf_counter()
+        p62ifc.execute()
+        duration = time.perf_counter() - start
+        print(f"Imported {args.activities} activities in {duration:.2f}s ({args.activities / duration:.0f} per second)")
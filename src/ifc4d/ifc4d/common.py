@@ -180,69 +180,65 @@ class ScheduleIfcGenerator:
                 )
 
     def create_tasks(self, work_schedule):
-        for wbs in self.wbs.values():
-            self.create_task_from_wbs(wbs, work_schedule)
-        for activity_id in self.root_activites:
-            self.create_task_from_activity(self.activities[activity_id], None, work_schedule)
+        children = {}
+        for wbs_id, wbs in self.wbs.items():
+            if not self.wbs.get(wbs["ParentObjectId"]):
+                wbs["ParentObjectId"] = None
+            children.setdefault(wbs["ParentObjectId"], []).append(wbs_id)
+        self.create_tasks_from_wbs(children, None, work_schedule)
+        self.create_tasks_from_activities([self.activities[a] for a in self.root_activites], None, work_schedule)
 
-    def create_task_from_wbs(self, wbs, work_schedule):
-        if not self.wbs.get(wbs["ParentObjectId"]):
-            wbs["ParentObjectId"] = None
-        wbs["ifc"] = ifcopenshell.api.run(
-            "sequence.add_task",
+    def create_tasks_from_wbs(self, children, parent_id, work_schedule):
+        wbs_ids = children.get(parent_id)
+        if not wbs_ids:
+            return
+        parent = self.wbs[parent_id] if parent_id is not None else None
+        tasks = []
+        for wbs_id in wbs_ids:
+            wbs = self.wbs[wbs_id]
+            identification = wbs["Code"]
+            if parent and parent["ifc"]:
+                identification = str(parent["ifc"].Identification) + "." + str(wbs["Code"])
+            tasks.append({"attributes": {"Name": wbs["Name"], "Identification": str(identification)}})
+        tasks = ifcopenshell.api.run(
+            "sequence.add_tasks",
             self.file,
-            work_schedule=None if wbs["ParentObjectId"] else work_schedule,
-            parent_task=self.wbs[wbs["ParentObjectId"]]["ifc"] if wbs["ParentObjectId"] else None,
+            tasks=tasks,
+            work_schedule=None if parent else work_schedule,
+            parent_task=parent["ifc"] if parent else None,
         )
-        identification = wbs["Code"]
-        if wbs["ParentObjectId"]:
-            if self.wbs[wbs["ParentObjectId"]]["ifc"]:
-                identification = str(self.wbs[wbs["ParentObjectId"]]["ifc"].Identification) + "." + str(wbs["Code"])
-        ifcopenshell.api.run(
-            "sequence.edit_task",
-            self.file,
-            task=wbs["ifc"],
-            attributes={"Name": wbs["Name"], "Identification": str(identification)},
-        )
-        for activity_id in wbs["activities"]:
-            self.create_task_from_activity(self.activities[activity_id], wbs, None)
+        for wbs_id, task in zip(wbs_ids, tasks):
+            self.wbs[wbs_id]["ifc"] = task
+        for wbs_id in wbs_ids:
+            wbs = self.wbs[wbs_id]
+            self.create_tasks_from_activities([self.activities[a] for a in wbs["activities"]], wbs, None)
+            self.create_tasks_from_wbs(children, wbs_id, work_schedule)
 
-    def create_task_from_activity(self, activity, wbs, work_schedule):
-        activity["ifc"] = ifcopenshell.api.run(
-            "sequence.add_task",
+    def create_tasks_from_activities(self, activities, wbs, work_schedule):
+        if not activities:
+            return
+        tasks = ifcopenshell.api.run(
+            "sequence.add_tasks",
             self.file,
+            tasks=[self.get_activity_task(activity) for activity in activities],
             work_schedule=None if wbs else work_schedule,
             parent_task=wbs["ifc"] if wbs else None,
         )
-        ifcopenshell.api.run(
-            "sequence.edit_task",
-            self.file,
-            task=activity["ifc"],
-            attributes={
+        for activity, task in zip(activities, tasks):
+            activity["ifc"] = task
+
+    def get_activity_task(self, activity):
+        calendar = self.calendars[activity["CalendarObjectId"]]
+        return {
+            "attributes": {
                 "Name": activity["Name"],
                 "Identification": str(activity["Identification"]),
                 "Status": activity["Status"],
                 "IsMilestone": activity["StartDate"] == activity["FinishDate"],
                 "PredefinedType": "CONSTRUCTION",
             },
-        )
-        task_time = ifcopenshell.api.run("sequence.add_task_time", self.file, task=activity["ifc"])
-        calendar = self.calendars[activity["CalendarObjectId"]]
-        # print(calendar, self.calendars)
-        # Seems intermittently crashy - can we investigate for larger files?
-        ifcopenshell.api.run(
-            "control.assign_control",
-            self.file,
-            **{
-                "relating_control": calendar["ifc"],
-                "related_object": activity["ifc"],
-            },
-        )
-        ifcopenshell.api.run(
-            "sequence.edit_task_time",
-            self.file,
-            task_time=task_time,
-            attributes={
+            "calendar": calendar["ifc"],
+            "task_time": {
                 "ScheduleStart": activity["StartDate"],
                 "ScheduleFinish": activity["FinishDate"],
                 "DurationType": "WORKTIME" if activity["PlannedDuration"] else None,
@@ -253,7 +249,7 @@ class ScheduleIfcGenerator:
                 if activity["PlannedDuration"]
                 else None,
             },
-        )
+        }
 
     def create_rel_sequences(self):
         self.sequence_type_map = {
@@ -262,29 +258,21 @@ class ScheduleIfcGenerator:
             "Finish to Start": "FINISH_START",
             "Finish to Finish": "FINISH_FINISH",
         }
+        sequences = []
         for relationship in self.relationships.values():
-            rel_sequence = ifcopenshell.api.run(
-                "sequence.assign_sequence",
-                self.file,
-                relating_process=self.activities[relationship["PredecessorActivity"]]["ifc"],
-                related_process=self.activities[relationship["SuccessorActivity"]]["ifc"],
-            )
-            ifcopenshell.api.run(
-                "sequence.edit_sequence",
-                self.file,
-                rel_sequence=rel_sequence,
-                attributes={"SequenceType": relationship["Type"]},
-            )
+            predecessor = self.activities[relationship["PredecessorActivity"]]
+            sequence = {
+                "relating_process": predecessor["ifc"],
+                "related_process": self.activities[relationship["SuccessorActivity"]]["ifc"],
+                "sequence_type": relationship["Type"],
+            }
             lag = float(relationship["Lag"])
             if lag:
-                calendar = self.calendars[self.activities[relationship["PredecessorActivity"]]["CalendarObjectId"]]
-                ifcopenshell.api.run(
-                    "sequence.assign_lag_time",
-                    self.file,
-                    rel_sequence=rel_sequence,
-                    lag_value=timedelta(days=lag / float(calendar["HoursPerDay"] or 8)),
-                    duration_type="WORKTIME",
-                )
+                calendar = self.calendars[predecessor["CalendarObjectId"]]
+                sequence["lag_value"] = timedelta(days=lag / float(calendar["HoursPerDay"] or 8))
+                sequence["duration_type"] = "WORKTIME"
+            sequences.append(sequence)
+        ifcopenshell.api.run("sequence.assign_sequences", self.file, sequences=sequences)
 
     def create_resources(self):
         # print("Resources", self.resources)
@@ -22,7 +22,7 @@ from typing import List
 import ifcopenshell
 import ifcopenshell.api
 import ifcopenshell.util.date
-import xml.etree.ElementTree as ET
+from . import xmlstream
 
 
 class MSP2Ifc:
@@ -43,16 +43,23 @@ class MSP2Ifc:
         self.create_ifc()
 
     def parse_xml(self):
-        tree = ET.parse(self.xml)
-        project = tree.getroot()
-        self.ns = {"pr": project.tag[1:].partition("}")[0]}
-        self.project["Name"] = project.findtext("pr:Name", namespaces=self.ns) or "Unnamed"
-        self.project["CalendarUID"] = project.findtext("pr:CalendarUID", namespaces=self.ns) or None
-        self.project["MinutesPerDay"] = project.findtext("pr:MinutesPerDay", namespaces=self.ns) or None
+        self.project["Name"] = "Unnamed"
+        self.project["CalendarUID"] = None
+        self.project["MinutesPerDay"] = None
         self.outline_level = 0
         self.outline_parents = {}
-        self.parse_task_xml(project)
-        self.parse_calendar_xml(project)
+        # Project settings precede calendars and tasks in the MSPDI schema
+        for path, element in xmlstream.iterparse(
+            self.xml, ["Name", "CalendarUID", "MinutesPerDay", "Calendars/Calendar", "Tasks/Task"]
+        ):
+            if self.ns is None:
+                self.ns = {"pr": xmlstream.get_namespace(element)}
+            if path == "Tasks/Task":
+                self.parse_task_xml(element)
+            elif path == "Calendars/Calendar":
+                self.parse_calendar_xml(element)
+            elif element.text:
+                self.project[path] = element.text
         # TODO Doesn't do anything right now
         # self.parse_resources_xml(project)
 
@@ -68,59 +75,55 @@ class MSP2Ifc:
                 id += 1
         return relationships
 
-    def parse_task_xml(self, project):
+    def parse_task_xml(self, task):
         if self.project["MinutesPerDay"]:
             hours_per_day = int(self.project["MinutesPerDay"]) / 60
         else:
             hours_per_day = 8
 
-        for task in project.find("pr:Tasks", self.ns):
-            task_id = task.find("pr:UID", self.ns).text
-            task_index_level = task.find("pr:OutlineLevel", self.ns).text
-            wbs_id = task.find("pr:WBS", self.ns).text
-            relationships = self.parse_relationship_xml(task)
-            outline_level = int(task.find("pr:OutlineLevel", self.ns).text)
-
-            if outline_level != 0:
-                parent_task = self.tasks[self.outline_parents[outline_level - 1]]
-                parent_task["subtasks"].append(task_id)
-            self.outline_level = outline_level
-            self.outline_parents[outline_level] = task_id
-
-            # Microsoft Project stores durations in terms of hours.
-            duration = ifcopenshell.util.date.ifc2datetime(task.find("pr:Duration", self.ns).text)
-            hours = duration.days * 24
-            hours += duration.seconds / 60 / 60
-            # Let's convert it into days, where days is the appropriate hours per day
-            duration = timedelta(days=hours / float(hours_per_day))
-
-            self.tasks[task_id] = {
-                "Name": task.find("pr:Name", self.ns).text,
-                "OutlineNumber": task.find("pr:OutlineNumber", self.ns).text,
-                "OutlineLevel": outline_level,
-                "Start": datetime.datetime.fromisoformat(task.find("pr:Start", self.ns).text),
-                "Finish": datetime.datetime.fromisoformat(task.find("pr:Finish", self.ns).text),
-                "Duration": duration,
-                "Priority": task.find("pr:Priority", self.ns).text,
-                "CalendarUID": task.find("pr:CalendarUID", self.ns).text,
-                "PredecessorTasks": relationships if relationships else None,
-                "subtasks": [],
-                "ifc": None,
-            }
-
-            # retrieve optional columns
-            # If first column = "all" then retrieve all columns
-            if len(self.optionalColumns) and self.optionalColumns[0] == "all":
-                self.optionalColumns = [child.tag.split("}")[1] for child in task]
-            
-            for column in self.optionalColumns:
-                if not self.tasks[task_id].get(column):
-                    self.tasks[task_id][column] = task.find(f"pr:{column}", self.ns).text if task.find(f"pr:{column}", self.ns) else None
-            
+        task_id = task.find("pr:UID", self.ns).text
+        task_index_level = task.find("pr:OutlineLevel", self.ns).text
+        wbs_id = task.find("pr:WBS", self.ns).text
+        relationships = self.parse_relationship_xml(task)
+        outline_level = int(task.find("pr:OutlineLevel", self.ns).text)
+
+        if outline_level != 0:
+            parent_task = self.tasks[self.outline_parents[outline_level - 1]]
+            parent_task["subtasks"].append(task_id)
+        self.outline_level = outline_level
+        self.outline_parents[outline_level] = task_id
+
+        # Microsoft Project stores durations in terms of hours.
+        duration = ifcopenshell.util.date.ifc2datetime(task.find("pr:Duration", self.ns).text)
+        hours = duration.days * 24
+        hours += duration.seconds / 60 / 60
+        # Let's convert it into days, where days is the appropriate hours per day
+        duration = timedelta(days=hours / float(hours_per_day))
+
+        self.tasks[task_id] = {
+            "Name": task.find("pr:Name", self.ns).text,
+            "OutlineNumber": task.find("pr:OutlineNumber", self.ns).text,
+            "OutlineLevel": outline_level,
+            "Start": datetime.datetime.fromisoformat(task.find("pr:Start", self.ns).text),
+            "Finish": datetime.datetime.fromisoformat(task.find("pr:Finish", self.ns).text),
+            "Duration": duration,
+            "Priority": task.find("pr:Priority", self.ns).text,
+            "CalendarUID": task.find("pr:CalendarUID", self.ns).text,
+            "PredecessorTasks": relationships if relationships else None,
+            "subtasks": [],
+            "ifc": None,
+        }
 
+        # retrieve optional columns
+        # If first column = "all" then retrieve all columns
+        if len(self.optionalColumns) and self.optionalColumns[0] == "all":
+            self.optionalColumns = [child.tag.split("}")[1] for child in task]
 
+        for column in self.optionalColumns:
+            if not self.tasks[task_id].get(column):
+                self.tasks[task_id][column] = task.find(f"pr:{column}", self.ns).text if task.find(f"pr:{column}", self.ns) else None
 
-    def parse_calendar_xml(self, project):
+    def parse_calendar_xml(self, calendar):
         def parse_working_times(day):
             working_times = []
             if day.find("pr:WorkingTimes", self.ns):
@@ -165,36 +168,35 @@ class MSP2Ifc:
             }
             return data
 
-        for calendar in project.find("pr:Calendars", self.ns).findall("pr:Calendar", self.ns):
-            calendar_id = calendar.find("pr:UID", self.ns).text
-            week_days = []
-            exceptions = []
-            week_days_element = calendar.find("pr:WeekDays", self.ns)
-            week_day_elements = week_days_element.findall("pr:WeekDay", self.ns) if week_days_element else []
-            for week_day in week_day_elements:
-                if week_day.find("pr:WorkingTimes", self.ns):
-                    if week_day.find("pr:DayType", self.ns).text == "0":
-                        data = parse_exception(week_day)
-                        data["Type"] = "2"
-                        exceptions.append(data)
-                    else:
-                        week_days.append(
-                            {
-                                "DayType": week_day.find("pr:DayType", self.ns).text,
-                                "WorkingTimes": parse_working_times(week_day),
-                                "ifc": None,
-                            }
-                        )
-            exceptions_element = calendar.find("pr:Exceptions", self.ns)
-            for exception in exceptions_element.findall("pr:Exception", self.ns) if exceptions_element else []:
-                data = parse_exception(exception)
-                exceptions.append(data)
-
-            self.calendars[calendar_id] = {
-                "Name": calendar.find("pr:Name", self.ns).text,
-                "StandardWorkWeek": week_days,
-                "HolidayOrExceptions": exceptions,
-            }
+        calendar_id = calendar.find("pr:UID", self.ns).text
+        week_days = []
+        exceptions = []
+        week_days_element = calendar.find("pr:WeekDays", self.ns)
+        week_day_elements = week_days_element.findall("pr:WeekDay", self.ns) if week_days_element else []
+        for week_day in week_day_elements:
+            if week_day.find("pr:WorkingTimes", self.ns):
+                if week_day.find("pr:DayType", self.ns).text == "0":
+                    data = parse_exception(week_day)
+                    data["Type"] = "2"
+                    exceptions.append(data)
+                else:
+                    week_days.append(
+                        {
+                            "DayType": week_day.find("pr:DayType", self.ns).text,
+                            "WorkingTimes": parse_working_times(week_day),
+                            "ifc": None,
+                        }
+                    )
+        exceptions_element = calendar.find("pr:Exceptions", self.ns)
+        for exception in exceptions_element.findall("pr:Exception", self.ns) if exceptions_element else []:
+            data = parse_exception(exception)
+            exceptions.append(data)
+
+        self.calendars[calendar_id] = {
+            "Name": calendar.find("pr:Name", self.ns).text,
+            "StandardWorkWeek": week_days,
+            "HolidayOrExceptions": exceptions,
+        }
 
     def create_ifc(self):
         if not self.file:
@@ -212,11 +214,9 @@ class MSP2Ifc:
         self.work_plan = self.file.create_entity("IfcWorkPlan")
 
     def create_tasks(self, work_schedule):
-        for task_id in self.tasks:
-            task = self.tasks[task_id]
-            # Outline Level can be None or 0
-            if not task["OutlineLevel"]:
-                self.create_task(task, work_schedule=work_schedule)
+        # Outline Level can be None or 0
+        root_tasks = [task for task in self.tasks.values() if not task["OutlineLevel"]]
+        self.create_sibling_tasks(root_tasks, work_schedule=work_schedule)
 
     def create_work_schedule(self):
         return ifcopenshell.api.run(
@@ -234,66 +234,53 @@ class MSP2Ifc:
             self.process_working_week(calendar["StandardWorkWeek"], calendar["ifc"])
             self.process_exceptions(calendar["HolidayOrExceptions"], calendar["ifc"])
 
-    def create_task(self, task, work_schedule=None, parent_task=None):
-        task["ifc"] = ifcopenshell.api.run(
-            "sequence.add_task",
+    def create_sibling_tasks(self, tasks, work_schedule=None, parent_task=None):
+        if not tasks:
+            return
+        ifc_tasks = ifcopenshell.api.run(
+            "sequence.add_tasks",
             self.file,
+            tasks=[self.get_task_data(task, parent_task) for task in tasks],
             work_schedule=work_schedule if work_schedule else None,
             parent_task=parent_task["ifc"] if parent_task else None,
         )
+        for task, ifc_task in zip(tasks, ifc_tasks):
+            task["ifc"] = ifc_task
+        for task in tasks:
+            self.create_sibling_tasks([self.tasks[subtask_id] for subtask_id in task["subtasks"]], parent_task=task)
 
+            # create pset for optional columns
+            if len(self.optionalColumns):
+                pset = ifcopenshell.api.run("pset.add_pset", self.file, product=task["ifc"], name="Pset_MSP_Task")
+
+                ifcopenshell.api.run(
+                    "pset.edit_pset",
+                    self.file,
+                    pset=pset,
+                    properties={name: str(task[name]) for name in self.optionalColumns if task[name]},
+                )
+
+    def get_task_data(self, task, parent_task=None):
         calendar = None
         if task["CalendarUID"] != "-1":
             calendar = self.calendars[task["CalendarUID"]]["ifc"]
         elif not parent_task and self.project["CalendarUID"]:
             calendar = self.calendars[self.project["CalendarUID"]]["ifc"]
 
-        if calendar:
-            ifcopenshell.api.run(
-                "control.assign_control",
-                self.file,
-                **{
-                    "relating_control": calendar,
-                    "related_object": task["ifc"],
-                },
-            )
-
-        ifcopenshell.api.run(
-            "sequence.edit_task",
-            self.file,
-            task=task["ifc"],
-            attributes={
+        return {
+            "attributes": {
                 "Name": task["Name"],
                 "Identification": task["OutlineNumber"],
                 "IsMilestone": task["Start"] == task["Finish"],
             },
-        )
-        task_time = ifcopenshell.api.run("sequence.add_task_time", self.file, task=task["ifc"])
-        ifcopenshell.api.run(
-            "sequence.edit_task_time",
-            self.file,
-            task_time=task_time,
-            attributes={
+            "calendar": calendar,
+            "task_time": {
                 "ScheduleStart": task["Start"],
                 "ScheduleFinish": task["Finish"],
                 "DurationType": "WORKTIME" if task["Duration"] else None,
                 "ScheduleDuration": task["Duration"] if task["Duration"] else None,
             },
-        )
-        for subtask_id in task["subtasks"]:
-            self.create_task(self.tasks[subtask_id], parent_task=task)
-
-
-        # create pset for optional columns
-        if len(self.optionalColumns):
-            pset = ifcopenshell.api.run("pset.add_pset", self.file, product=task["ifc"] , name="Pset_MSP_Task")
-
-            ifcopenshell.api.run(
-                "pset.edit_pset",
-                self.file,
-                pset=pset,
-                properties= {name: str(task[name]) for name in self.optionalColumns if task[name]}
-            )
+        }
 
     def process_working_week(self, week, calendar):
         day_map = {
@@ -356,23 +343,19 @@ class MSP2Ifc:
             "2": "START_FINISH",
             "3": "START_START",
         }
+        sequences = []
         for task in self.tasks.values():
             if not task["PredecessorTasks"]:
                 continue
             for predecessor in task["PredecessorTasks"].values():
-                rel_sequence = ifcopenshell.api.run(
-                    "sequence.assign_sequence",
-                    self.file,
-                    related_process=task["ifc"],
-                    relating_process=self.tasks[predecessor["PredecessorTask"]]["ifc"],
-                )
+                sequence = {
+                    "related_process": task["ifc"],
+                    "relating_process": self.tasks[predecessor["PredecessorTask"]]["ifc"],
+                }
                 if predecessor["Type"]:
-                    ifcopenshell.api.run(
-                        "sequence.edit_sequence",
-                        self.file,
-                        rel_sequence=rel_sequence,
-                        attributes={"SequenceType": self.sequence_type_map[predecessor["Type"]]},
-                    )
+                    sequence["sequence_type"] = self.sequence_type_map[predecessor["Type"]]
+                sequences.append(sequence)
+        ifcopenshell.api.run("sequence.assign_sequences", self.file, sequences=sequences)
 
     def parse_resources_xml(self, project):
         resources_lst = project.find("pr:Resources", self.ns)
@@ -21,7 +21,7 @@ import datetime
 import ifcopenshell
 import ifcopenshell.api
 import ifcopenshell.util.date
-import xml.etree.ElementTree as ET
+from . import xmlstream
 from .common import ScheduleIfcGenerator
 
 
@@ -87,133 +87,160 @@ class P62Ifc:
         print("Overall Time", end2 - start)
 
     def parse_xml(self):
-        tree = ET.parse(self.xml)
-        root = tree.getroot()
-        self.ns = {"pr": root.tag[1:].partition("}")[0]}
-        project = root.find("pr:Project", self.ns)
-        self.project["Name"] = project.findtext("pr:Name") or "Unnamed"
-        self.parse_calendar_xml(root)
-        self.parse_calendar_xml(project)
-        self.parse_wbs_xml(project)
-        self.parse_activity_xml(project)
-        self.parse_relationship_xml(project)
-        self.parse_resources_xml(root)
+        self.project["Name"] = "Unnamed"
+        self.ns = None
+        is_project_parsed = False
+        # Only the first project is imported, along with all global calendars and resources
+        for path, element in xmlstream.iterparse(
+            self.xml,
+            [
+                "Calendar",
+                "Resource",
+                "Project",
+                "Project/Name",
+                "Project/Calendar",
+                "Project/WBS",
+                "Project/Activity",
+                "Project/Relationship",
+            ],
+        ):
+            if self.ns is None:
+                self.ns = {"pr": xmlstream.get_namespace(element)}
+            if path == "Calendar":
+                self.parse_calendar_xml(element)
+            elif path == "Resource":
+                self.parse_resource_xml(element)
+            elif is_project_parsed:
+                continue
+            elif path == "Project":
+                is_project_parsed = True
+            elif path == "Project/Name":
+                self.project["Name"] = element.text or "Unnamed"
+            elif path == "Project/Calendar":
+                self.parse_calendar_xml(element)
+            elif path == "Project/WBS":
+                self.parse_wbs_xml(element)
+            elif path == "Project/Activity":
+                self.parse_activity_xml(element)
+            elif path == "Project/Relationship":
+                self.parse_relationship_xml(element)
+        self.link_activities()
+        print("Resource found", self.resources)
+
+    def link_activities(self):
+        # WBS, activities and relationships may appear in any order in the XML
+        for activity_id, activity in self.activities.items():
+            if activity["WBSObjectId"]:
+                self.wbs[activity["WBSObjectId"]]["activities"].append(activity_id)
+            else:
+                self.root_activites.append(activity_id)
+        self.relationships = {
+            relationship_id: relationship
+            for relationship_id, relationship in self.relationships.items()
+            if relationship["PredecessorActivity"] in self.activities
+            and relationship["SuccessorActivity"] in self.activities
+        }
 
-    def parse_calendar_xml(self, project):
-        for calendar in project.findall("pr:Calendar", self.ns):
-            calendar_id = calendar.find("pr:ObjectId", self.ns).text
-            standard_work_week = []
-            for standard_work_hour in calendar.find("pr:StandardWorkWeek", self.ns).findall(
-                "pr:StandardWorkHours", self.ns
-            ):
-                work_times = []
-                for work_time in standard_work_hour.findall("pr:WorkTime", self.ns):
-                    if work_time.find("pr:Start", self.ns) is None:
-                        continue
-                    work_times.append(
-                        {
-                            "Start": datetime.time.fromisoformat(work_time.find("pr:Start", self.ns).text),
-                            "Finish": datetime.time.fromisoformat(work_time.find("pr:Finish", self.ns).text),
-                        }
-                    )
-                standard_work_week.append(
+    def parse_calendar_xml(self, calendar):
+        calendar_id = calendar.find("pr:ObjectId", self.ns).text
+        standard_work_week = []
+        for standard_work_hour in calendar.find("pr:StandardWorkWeek", self.ns).findall(
+            "pr:StandardWorkHours", self.ns
+        ):
+            work_times = []
+            for work_time in standard_work_hour.findall("pr:WorkTime", self.ns):
+                if work_time.find("pr:Start", self.ns) is None:
+                    continue
+                work_times.append(
                     {
-                        "DayOfWeek": standard_work_hour.find("pr:DayOfWeek", self.ns).text,
-                        "WorkTimes": work_times,
-                        "ifc": None,
+                        "Start": datetime.time.fromisoformat(work_time.find("pr:Start", self.ns).text),
+                        "Finish": datetime.time.fromisoformat(work_time.find("pr:Finish", self.ns).text),
                     }
                 )
-            exceptions = {}
-            holiday_or_exceptions = calendar.find("pr:HolidayOrExceptions", self.ns)
-            holiday_or_exception = []
-            if holiday_or_exceptions is not None:
-                holiday_or_exception = holiday_or_exceptions.findall("pr:HolidayOrException", self.ns)
-            for exception in holiday_or_exception:
-                d = datetime.datetime.fromisoformat(exception.find("pr:Date", self.ns).text).date()
-                month = exceptions.setdefault(d.year, {}).setdefault(d.month, {})
-                month.setdefault("FullDay", [])
-                month.setdefault("WorkTime", [])
-                work_times = []
-                for work_time in exception.findall("pr:WorkTime", self.ns):
-                    if work_time.find("pr:Start", self.ns) is None:
-                        continue
-                    work_times.append(
-                        {
-                            "Start": datetime.time.fromisoformat(work_time.find("pr:Start", self.ns).text),
-                            "Finish": datetime.time.fromisoformat(work_time.find("pr:Finish", self.ns).text),
-                        }
-                    )
-                if work_times:
-                    exceptions[d.year][d.month]["WorkTime"].append({"Day": d.day, "WorkTimes": work_times, "ifc": None})
-                else:
-                    exceptions[d.year][d.month]["FullDay"].append(d.day)
-            self.calendars[calendar_id] = {
-                "Name": calendar.find("pr:Name", self.ns).text,
-                "Type": calendar.find("pr:Type", self.ns).text,
-                "HoursPerDay": calendar.find("pr:HoursPerDay", self.ns).text,
-                "StandardWorkWeek": standard_work_week,
-                "HolidayOrExceptions": exceptions,
-            }
+            standard_work_week.append(
+                {
+                    "DayOfWeek": standard_work_hour.find("pr:DayOfWeek", self.ns).text,
+                    "WorkTimes": work_times,
+                    "ifc": None,
+                }
+            )
+        exceptions = {}
+        holiday_or_exceptions = calendar.find("pr:HolidayOrExceptions", self.ns)
+        holiday_or_exception = []
+        if holiday_or_exceptions is not None:
+            holiday_or_exception = holiday_or_exceptions.findall("pr:HolidayOrException", self.ns)
+        for exception in holiday_or_exception:
+            d = datetime.datetime.fromisoformat(exception.find("pr:Date", self.ns).text).date()
+            month = exceptions.setdefault(d.year, {}).setdefault(d.month, {})
+            month.setdefault("FullDay", [])
+            month.setdefault("WorkTime", [])
+            work_times = []
+            for work_time in exception.findall("pr:WorkTime", self.ns):
+                if work_time.find("pr:Start", self.ns) is None:
+                    continue
+                work_times.append(
+                    {
+                        "Start": datetime.time.fromisoformat(work_time.find("pr:Start", self.ns).text),
+                        "Finish": datetime.time.fromisoformat(work_time.find("pr:Finish", self.ns).text),
+                    }
+                )
+            if work_times:
+                exceptions[d.year][d.month]["WorkTime"].append({"Day": d.day, "WorkTimes": work_times, "ifc": None})
+            else:
+                exceptions[d.year][d.month]["FullDay"].append(d.day)
+        self.calendars[calendar_id] = {
+            "Name": calendar.find("pr:Name", self.ns).text,
+            "Type": calendar.find("pr:Type", self.ns).text,
+            "HoursPerDay": calendar.find("pr:HoursPerDay", self.ns).text,
+            "StandardWorkWeek": standard_work_week,
+            "HolidayOrExceptions": exceptions,
+        }
 
-    def parse_wbs_xml(self, project):
-        for wbs in project.findall("pr:WBS", self.ns):
-            self.wbs[wbs.find("pr:ObjectId", self.ns).text] = {
-                "Name": wbs.find("pr:Name", self.ns).text,
-                "Code": wbs.find("pr:Code", self.ns).text,
-                "ParentObjectId": wbs.find("pr:ParentObjectId", self.ns).text,
-                "ifc": None,
-                "rel": None,
-                "activities": [],
-            }
+    def parse_wbs_xml(self, wbs):
+        self.wbs[wbs.find("pr:ObjectId", self.ns).text] = {
+            "Name": wbs.find("pr:Name", self.ns).text,
+            "Code": wbs.find("pr:Code", self.ns).text,
+            "ParentObjectId": wbs.find("pr:ParentObjectId", self.ns).text,
+            "ifc": None,
+            "rel": None,
+            "activities": [],
+        }
 
-    def parse_activity_xml(self, project):
-        for activity in project.findall("pr:Activity", self.ns):
-            activity_type = activity.find("pr:Type", self.ns).text
-            if activity_type == "Level of Effort":
-                continue
-            activity_id = activity.find("pr:ObjectId", self.ns).text
-            wbs_id = activity.find("pr:WBSObjectId", self.ns).text
-            if wbs_id:
-                self.wbs[wbs_id]["activities"].append(activity_id)
-            else:
-                self.root_activites.append(activity_id)
-            self.activities[activity_id] = {
-                "Name": activity.find("pr:Name", self.ns).text,
-                "Identification": activity.find("pr:Id", self.ns).text,
-                "StartDate": datetime.datetime.fromisoformat(activity.find("pr:StartDate", self.ns).text),
-                "FinishDate": datetime.datetime.fromisoformat(activity.find("pr:FinishDate", self.ns).text),
-                "PlannedDuration": activity.find("pr:PlannedDuration", self.ns).text,
-                "Status": activity.find("pr:Status", self.ns).text,
-                "CalendarObjectId": activity.find("pr:CalendarObjectId", self.ns).text,
-                "ifc": None,
-            }
+    def parse_activity_xml(self, activity):
+        activity_type = activity.find("pr:Type", self.ns).text
+        if activity_type == "Level of Effort":
+            return
+        activity_id = activity.find("pr:ObjectId", self.ns).text
+        self.activities[activity_id] = {
+            "WBSObjectId": activity.find("pr:WBSObjectId", self.ns).text,
+            "Name": activity.find("pr:Name", self.ns).text,
+            "Identification": activity.find("pr:Id", self.ns).text,
+            "StartDate": datetime.datetime.fromisoformat(activity.find("pr:StartDate", self.ns).text),
+            "FinishDate": datetime.datetime.fromisoformat(activity.find("pr:FinishDate", self.ns).text),
+            "PlannedDuration": activity.find("pr:PlannedDuration", self.ns).text,
+            "Status": activity.find("pr:Status", self.ns).text,
+            "CalendarObjectId": activity.find("pr:CalendarObjectId", self.ns).text,
+            "ifc": None,
+        }
 
-    def parse_relationship_xml(self, project):
-        for relationship in project.findall("pr:Relationship", self.ns):
-            predecessor = relationship.find("pr:PredecessorActivityObjectId", self.ns).text
-            successor = relationship.find("pr:SuccessorActivityObjectId", self.ns).text
-            if predecessor not in self.activities or successor not in self.activities:
-                continue
-            self.relationships[relationship.find("pr:ObjectId", self.ns).text] = {
-                "PredecessorActivity": predecessor,
-                "SuccessorActivity": successor,
-                "Type": self.sequence_type_map[relationship.find("pr:Type", self.ns).text],
-                "Lag": relationship.find("pr:Lag", self.ns).text,
-            }
+    def parse_relationship_xml(self, relationship):
+        self.relationships[relationship.find("pr:ObjectId", self.ns).text] = {
+            "PredecessorActivity": relationship.find("pr:PredecessorActivityObjectId", self.ns).text,
+            "SuccessorActivity": relationship.find("pr:SuccessorActivityObjectId", self.ns).text,
+            "Type": self.sequence_type_map[relationship.find("pr:Type", self.ns).text],
+            "Lag": relationship.find("pr:Lag", self.ns).text,
+        }
 
     def get_wbs(self, wbs):
         return {"Name": wbs.find("pr:Name", self.ns).text, "subtasks": []}
 
-    def parse_resources_xml(self, project):
-        resources = project.findall("pr:Resource", self.ns)
-        for resource in resources:
-            id = resource.find("pr:ObjectId", self.ns).text
-            self.resources[id] = {
-                "Name": resource.find("pr:Name", self.ns).text,
-                "Code": resource.find("pr:Id", self.ns).text,
-                "ParentObjectId": resource.find("pr:ParentObjectId", self.ns).text,
-                "Type": self.resource_type_map[resource.find("pr:ResourceType", self.ns).text],
-                "ifc": None,
-                "rel": None,
-            }
-        print("Resource found", self.resources)
+    def parse_resource_xml(self, resource):
+        id = resource.find("pr:ObjectId", self.ns).text
+        self.resources[id] = {
+            "Name": resource.find("pr:Name", self.ns).text,
+            "Code": resource.find("pr:Id", self.ns).text,
+            "ParentObjectId": resource.find("pr:ParentObjectId", self.ns).text,
+            "Type": self.resource_type_map[resource.find("pr:ResourceType", self.ns).text],
+            "ifc": None,
+            "rel": None,
+        }
@@ -0,0 +1,66 @@
+# Ifc4D - IFC scheduling utility
+# Copyright (C) 2024 Dion Moult <dion@thinkmoult.com>
+#
+# This file is part of Ifc4D.
+#
+# Ifc4D is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ifc4D is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Ifc4D.  If not, see <http://www.gnu.org/licenses/>.
+
+import xml.etree.ElementTree as ET
+from typing import Iterable, Iterator
+
+
+def get_namespace(element: ET.Element) -> str:
+    return element.tag[1:].partition("}")[0]
+
+
+def iterparse(source, paths: Iterable[str]) -> Iterator[tuple[str, ET.Element]]:
+    """Yields elements at the given paths as soon as they are fully parsed
+
+    Schedule exports may be hundreds of megabytes, so instead of building the
+    whole document, elements are discarded as soon as they are closed. Only
+    the subtree of the element currently being yielded is ever held in memory.
+
+    :param source: A filename or file object of the XML document
+    :param paths: Slash separated paths of local tag names, relative to the
+        root element and without namespaces, such as "Tasks/Task". If a path
+        contains other paths, such as "Project" and "Project/WBS", the
+        container is yielded when it closes, after (and without) its
+        contents, so callers know when it has ended.
+    :return: Pairs of the matched path and the element, in document order.
+        The element is discarded once the caller moves on to the next one.
+    """
+    paths = {tuple(p.split("/")) for p in paths}
+    containers = {p[:i] for p in paths for i in range(len(p))}
+    elements = []
+    names = []
+    total_wanted = 0  # The number of open wanted elements, whose contents are kept
+    for event, element in ET.iterparse(source, events=("start", "end")):
+        if event == "start":
+            elements.append(element)
+            names.append(element.tag.rpartition("}")[2])
+            path = tuple(names[1:])
+            if path in paths and path not in containers:
+                total_wanted += 1
+            continue
+        path = tuple(names[1:])
+        elements.pop()
+        names.pop()
+        if path in paths:
+            if path not in containers:
+                total_wanted -= 1
+            yield "/".join(path), element
+        elif total_wanted:
+            continue  # Part of a wanted element, which is discarded as a whole
+        if elements:
+            elements[-1].remove(element)
@@ -17,6 +17,8 @@
 # along with Ifc5D.  If not, see <http://www.gnu.org/licenses/>.
 
 import csv
+import time
+import logging
 import ifcopenshell
 import ifcopenshell.api
 import ifcopenshell.util.unit
@@ -33,10 +35,20 @@ class Csv2Ifc:
         self.cost_schedule = None
         self.is_schedule_of_rates = False
         self.units = {}
+        self.timings = {}
+        self.logger = logging.getLogger(__name__)
 
     def execute(self):
-        self.parse_csv()
+        self.time("parse_csv", self.parse_csv)
         self.create_ifc()
+        for phase, duration in self.timings.items():
+            self.logger.info("%s finished in %.2fs", phase, duration)
+
+    def time(self, phase, callback, *args):
+        start = time.perf_counter()
+        result = callback(*args)
+        self.timings[phase] = self.timings.get(phase, 0.0) + time.perf_counter() - start
+        return result
 
     def parse_csv(self):
         self.parents = {}
@@ -106,18 +118,32 @@ class Csv2Ifc:
             self.cost_schedule = ifcopenshell.api.run("cost.add_cost_schedule", self.file, name="CSV Import")
             if self.is_schedule_of_rates:
                 self.cost_schedule.PredefinedType = "SCHEDULEOFRATES"
-        self.create_cost_items(self.cost_items)
+        self.assignments = []
+        self.query_results = {}
+        self.quantity_names = None
+        self.time("create_cost_items", self.create_cost_items, self.cost_items)
+        self.time("query", self.query_assignments)
+        self.time("assignment", self.assign_quantities)
 
     def create_cost_items(self, cost_items, parent=None):
         for cost_item in cost_items:
-            self.create_cost_item(cost_item, parent)
-
-    def create_cost_item(self, cost_item, parent):
-        if parent is None:
-            cost_item["ifc"] = ifcopenshell.api.run("cost.add_cost_item", self.file, cost_schedule=self.cost_schedule)
-        else:
-            cost_item["ifc"] = ifcopenshell.api.run("cost.add_cost_item", self.file, cost_item=parent)
+            if parent is None:
+                cost_item["ifc"] = ifcopenshell.api.run(
+                    "cost.add_cost_item", self.file, cost_schedule=self.cost_schedule
+                )
+            else:
+                cost_item["ifc"] = ifcopenshell.api.run("cost.add_cost_item", self.file)
+            self.create_cost_item(cost_item)
+        if parent is not None and cost_items:
+            # Nesting all children at once avoids rewriting the nesting relationship per child
+            ifcopenshell.api.run(
+                "nest.assign_object",
+                self.file,
+                related_objects=[c["ifc"] for c in cost_items],
+                relating_object=parent,
+            )
 
+    def create_cost_item(self, cost_item):
         cost_item["ifc"].Name = cost_item["Name"]
         cost_item["ifc"].Identification = cost_item["Identification"]
 
@@ -171,18 +197,62 @@ class Csv2Ifc:
                 prop_name = ""
             else:
                 prop_name = cost_item["assignments"]["PropertyName"]
-            results = ifcopenshell.util.selector.filter_elements(self.file, cost_item["assignments"]["Query"])
-            results = [r for r in results if has_property(self.file, r, prop_name)]
+            self.assignments.append((cost_item["ifc"], cost_item["assignments"]["Query"], prop_name))
+
+        self.create_cost_items(cost_item["children"], cost_item["ifc"])
+
+    def query_assignments(self):
+        # Rows frequently share queries, so each distinct query is only run once.
+        # Queries run after all cost items are created and are assumed to not
+        # select the imported cost items themselves.
+        for _, query, _ in self.assignments:
+            if query not in self.query_results:
+                self.query_results[query] = ifcopenshell.util.selector.filter_elements(self.file, query)
+
+    def assign_quantities(self):
+        for cost_item, query, prop_name in self.assignments:
+            results = self.query_results[query]
+            if prop_name:
+                results = [r for r in results if prop_name in self.get_quantity_names(r)]
             if results:
                 ifcopenshell.api.run(
                     "cost.assign_cost_item_quantity",
                     self.file,
-                    cost_item=cost_item["ifc"],
-                    products=results,
+                    cost_item=cost_item,
+                    products=list(results),
                     prop_name=prop_name,
                 )
 
-        self.create_cost_items(cost_item["children"], cost_item["ifc"])
+    def get_quantity_names(self, product):
+        if self.quantity_names is None:
+            self.quantity_names = self.index_quantity_names()
+        return self.quantity_names.get(product.id(), ())
+
+    def index_quantity_names(self):
+        """Maps product ids to the names of all their quantities in a single pass
+
+        This is equivalent to looking up the quantities of every product with
+        ifcopenshell.util.element.get_psets, including those inherited from
+        the product's type.
+        """
+        quantity_names = {}
+
+        def get_names(definitions):
+            return {q.Name for d in definitions if d.is_a("IfcElementQuantity") for q in d.Quantities}
+
+        for rel in self.file.by_type("IfcRelDefinesByProperties"):
+            definitions = rel.RelatingPropertyDefinition
+            if not isinstance(definitions, tuple):  # IFC4 allows a set of definitions
+                definitions = (definitions,)
+            if names := get_names(definitions):
+                for related_object in rel.RelatedObjects:
+                    quantity_names.setdefault(related_object.id(), set()).update(names)
+        for element_type in self.file.by_type("IfcTypeObject"):
+            if names := get_names(element_type.HasPropertySets or []):
+                quantity_names.setdefault(element_type.id(), set()).update(names)
+                for occurrence in ifcopenshell.util.element.get_types(element_type):
+                    quantity_names.setdefault(occurrence.id(), set()).update(names)
+        return quantity_names
 
     def create_unit(self, symbol):
         unit = self.units.get(symbol, None)
@@ -46,13 +46,14 @@ class IfcDataGetter:
         return [obj for rel in cost_schedule.Controls or [] for obj in rel.RelatedObjects or []]
 
     @staticmethod
-    def get_cost_item_values(cost_item=None):
+    def get_cost_item_values(cost_item=None, evaluator=None):
         if not cost_item:
             return None
+        evaluator = evaluator or ifcopenshell.util.cost.CostEvaluator()
         values = []
         for cost_value in cost_item.CostValues or []:
             name = cost_value.Name
-            applied_value = ifcopenshell.util.cost.calculate_applied_value(cost_item, cost_value)
+            applied_value = evaluator.get_applied_value(cost_item, cost_value)
             unit = IfcDataGetter.get_cost_value_unit(cost_value)
             values.append(
                 {
@@ -88,12 +89,12 @@ class IfcDataGetter:
         return categories
 
     @staticmethod
-    def process_cost_data(file, cost_item, cost_items_data, index, hierarchy="1"):
+    def process_cost_data(file, cost_item, cost_items_data, index, hierarchy="1", evaluator=None):
         def listToString(s):
             return ", ".join([str(i) for i in s])
 
         quantity_data = IfcDataGetter.get_cost_item_quantity(file, cost_item)
-        cost_values_data = IfcDataGetter.get_cost_item_values(cost_item)
+        cost_values_data = IfcDataGetter.get_cost_item_values(cost_item, evaluator)
 
         data = {
             "Index": index,
@@ -123,7 +124,7 @@ class IfcDataGetter:
         index += 1
         child_hierarchy = hierarchy + ".1"
         for nested_cost in [obj for rel in cost_item.IsNestedBy or [] for obj in rel.RelatedObjects or []]:
-            IfcDataGetter.process_cost_data(file, nested_cost, cost_items_data, index, child_hierarchy)
+            IfcDataGetter.process_cost_data(file, nested_cost, cost_items_data, index, child_hierarchy, evaluator)
             child_hierarchy = (
                 ".".join(child_hierarchy.split(".")[:-1]) + "." + str(int(child_hierarchy.split(".")[-1]) + 1)
             )
@@ -132,8 +133,10 @@ class IfcDataGetter:
     def get_cost_items_data(file, schedule):
         cost_items_data = []
         index = 0
+        evaluator = ifcopenshell.util.cost.CostEvaluator()
+        evaluator.evaluate(schedule)
         for cost_item in IfcDataGetter.get_root_costs(schedule):
-            IfcDataGetter.process_cost_data(file, cost_item, cost_items_data, index)
+            IfcDataGetter.process_cost_data(file, cost_item, cost_items_data, index, evaluator=evaluator)
         return cost_items_data
 
     @staticmethod
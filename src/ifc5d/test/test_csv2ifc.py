@@ -0,0 +1,91 @@
+# Ifc5D - IFC costing utility
+# Copyright (C) 2024 Dion Moult <dion@thinkmoult.com>
+#
+# This file is part of Ifc5D.
+#
+# Ifc5D is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ifc5D is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Ifc5D.  If not, see <http://www.gnu.org/licenses/>.
+
+import pytest
+import ifcopenshell
+import ifcopenshell.api
+import ifcopenshell.util.selector
+from ifc5d.csv2ifc import Csv2Ifc
+
+
+CSV_DATA = """Hierarchy,Identification,Name,Quantity,Unit,Value,Property,Query
+1,1,Concrete,,m3,100,NetVolume,IfcSlab
+1,2,Formwork,,m3,20,COUNT,IfcSlab
+1,3,Finishes,,m3,10,,IfcSlab
+1,4,Walls,,m3,50,NetVolume,IfcWall
+"""
+
+
+class TestCsv2Ifc:
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path, monkeypatch):
+        self.file = ifcopenshell.file(schema="IFC4")
+        ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcProject")
+        self.csv = tmp_path / "costs.csv"
+        self.csv.write_text(CSV_DATA)
+        self.queries = []
+        filter_elements = ifcopenshell.util.selector.filter_elements
+
+        def count_queries(ifc_file, query, *args, **kwargs):
+            self.queries.append(query)
+            return filter_elements(ifc_file, query, *args, **kwargs)
+
+        monkeypatch.setattr(ifcopenshell.util.selector, "filter_elements", count_queries)
+
+    def create_element(self, ifc_class, volume=None):
+        element = ifcopenshell.api.run("root.create_entity", self.file, ifc_class=ifc_class)
+        if volume is not None:
+            qto = ifcopenshell.api.run("pset.add_qto", self.file, product=element, name="Qto_BaseQuantities")
+            ifcopenshell.api.run("pset.edit_qto", self.file, qto=qto, properties={"NetVolume": volume})
+        return element
+
+    def import_csv(self):
+        csv2ifc = Csv2Ifc()
+        csv2ifc.csv = str(self.csv)
+        csv2ifc.file = self.file
+        csv2ifc.execute()
+        return {i.Identification: i for i in self.file.by_type("IfcCostItem")}
+
+    def get_quantity(self, element):
+        return element.IsDefinedBy[0].RelatingPropertyDefinition.Quantities[0]
+
+    def test_shared_queries_are_only_run_once(self):
+        slab1 = self.create_element("IfcSlab", 42.0)
+        slab2 = self.create_element("IfcSlab", 24.0)
+        slab3 = self.create_element("IfcSlab")
+        wall = self.create_element("IfcWall", 12.0)
+        items = self.import_csv()
+        assert sorted(self.queries) == ["IfcSlab", "IfcWall"]
+
+        assert set(items["1"].CostQuantities) == {self.get_quantity(slab1), self.get_quantity(slab2)}
+        assert set(items["1"].Controls[0].RelatedObjects) == {slab1, slab2}
+
+        for identification in ("2", "3"):
+            assert len(items[identification].CostQuantities) == 1
+            assert items[identification].CostQuantities[0].CountValue == 3
+            assert set(items[identification].Controls[0].RelatedObjects) == {slab1, slab2, slab3}
+
+        assert items["4"].CostQuantities == (self.get_quantity(wall),)
+        assert items["4"].Controls[0].RelatedObjects == (wall,)
+
+    def test_queries_without_results_are_not_assigned(self):
+        self.create_element("IfcSlab")
+        items = self.import_csv()
+        assert items["1"].CostQuantities is None
+        assert not items["1"].Controls
+        assert not items["4"].Controls
@@ -21,7 +21,9 @@
 # This can be packaged with `pyinstaller --onefile --clean --icon=icon.ico ifcdiff.py`
 
 import time
+import gzip
 import json
+import hashlib
 import logging
 import argparse
 import numpy as np
@@ -42,9 +44,10 @@ class IfcDiff:
 
     If you are using IfcDiff as a library, this is the class you should use.
 
-    :param old: IFC file object for the old model
-    :type old: ifcopenshell.file.file
-    :param new: IFC file object for the old model
+    :param old: IFC file object for the old model, or a snapshot of the old
+        model loaded with ``load_snapshot``
+    :type old: ifcopenshell.file.file,dict
+    :param new: IFC file object for the new model
     :type new: ifcopenshell.file.file
     :param relationships: List of relationships to check. None means that only
         geometry is compared.
@@ -56,6 +59,10 @@ class IfcDiff:
     :param filter_elements: An IFC filter query if you only want to compare a
         subset of elements. For example: ``IfcWall`` to only compare walls.
     :type filter_elements: string
+    :param jobs: Number of processes used to hash element attributes and
+        relationships before the detailed comparison. Only elements whose
+        hashes differ are compared in detail.
+    :type jobs: int
 
     Example::
 
@@ -65,43 +72,54 @@ class IfcDiff:
         ifc_diff.diff()
         print(ifc_diff.change_register)
         ifc_diff.export()
+
+        # Persist the new model so that later revisions can be diffed
+        # against it without loading it again
+        ifc_diff.export_snapshot(ifc_diff.new, "/path/to/baseline.json")
+        # Or store values too, to recheck differing hashes with a tolerance
+        ifc_diff.export_snapshot(ifc_diff.new, "/path/to/baseline.json", include_values=True)
+        baseline = IfcDiff.load_snapshot("/path/to/baseline.json")
+        ifc_diff = IfcDiff(baseline, ifcopenshell.open("/path/to/newer.ifc"))
+        ifc_diff.diff()
     """
 
-    def __init__(self, old, new, relationships=None, is_shallow=True, filter_elements=None):
+    change_keys = {
+        "attributes": "attributes_changed",
+        "type": "type_changed",
+        "property": "properties_changed",
+        "container": "container_changed",
+        "aggregate": "aggregate_changed",
+        "classification": "classification_changed",
+        "geometry": "geometry_changed",
+    }
+
+    # Relationships containing numbers, which snapshots may store as values
+    snapshot_value_relationships = ("attributes", "property")
+
+    def __init__(self, old, new, relationships=None, is_shallow=True, filter_elements=None, jobs=1):
         self.old = old
         self.new = new
         self.change_register = {}
         self.representation_ids = {}
         self.relationships = relationships or ["geometry"]
         self.precision = 1e-4
+        self.geometry_precision = 1e-5
         self.is_shallow = is_shallow
         self.filter_elements = filter_elements
+        self.jobs = jobs
 
     def diff(self):
         logging.disable(logging.CRITICAL)
 
+        if isinstance(self.old, dict):
+            self.diff_snapshot()
+            logging.disable(logging.NOTSET)
+            return
+
         self.precision = self.get_precision()
 
-        if self.filter_elements:
-            old_elements = set(
-                e.GlobalId for e in ifcopenshell.util.selector.filter_elements(self.old, self.filter_elements)
-            )
-            new_elements = set(
-                e.GlobalId for e in ifcopenshell.util.selector.filter_elements(self.new, self.filter_elements)
-            )
-        else:
-            old_elements = self.old.by_type("IfcElement")
-            if self.old.schema == "IFC2X3":
-                old_elements += self.old.by_type("IfcSpatialStructureElement")
-            else:
-                old_elements += self.old.by_type("IfcSpatialElement")
-            old_elements = set(e.GlobalId for e in old_elements if not e.is_a("IfcFeatureElement"))
-            new_elements = self.new.by_type("IfcElement")
-            if self.new.schema == "IFC2X3":
-                new_elements += self.new.by_type("IfcSpatialStructureElement")
-            else:
-                new_elements += self.new.by_type("IfcSpatialElement")
-            new_elements = set(e.GlobalId for e in new_elements if not e.is_a("IfcFeatureElement"))
+        old_elements = self.get_elements(self.old)
+        new_elements = self.get_elements(self.new)
 
         print(" - {} item(s) are in the old model".format(len(old_elements)))
         print(" - {} item(s) are in the new model".format(len(new_elements)))
@@ -132,16 +150,27 @@ class IfcDiff:
             else:
                 should_check_other = True
 
+        hashed_relationships = [r for r in self.relationships if r != "geometry"]
+        if hashed_relationships:
+            print("... hashing old elements ...")
+            old_hashes = self.hash_elements(self.old, same_elements, hashed_relationships)
+            print("... hashing new elements ...")
+            new_hashes = self.hash_elements(self.new, same_elements, hashed_relationships)
+
         for global_id in same_elements:
             total_diffed += 1
             if total_diffed % 250 == 0:
                 print("{}/{} diffed ...".format(total_diffed, total_same_elements), end="\r", flush=True)
             old = self.old.by_id(global_id)
             new = self.new.by_id(global_id)
-            if should_check_attributes:
+            if hashed_relationships:
+                old_hash = old_hashes[global_id]
+                new_hash = new_hashes[global_id]
+                changed = {r for r in hashed_relationships if old_hash.get(r) != new_hash.get(r)}
+            if should_check_attributes and "attributes" in changed:
                 if self.diff_element(old, new) and self.is_shallow:
                     continue
-            if should_check_other:
+            if should_check_other and changed - {"attributes"}:
                 if self.diff_element_relationships(old, new) and self.is_shallow:
                     continue
             if should_check_geometry:
@@ -172,8 +201,7 @@ class IfcDiff:
                     self.change_register.setdefault(global_id, {}).update({"geometry_changed": True})
                     continue
                 del new_shapes[global_id]
-                diff = DeepDiff(old_shape, new_shape, math_epsilon=1e-5)
-                if diff:
+                if self.diff_shape(old_shape, new_shape):
                     self.change_register.setdefault(global_id, {}).update({"geometry_changed": True})
                     continue
 
@@ -184,6 +212,260 @@ class IfcDiff:
 
         logging.disable(logging.NOTSET)
 
+    def diff_snapshot(self):
+        snapshot = self.old
+        if snapshot.get("filter_elements") != self.filter_elements:
+            raise ValueError("The snapshot was created with a different element filter")
+        missing = set(self.relationships) - set(snapshot["relationships"])
+        if missing:
+            raise ValueError("The snapshot does not include the relationships: {}".format(", ".join(sorted(missing))))
+
+        # Hashes are only comparable when quantised identically
+        self.precision = snapshot["precision"]
+        self.geometry_precision = snapshot["geometry_precision"]
+
+        old_elements = set(snapshot["elements"].keys())
+        new_elements = self.get_elements(self.new)
+
+        print(" - {} item(s) are in the old snapshot".format(len(old_elements)))
+        print(" - {} item(s) are in the new model".format(len(new_elements)))
+
+        self.deleted_elements = old_elements - new_elements
+        self.added_elements = new_elements - old_elements
+        same_elements = new_elements - self.added_elements
+
+        print(" - {} item(s) were added".format(len(self.added_elements)))
+        print(" - {} item(s) were deleted".format(len(self.deleted_elements)))
+        print(" - {} item(s) are common to both models".format(len(same_elements)))
+
+        hashed_relationships = [r for r in self.relationships if r != "geometry"]
+        print("... hashing new elements ...")
+        new_hashes = self.hash_elements(self.new, same_elements, hashed_relationships)
+
+        potential_new_changes = []
+        for global_id in same_elements:
+            old_hash = snapshot["elements"][global_id]
+            new_hash = new_hashes[global_id]
+            for relationship in hashed_relationships:
+                if old_hash.get(relationship) == new_hash.get(relationship):
+                    continue
+                # Values within precision may still round to different quanta
+                change = self.diff_snapshot_value(snapshot, global_id, relationship)
+                if change:
+                    self.change_register.setdefault(global_id, {})[self.change_keys[relationship]] = change
+                    if self.is_shallow:
+                        break
+            if global_id in self.change_register and self.is_shallow:
+                continue
+            if "geometry" in self.relationships:
+                new = self.new.by_id(global_id)
+                if ifcopenshell.util.representation.get_representation(new, "Model", "Body", "MODEL_VIEW"):
+                    potential_new_changes.append(new)
+
+        print(" - {} item(s) had simple changes".format(len(self.change_register.keys())))
+
+        if potential_new_changes:
+            print(" - {} item(s) are queued for a detailed geometry check".format(len(potential_new_changes)))
+            print("... processing new shapes ...")
+            new_shapes = self.summarise_shapes(self.new, potential_new_changes)
+            print("... comparing shapes ...")
+            for new in potential_new_changes:
+                old_shape = snapshot["shapes"].get(new.GlobalId)
+                new_shape = new_shapes.get(new.GlobalId)
+                if old_shape is None and new_shape is None:
+                    continue
+                elif old_shape is None or new_shape is None or self.diff_shape(old_shape, new_shape):
+                    self.change_register.setdefault(new.GlobalId, {}).update({"geometry_changed": True})
+
+        print(" - {} item(s) were changed".format(len(self.change_register.keys())))
+
+    def diff_snapshot_value(self, snapshot, global_id, relationship):
+        """Compares a relationship whose hash differs from the snapshot
+
+        If the snapshot includes values, relationships containing numbers
+        are compared again with DeepDiff using the model precision, like in a
+        diff of two models. Otherwise, and for other relationships, which are
+        normalised to GlobalIds and strings, a different hash means they have
+        changed.
+
+        :return: A truthy value describing the change, or None if the values
+            are equal within the precision.
+        """
+        old_value = snapshot.get("values", {}).get(global_id, {}).get(relationship)
+        if relationship not in self.snapshot_value_relationships or old_value is None:
+            return True
+        new_value = self.get_snapshot_value(self.new, self.new.by_id(global_id), relationship)
+        try:
+            diff = DeepDiff(
+                old_value,
+                new_value,
+                math_epsilon=self.precision,
+                ignore_string_type_changes=True,
+                ignore_numeric_type_changes=True,
+                exclude_regex_paths=[r"\['id'\]$"],
+            )
+        except:
+            return True
+        if not diff:
+            return
+        if relationship == "property":
+            return diff
+        return True
+
+    def get_elements(self, ifc):
+        if self.filter_elements:
+            return set(e.GlobalId for e in ifcopenshell.util.selector.filter_elements(ifc, self.filter_elements))
+        elements = ifc.by_type("IfcElement")
+        if ifc.schema == "IFC2X3":
+            elements += ifc.by_type("IfcSpatialStructureElement")
+        else:
+            elements += ifc.by_type("IfcSpatialElement")
+        return set(e.GlobalId for e in elements if not e.is_a("IfcFeatureElement"))
+
+    def create_snapshot(self, ifc, include_values=False):
+        """Summarises a model so that it can later be diffed without loading it
+
+        The snapshot stores, per GlobalId, the hashes of the attributes and
+        relationships configured for this diff, as well as the geometry
+        fingerprint of every element with a body representation.
+
+        Hashes are computed from values quantised to the model precision, so
+        values within the precision of each other may still have different
+        hashes if they round to different quanta. Such a difference is
+        reported as a change unless ``include_values`` is set.
+
+        :param ifc: The model to summarise
+        :type ifc: ifcopenshell.file.file
+        :param include_values: Also store the attribute and property values
+            and the shape vertices and faces, so that a differing hash is
+            checked again with a tolerance. This makes the snapshot about as
+            large as the property and geometry data of the model.
+        :type include_values: bool
+        :return: A JSON serialisable snapshot
+        :rtype: dict
+        """
+        logging.disable(logging.CRITICAL)
+        self.precision = self.get_precision(ifc)
+        global_ids = self.get_elements(ifc)
+        hashed_relationships = [r for r in self.relationships if r != "geometry"]
+        value_relationships = [r for r in hashed_relationships if r in self.snapshot_value_relationships]
+        values = {}
+        if include_values and value_relationships:
+            for global_id in global_ids:
+                element = ifc.by_id(global_id)
+                values[global_id] = {r: self.get_snapshot_value(ifc, element, r) for r in value_relationships}
+        shapes = {}
+        if "geometry" in self.relationships:
+            elements = [ifc.by_id(g) for g in global_ids]
+            elements = [
+                e
+                for e in elements
+                if ifcopenshell.util.representation.get_representation(e, "Model", "Body", "MODEL_VIEW")
+            ]
+            if elements:
+                for global_id, shape in self.summarise_shapes(ifc, elements).items():
+                    if include_values:
+                        shape["verts"] = shape["verts"].tolist()
+                        shape["faces"] = shape["faces"].tolist()
+                    else:
+                        del shape["verts"], shape["faces"]
+                    shape["matrix"] = shape["matrix"].tolist()
+                    shapes[global_id] = shape
+        snapshot = {
+            "schema": ifc.schema,
+            "precision": self.precision,
+            "geometry_precision": self.geometry_precision,
+            "relationships": self.relationships,
+            "filter_elements": self.filter_elements,
+            "elements": self.hash_elements(ifc, global_ids, hashed_relationships),
+            "shapes": shapes,
+        }
+        if include_values:
+            snapshot["values"] = values
+        logging.disable(logging.NOTSET)
+        return snapshot
+
+    def export_snapshot(self, ifc, path, include_values=False):
+        snapshot = self.create_snapshot(ifc, include_values=include_values)
+        with (gzip.open if path.endswith(".gz") else open)(path, "wt", encoding="utf-8") as snapshot_file:
+            json.dump(snapshot, snapshot_file, separators=(",", ":"))
+
+    @staticmethod
+    def load_snapshot(path):
+        with (gzip.open if path.endswith(".gz") else open)(path, "rt", encoding="utf-8") as snapshot_file:
+            return json.load(snapshot_file)
+
+    def get_snapshot_value(self, ifc, element, relationship):
+        # Values are stored as they would be loaded back from JSON
+        value = self.get_relationship_value(ifc, element, relationship)
+        return json.loads(json.dumps(value, default=self.normalise_value))
+
+    def hash_elements(self, ifc, global_ids, relationships):
+        global_ids = list(global_ids)
+        if self.jobs > 1 and len(global_ids) > self.jobs and "fork" in multiprocessing.get_all_start_methods():
+            global _hash_context
+            _hash_context = (self, ifc, relationships)
+            chunk_size = -(-len(global_ids) // (self.jobs * 4))
+            chunks = [global_ids[i : i + chunk_size] for i in range(0, len(global_ids), chunk_size)]
+            hashes = {}
+            # Forked workers inherit the already loaded model, so it is not reparsed
+            with multiprocessing.get_context("fork").Pool(self.jobs) as pool:
+                for result in pool.imap_unordered(_hash_chunk, chunks):
+                    hashes.update(result)
+            _hash_context = None
+            return hashes
+        return {g: self.hash_element(ifc, ifc.by_id(g), relationships) for g in global_ids}
+
+    def hash_element(self, ifc, element, relationships):
+        """Hashes the content of an element for a quick equality check
+
+        Each relationship is hashed separately. Entity references are
+        normalised to GlobalIds and numbers are quantised to the model
+        precision, so that equal hashes mean there is nothing to diff.
+
+        :return: A dictionary of relationship names to hex digests
+        :rtype: dict[str, str]
+        """
+        results = {}
+        for relationship in relationships:
+            if relationship not in self.change_keys or relationship == "geometry":
+                continue
+            value = self.get_relationship_value(ifc, element, relationship)
+            results[relationship] = hashlib.blake2b(
+                repr(self.normalise_value(value)).encode(), digest_size=16
+            ).hexdigest()
+        return results
+
+    def get_relationship_value(self, ifc, element, relationship):
+        if relationship == "attributes":
+            return [a for a in element if not isinstance(a, (ifcopenshell.entity_instance, tuple))]
+        elif relationship == "type":
+            return ifcopenshell.util.element.get_type(element)
+        elif relationship == "property":
+            return ifcopenshell.util.element.get_psets(element)
+        elif relationship == "container":
+            return ifcopenshell.util.element.get_container(element)
+        elif relationship == "aggregate":
+            return ifcopenshell.util.element.get_aggregate(element)
+        elif relationship == "classification":
+            attribute = "ItemReference" if ifc.schema == "IFC2X3" else "Identification"
+            return [getattr(r, attribute) for r in ifcopenshell.util.classification.get_references(element)]
+
+    def normalise_value(self, value):
+        if isinstance(value, ifcopenshell.entity_instance):
+            if hasattr(value, "GlobalId"):
+                return value.GlobalId
+            return self.normalise_value(value.get_info(include_identifier=False, recursive=True))
+        elif isinstance(value, dict):
+            return sorted((k, self.normalise_value(v)) for k, v in value.items() if k != "id")
+        elif isinstance(value, (list, tuple)):
+            return [self.normalise_value(v) for v in value]
+        elif isinstance(value, bool) or value is None:
+            return value
+        elif isinstance(value, (int, float)):
+            return int(round(value / self.precision))
+        return str(value)
+
     def summarise_shapes(self, ifc, elements):
         shapes = {}
         iterator = ifcopenshell.geom.iterator(
@@ -193,25 +475,89 @@ class IfcDiff:
         while True:
             shape = iterator.get()
             element = ifc.by_id(shape.id)
-            geometry = shape.geometry
-            if geometry.verts:
-                shapes[element.GlobalId] = {
-                    "total_verts": len(geometry.verts),
-                    "sum_verts": sum(geometry.verts),
-                    "min_vert": min(geometry.verts),
-                    "max_vert": max(geometry.verts),
-                    "matrix": tuple(shape.transformation.matrix.data),
-                    "openings": sorted(
-                        [o.RelatedOpeningElement.GlobalId for o in getattr(element, "HasOpenings", []) or []]
-                    ),
-                    "projections": sorted(
-                        [o.RelatedFeatureElement.GlobalId for o in getattr(element, "HasProjections", []) or []]
-                    ),
-                }
+            summary = self.summarise_shape(element, shape)
+            if summary:
+                shapes[element.GlobalId] = summary
             if not iterator.next():
                 break
         return shapes
 
+    def summarise_shape(self, element, shape):
+        """Fingerprints a shape produced by the geometry iterator
+
+        Vertices (in local coordinates), faces and the placement matrix are
+        read directly from the iterator buffers. See ``summarise_mesh``.
+
+        :return: A dictionary summarising the shape, or None if the shape has
+            no vertices.
+        :rtype: dict
+        """
+        geometry = shape.geometry
+        verts = np.frombuffer(geometry.verts_buffer)
+        if not verts.size:
+            return
+        faces = np.frombuffer(geometry.faces_buffer, dtype=np.int32)
+        matrix = np.array(shape.transformation.matrix.data)
+        openings = sorted([o.RelatedOpeningElement.GlobalId for o in getattr(element, "HasOpenings", []) or []])
+        projections = sorted([o.RelatedFeatureElement.GlobalId for o in getattr(element, "HasProjections", []) or []])
+        return self.summarise_mesh(verts, faces, matrix, openings, projections)
+
+    def summarise_mesh(self, verts, faces, matrix, openings, projections):
+        """Fingerprints a mesh
+
+        The vertices and the matrix are quantised to ``geometry_precision``
+        and hashed with the faces, openings and projections. The buffers are
+        kept alongside the hash, so that meshes whose hashes differ only due
+        to quantisation can still be compared elementwise with a tolerance.
+
+        :return: A dictionary summarising the mesh
+        :rtype: dict
+        """
+        h = hashlib.blake2b(digest_size=16)
+        h.update(np.rint(verts / self.geometry_precision).astype(np.int64).tobytes())
+        h.update(faces.tobytes())
+        h.update(np.rint(matrix / self.geometry_precision).astype(np.int64).tobytes())
+        h.update("|".join(openings).encode())
+        h.update(b"#")
+        h.update("|".join(projections).encode())
+
+        return {
+            "hash": h.hexdigest(),
+            "verts": verts,
+            "faces": faces,
+            "matrix": matrix,
+            "openings": openings,
+            "projections": projections,
+        }
+
+    def diff_shape(self, old_shape, new_shape):
+        """Compares two shape summaries from ``summarise_shape``
+
+        Identical hashes mean identical geometry. Otherwise, the vertices and
+        the matrix are compared again elementwise using ``geometry_precision``
+        as a tolerance, since two values within tolerance may still round to
+        different quanta. Summaries without buffers, such as those stored in
+        snapshots without values, are changed if their hashes differ.
+
+        :return: True if the geometry has changed
+        :rtype: bool
+        """
+        if old_shape["hash"] == new_shape["hash"]:
+            return False
+        if old_shape["openings"] != new_shape["openings"] or old_shape["projections"] != new_shape["projections"]:
+            return True
+        if old_shape.get("verts") is None or new_shape.get("verts") is None:
+            return True
+        old_verts, new_verts = np.asarray(old_shape["verts"]), np.asarray(new_shape["verts"])
+        if old_verts.shape != new_verts.shape or not np.array_equal(old_shape["faces"], new_shape["faces"]):
+            return True
+        atol = self.geometry_precision
+        if not np.allclose(old_verts, new_verts, rtol=0, atol=atol):
+            return True
+        if not np.allclose(old_shape["matrix"], new_shape["matrix"], rtol=0, atol=atol):
+            return True
+        return False
+
     def get_settings(self, ifc):
         settings = ifcopenshell.geom.settings()
         settings.set(settings.STRICT_TOLERANCE, True)
@@ -257,8 +603,10 @@ class IfcDiff:
                 default=self.json_dump_default,
             )
 
-    def get_precision(self):
-        contexts = [c for c in self.new.by_type("IfcGeometricRepresentationContext") if c.ContextType == "Model"]
+    def get_precision(self, ifc=None):
+        contexts = [
+            c for c in (ifc or self.new).by_type("IfcGeometricRepresentationContext") if c.ContextType == "Model"
+        ]
         if contexts:
             return contexts[0].Precision or 1e-4
         return 1e-4
@@ -395,6 +743,14 @@ class IfcDiff:
                 return representation.Items[0].MappingSource.MappedRepresentation.id()
 
 
+_hash_context = None
+
+
+def _hash_chunk(global_ids):
+    ifc_diff, ifc, relationships = _hash_context
+    return {g: ifc_diff.hash_element(ifc, ifc.by_id(g), relationships) for g in global_ids}
+
+
 class DiffTerminator:
     def match(self, level) -> bool:
         return True
@@ -406,7 +762,7 @@ class DiffTerminator:
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Show the difference between two IFC files")
-    parser.add_argument("old", type=str, help="The old IFC file")
+    parser.add_argument("old", type=str, help="The old IFC file, or a snapshot (.json or .json.gz) of it")
     parser.add_argument("new", type=str, help="The new IFC file")
     parser.add_argument(
         "-o", "--output", type=str, help="The JSON diff file to output. Defaults to diff.json", default="diff.json"
@@ -418,22 +774,44 @@ if __name__ == "__main__":
         help='A list of space-separated relationships, chosen from "type", "property", "container", "aggregate", "classification"',
         default="",
     )
+    parser.add_argument(
+        "-j", "--jobs", type=int, help="Number of processes used to hash elements. Defaults to 1", default=1
+    )
+    parser.add_argument(
+        "-s",
+        "--snapshot",
+        type=str,
+        help="Also write a snapshot of the new model to this path, to later be used in place of the old IFC file",
+    )
+    parser.add_argument(
+        "--snapshot-values",
+        action="store_true",
+        help="Store values in the snapshot to recheck differing hashes with a tolerance, at the cost of a larger file",
+    )
     args = parser.parse_args()
 
     print("# IFC Diff")
 
     start = time.time()
     print("Loading old file ...")
-    old = ifcopenshell.open(args.old)
+    if args.old.endswith((".json", ".json.gz")):
+        old = IfcDiff.load_snapshot(args.old)
+    else:
+        old = ifcopenshell.open(args.old)
     print("Loading new file ...")
     new = ifcopenshell.open(args.new)
 
     print("# Loading finished in {:.2f} seconds".format(time.time() - start))
     start = time.time()
 
-    ifc_diff = IfcDiff(old, new, args.relationships.split())
+    ifc_diff = IfcDiff(old, new, args.relationships.split(), jobs=args.jobs)
     ifc_diff.diff()
 
     print("# Diff finished in {:.2f} seconds".format(time.time() - start))
 
     ifc_diff.export(args.output)
+
+    if args.snapshot:
+        start = time.time()
+        ifc_diff.export_snapshot(new, args.snapshot, include_values=args.snapshot_values)
+        print("# Snapshot written in {:.2f} seconds".format(time.time() - start))
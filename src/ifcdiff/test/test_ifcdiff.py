@@ -0,0 +1,130 @@
+# IfcDiff - Compare IFCs
+# Copyright (C) 2024 Dion Moult <dion@thinkmoult.com>
+#
+# This file is part of IfcDiff.
+#
+# IfcDiff is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# IfcDiff is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with IfcDiff.  If not, see <http://www.gnu.org/licenses/>.
+
+import pytest
+import numpy as np
+import ifcopenshell
+import ifcopenshell.api
+import ifcopenshell.api.owner.settings
+from ifcdiff import IfcDiff
+
+
+RELATIONSHIPS = ["attributes", "property"]
+
+
+@pytest.fixture(autouse=True)
+def setup():
+    ifcopenshell.api.owner.settings.get_user = lambda ifc: (ifc.by_type("IfcPersonAndOrganization") or [None])[0]
+    ifcopenshell.api.owner.settings.get_application = lambda ifc: (ifc.by_type("IfcApplication") or [None])[0]
+
+
+def create_model(walls):
+    ifc = ifcopenshell.api.run("project.create_file")
+    ifcopenshell.api.run("root.create_entity", ifc, ifc_class="IfcProject")
+    for global_id, (name, width) in walls.items():
+        wall = ifcopenshell.api.run("root.create_entity", ifc, ifc_class="IfcWall", name=name)
+        wall.GlobalId = global_id
+        pset = ifcopenshell.api.run("pset.add_pset", ifc, product=wall, name="Foo_Bar")
+        ifcopenshell.api.run("pset.edit_pset", ifc, pset=pset, properties={"Width": width})
+    return ifc
+
+
+class TestSnapshot:
+    def diff(self, old, new, tmp_path, include_values=True):
+        path = str(tmp_path / "old.json.gz")
+        IfcDiff(old, new, relationships=RELATIONSHIPS).export_snapshot(old, path, include_values=include_values)
+        ifc_diff = IfcDiff(IfcDiff.load_snapshot(path), new, relationships=RELATIONSHIPS)
+        ifc_diff.diff()
+        return ifc_diff
+
+    def test_diffing_against_a_snapshot_round_trip(self, tmp_path):
+        old = create_model({"0" * 22: ("Foo", 0.1), "1" * 22: ("Bar", 0.2), "2" * 22: ("Baz", 0.3)})
+        new = create_model({"0" * 22: ("Foo", 0.1), "1" * 22: ("Bar", 0.25), "3" * 22: ("Baz", 0.3)})
+        ifc_diff = self.diff(old, new, tmp_path)
+        assert ifc_diff.added_elements == {"3" * 22}
+        assert ifc_diff.deleted_elements == {"2" * 22}
+        assert list(ifc_diff.change_register) == ["1" * 22]
+        assert ifc_diff.change_register["1" * 22]["properties_changed"]["values_changed"] == {
+            "root['Foo_Bar']['Width']": {"new_value": 0.25, "old_value": 0.2}
+        }
+
+    def test_values_within_precision_across_a_quantisation_boundary_are_unchanged(self, tmp_path):
+        # With the default precision of 1e-4, these round to different quanta
+        old = create_model({"0" * 22: ("Foo", 0.10004)})
+        new = create_model({"0" * 22: ("Foo", 0.10006)})
+        assert self.diff(old, new, tmp_path).change_register == {}
+
+    def test_snapshots_only_store_hashes_by_default(self, tmp_path):
+        old = create_model({"0" * 22: ("Foo", 0.1), "1" * 22: ("Bar", 0.2)})
+        snapshot = IfcDiff(old, old, relationships=RELATIONSHIPS).create_snapshot(old)
+        assert "values" not in snapshot
+        assert set(snapshot["elements"]["0" * 22]) == {"attributes", "property"}
+
+    def test_changes_are_reported_from_hashes_without_values(self, tmp_path):
+        old = create_model({"0" * 22: ("Foo", 0.1), "1" * 22: ("Bar", 0.2)})
+        new = create_model({"0" * 22: ("Foo", 0.1), "1" * 22: ("Bar", 0.25)})
+        ifc_diff = self.diff(old, new, tmp_path, include_values=False)
+        assert ifc_diff.change_register == {"1" * 22: {"properties_changed": True}}
+
+    def test_attribute_changes_match_diffing_the_models(self, tmp_path):
+        old = create_model({"0" * 22: ("Foo", 0.1), "1" * 22: ("Bar", 0.2)})
+        new = create_model({"0" * 22: ("Foo", 0.1), "1" * 22: ("Baz", 0.2)})
+        ifc_diff = IfcDiff(old, new, relationships=RELATIONSHIPS)
+        ifc_diff.diff()
+        assert self.diff(old, new, tmp_path).change_register == ifc_diff.change_register
+        assert ifc_diff.change_register == {"1" * 22: {"attributes_changed": True}}
+
+
+class TestDiffShape:
+    def summarise(self, verts, matrix=None):
+        ifc_diff = IfcDiff(None, None)
+        verts = np.array(verts, dtype=float).ravel()
+        faces = np.array([0, 1, 2], dtype=np.int32)
+        matrix = np.eye(4).ravel() if matrix is None else np.array(matrix, dtype=float)
+        return ifc_diff, ifc_diff.summarise_mesh(verts, faces, matrix, [], [])
+
+    def test_identical_meshes_are_unchanged(self):
+        ifc_diff, old = self.summarise([[0, 0, 0], [1, 0, 0], [0, 1, 0]])
+        ifc_diff, new = self.summarise([[0, 0, 0], [1, 0, 0], [0, 1, 0]])
+        assert ifc_diff.diff_shape(old, new) is False
+
+    def test_permuted_vertices_within_the_same_bounds_are_changed(self):
+        # The sum, minimum and maximum of the vertices are equal
+        ifc_diff, old = self.summarise([[0, 0, 0], [1, 0, 0], [0, 1, 0]])
+        ifc_diff, new = self.summarise([[1, 0, 0], [0, 0, 0], [0, 1, 0]])
+        assert ifc_diff.diff_shape(old, new) is True
+
+    def test_vertices_within_precision_across_a_quantisation_boundary_are_unchanged(self):
+        # With the default geometry precision of 1e-5, these round to different quanta
+        ifc_diff, old = self.summarise([[0, 0, 0], [1.000004, 0, 0], [0, 1, 0]])
+        ifc_diff, new = self.summarise([[0, 0, 0], [1.000006, 0, 0], [0, 1, 0]])
+        assert old["hash"] != new["hash"]
+        assert ifc_diff.diff_shape(old, new) is False
+
+    def test_a_moved_placement_is_changed(self):
+        matrix = np.eye(4)
+        matrix[0][3] = 1.0
+        ifc_diff, old = self.summarise([[0, 0, 0], [1, 0, 0], [0, 1, 0]])
+        ifc_diff, new = self.summarise([[0, 0, 0], [1, 0, 0], [0, 1, 0]], matrix.ravel())
+        assert ifc_diff.diff_shape(old, new) is True
+
+    def test_summaries_without_buffers_are_changed_if_their_hashes_differ(self):
+        ifc_diff, old = self.summarise([[0, 0, 0], [1.000004, 0, 0], [0, 1, 0]])
+        ifc_diff, new = self.summarise([[0, 0, 0], [1.000006, 0, 0], [0, 1, 0]])
+        del old["verts"], old["faces"]
+        assert ifc_diff.diff_shape(old, new) is True
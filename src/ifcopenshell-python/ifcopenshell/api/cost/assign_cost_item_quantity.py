@@ -17,6 +17,7 @@
 # along with IfcOpenShell.  If not, see <http://www.gnu.org/licenses/>.
 
 import ifcopenshell.api
+import ifcopenshell.guid
 
 
 def assign_cost_item_quantity(file, cost_item=None, products=None, prop_name="") -> None:
@@ -87,28 +88,38 @@ def assign_cost_item_quantity(file, cost_item=None, products=None, prop_name="")
 
 class Usecase:
     def execute(self):
-        if self.settings["prop_name"]:
-            self.quantities = set(self.settings["cost_item"].CostQuantities or [])
+        cost_item = self.settings["cost_item"]
+        self.assign_cost_control(related_objects=self.settings["products"], cost_item=cost_item)
+        if not self.settings["prop_name"]:
+            return self.update_cost_item_count()
+        if cost_item.CostQuantities and cost_item.CostQuantities[0].Name.lower() != self.settings["prop_name"].lower():
+            return
+        self.quantities = set(cost_item.CostQuantities or [])
         for product in self.settings["products"]:
-            self.assign_cost_control(related_object=product, cost_item=self.settings["cost_item"])
-            if self.settings["prop_name"]:
-                if (
-                    self.settings["cost_item"].CostQuantities
-                    and self.settings["cost_item"].CostQuantities[0].Name.lower() != self.settings["prop_name"].lower()
-                ) or not product.is_a("IfcObject"):
-                    continue
+            if product.is_a("IfcObject"):
                 self.add_quantity_from_related_object(product)
-        if self.settings["prop_name"]:
-            self.settings["cost_item"].CostQuantities = list(self.quantities)
-        else:
-            self.update_cost_item_count()
-
-    def assign_cost_control(self, related_object, cost_item):
-        return ifcopenshell.api.run(
-            "control.assign_control",
-            self.file,
-            related_object=related_object,
-            relating_control=cost_item,
+        cost_item.CostQuantities = list(self.quantities)
+
+    def assign_cost_control(self, related_objects, cost_item):
+        # Equivalent to control.assign_control for each product, but the
+        # related objects of the relationship are only rewritten once.
+        controlled = set()
+        for rel in cost_item.Controls or []:
+            controlled.update(rel.RelatedObjects)
+        related_objects = [o for o in dict.fromkeys(related_objects) if o not in controlled]
+        if not related_objects:
+            return
+        if cost_item.Controls:
+            controls = cost_item.Controls[0]
+            controls.RelatedObjects = list(set(controls.RelatedObjects) | set(related_objects))
+            ifcopenshell.api.run("owner.update_owner_history", self.file, element=controls)
+            return controls
+        return self.file.create_entity(
+            "IfcRelAssignsToControl",
+            GlobalId=ifcopenshell.guid.new(),
+            OwnerHistory=ifcopenshell.api.run("owner.create_owner_history", self.file),
+            RelatedObjects=related_objects,
+            RelatingControl=cost_item,
         )
 
     def add_quantity_from_related_object(self, element):
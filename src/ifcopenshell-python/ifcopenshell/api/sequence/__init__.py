@@ -17,6 +17,7 @@
 # along with IfcOpenShell.  If not, see <http://www.gnu.org/licenses/>.
 
 from .add_task import add_task
+from .add_tasks import add_tasks
 from .add_task_time import add_task_time
 from .add_time_period import add_time_period
 from .add_work_calendar import add_work_calendar
@@ -28,6 +29,7 @@ from .assign_process import assign_process
 from .assign_product import assign_product
 from .assign_recurrence_pattern import assign_recurrence_pattern
 from .assign_sequence import assign_sequence
+from .assign_sequences import assign_sequences
 from .assign_workplan import assign_workplan
 from .calculate_task_duration import calculate_task_duration
 from .cascade_schedule import cascade_schedule
@@ -0,0 +1,139 @@
+# IfcOpenShell - IFC toolkit and geometry engine
+# Copyright (C) 2024 Dion Moult <dion@thinkmoult.com>
+#
+# This file is part of IfcOpenShell.
+#
+# IfcOpenShell is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# IfcOpenShell is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with IfcOpenShell.  If not, see <http://www.gnu.org/licenses/>.
+
+import ifcopenshell
+import ifcopenshell.api
+import ifcopenshell.guid
+
+
+def add_tasks(file, tasks=None, work_schedule=None, parent_task=None) -> list:
+    """Adds many sibling tasks at once, optionally with calendars and times
+
+    This is equivalent to calling sequence.add_task, control.assign_control,
+    sequence.edit_task, sequence.add_task_time and sequence.edit_task_time
+    for every task, but relationships are only looked up and rewritten once
+    for all tasks. This is intended for importing large schedules from other
+    scheduling software.
+
+    Tasks that have their own subtasks may be passed as the parent_task of a
+    subsequent call, so a work breakdown structure is created one level (or
+    one parent) at a time.
+
+    :param tasks: A list of dictionaries, one per task. The "attributes" key
+        holds the IfcTask attributes to set, as per sequence.edit_task. The
+        optional "calendar" key holds an IfcWorkCalendar that controls the
+        task. The optional "task_time" key holds the attributes of an
+        IfcTaskTime to add to the task, as per sequence.edit_task_time.
+    :type tasks: list[dict]
+    :param work_schedule: The work schedule, if the tasks are root tasks.
+        This is mutually exclusive with the parent_task parameter.
+    :type work_schedule: ifcopenshell.entity_instance
+    :param parent_task: The parent task, if the tasks are subtasks. This is
+        mutually exclusive with the work_schedule parameter.
+    :type parent_task: ifcopenshell.entity_instance
+    :return: The newly created IfcTasks, in the same order as the tasks
+        parameter.
+    :rtype: list[ifcopenshell.entity_instance]
+
+    Example:
+
+    .. code:: python
+
+        schedule = ifcopenshell.api.run("sequence.add_work_schedule", model, name="Construction Schedule A")
+        calendar = ifcopenshell.api.run("sequence.add_work_calendar", model)
+        construction = ifcopenshell.api.run("sequence.add_task", model,
+            work_schedule=schedule, name="Construction", identification="C")
+        ifcopenshell.api.run("sequence.add_tasks", model, parent_task=construction, tasks=[
+            {
+                "attributes": {"Name": "Early Works"},
+                "calendar": calendar,
+                "task_time": {"ScheduleStart": "2000-01-03T09:00:00", "ScheduleDuration": "P5D"},
+            },
+            {
+                "attributes": {"Name": "Substructure"},
+                "calendar": calendar,
+                "task_time": {"ScheduleStart": "2000-01-10T09:00:00", "ScheduleDuration": "P10D"},
+            },
+        ])
+    """
+    usecase = Usecase()
+    usecase.file = file
+    usecase.settings = {"tasks": tasks or [], "work_schedule": work_schedule, "parent_task": parent_task}
+    return usecase.execute()
+
+
+class Usecase:
+    def execute(self):
+        tasks = [self.create_task() for _ in self.settings["tasks"]]
+        if self.settings["work_schedule"]:
+            for task in tasks:
+                self.file.create_entity(
+                    "IfcRelAssignsToControl",
+                    GlobalId=ifcopenshell.guid.new(),
+                    OwnerHistory=ifcopenshell.api.run("owner.create_owner_history", self.file),
+                    RelatedObjects=[task],
+                    RelatingControl=self.settings["work_schedule"],
+                )
+        elif self.settings["parent_task"] and tasks:
+            self.nest_tasks(tasks)
+
+        calendars = {}
+        for task, data in zip(tasks, self.settings["tasks"]):
+            if data.get("calendar"):
+                calendars.setdefault(data["calendar"], []).append(task)
+        for calendar, calendar_tasks in calendars.items():
+            self.assign_calendar(calendar, calendar_tasks)
+
+        for task, data in zip(tasks, self.settings["tasks"]):
+            for name, value in (data.get("attributes") or {}).items():
+                setattr(task, name, value)
+            if data.get("task_time") is not None:
+                task_time = ifcopenshell.api.run("sequence.add_task_time", self.file, task=task)
+                ifcopenshell.api.run(
+                    "sequence.edit_task_time", self.file, task_time=task_time, attributes=data["task_time"]
+                )
+        return tasks
+
+    def create_task(self):
+        task = ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcTask", predefined_type="NOTDEFINED")
+        task.IsMilestone = False
+        return task
+
+    def nest_tasks(self, tasks):
+        parent_task = self.settings["parent_task"]
+        total_siblings = sum(len(rel.RelatedObjects) for rel in parent_task.IsNestedBy)
+        ifcopenshell.api.run("nest.assign_object", self.file, related_objects=tasks, relating_object=parent_task)
+        if parent_task.Identification:
+            for i, task in enumerate(tasks, total_siblings + 1):
+                task.Identification = parent_task.Identification + "." + str(i)
+
+    def assign_calendar(self, calendar, tasks):
+        # Equivalent to control.assign_control for each task, but the related
+        # objects of the relationship are only rewritten once.
+        if calendar.Controls:
+            controls = calendar.Controls[0]
+            controls.RelatedObjects = list(set(controls.RelatedObjects) | set(tasks))
+            ifcopenshell.api.run("owner.update_owner_history", self.file, element=controls)
+        else:
+            self.file.create_entity(
+                "IfcRelAssignsToControl",
+                GlobalId=ifcopenshell.guid.new(),
+                OwnerHistory=ifcopenshell.api.run("owner.create_owner_history", self.file),
+                RelatedObjects=tasks,
+                RelatingControl=calendar,
+            )
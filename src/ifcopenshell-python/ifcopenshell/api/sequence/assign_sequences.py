@@ -0,0 +1,154 @@
+# IfcOpenShell - IFC toolkit and geometry engine
+# Copyright (C) 2024 Dion Moult <dion@thinkmoult.com>
+#
+# This file is part of IfcOpenShell.
+#
+# IfcOpenShell is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# IfcOpenShell is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with IfcOpenShell.  If not, see <http://www.gnu.org/licenses/>.
+
+import ifcopenshell
+import ifcopenshell.api
+import ifcopenshell.guid
+from ifcopenshell.api.sequence.cascade_schedule import Usecase as CascadeScheduleUsecase
+
+
+def assign_sequences(file, sequences=None) -> list:
+    """Assigns many sequential relationships between tasks at once
+
+    This is equivalent to calling sequence.assign_sequence and optionally
+    sequence.assign_lag_time for every sequence, except that the schedule is
+    only cascaded once after all sequences are assigned, instead of after
+    every single sequence. This is intended for importing large schedules
+    from other scheduling software.
+
+    Every task downstream of the assigned sequences is cascaded exactly once,
+    in topological order, so lag times are already taken into account and
+    long chains of tasks do not cascade recursively.
+
+    :param sequences: A list of dictionaries, one per sequence. The
+        "relating_process" and "related_process" keys hold the predecessor
+        and successor tasks. The optional "sequence_type" key defaults to
+        FINISH_START. The optional "lag_value" (a timedelta) and
+        "duration_type" keys assign a lag time, as per
+        sequence.assign_lag_time.
+    :type sequences: list[dict]
+    :return: The IfcRelSequences, in the same order as the sequences
+        parameter. If a sequence already existed, the existing relationship
+        is returned and left unchanged.
+    :rtype: list[ifcopenshell.entity_instance]
+
+    Example:
+
+    .. code:: python
+
+        task1 = ifcopenshell.api.run("sequence.add_task", model, work_schedule=schedule)
+        task2 = ifcopenshell.api.run("sequence.add_task", model, work_schedule=schedule)
+        task3 = ifcopenshell.api.run("sequence.add_task", model, work_schedule=schedule)
+        ifcopenshell.api.run("sequence.assign_sequences", model, sequences=[
+            {"relating_process": task1, "related_process": task2},
+            {
+                "relating_process": task2,
+                "related_process": task3,
+                "sequence_type": "START_START",
+                "lag_value": datetime.timedelta(days=2),
+                "duration_type": "WORKTIME",
+            },
+        ])
+    """
+    usecase = Usecase()
+    usecase.file = file
+    usecase.settings = {"sequences": sequences or []}
+    return usecase.execute()
+
+
+class Usecase:
+    def execute(self):
+        rels = []
+        new_rels = []
+        existing = {}
+        for sequence in self.settings["sequences"]:
+            related_process = sequence["related_process"]
+            if related_process not in existing:
+                existing[related_process] = {r.RelatingProcess: r for r in related_process.IsSuccessorFrom or []}
+            rel = existing[related_process].get(sequence["relating_process"])
+            if rel is None:
+                rel = existing[related_process][sequence["relating_process"]] = self.create_sequence(sequence)
+                new_rels.append(rel)
+            rels.append(rel)
+
+        if new_rels:
+            self.cascade_tasks({rel.RelatingProcess for rel in new_rels})
+        return rels
+
+    def cascade_tasks(self, tasks):
+        # Every task downstream of the new sequences is cascaded once, in
+        # topological order, instead of recursively after every sequence.
+        in_degrees = {}
+        queue = list(tasks)
+        while queue:
+            task = queue.pop()
+            if task in in_degrees:
+                continue
+            in_degrees[task] = 0
+            queue.extend(self.get_downstream_tasks(task))
+        for task in in_degrees:
+            for downstream_task in self.get_downstream_tasks(task):
+                in_degrees[downstream_task] += 1
+
+        cascader = Cascader()
+        cascader.file = self.file
+        cascader.calendar_cache = {}
+        queue = [task for task, in_degree in in_degrees.items() if not in_degree]
+        total_cascaded = 0
+        while queue:
+            task = queue.pop()
+            cascader.cascade_task(task, is_first_task=True)
+            total_cascaded += 1
+            for downstream_task in self.get_downstream_tasks(task):
+                in_degrees[downstream_task] -= 1
+                if not in_degrees[downstream_task]:
+                    queue.append(downstream_task)
+        if total_cascaded != len(in_degrees):
+            raise RecursionError("Recursive tasks found. Could not cascade schedule.")
+
+    def get_downstream_tasks(self, task):
+        for rel in task.IsPredecessorTo:
+            yield rel.RelatedProcess
+        for rel in task.IsNestedBy:
+            yield from rel.RelatedObjects or []
+
+    def create_sequence(self, sequence):
+        rel = self.file.create_entity(
+            "IfcRelSequence",
+            GlobalId=ifcopenshell.guid.new(),
+            OwnerHistory=ifcopenshell.api.run("owner.create_owner_history", self.file),
+            RelatingProcess=sequence["relating_process"],
+            RelatedProcess=sequence["related_process"],
+            SequenceType=sequence.get("sequence_type") or "FINISH_START",
+        )
+        if sequence.get("lag_value"):
+            ifcopenshell.api.run(
+                "sequence.assign_lag_time",
+                self.file,
+                rel_sequence=rel,
+                lag_value=sequence["lag_value"],
+                duration_type=sequence.get("duration_type") or "WORKTIME",
+            )
+        return rel
+
+
+class Cascader(CascadeScheduleUsecase):
+    def cascade_task(self, task, is_first_task=False, task_sequence=None):
+        # Downstream tasks are cascaded by the caller in topological order
+        if is_first_task:
+            super().cascade_task(task, is_first_task=True)
@@ -18,15 +18,20 @@
 
 """2D drawing generation and serialisation"""
 
+import os
+import re
 import math
 import json
+import time
+import hashlib
 import functools
+import multiprocessing
 
 import ifcopenshell
 import ifcopenshell.geom
 
 from xml.dom.minidom import parseString
-from dataclasses import dataclass, fields
+from dataclasses import dataclass, fields, replace, asdict
 
 import numpy
 
@@ -62,11 +67,14 @@ class draw_settings:
     prefilter: bool = True
     include_curves: bool = False
     unify_inputs: bool = True
+    tiles: int = 1
+    tile_size: float = 0.0
+    jobs: int = 1
+    drawing_cache: str = ""
 
 
-def main(settings, files, iterators=None, merge_projection=True, progress_function=DO_NOTHING):
-
-    geom_settings = ifcopenshell.geom.settings(
+def create_geometry_settings(settings):
+    return ifcopenshell.geom.settings(
         # this is required for serialization
         APPLY_DEFAULT_MATERIALS=True,
         DISABLE_TRIANGULATION=True,
@@ -75,39 +83,44 @@ def main(settings, files, iterators=None, merge_projection=True, progress_functi
         SEW_SHELLS=settings.subtract_before_hlr,
     )
 
-    if not iterators:
-        iterator_kwargs = {}
-        if settings.include_entities:
-            iterator_kwargs["include"] = settings.include_entities.split(",")
-        elif settings.exclude_entities:
-            iterator_kwargs["exclude"] = settings.exclude_entities.split(",")
-
-        # We have to keep the iterator in memory because otherwise
-        # the styles are cleared up.
-        iterators = list(
-            map(
-                functools.partial(ifcopenshell.geom.iterator, geom_settings, **iterator_kwargs),
-                files,
-            )
+
+def create_iterators(settings, geom_settings, files):
+    iterator_kwargs = {}
+    if settings.include_entities:
+        iterator_kwargs["include"] = settings.include_entities.split(",")
+    elif settings.exclude_entities:
+        iterator_kwargs["exclude"] = settings.exclude_entities.split(",")
+
+    # We have to keep the iterator in memory because otherwise
+    # the styles are cleared up.
+    iterators = list(
+        map(
+            functools.partial(ifcopenshell.geom.iterator, geom_settings, **iterator_kwargs),
+            files,
         )
+    )
 
-        if settings.cache:
-            cache = ifcopenshell.geom.serializers.hdf5("cache.h5", geom_settings)
-            for it in iterators:
-                it.set_cache(cache)
+    if settings.cache:
+        cache = ifcopenshell.geom.serializers.hdf5("cache.h5", geom_settings)
+        for it in iterators:
+            it.set_cache(cache)
 
-    def yield_from_iterator(it):
-        if it.initialize():
-            while True:
-                yield it.get()
-                if not it.next():
-                    break
+    return iterators
 
-    # Initialize serializer
+
+def yield_from_iterator(it):
+    if it.initialize():
+        while True:
+            yield it.get()
+            if not it.next():
+                break
+
+
+def create_serializer(settings, geom_settings, file):
     buffer = ifcopenshell.geom.serializers.buffer()
     sr = ifcopenshell.geom.serializers.svg(buffer, geom_settings)
 
-    sr.setFile(files[0])
+    sr.setFile(file)
     if settings.auto_floorplan:
         sr.setSectionHeightsFromStoreys()
 
@@ -144,6 +157,29 @@ def main(settings, files, iterators=None, merge_projection=True, progress_functi
     except:
         raise ValueError("storey_heights should be one of {'none', 'full', 'left'}")
 
+    return buffer, sr
+
+
+def yield_groups(n):
+    if n.nodeType == n.ELEMENT_NODE and n.tagName == "g":
+        yield n
+    for c in n.childNodes:
+        yield from yield_groups(c)
+
+
+def main(settings, files, iterators=None, merge_projection=True, progress_function=DO_NOTHING):
+
+    if (settings.tiles > 1 or settings.tile_size > 0.0 or settings.drawing_cache) and not iterators:
+        return draw_tiles(settings, files, merge_projection=merge_projection, progress_function=progress_function)
+
+    geom_settings = create_geometry_settings(settings)
+
+    if not iterators:
+        iterators = create_iterators(settings, geom_settings, files)
+
+    # Initialize serializer
+    buffer, sr = create_serializer(settings, geom_settings, files[0])
+
     """
     # It is also possible to add drawing planes manually
     import bpy
@@ -182,12 +218,6 @@ def main(settings, files, iterators=None, merge_projection=True, progress_functi
 
     if not settings.cells:
         return svg_data_1.encode("ascii", "xmlcharrefreplace")
-    
-    def yield_groups(n):
-        if n.nodeType == n.ELEMENT_NODE and n.tagName == "g":
-            yield n
-        for c in n.childNodes:
-            yield from yield_groups(c)
 
     dom1 = parseString(svg_data_1)
     svg1 = dom1.childNodes[0]
@@ -385,6 +415,554 @@ def main(settings, files, iterators=None, merge_projection=True, progress_functi
     return data
 
 
+# Tiles extend this far (in metres) beyond the outermost element centres
+TILE_EXTENT = 1.0e6
+
+# The tile size (in metres) used with a drawing cache if no tile size is set
+DRAWING_CACHE_TILE_SIZE = 20.0
+
+_tile_context = None
+
+
+def partition_tiles(settings, files, progress_function=DO_NOTHING):
+    """Partitions the plan into a grid of tiles and culls elements per tile
+
+    Tile boundaries are placed on quantiles of the element centres so that
+    tiles hold a comparable number of elements, or on a fixed grid if
+    ``settings.tile_size`` (in metres) is set. A fixed grid keeps tiles stable
+    between revisions of a model, which is preferable when using a drawing
+    cache. The outer tiles are unbounded so every element is assigned to at
+    least one tile. Elements are culled using conservative plan bounds
+    composed from their representations (see :func:`get_plan_bounds`), so
+    the model is not tessellated, and elements crossing a tile boundary are
+    drawn in every tile they overlap.
+
+    :return: A list of tiles, each a tuple of its XY bounds in metres and, per
+        file, the ids of the elements overlapping the tile.
+    """
+    import ifcopenshell.util.unit
+
+    include = settings.include_entities.split(",") if settings.include_entities else []
+    exclude = settings.exclude_entities.split(",") if settings.exclude_entities and not include else []
+
+    element_ids = []
+    bounds = []
+    for i, f in enumerate(files):
+        unit_scale = ifcopenshell.util.unit.calculate_unit_scale(f)
+        memo = {}
+        element_ids.append([])
+        elements = [e for e in f.by_type("IfcProduct") if e.Representation]
+        for j, element in enumerate(elements):
+            if include and not any(element.is_a(c) for c in include):
+                continue
+            if any(element.is_a(c) for c in exclude):
+                continue
+            element_ids[i].append(element.id())
+            bounds.append(get_plan_bounds(element, unit_scale, memo))
+            progress_function("file", i, "culling", 100 * j // len(elements))
+
+    if not bounds:
+        return []
+
+    bounds = numpy.array(bounds)
+    # Elements that could not be bounded are in every tile but do not place tiles
+    finite = numpy.isfinite(bounds).all(axis=1)
+    origins = (bounds[finite, 0:2] + bounds[finite, 2:4]) / 2.0
+    if not len(origins):
+        origins = numpy.zeros((1, 2))
+    file_ranges = numpy.cumsum([0] + [len(ids) for ids in element_ids])
+
+    low = origins.min(axis=0) - TILE_EXTENT
+    high = origins.max(axis=0) + TILE_EXTENT
+    if settings.tile_size > 0.0:
+        lower = numpy.floor(origins.min(axis=0) / settings.tile_size).astype(int) + 1
+        upper = numpy.ceil(origins.max(axis=0) / settings.tile_size).astype(int)
+        xs = [low[0], *(numpy.arange(lower[0], upper[0]) * settings.tile_size), high[0]]
+        ys = [low[1], *(numpy.arange(lower[1], upper[1]) * settings.tile_size), high[1]]
+    else:
+        quantiles = numpy.linspace(0.0, 1.0, settings.tiles + 1)[1:-1]
+        xs = [low[0], *numpy.quantile(origins[:, 0], quantiles), high[0]]
+        ys = [low[1], *numpy.quantile(origins[:, 1], quantiles), high[1]]
+
+    tiles = []
+    for x0, x1 in zip(xs, xs[1:]):
+        for y0, y1 in zip(ys, ys[1:]):
+            if x1 - x0 <= 0.0 or y1 - y0 <= 0.0:
+                continue
+            overlaps = (bounds[:, 0] <= x1) & (bounds[:, 2] >= x0) & (bounds[:, 1] <= y1) & (bounds[:, 3] >= y0)
+            tile_element_ids = [
+                [ids[k] for k in numpy.flatnonzero(overlaps[start:end])]
+                for ids, start, end in zip(element_ids, file_ranges, file_ranges[1:])
+            ]
+            if any(tile_element_ids):
+                tiles.append(((float(x0), float(y0), float(x1), float(y1)), tile_element_ids))
+    return tiles
+
+
+def get_plan_bounds(element, unit_scale, memo):
+    """Computes conservative XY bounds of an element in metres without tessellating it
+
+    The bounds of every representation item are composed along the
+    representation chain: coordinates are transformed by the placements and
+    transformation operators (including scales) of mapped items, solids,
+    profiles and curves that contain them, and are widened by the lengths
+    such as radii, dimensions and depths of the items that define them.
+    Anything that cannot be bounded this way, such as an unbounded line or a
+    placement along an alignment, makes the bounds infinite so that the
+    element is drawn in every tile.
+
+    :param unit_scale: The scale from file units to metres.
+    :param memo: A dictionary shared between elements of a file, so that
+        shared representations such as those of types are only visited once.
+    :return: A tuple of the minimum X and Y and the maximum X and Y.
+    """
+    matrix = _get_object_placement(element.ObjectPlacement, memo)
+    box, length = _get_local_bounds(element.Representation, memo)
+    if matrix is None:
+        box = _INFINITE_BOX
+    elif box is None:
+        box = (matrix[0:3, 3], matrix[0:3, 3])
+    else:
+        box = _transform_box(matrix, box)
+    (x0, y0), (x1, y1) = box[0][0:2] * unit_scale, box[1][0:2] * unit_scale
+    return (float(x0), float(y0), float(x1), float(y1))
+
+
+_INFINITE_BOX = (numpy.full(3, -numpy.inf), numpy.full(3, numpy.inf))
+
+
+def _get_object_placement(placement, memo):
+    # The matrix of an object placement, or None if it is not a local placement
+    if placement is None:
+        return numpy.eye(4)
+    key = ("placement", placement.id())
+    if key in memo:
+        return memo[key]
+    matrix = None
+    if placement.is_a("IfcLocalPlacement"):
+        parent = _get_object_placement(placement.PlacementRelTo, memo)
+        relative = _get_transformation(placement.RelativePlacement)
+        if parent is not None and relative is not None:
+            matrix = parent @ relative
+    memo[key] = matrix
+    return matrix
+
+
+def _get_transformation(value):
+    # The matrix of a placement or transformation operator, or None if it is unsupported
+    import ifcopenshell.util.placement
+
+    if value.is_a("IfcPlacement"):
+        if not value.Location.is_a("IfcCartesianPoint"):
+            return None
+        return ifcopenshell.util.placement.get_axis2placement(value)
+    elif value.is_a("IfcCartesianTransformationOperator3D"):
+        return ifcopenshell.util.placement.get_cartesiantransformationoperator3d(value)
+    # A 2D operator, of which the second axis is derived from the first
+    x = numpy.array(value.Axis1.DirectionRatios if value.Axis1 else (1.0, 0.0))
+    x = x / numpy.linalg.norm(x)
+    y = numpy.array((-x[1], x[0]))
+    if value.Axis2 and numpy.dot(value.Axis2.DirectionRatios, y) < 0.0:
+        y = -y
+    matrix = numpy.eye(4)
+    matrix[0:2, 0] = x * (value.Scale or 1.0)
+    matrix[0:2, 1] = y * (getattr(value, "Scale2", None) or value.Scale or 1.0)
+    matrix[0:2, 3] = value.LocalOrigin.Coordinates
+    return matrix
+
+
+def _transform_box(matrix, box):
+    if not (numpy.isfinite(box[0]).all() and numpy.isfinite(box[1]).all()):
+        return _INFINITE_BOX
+    corners = numpy.array([(x, y, z, 1.0) for x in (0, 1) for y in (0, 1) for z in (0, 1)])
+    corners[:, 0:3] = numpy.where(corners[:, 0:3], box[1], box[0])
+    corners = corners @ matrix.T
+    return corners[:, 0:3].min(axis=0), corners[:, 0:3].max(axis=0)
+
+
+def _union_box(a, b):
+    if a is None:
+        return b
+    elif b is None:
+        return a
+    return numpy.minimum(a[0], b[0]), numpy.maximum(a[1], b[1])
+
+
+def _get_points_box(points):
+    points = numpy.array(points, dtype=float).reshape((-1, len(points[0]) if len(points) else 3))
+    if not len(points):
+        return None
+    points = numpy.pad(points, ((0, 0), (0, 3 - points.shape[1])))
+    return points.min(axis=0), points.max(axis=0)
+
+
+def _get_local_bounds(value, memo):
+    # A box containing a value in its own coordinates (or None if it has no
+    # coordinates) and the largest length that it defines
+    if isinstance(value, ifcopenshell.entity_instance):
+        step_id = value.id()
+        if not step_id:
+            # A type such as IfcParameterValue or IfcPositiveLengthMeasure
+            return _get_local_bounds(value.wrappedValue, memo)
+        if step_id in memo:
+            return memo[step_id]
+        memo[step_id] = result = (_get_entity_bounds(value, memo), 0.0)
+        return result
+    elif isinstance(value, tuple):
+        box, length = None, 0.0
+        for v in value:
+            b, l = _get_local_bounds(v, memo)
+            box, length = _union_box(box, b), max(length, l)
+        return box, length
+    elif isinstance(value, float):
+        return None, abs(value)
+    return None, 0.0
+
+
+def _get_entity_bounds(entity, memo):
+    if entity.is_a("IfcRepresentationContext") or entity.is_a("IfcDirection"):
+        return None
+    elif entity.is_a("IfcCartesianPoint"):
+        return _get_points_box([entity.Coordinates])
+    elif entity.is_a("IfcCartesianPointList"):
+        return _get_points_box(entity.CoordList)
+    elif entity.is_a("IfcLine"):
+        return _INFINITE_BOX
+    elif entity.is_a("IfcTrimmedCurve") and entity.BasisCurve.is_a("IfcLine"):
+        line = entity.BasisCurve
+        points = []
+        for trim in (entity.Trim1, entity.Trim2):
+            for select in trim:
+                if select.is_a("IfcCartesianPoint"):
+                    points.append(select.Coordinates)
+                    break
+            else:
+                vector = numpy.array(line.Dir.Orientation.DirectionRatios)
+                vector = vector / numpy.linalg.norm(vector) * line.Dir.Magnitude
+                points.append(numpy.array(line.Pnt.Coordinates) + vector * trim[0].wrappedValue)
+        return _get_points_box(points)
+    elif entity.is_a("IfcTrimmedCurve"):
+        # Trimming only shortens the basis curve
+        return _get_local_bounds(entity.BasisCurve, memo)[0]
+    elif entity.is_a("IfcBooleanResult"):
+        # Differences and intersections lie within their first operand
+        operands = [entity.FirstOperand]
+        if entity.Operator == "UNION":
+            operands.append(entity.SecondOperand)
+        return _get_local_bounds(tuple(operands), memo)[0]
+
+    transformations = []
+    axis = None
+    box, length = None, 0.0
+    for attribute in entity:
+        values = attribute if isinstance(attribute, tuple) else (attribute,)
+        if values and all(isinstance(v, ifcopenshell.entity_instance) and v.id() for v in values):
+            if all(v.is_a("IfcAxis1Placement") for v in values):
+                axis = values[0]
+                continue
+            elif all(v.is_a("IfcPlacement") or v.is_a("IfcCartesianTransformationOperator") for v in values):
+                transformations.extend(values)
+                continue
+        b, l = _get_local_bounds(attribute, memo)
+        box, length = _union_box(box, b), max(length, l)
+
+    if axis is not None:
+        # The only length of a revolution is its angle
+        length = 0.0
+    if box is None and length:
+        box = (numpy.zeros(3), numpy.zeros(3))
+    if box is not None:
+        box = (box[0] - length, box[1] + length)
+    if box is not None and axis is not None:
+        # Revolving around an axis stays within the sphere reaching the furthest corner
+        if (axis_matrix := _get_transformation(axis)) is None:
+            return _INFINITE_BOX
+        origin = axis_matrix[0:3, 3]
+        corners = numpy.array([numpy.where((x, y, z), box[1], box[0]) for x in (0, 1) for y in (0, 1) for z in (0, 1)])
+        radius = numpy.linalg.norm(corners - origin, axis=1).max()
+        box = (origin - radius, origin + radius)
+    if box is not None and transformations:
+        transformed_box = None
+        for transformation in transformations:
+            if (matrix := _get_transformation(transformation)) is None:
+                return _INFINITE_BOX
+            transformed_box = _union_box(transformed_box, _transform_box(matrix, box))
+        box = transformed_box
+    return box
+
+
+def _draw_tile(index):
+    settings, files, tiles, merge_projection = _tile_context
+    start = time.time()
+    geom_settings = create_geometry_settings(settings)
+    bounds, element_ids = tiles[index]
+    iterators = [
+        ifcopenshell.geom.iterator(geom_settings, f, include=[f.by_id(i) for i in ids])
+        for f, ids in zip(files, element_ids)
+        if ids
+    ]
+    if settings.cache:
+        cache = ifcopenshell.geom.serializers.hdf5("cache.h5", geom_settings)
+        for it in iterators:
+            it.set_cache(cache)
+    tile_settings = replace(settings, tiles=1, tile_size=0.0, drawing_cache="")
+    svg_data = main(tile_settings, files, iterators=iterators, merge_projection=merge_projection)
+    if isinstance(svg_data, bytes):
+        svg_data = svg_data.decode("ascii")
+    return index, svg_data, time.time() - start
+
+
+def draw_tiles(settings, files, merge_projection=True, progress_function=DO_NOTHING):
+    """Draws floor plans as a grid of tiles, optionally across processes
+
+    Hidden line removal, and the conversion of the projection into styled
+    cells, is run independently per tile, which is valid for plans as only
+    elements overlapping a tile in plan can occlude it. Tiles are drawn in
+    ``settings.jobs`` forked processes and the resulting drawing groups are
+    clipped to their tile and stitched into a single SVG. The geometry cache
+    (``settings.cache``) can only be used when drawing tiles in one process.
+
+    If ``settings.drawing_cache`` is a directory, the SVG output of every tile
+    is stored there, keyed by the drawing settings, the storeys, the tile
+    bounds and a content digest of every element in the tile. On subsequent
+    runs only tiles containing a changed element are drawn again. Unless
+    ``settings.tile_size`` is set, the plan is partitioned into a fixed grid
+    of :data:`DRAWING_CACHE_TILE_SIZE` tiles, so that a change only
+    invalidates the tiles around it. Cached tiles that are not part of the
+    drawing are removed afterwards, so every drawing should use its own
+    directory. Like tiling, the drawing cache is only supported for floor
+    plans.
+
+    Progress is reported with a ``"tile timing"`` event per tile, with the
+    tile index, the number of elements and the time taken in seconds, or a
+    ``"tile cached"`` event if the tile was loaded from the cache.
+    """
+    if settings.auto_elevation or settings.auto_section or settings.drawing_guid:
+        raise ValueError("Tiled drawing and the drawing cache are only supported for floor plans")
+    if settings.cache and settings.jobs > 1:
+        raise ValueError("The geometry cache cannot be shared between processes drawing tiles")
+    if settings.drawing_cache and settings.tile_size <= 0.0:
+        settings = replace(settings, tile_size=DRAWING_CACHE_TILE_SIZE)
+
+    global _tile_context
+
+    tiles = partition_tiles(settings, files, progress_function=progress_function)
+    if not tiles:
+        settings = replace(settings, tiles=1, tile_size=0.0, drawing_cache="")
+        return main(settings, files, merge_projection=merge_projection, progress_function=progress_function)
+
+    _tile_context = (settings, files, tiles, merge_projection)
+    results = [None] * len(tiles)
+    cache_paths = [None] * len(tiles)
+
+    if settings.drawing_cache:
+        os.makedirs(settings.drawing_cache, exist_ok=True)
+        keys = get_tile_cache_keys(settings, files, tiles)
+        for index, key in enumerate(keys):
+            cache_paths[index] = os.path.join(settings.drawing_cache, key + ".svg")
+            if os.path.isfile(cache_paths[index]):
+                with open(cache_paths[index], "r", encoding="utf-8") as f:
+                    results[index] = f.read()
+                progress_function("tile cached", index)
+        prune_drawing_cache(settings.drawing_cache, keys)
+
+    def collect(result):
+        index, svg_data, seconds = result
+        results[index] = svg_data
+        if cache_paths[index]:
+            with open(cache_paths[index], "w", encoding="utf-8") as f:
+                f.write(svg_data)
+        progress_function("tile timing", index, sum(map(len, tiles[index][1])), seconds)
+
+    stale_tiles = [index for index, svg_data in enumerate(results) if svg_data is None]
+
+    try:
+        if settings.jobs > 1 and len(stale_tiles) > 1 and "fork" in multiprocessing.get_all_start_methods():
+            # Forked workers inherit the already loaded models
+            with multiprocessing.get_context("fork").Pool(settings.jobs) as pool:
+                for result in pool.imap_unordered(_draw_tile, stale_tiles):
+                    collect(result)
+        else:
+            for index in stale_tiles:
+                collect(_draw_tile(index))
+    finally:
+        _tile_context = None
+
+    progress_function("stitching tiles")
+    data = stitch_tiles(results, [bounds for bounds, element_ids in tiles])
+
+    if not merge_projection:
+        return data
+    return data.encode("ascii", "xmlcharrefreplace")
+
+
+def prune_drawing_cache(drawing_cache, keys):
+    """Removes cached tiles that are not one of the given keys"""
+    keys = set(keys)
+    for filename in os.listdir(drawing_cache):
+        key, extension = os.path.splitext(filename)
+        if extension == ".svg" and key not in keys and re.fullmatch("[0-9a-f]{32}", key):
+            os.remove(os.path.join(drawing_cache, filename))
+
+
+def get_tile_cache_keys(settings, files, tiles):
+    """Derives a cache key per tile from the content of its elements
+
+    Elements are digested from their attributes, placement, representation
+    (including styles of representation items), material (including styles
+    assigned to materials) and openings, with references resolved
+    recursively so that the digest is independent of instance ids.
+    Owner histories are ignored, so resaving an unchanged model is a cache
+    hit.
+    """
+    memos = [{} for f in files]
+    excluded_settings = ("jobs", "cache", "drawing_cache")
+    context = hashlib.blake2b(digest_size=16)
+    context.update(
+        json.dumps({k: v for k, v in asdict(settings).items() if k not in excluded_settings}, sort_keys=True).encode()
+    )
+    for storey in files[0].by_type("IfcBuildingStorey"):
+        context.update(repr((storey.GlobalId, storey.Name, storey.Elevation)).encode())
+
+    keys = []
+    for bounds, element_ids in tiles:
+        h = context.copy()
+        h.update(repr(bounds).encode())
+        for f, memo, ids in zip(files, memos, element_ids):
+            digests = sorted(get_element_digest(f.by_id(i), memo) for i in ids)
+            h.update(b"".join(digests))
+        keys.append(h.hexdigest())
+    return keys
+
+
+def get_element_digest(element, memo):
+    import ifcopenshell.util.element
+
+    h = hashlib.blake2b(element.is_a().encode(), digest_size=16)
+    for i, attribute in enumerate(element):
+        if element.attribute_name(i) != "OwnerHistory":
+            h.update(_digest_value(attribute, memo))
+    h.update(_digest_value(ifcopenshell.util.element.get_material(element), memo))
+    for rel in getattr(element, "HasOpenings", []) or []:
+        h.update(get_element_digest(rel.RelatedOpeningElement, memo))
+    return h.digest()
+
+
+def _digest_value(value, memo):
+    if isinstance(value, ifcopenshell.entity_instance):
+        step_id = value.id()
+        if step_id and step_id in memo:
+            return memo[step_id]
+        if value.is_a("IfcRoot"):
+            digest = value.GlobalId.encode()
+        else:
+            h = hashlib.blake2b(value.is_a().encode(), digest_size=16)
+            for attribute in value:
+                h.update(_digest_value(attribute, memo))
+            if value.is_a("IfcRepresentationItem"):
+                for styled_item in value.StyledByItem:
+                    h.update(_digest_value(styled_item.Styles, memo))
+            elif value.is_a("IfcMaterial"):
+                for definition_representation in getattr(value, "HasRepresentation", ()):
+                    h.update(_digest_value(definition_representation.Representations, memo))
+            digest = h.digest()
+        if step_id:
+            memo[step_id] = digest
+        return digest
+    elif isinstance(value, tuple):
+        h = hashlib.blake2b(digest_size=16)
+        for v in value:
+            h.update(_digest_value(v, memo))
+        return h.digest()
+    return repr(value).encode()
+
+
+def stitch_tiles(svg_datas, tile_bounds):
+    """Merges the SVG output of tiles into a single SVG
+
+    The first tile is used as the reference document. Since the serializer
+    centers every tile on its own content, the drawing groups of other tiles
+    are translated to the reference paper coordinates using the difference
+    between their ``ifc:matrix3`` attributes. Groups are clipped to their
+    tile so that geometry crossing tile boundaries is not drawn twice. A
+    single tile covers the whole drawing and is returned as is.
+    """
+    if len(svg_datas) == 1:
+        return svg_datas[0]
+
+    dom = None
+    reference_groups = {}
+
+    for tile_index, (svg_data, bounds) in enumerate(zip(svg_datas, tile_bounds)):
+        tile_dom = parseString(svg_data)
+        if dom is None:
+            dom = tile_dom
+            svg = dom.childNodes[0]
+            defs = dom.createElement("defs")
+            svg.insertBefore(defs, svg.firstChild)
+
+        drawing_groups = [g for g in yield_groups(tile_dom.childNodes[0]) if g.hasAttribute("ifc:plane")]
+        for group_index, g in enumerate(drawing_groups):
+            name = g.getAttribute("ifc:name")
+            m3 = numpy.array(json.loads(g.getAttribute("ifc:matrix3")))
+            m4 = numpy.array(json.loads(g.getAttribute("ifc:plane")))
+
+            clip_id = "tile-{}-{}".format(tile_index, group_index)
+            clip_path = dom.createElement("clipPath")
+            clip_path.setAttribute("id", clip_id)
+            clip_path.appendChild(create_tile_rect(dom, bounds, m3, m4))
+            defs.appendChild(clip_path)
+
+            tile_group = dom.createElement("g")
+            tile_group.setAttribute("class", "tile")
+            tile_group.setAttribute("clip-path", "url(#{})".format(clip_id))
+            for child in list(g.childNodes):
+                if tile_dom is dom:
+                    tile_group.appendChild(g.removeChild(child))
+                else:
+                    tile_group.appendChild(dom.importNode(child, True))
+
+            if name in reference_groups:
+                reference_m3, parent = reference_groups[name]
+                dx, dy = reference_m3[0][2] - m3[0][2], reference_m3[1][2] - m3[1][2]
+                tile_group.setAttribute("transform", "translate({} {})".format(dx, dy))
+            else:
+                # The first tile to contain a drawing group defines its paper coordinates
+                if tile_dom is dom:
+                    parent = g
+                else:
+                    parent = dom.importNode(g, False)
+                    svg.appendChild(parent)
+                reference_groups[name] = (m3, parent)
+            parent.appendChild(tile_group)
+
+    return dom.toxml()
+
+
+def create_tile_rect(dom, bounds, m3, m4):
+    # The inverse of project() in main(), mapping model XY onto paper
+    m44 = numpy.eye(4)
+    m44[0][0:2] = m3[0][0:2]
+    m44[1][0:2] = m3[1][0:2]
+    m44[0][3] = m3[0][2]
+    m44[1][3] = m3[1][2]
+    m4_inv = numpy.linalg.inv(m4)
+    z = m4[2][3]
+    x0, y0, x1, y1 = bounds
+    corners = []
+    for x, y in ((x0, y0), (x1, y1)):
+        xyzw = m4_inv @ numpy.array([x, y, z, 1.0])
+        xyzw[1] *= -1.0
+        corners.append((m44 @ xyzw)[0:2])
+    (px0, py0), (px1, py1) = corners
+    rect = dom.createElement("rect")
+    rect.setAttribute("x", str(min(px0, px1)))
+    rect.setAttribute("y", str(min(py0, py1)))
+    rect.setAttribute("width", str(abs(px1 - px0)))
+    rect.setAttribute("height", str(abs(py1 - py0)))
+    return rect
+
+
 if __name__ == "__main__":
     import sys
     import time
@@ -400,6 +978,9 @@ if __name__ == "__main__":
         return r
 
     def print_progress(*args):
+        if args[0] == "tile timing":
+            index, num_elements, dt = args[1:]
+            times.append((f"tile {index} ({num_elements} elements)", dt))
         print("\r", *args, " " * 10, end="", flush=True)
 
     parser = argparse.ArgumentParser()
@@ -24,7 +24,6 @@ import itertools
 import operator
 import subprocess
 import sys
-import time
 from typing import Union, Any, Callable, TypeVar, overload
 
 from . import ifcopenshell_wrapper
@@ -98,6 +97,53 @@ for nm in ifcopenshell_wrapper.schema_names():
     schema = ifcopenshell_wrapper.schema_by_name(nm)
     register_schema_attributes(schema)
 
+# Derived attribute functions are resolved once per schema, entity and
+# attribute name, rather than walking the supertypes on every access.
+_derived_rules = {}
+_derived_functions: dict[tuple[str, str, str], Union[Callable, None]] = {}
+
+
+def import_derived_attribute_rules(schema_name: str):
+    """Imports the module with the derived attribute functions of a schema
+
+    The modules in express/rules/derived only contain the derived attribute
+    functions and their dependencies, which is much cheaper to import than
+    the full rules module. For custom schemas the full rules module is
+    compiled next to the .exp file in the current directory.
+    """
+    if schema_name in _derived_rules:
+        return _derived_rules[schema_name]
+    try:
+        rules = importlib.import_module(f"ifcopenshell.express.rules.derived.{schema_name}")
+    except ImportError:
+        try:
+            rules = importlib.import_module(f"ifcopenshell.express.rules.{schema_name}")
+        except ImportError:
+            import os
+
+            current_dir_files = {fn.lower(): fn for fn in os.listdir(".")}
+            schema_path = current_dir_files.get(schema_name.lower() + ".exp")
+            fn = schema_path[:-4] + ".py"
+            if not os.path.exists(fn):
+                subprocess.run([sys.executable, "-m", "ifcopenshell.express.rule_compiler", schema_path, fn], check=True)
+                importlib.invalidate_caches()
+            rules = importlib.import_module(schema_name)
+    _derived_rules[schema_name] = rules
+    return rules
+
+
+def get_derived_attribute_function(schema_name: str, entity_name: str, name: str) -> Union[Callable, None]:
+    key = (schema_name, entity_name, name)
+    if key not in _derived_functions:
+        rules = import_derived_attribute_rules(schema_name)
+        decl = ifcopenshell_wrapper.schema_by_name(schema_name).declaration_by_name(entity_name)
+        fn = None
+        while decl and not fn:
+            fn = getattr(rules, f"calc_{decl.name()}_{name}", None)
+            decl = decl.supertype()
+        _derived_functions[key] = fn
+    return _derived_functions[key]
+
 
 class entity_instance:
     """Represents an entity (wall, slab, property, etc) of an IFC model
@@ -191,29 +237,9 @@ class entity_instance:
             return vs
 
         # derived attribute perhaps?
-        schema_name = self.wrapped_data.is_a(True).split(".")[0]
-        try:
-            rules = importlib.import_module(f"ifcopenshell.express.rules.{schema_name}")
-        except:
-            import os
-            current_dir_files = {fn.lower(): fn for fn in os.listdir('.')}
-            schema_path = current_dir_files.get(schema_name.lower() + '.exp')
-            fn = schema_path[:-4] + '.py'
-            if not os.path.exists(fn):
-                subprocess.run([sys.executable, "-m", "ifcopenshell.express.rule_compiler", schema_path, fn], check=True)
-                time.sleep(1.)
-            rules = importlib.import_module(schema_name)
-
-        def yield_supertypes():
-            decl = ifcopenshell_wrapper.schema_by_name(schema_name).declaration_by_name(self.is_a())
-            while decl:
-                yield decl.name()
-                decl = decl.supertype()
-
-        for sty in yield_supertypes():
-            fn = getattr(rules, f"calc_{sty}_{name}", None)
-            if fn:
-                return fn(self)
+        fn = get_derived_attribute_function(self.wrapped_data.is_a(True).split(".")[0], self.is_a(), name)
+        if fn:
+            return fn(self)
 
         if attr_cat != FORWARD:
             raise AttributeError(
@@ -0,0 +1,64 @@
+"""Extracts the derived attribute functions from a compiled rules module
+
+The rules modules generated by rule_compiler.py contain every type, entity
+and global rule of a schema and are slow to import. Evaluating derived
+attributes only requires the calc_<Entity>_<Attribute> functions and the
+definitions they (transitively) refer to, so these are written to a much
+smaller module that entity_instance imports instead.
+
+~~~
+python -m ifcopenshell.express.derived_compiler rules/IFC4.py rules/derived/IFC4.py
+~~~
+"""
+
+import ast
+import sys
+import collections
+
+
+def get_defined_names(stmt: ast.stmt) -> set[str]:
+    if isinstance(stmt, (ast.FunctionDef, ast.ClassDef)):
+        return {stmt.name}
+    elif isinstance(stmt, ast.Assign):
+        return {n.id for t in stmt.targets for n in ast.walk(t) if isinstance(n, ast.Name)}
+    elif isinstance(stmt, (ast.Import, ast.ImportFrom)):
+        return {(a.asname or a.name).split(".")[0] for a in stmt.names}
+    return set()
+
+
+def compile_derived(source: str) -> str:
+    tree = ast.parse(source)
+
+    definitions = collections.defaultdict(list)
+    for i, stmt in enumerate(tree.body):
+        for name in get_defined_names(stmt):
+            definitions[name].append(i)
+
+    # Imports are always kept, as names from star imports cannot be resolved
+    included = {i for i, stmt in enumerate(tree.body) if isinstance(stmt, (ast.Import, ast.ImportFrom))}
+    queue = [name for name in definitions if name.startswith("calc_")]
+    visited = set()
+    while queue:
+        name = queue.pop()
+        if name in visited:
+            continue
+        visited.add(name)
+        for i in definitions.get(name, ()):
+            if i in included:
+                continue
+            included.add(i)
+            # This over-approximates by also following local names, which is harmless
+            queue.extend(n.id for n in ast.walk(tree.body[i]) if isinstance(n, ast.Name))
+
+    header = "# This file is generated by ifcopenshell.express.derived_compiler, do not edit"
+    return "\n".join([header] + [ast.unparse(tree.body[i]) for i in sorted(included)]) + "\n"
+
+
+if __name__ == "__main__":
+    with open(sys.argv[1], "r") as f:
+        derived = compile_derived(f.read())
+    if len(sys.argv) < 3 or sys.argv[2] == "-":
+        print(derived)
+    else:
+        with open(sys.argv[2], "w") as f:
+            f.write(derived)
@@ -1,9 +1,14 @@
 import os
 import re
 import ast
+import sys
+import time
+import marshal
+import hashlib
 import collections
 import ifcopenshell
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Optional
 from codegen import indent
 
 
@@ -62,9 +67,198 @@ def fix_type(v):
     return v
 
 
-def run(f, logger):
+@dataclass
+class rule_set:
+    """The compiled rules of a schema, with the type rules indexed by the type they apply to"""
+
+    source_lines: list[str]
+    file_rules: list
+    type_rules: dict[str, list]
+    entity_rules: list
+    # Entity rules grouped by the entity they apply to, in order of appearance
+    entity_rules_by_type: dict[str, list] = field(default_factory=dict)
+    # Per entity, the attributes which may hold values that type rules apply to
+    checked_attributes: dict[str, list] = field(default_factory=dict)
+
+    def get_checked_attributes(self, schema, entity_name: str) -> list:
+        """Returns (index, attribute type) of attributes that need the simple type rule pass
+
+        Attributes referencing entities or simple types without rules are
+        skipped, so most values of an instance are never unpacked.
+        """
+        checked = self.checked_attributes.get(entity_name)
+        if checked is None:
+            entity = schema.declaration_by_name(entity_name)
+            checked = self.checked_attributes[entity_name] = [
+                (i, attr.type_of_attribute())
+                for i, (attr, is_derived) in enumerate(zip(entity.all_attributes(), entity.derived()))
+                if not is_derived and self.has_type_rules(attr.type_of_attribute())
+            ]
+        return checked
+
+    def has_type_rules(self, ty, visited=None) -> bool:
+        w = ifcopenshell.ifcopenshell_wrapper
+        if isinstance(ty, w.named_type):
+            return self.has_type_rules(ty.declared_type(), visited)
+        elif isinstance(ty, w.aggregation_type):
+            return self.has_type_rules(ty.type_of_element(), visited)
+        elif isinstance(ty, w.simple_type):
+            return False
+        elif ty.name() in self.type_rules:
+            return True
+        elif isinstance(ty, w.type_declaration):
+            return self.has_type_rules(ty.declared_type(), visited)
+        elif isinstance(ty, w.select_type):
+            # Selects may hold wrapped type values, such as IfcLabel in IfcValue
+            visited = visited or set()
+            if ty.name() in visited:
+                return False
+            visited.add(ty.name())
+            return any(self.has_type_rules(member, visited) for member in ty.select_list())
+        return False
+
+
+class rule_profile:
+    """Accumulates the number of invocations and time spent per rule
+
+    Pass an instance to run() to find the rules that dominate validation time.
+    """
+
+    def __init__(self):
+        self.invocations = collections.Counter()
+        self.durations = collections.Counter()
+
+    def add(self, rule_name: str, duration: float, invocations: int = 1) -> None:
+        self.invocations[rule_name] += invocations
+        self.durations[rule_name] += duration
+
+    def report(self) -> list[tuple[str, int, float]]:
+        """Returns (rule name, invocations, seconds) sorted by the time spent, slowest first"""
+        return sorted(
+            ((name, self.invocations[name], duration) for name, duration in self.durations.items()),
+            key=lambda x: x[2],
+            reverse=True,
+        )
+
+
+# Compiled rule sets keyed by schema identifier and source digest
+rule_set_cache: dict[tuple[str, str], rule_set] = {}
+
+
+def get_rule_source(schema_identifier: str) -> tuple[str, str]:
+    fn = os.path.join(os.path.dirname(__file__), "rules", f"{schema_identifier}.py")
+    try:
+        return open(fn, "r").read(), fn
+    except FileNotFoundError as e:
+        import subprocess
+
+        current_dir_files = {fn.lower(): fn for fn in os.listdir('.')}
+        schema_name = str(schema_identifier).split(' ')[-1].lower()
+        schema_path = current_dir_files.get(schema_name + '.exp')
+        fn = schema_path[:-4] + '.py'
+        if not os.path.exists(fn):
+            subprocess.run([sys.executable, "-m", "ifcopenshell.express.rule_compiler", schema_path, fn], check=True)
+        return open(fn, "r").read(), fn
+
+
+def compile_rules(source: str, filename: str, digest: str, cache_dir: str):
+    """Compiles the rules source with pytest's assertion rewriting
+
+    The resulting bytecode is stored in the cache directory keyed by the
+    source digest, so that other processes can skip the rewriting and
+    compilation. Failing to read or write the cache is not an error.
+    """
     from _pytest import assertion
 
+    cache_file = os.path.join(cache_dir, f"{filename[:-3]}.{sys.implementation.cache_tag}.{digest}.rules.pyc")
+    try:
+        with open(cache_file, "rb") as f:
+            return marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        pass
+
+    a = ast.parse(source)
+    assertion.rewrite.rewrite_asserts(mod=a, source=source)
+    cd = compile(a, filename, "exec")
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        # Write atomically, as other processes may be reading the cache
+        tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+        with open(tmp_file, "wb") as f:
+            marshal.dump(cd, f)
+        os.replace(tmp_file, cache_file)
+    except OSError:
+        pass
+    return cd
+
+
+def get_rules(schema_identifier: str, cache_dir: Optional[str] = None) -> rule_set:
+    """Returns the compiled rules for a schema, cached in-process and as bytecode on disk
+
+    :param cache_dir: Directory for the bytecode cache, defaults to a
+        __pycache__ directory next to the rules source.
+    """
+    import pytest
+
+    source, fn = get_rule_source(schema_identifier)
+    # The rewritten bytecode depends on the pytest version rewriting the asserts
+    digest = hashlib.sha256(f"{pytest.__version__}\n{source}".encode("utf-8")).hexdigest()[:16]
+    cached = rule_set_cache.get((schema_identifier, digest))
+    if cached:
+        return cached
+
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(fn), "__pycache__")
+    cd = compile_rules(source, f"{schema_identifier}.py", digest, cache_dir)
+    scope = {}
+    exec(cd, scope)
+    S = ifcopenshell.ifcopenshell_wrapper.schema_by_name(schema_identifier)
+
+    rules = list(filter(lambda x: hasattr(x, "SCOPE"), scope.values()))
+
+    types = {}
+    subtypes = collections.defaultdict(list)
+    for d in S.declarations():
+        if isinstance(d, ifcopenshell.ifcopenshell_wrapper.type_declaration):
+            types[d.name()] = d
+            if isinstance(
+                d.declared_type(), ifcopenshell.ifcopenshell_wrapper.named_type
+            ):
+                subtypes[d.declared_type().declared_type().name()].append(d.name())
+
+    D = collections.defaultdict(list)
+    for r in rules:
+        if r.SCOPE == "type":
+
+            def visit(nm):
+                D[nm].append(r)
+                for nm2 in subtypes[nm]:
+                    visit(nm2)
+
+            visit(r.TYPE_NAME)
+
+    entity_rules = [r for r in rules if r.SCOPE == "entity"]
+    entity_rules_by_type = {}
+    for r in entity_rules:
+        entity_rules_by_type.setdefault(r.TYPE_NAME, []).append(r)
+
+    v = rule_set_cache[(schema_identifier, digest)] = rule_set(
+        source.split("\n"),
+        [r for r in rules if r.SCOPE == "file"],
+        dict(D),
+        entity_rules,
+        entity_rules_by_type,
+    )
+    return v
+
+
+def run(f, logger, profile: Optional[rule_profile] = None):
+    """Checks the EXPRESS global, type and entity rules of a file
+
+    :param profile: If provided, the time spent and number of invocations
+        of each rule are added to it.
+    """
     if hasattr(logger, "set_instance"):
         # when using the json logger, we notify it of the relevant instance
         pre_annotate_instance = lambda instance: logger.set_state('instance', instance) if hasattr(logger, 'set_state') else None
@@ -81,36 +275,16 @@ def run(f, logger):
     orig = ifcopenshell.settings.unpack_non_aggregate_inverses
     ifcopenshell.settings.unpack_non_aggregate_inverses = True
 
-    fn = os.path.join(os.path.dirname(__file__), "rules", f"{f.schema_identifier}.py")
-    try:
-        source = open(fn, "r").read()
-    except FileNotFoundError as e:
-        import sys
-        import time
-        import subprocess
-
-        current_dir_files = {fn.lower(): fn for fn in os.listdir('.')}
-        schema_name = str(f.schema_identifier).split(' ')[-1].lower()
-        schema_path = current_dir_files.get(schema_name + '.exp')
-        fn = schema_path[:-4] + '.py'
-        if not os.path.exists(fn):
-            subprocess.run([sys.executable, "-m", "ifcopenshell.express.rule_compiler", schema_path, fn], check=True)
-            time.sleep(1.)
-        source = open(fn, "r").read()
-
-    a = ast.parse(source)
-    assertion.rewrite.rewrite_asserts(mod=a, source=source)
-    cd = compile(a, f"{f.schema_identifier}.py", "exec")
-    scope = {}
-    exec(cd, scope)
+    rules = get_rules(f.schema_identifier)
+    source_lines = rules.source_lines
+    D = rules.type_rules
     S = ifcopenshell.ifcopenshell_wrapper.schema_by_name(f.schema_identifier)
 
-    rules = list(filter(lambda x: hasattr(x, "SCOPE"), scope.values()))
-
     if hasattr(logger, 'set_state'):
         logger.set_state('type', 'global_rule')
 
-    for R in [r for r in rules if r.SCOPE == "file"]:
+    for R in rules.file_rules:
+        start = time.perf_counter()
         try:
             R()(f)
         except Exception as e:
@@ -120,36 +294,17 @@ def run(f, logger):
                 str(
                     error(
                         post_annotate_attribute(R.__name__),
-                        reverse_compile(source.split("\n")[ln - 1]),
+                        reverse_compile(source_lines[ln - 1]),
                         reverse_compile(e.args[0]),
                     )
                 )
             )
+        if profile is not None:
+            profile.add(R.__name__, time.perf_counter() - start)
 
     if hasattr(logger, 'set_state'):
         logger.set_state('type', 'simpletype_rule')
 
-    types = {}
-    subtypes = collections.defaultdict(list)
-    for d in S.declarations():
-        if isinstance(d, ifcopenshell.ifcopenshell_wrapper.type_declaration):
-            types[d.name()] = d
-            if isinstance(
-                d.declared_type(), ifcopenshell.ifcopenshell_wrapper.named_type
-            ):
-                subtypes[d.declared_type().declared_type().name()].append(d.name())
-
-    D = collections.defaultdict(list)
-    for r in rules:
-        if r.SCOPE == "type":
-
-            def visit(nm):
-                D[nm].append(r)
-                for nm2 in subtypes[nm]:
-                    visit(nm2)
-
-            visit(r.TYPE_NAME)
-
     def type_name(ty):
         if isinstance(ty, ifcopenshell.ifcopenshell_wrapper.named_type):
             return type_name(ty.declared_type())
@@ -167,6 +322,8 @@ def run(f, logger):
 
         if type_name(type) in D:
             for R in D[type_name(type)]:
+                if profile is not None:
+                    start = time.perf_counter()
                 try:
                     R()(fix_type(value))
                 except Exception as e:
@@ -177,12 +334,14 @@ def run(f, logger):
                         str(
                             error(
                                 post_annotate_attribute(f"{R.TYPE_NAME}.{R.RULE_NAME}"),
-                                reverse_compile(source.split("\n")[ln - 1]),
+                                reverse_compile(source_lines[ln - 1]),
                                 reverse_compile(e.args[0]),
                                 post_annotate_instance(instance),
                             )
                         )
                     )
+                if profile is not None:
+                    profile.add(f"{R.TYPE_NAME}.{R.RULE_NAME}", time.perf_counter() - start)
 
         # @nb something can be a named type with rules and still be an aggregation.
         # case in point IfcCompoundPlaneAngleMeasure. Therefore only unpack named
@@ -217,46 +376,50 @@ def run(f, logger):
                 check(value[0], S.declaration_by_name(value.is_a()), instance=inst)
 
     for inst in f:
+        # Only unpack the attributes which may reach a type rule
+        checked_attributes = rules.get_checked_attributes(S, inst.is_a())
+        if not checked_attributes:
+            continue
         try:
-            values = list(inst)
+            values = [inst[i] for i, _ in checked_attributes]
         except Exception as e:
             if hasattr(logger, "set_state"):
                 logger.error(str(e))
             else:
                 logger.error("For instance:\n    %s\n%s", inst, e)
             continue
-        entity = S.declaration_by_name(inst.is_a())
-        attrs = entity.all_attributes()
-        for i, (attr, val, is_derived) in enumerate(
-            zip(attrs, values, entity.derived())
-        ):
-            if is_derived:
-                # @todo
-                pass
-            else:
-                check(val, attr.type_of_attribute(), instance=inst)
+        for (i, attr_type), val in zip(checked_attributes, values):
+            check(val, attr_type, instance=inst)
 
     if hasattr(logger, 'set_state'):
         logger.set_state('type', 'entity_rule')
 
-    for R in [r for r in rules if r.SCOPE == "entity"]:
-        for inst in f.by_type(R.TYPE_NAME):
-            try:
-                R()(inst)
-            except Exception as e:
-                ln = e.__traceback__.tb_next.tb_lineno
-                pre_annotate_instance(inst)
-                pre_annotate_attribute(f"{R.TYPE_NAME}.{R.RULE_NAME}")
-                logger.error(
-                    str(
-                        error(
-                            post_annotate_attribute(f"{R.TYPE_NAME}.{R.RULE_NAME}"),
-                            reverse_compile(source.split("\n")[ln - 1]),
-                            reverse_compile(e.args[0]),
-                            post_annotate_instance(inst),
+    for entity_name, entity_rules in rules.entity_rules_by_type.items():
+        # Many rules apply to the same entity, so its instances are only fetched once
+        instances = f.by_type(entity_name)
+        if not instances:
+            continue
+        for R in entity_rules:
+            start = time.perf_counter()
+            for inst in instances:
+                try:
+                    R()(inst)
+                except Exception as e:
+                    ln = e.__traceback__.tb_next.tb_lineno
+                    pre_annotate_instance(inst)
+                    pre_annotate_attribute(f"{R.TYPE_NAME}.{R.RULE_NAME}")
+                    logger.error(
+                        str(
+                            error(
+                                post_annotate_attribute(f"{R.TYPE_NAME}.{R.RULE_NAME}"),
+                                reverse_compile(source_lines[ln - 1]),
+                                reverse_compile(e.args[0]),
+                                post_annotate_instance(inst),
+                            )
                         )
                     )
-                )
+            if profile is not None:
+                profile.add(f"{R.TYPE_NAME}.{R.RULE_NAME}", time.perf_counter() - start, len(instances))
 
     ifcopenshell.settings.unpack_non_aggregate_inverses = orig
 
@@ -280,7 +443,12 @@ if __name__ == "__main__":
 
         f = ifcopenshell.open(fn)
 
-        run(f, logger)
+        profile = rule_profile() if "--profile" in flags else None
+        run(f, logger, profile)
 
         if "--json" in flags:
             print("\n".join(json.dumps(x, default=str) for x in logger.statements))
+
+        if profile is not None:
+            for rule_name, invocations, duration in profile.report():
+                print(f"{duration:.3f}s {invocations:>8} {rule_name}", file=sys.stderr)
@@ -0,0 +1,697 @@
+# This file is generated by ifcopenshell.express.derived_compiler, do not edit
+import ifcopenshell
+def exists(v):
+    if callable(v):
+        try:
+            return v() is not None
+        except IndexError as e:
+            return False
+    else:
+        return v is not None
+def nvl(v, default):
+    return v if v is not None else default
+def is_entity(inst):
+    if isinstance(inst, ifcopenshell.entity_instance):
+        schema_name = inst.is_a(True).split('.')[0].lower()
+        decl = ifcopenshell.ifcopenshell_wrapper.schema_by_name(schema_name).declaration_by_name(inst.is_a())
+        return isinstance(decl, ifcopenshell.ifcopenshell_wrapper.entity)
+    return False
+def express_len(v):
+    if isinstance(v, ifcopenshell.entity_instance) and (not is_entity(v)):
+        v = v[0]
+    elif v is None or v is INDETERMINATE:
+        return INDETERMINATE
+    return len(v)
+old_range = range
+def range(*args):
+    if INDETERMINATE in args:
+        return
+    yield from old_range(*args)
+sizeof = express_len
+hiindex = express_len
+loindex = lambda x: 1
+from math import *
+class express_set(set):
+
+    def __mul__(self, other):
+        return express_set(set(other) & self)
+    __rmul__ = __mul__
+
+    def __add__(self, other):
+
+        def make_list(v):
+            if isinstance(v, (list, tuple, set, express_set)):
+                return list(v)
+            else:
+                return [v]
+        return express_set(list(self) + make_list(other))
+    __radd__ = __add__
+
+    def __repr__(self):
+        return repr(set(self))
+
+    def __getitem__(self, k):
+        return express_getitem(list(self), k, INDETERMINATE)
+def express_getitem(aggr, idx, default):
+    if aggr is None:
+        return default
+    if isinstance(aggr, ifcopenshell.entity_instance) and (not is_entity(aggr)):
+        aggr = aggr[0]
+    try:
+        return aggr[idx]
+    except IndexError as e:
+        return None
+EXPRESS_ONE_BASED_INDEXING = 1
+def typeof(inst):
+    if not inst:
+        return express_set([])
+    schema_name = inst.is_a(True).split('.')[0].lower()
+
+    def inner():
+        decl = ifcopenshell.ifcopenshell_wrapper.schema_by_name(schema_name).declaration_by_name(inst.is_a())
+        while decl:
+            yield '.'.join((schema_name, decl.name().lower()))
+            if isinstance(decl, ifcopenshell.ifcopenshell_wrapper.entity):
+                decl = decl.supertype()
+            else:
+                decl = decl.declared_type()
+                while isinstance(decl, ifcopenshell.ifcopenshell_wrapper.named_type):
+                    decl = decl.declared_type()
+                if not isinstance(decl, ifcopenshell.ifcopenshell_wrapper.type_declaration):
+                    break
+    return express_set(inner())
+class indeterminate_type:
+
+    def __bool__(self):
+        return False
+
+    def bop(self, *other):
+        return self
+    __lt__ = bop
+    __le__ = bop
+    __eq__ = bop
+    __ne__ = bop
+    __gt__ = bop
+    __ge__ = bop
+    __add__ = bop
+    __radd__ = bop
+    __sub__ = bop
+    __rsub__ = bop
+    __mul__ = bop
+    __rmul__ = bop
+    __truediv__ = bop
+    __floordiv__ = bop
+    __rtruediv__ = bop
+    __rfloordiv__ = bop
+    __mod__ = bop
+    __rmod__ = bop
+    __pow__ = bop
+    __rpow__ = bop
+    __neg__ = bop
+    __pos__ = bop
+    __getitem__ = bop
+    __getattr__ = bop
+INDETERMINATE = indeterminate_type()
+class enum_namespace:
+
+    def __getattr__(self, k):
+        return getattr(k, 'upper', INDETERMINATE)()
+IfcLayerSetDirectionEnum = enum_namespace()
+axis1 = getattr(IfcLayerSetDirectionEnum, 'AXIS1', INDETERMINATE)
+axis2 = getattr(IfcLayerSetDirectionEnum, 'AXIS2', INDETERMINATE)
+axis3 = getattr(IfcLayerSetDirectionEnum, 'AXIS3', INDETERMINATE)
+IfcProfileTypeEnum = enum_namespace()
+curve = getattr(IfcProfileTypeEnum, 'CURVE', INDETERMINATE)
+IfcSIUnitName = enum_namespace()
+ampere = getattr(IfcSIUnitName, 'AMPERE', INDETERMINATE)
+becquerel = getattr(IfcSIUnitName, 'BECQUEREL', INDETERMINATE)
+candela = getattr(IfcSIUnitName, 'CANDELA', INDETERMINATE)
+coulomb = getattr(IfcSIUnitName, 'COULOMB', INDETERMINATE)
+cubic_metre = getattr(IfcSIUnitName, 'CUBIC_METRE', INDETERMINATE)
+degree_celsius = getattr(IfcSIUnitName, 'DEGREE_CELSIUS', INDETERMINATE)
+farad = getattr(IfcSIUnitName, 'FARAD', INDETERMINATE)
+gram = getattr(IfcSIUnitName, 'GRAM', INDETERMINATE)
+gray = getattr(IfcSIUnitName, 'GRAY', INDETERMINATE)
+henry = getattr(IfcSIUnitName, 'HENRY', INDETERMINATE)
+hertz = getattr(IfcSIUnitName, 'HERTZ', INDETERMINATE)
+joule = getattr(IfcSIUnitName, 'JOULE', INDETERMINATE)
+kelvin = getattr(IfcSIUnitName, 'KELVIN', INDETERMINATE)
+lumen = getattr(IfcSIUnitName, 'LUMEN', INDETERMINATE)
+lux = getattr(IfcSIUnitName, 'LUX', INDETERMINATE)
+metre = getattr(IfcSIUnitName, 'METRE', INDETERMINATE)
+mole = getattr(IfcSIUnitName, 'MOLE', INDETERMINATE)
+newton = getattr(IfcSIUnitName, 'NEWTON', INDETERMINATE)
+ohm = getattr(IfcSIUnitName, 'OHM', INDETERMINATE)
+pascal = getattr(IfcSIUnitName, 'PASCAL', INDETERMINATE)
+radian = getattr(IfcSIUnitName, 'RADIAN', INDETERMINATE)
+second = getattr(IfcSIUnitName, 'SECOND', INDETERMINATE)
+siemens = getattr(IfcSIUnitName, 'SIEMENS', INDETERMINATE)
+sievert = getattr(IfcSIUnitName, 'SIEVERT', INDETERMINATE)
+square_metre = getattr(IfcSIUnitName, 'SQUARE_METRE', INDETERMINATE)
+steradian = getattr(IfcSIUnitName, 'STERADIAN', INDETERMINATE)
+tesla = getattr(IfcSIUnitName, 'TESLA', INDETERMINATE)
+volt = getattr(IfcSIUnitName, 'VOLT', INDETERMINATE)
+watt = getattr(IfcSIUnitName, 'WATT', INDETERMINATE)
+weber = getattr(IfcSIUnitName, 'WEBER', INDETERMINATE)
+IfcTransitionCode = enum_namespace()
+discontinuous = getattr(IfcTransitionCode, 'DISCONTINUOUS', INDETERMINATE)
+def IfcCartesianPoint(*args, **kwargs):
+    return ifcopenshell.create_entity('IfcCartesianPoint', 'IFC4X2', *args, **kwargs)
+def IfcCartesianTransformationOperator2D(*args, **kwargs):
+    return ifcopenshell.create_entity('IfcCartesianTransformationOperator2D', 'IFC4X2', *args, **kwargs)
+def IfcDimensionalExponents(*args, **kwargs):
+    return ifcopenshell.create_entity('IfcDimensionalExponents', 'IFC4X2', *args, **kwargs)
+def IfcDirection(*args, **kwargs):
+    return ifcopenshell.create_entity('IfcDirection', 'IFC4X2', *args, **kwargs)
+def IfcLine(*args, **kwargs):
+    return ifcopenshell.create_entity('IfcLine', 'IFC4X2', *args, **kwargs)
+def IfcVector(*args, **kwargs):
+    return ifcopenshell.create_entity('IfcVector', 'IFC4X2', *args, **kwargs)
+def calc_IfcAxis1Placement_Z(self):
+    axis = getattr(self, 'Axis', INDETERMINATE)
+    return nvl(IfcNormalise(axis), IfcDirection(DirectionRatios=[0.0, 0.0, 1.0]))
+def calc_IfcAxis2Placement2D_P(self):
+    refdirection = getattr(self, 'RefDirection', INDETERMINATE)
+    return IfcBuild2Axes(refdirection)
+def calc_IfcAxis2Placement3D_P(self):
+    axis = getattr(self, 'Axis', INDETERMINATE)
+    refdirection = getattr(self, 'RefDirection', INDETERMINATE)
+    return IfcBuildAxes(axis, refdirection)
+def calc_IfcBSplineCurve_UpperIndexOnControlPoints(self):
+    controlpointslist = getattr(self, 'ControlPointsList', INDETERMINATE)
+    return sizeof(controlpointslist) - 1
+def calc_IfcBSplineCurve_ControlPoints(self):
+    controlpointslist = getattr(self, 'ControlPointsList', INDETERMINATE)
+    upperindexoncontrolpoints = getattr(self, 'UpperIndexOnControlPoints', INDETERMINATE)
+    return IfcListToArray(controlpointslist, 0, upperindexoncontrolpoints)
+def calc_IfcBSplineCurveWithKnots_UpperIndexOnKnots(self):
+    knots = getattr(self, 'Knots', INDETERMINATE)
+    return sizeof(knots)
+def calc_IfcBSplineSurface_UUpper(self):
+    controlpointslist = getattr(self, 'ControlPointsList', INDETERMINATE)
+    return sizeof(controlpointslist) - 1
+def calc_IfcBSplineSurface_VUpper(self):
+    controlpointslist = getattr(self, 'ControlPointsList', INDETERMINATE)
+    return sizeof(express_getitem(controlpointslist, 1 - EXPRESS_ONE_BASED_INDEXING, INDETERMINATE)) - 1
+def calc_IfcBSplineSurface_ControlPoints(self):
+    controlpointslist = getattr(self, 'ControlPointsList', INDETERMINATE)
+    uupper = getattr(self, 'UUpper', INDETERMINATE)
+    vupper = getattr(self, 'VUpper', INDETERMINATE)
+    return IfcMakeArrayOfArray(controlpointslist, 0, uupper, 0, vupper)
+def calc_IfcBSplineSurfaceWithKnots_KnotVUpper(self):
+    vknots = getattr(self, 'VKnots', INDETERMINATE)
+    return sizeof(vknots)
+def calc_IfcBSplineSurfaceWithKnots_KnotUUpper(self):
+    uknots = getattr(self, 'UKnots', INDETERMINATE)
+    return sizeof(uknots)
+def calc_IfcBooleanResult_Dim(self):
+    firstoperand = getattr(self, 'FirstOperand', INDETERMINATE)
+    return getattr(firstoperand, 'Dim', INDETERMINATE)
+def calc_IfcBoundingBox_Dim(self):
+    return 3
+def calc_IfcCartesianPoint_Dim(self):
+    coordinates = getattr(self, 'Coordinates', INDETERMINATE)
+    return hiindex(coordinates)
+def calc_IfcCartesianPointList_Dim(self):
+    return IfcPointListDim(self)
+def calc_IfcCartesianTransformationOperator_Scl(self):
+    scale = getattr(self, 'Scale', INDETERMINATE)
+    return nvl(scale, 1.0)
+def calc_IfcCartesianTransformationOperator_Dim(self):
+    localorigin = getattr(self, 'LocalOrigin', INDETERMINATE)
+    return getattr(localorigin, 'Dim', INDETERMINATE)
+def calc_IfcCartesianTransformationOperator2D_U(self):
+    return IfcBaseAxis(2, getattr(self, 'Axis1', INDETERMINATE), getattr(self, 'Axis2', INDETERMINATE), None)
+def calc_IfcCartesianTransformationOperator2DnonUniform_Scl2(self):
+    scale2 = getattr(self, 'Scale2', INDETERMINATE)
+    return nvl(scale2, getattr(self, 'Scl', INDETERMINATE))
+def calc_IfcCartesianTransformationOperator3D_U(self):
+    axis3 = getattr(self, 'Axis3', INDETERMINATE)
+    return IfcBaseAxis(3, getattr(self, 'Axis1', INDETERMINATE), getattr(self, 'Axis2', INDETERMINATE), axis3)
+def calc_IfcCartesianTransformationOperator3DnonUniform_Scl2(self):
+    scale2 = getattr(self, 'Scale2', INDETERMINATE)
+    return nvl(scale2, getattr(self, 'Scl', INDETERMINATE))
+def calc_IfcCartesianTransformationOperator3DnonUniform_Scl3(self):
+    scale3 = getattr(self, 'Scale3', INDETERMINATE)
+    return nvl(scale3, getattr(self, 'Scl', INDETERMINATE))
+def calc_IfcCompositeCurve_NSegments(self):
+    segments = getattr(self, 'Segments', INDETERMINATE)
+    return sizeof(segments)
+def calc_IfcCompositeCurve_ClosedCurve(self):
+    segments = getattr(self, 'Segments', INDETERMINATE)
+    nsegments = getattr(self, 'NSegments', INDETERMINATE)
+    return getattr(express_getitem(segments, nsegments - EXPRESS_ONE_BASED_INDEXING, INDETERMINATE), 'Transition', INDETERMINATE) != discontinuous
+def calc_IfcCompositeCurveOnSurface_BasisSurface(self):
+    return IfcGetBasisSurface(self)
+def calc_IfcCompositeCurveSegment_Dim(self):
+    parentcurve = getattr(self, 'ParentCurve', INDETERMINATE)
+    return getattr(parentcurve, 'Dim', INDETERMINATE)
+def calc_IfcCsgPrimitive3D_Dim(self):
+    return 3
+def calc_IfcCurve_Dim(self):
+    return IfcCurveDim(self)
+def calc_IfcDerivedUnit_Dimensions(self):
+    elements = getattr(self, 'Elements', INDETERMINATE)
+    return IfcDeriveDimensionalExponents(elements)
+def calc_IfcDirection_Dim(self):
+    directionratios = getattr(self, 'DirectionRatios', INDETERMINATE)
+    return hiindex(directionratios)
+def calc_IfcEdgeLoop_Ne(self):
+    edgelist = getattr(self, 'EdgeList', INDETERMINATE)
+    return sizeof(edgelist)
+def calc_IfcFaceBasedSurfaceModel_Dim(self):
+    return 3
+def calc_IfcGeometricRepresentationSubContext_WorldCoordinateSystem(self):
+    parentcontext = getattr(self, 'ParentContext', INDETERMINATE)
+    return getattr(parentcontext, 'WorldCoordinateSystem', INDETERMINATE)
+def calc_IfcGeometricRepresentationSubContext_CoordinateSpaceDimension(self):
+    parentcontext = getattr(self, 'ParentContext', INDETERMINATE)
+    return getattr(parentcontext, 'CoordinateSpaceDimension', INDETERMINATE)
+def calc_IfcGeometricRepresentationSubContext_TrueNorth(self):
+    parentcontext = getattr(self, 'ParentContext', INDETERMINATE)
+    return nvl(getattr(parentcontext, 'TrueNorth', INDETERMINATE), IfcConvertDirectionInto2D(express_getitem(getattr(getattr(self, 'WorldCoordinateSystem', INDETERMINATE), 'P', INDETERMINATE), 2 - EXPRESS_ONE_BASED_INDEXING, INDETERMINATE)))
+def calc_IfcGeometricRepresentationSubContext_Precision(self):
+    parentcontext = getattr(self, 'ParentContext', INDETERMINATE)
+    return nvl(getattr(parentcontext, 'Precision', INDETERMINATE), 1)
+def calc_IfcGeometricSet_Dim(self):
+    elements = getattr(self, 'Elements', INDETERMINATE)
+    return getattr(express_getitem(elements, 1 - EXPRESS_ONE_BASED_INDEXING, INDETERMINATE), 'Dim', INDETERMINATE)
+def calc_IfcHalfSpaceSolid_Dim(self):
+    return 3
+def calc_IfcMaterialLayerSet_TotalThickness(self):
+    return IfcMlsTotalThickness(self)
+def calc_IfcMirroredProfileDef_Operator(self):
+    return IfcCartesianTransformationOperator2D(Axis1=IfcDirection(DirectionRatios=[-1.0, 0.0]), Axis2=IfcDirection(DirectionRatios=[0.0, 1.0]), LocalOrigin=IfcCartesianPoint(Coordinates=[0.0, 0.0]), Scale=1.0)
+def calc_IfcOrientedEdge_EdgeStart(self):
+    edgeelement = getattr(self, 'EdgeElement', INDETERMINATE)
+    orientation = getattr(self, 'Orientation', INDETERMINATE)
+    return IfcBooleanChoose(orientation, getattr(edgeelement, 'EdgeStart', INDETERMINATE), getattr(edgeelement, 'EdgeEnd', INDETERMINATE))
+def calc_IfcOrientedEdge_EdgeEnd(self):
+    edgeelement = getattr(self, 'EdgeElement', INDETERMINATE)
+    orientation = getattr(self, 'Orientation', INDETERMINATE)
+    return IfcBooleanChoose(orientation, getattr(edgeelement, 'EdgeEnd', INDETERMINATE), getattr(edgeelement, 'EdgeStart', INDETERMINATE))
+def calc_IfcPlacement_Dim(self):
+    location = getattr(self, 'Location', INDETERMINATE)
+    return getattr(location, 'Dim', INDETERMINATE)
+def calc_IfcPointOnCurve_Dim(self):
+    basiscurve = getattr(self, 'BasisCurve', INDETERMINATE)
+    return getattr(basiscurve, 'Dim', INDETERMINATE)
+def calc_IfcPointOnSurface_Dim(self):
+    basissurface = getattr(self, 'BasisSurface', INDETERMINATE)
+    return getattr(basissurface, 'Dim', INDETERMINATE)
+def calc_IfcRationalBSplineCurveWithKnots_Weights(self):
+    weightsdata = getattr(self, 'WeightsData', INDETERMINATE)
+    return IfcListToArray(weightsdata, 0, getattr(self, 'UpperIndexOnControlPoints', INDETERMINATE))
+def calc_IfcRationalBSplineSurfaceWithKnots_Weights(self):
+    uupper = getattr(self, 'UUpper', INDETERMINATE)
+    vupper = getattr(self, 'VUpper', INDETERMINATE)
+    weightsdata = getattr(self, 'WeightsData', INDETERMINATE)
+    return IfcMakeArrayOfArray(weightsdata, 0, uupper, 0, vupper)
+def calc_IfcRevolvedAreaSolid_AxisLine(self):
+    axis = getattr(self, 'Axis', INDETERMINATE)
+    return IfcLine(Pnt=getattr(axis, 'Location', INDETERMINATE), Dir=IfcVector(Orientation=getattr(axis, 'Z', INDETERMINATE), Magnitude=1.0))
+def calc_IfcSIUnit_Dimensions(self):
+    return IfcDimensionsForSiUnit(getattr(self, 'Name', INDETERMINATE))
+def calc_IfcSectionedSpine_Dim(self):
+    return 3
+def calc_IfcShellBasedSurfaceModel_Dim(self):
+    return 3
+def calc_IfcSolidModel_Dim(self):
+    return 3
+def calc_IfcSurface_Dim(self):
+    return 3
+def calc_IfcSurfaceCurve_BasisSurface(self):
+    return IfcGetBasisSurface(self)
+def calc_IfcSurfaceOfLinearExtrusion_ExtrusionAxis(self):
+    extrudeddirection = getattr(self, 'ExtrudedDirection', INDETERMINATE)
+    depth = getattr(self, 'Depth', INDETERMINATE)
+    return IfcVector(Orientation=extrudeddirection, Magnitude=depth)
+def calc_IfcSurfaceOfRevolution_AxisLine(self):
+    axisposition = getattr(self, 'AxisPosition', INDETERMINATE)
+    return IfcLine(Pnt=getattr(axisposition, 'Location', INDETERMINATE), Dir=IfcVector(Orientation=getattr(axisposition, 'Z', INDETERMINATE), Magnitude=1.0))
+def calc_IfcTable_NumberOfCellsInRow(self):
+    rows = getattr(self, 'Rows', INDETERMINATE)
+    return hiindex(getattr(express_getitem(rows, 1 - EXPRESS_ONE_BASED_INDEXING, INDETERMINATE), 'RowCells', INDETERMINATE))
+def calc_IfcTable_NumberOfHeadings(self):
+    rows = getattr(self, 'Rows', INDETERMINATE)
+    return sizeof([temp for temp in rows if getattr(temp, 'IsHeading', INDETERMINATE)])
+def calc_IfcTable_NumberOfDataRows(self):
+    rows = getattr(self, 'Rows', INDETERMINATE)
+    return sizeof([temp for temp in rows if not getattr(temp, 'IsHeading', INDETERMINATE)])
+def calc_IfcTessellatedFaceSet_Dim(self):
+    return 3
+def calc_IfcTriangulatedFaceSet_NumberOfTriangles(self):
+    coordindex = getattr(self, 'CoordIndex', INDETERMINATE)
+    return sizeof(coordindex)
+def calc_IfcVector_Dim(self):
+    orientation = getattr(self, 'Orientation', INDETERMINATE)
+    return getattr(orientation, 'Dim', INDETERMINATE)
+def IfcAssociatedSurface(arg):
+    surf = getattr(arg, 'BasisSurface', INDETERMINATE)
+    return surf
+def IfcBaseAxis(dim, axis1, axis2, axis3):
+    if dim == 3:
+        d1 = nvl(IfcNormalise(axis3), IfcDirection(DirectionRatios=[0.0, 0.0, 1.0]))
+        d2 = IfcFirstProjAxis(d1, axis1)
+        u = [d2, IfcSecondProjAxis(d1, d2, axis2), d1]
+    elif exists(axis1):
+        d1 = IfcNormalise(axis1)
+        u = [d1, IfcOrthogonalComplement(d1)]
+        if exists(axis2):
+            factor = IfcDotProduct(axis2, express_getitem(u, 2 - EXPRESS_ONE_BASED_INDEXING, INDETERMINATE))
+            if factor < 0.0:
+                u[2 - EXPRESS_ONE_BASED_INDEXING].DirectionRatios[1 - EXPRESS_ONE_BASED_INDEXING] = -express_getitem(getattr(express_getitem(u, 2 - EXPRESS_ONE_BASED_INDEXING, INDETERMINATE), 'DirectionRatios', INDETERMINATE), 1 - EXPRESS_ONE_BASED_INDEXING, INDETERMINATE)
+                u[2 - EXPRESS_ONE_BASED_INDEXING].DirectionRatios[2 - EXPRESS_ONE_BASED_INDEXING] = -express_getitem(getattr(express_getitem(u, 2 - EXPRESS_ONE_BASED_INDEXING, INDETERMINATE), 'DirectionRatios', INDETERMINATE), 2 - EXPRESS_ONE_BASED_INDEXING, INDETERMINATE)
+    elif exists(axis2):
+        d1 = IfcNormalise(axis2)
+        u = [IfcOrthogonalComplement(d1), d1]
+        u[1 - EXPRESS_ONE_BASED_INDEXING].DirectionRatios[1 - EXPRESS_ONE_BASED_INDEXING] = -express_getitem(getattr(express_getitem(u, 1 - EXPRESS_ONE_BASED_INDEXING, INDETERMINATE), 'DirectionRatios', INDETERMINATE), 1 - EXPRESS_ONE_BASED_INDEXING, INDETERMINATE)
+        u[1 - EXPRESS_ONE_BASED_INDEXING].DirectionRatios[2 - EXPRESS_ONE_BASED_INDEXING] = -express_getitem(getattr(express_getitem(u, 1 - EXPRESS_ONE_BASED_INDEXING, INDETERMINATE), 'DirectionRatios', INDETERMINATE), 2 - EXPRESS_ONE_BASED_INDEXING, INDETERMINATE)
+    else:
+        u = [IfcDirection(DirectionRatios=[1.0, 0.0]), IfcDirection(DirectionRatios=[0.0, 1.0])]
+    return u
+def IfcBooleanChoose(b, choice1, choice2):
+    if b:
+        return choice1
+    else:
+        return choice2
+def IfcBuild2Axes(refdirection):
+    d = nvl(IfcNormalise(refdirection), IfcDirection(DirectionRatios=[1.0, 0.0]))
+    return [d, IfcOrthogonalComplement(d)]
+def IfcBuildAxes(axis, refdirection):
+    d1 = nvl(IfcNormalise(axis), IfcDirection(DirectionRatios=[0.0, 0.0, 1.0]))
+    d2 = IfcFirstProjAxis(d1, refdirection)
+    return [d2, getattr(IfcNormalise(IfcCrossProduct(d1, d2)), 'Orientation', INDETERMINATE), d1]
+def IfcConvertDirectionInto2D(direction):
+    direction2d = IfcDirection(DirectionRatios=[0.0, 1.0])
+    temp = list(getattr(direction2d, 'DirectionRatios', INDETERMINATE))
+    temp[1 - EXPRESS_ONE_BASED_INDEXING] = express_getitem(getattr(direction, 'DirectionRatios', INDETERMINATE), 1 - EXPRESS_ONE_BASED_INDEXING, INDETERMINATE)
+    direction2d.DirectionRatios = temp
+    temp = list(getattr(direction2d, 'DirectionRatios', INDETERMINATE))
+    temp[2 - EXPRESS_ONE_BASED_INDEXING] = express_getitem(getattr(direction, 'DirectionRatios', INDETERMINATE), 2 - EXPRESS_ONE_BASED_INDEXING, INDETERMINATE)
+    direction2d.DirectionRatios = temp
+    return direction2d
+def IfcCrossProduct(arg1, arg2):
+    if (not exists(arg1) or getattr(arg1, 'Dim', INDETERMINATE) == 2) or (not exists(arg2) or getattr(arg2, 'Dim', INDETERMINATE) == 2):
+        return None
+    else:
+        v1 = getattr(IfcNormalise(arg1), 'DirectionRatios', INDETERMINATE)
+        v2 = getattr(IfcNormalise(arg2), 'DirectionRatios', INDETERMINATE)
+        res = IfcDirection(DirectionRatios=[express_getitem(v1, 2 - EXPRESS_ONE_BASED_INDEXING, INDETERMINATE) * express_getitem(v2, 3 - EXPRESS_ONE_BASED_INDEXING, INDETERMINATE) - express_getitem(v1, 3 - EXPRESS_ONE_BASED_INDEXING, INDETERMINATE) * express_getitem(v2, 2 - EXPRESS_ONE_BASED_INDEXING, INDETERMINATE), express_getitem(v1, 3 - EXPRESS_ONE_BASED_INDEXING, INDETERMINATE) * express_getitem(v2, 1 - EXPRESS_ONE_BASED_INDEXING, INDETERMINATE) - express_getitem(v1, 1 - EXPRESS_ONE_BASED_INDEXING, INDETERMINATE) * express_getitem(v2, 3 - EXPRESS_ONE_BASED_INDEXING, INDETERMINATE), express_getitem(v1, 1 - EXPRESS_ONE_BASED_INDEXING, INDETERMINATE) * express_getitem(v2, 2 - EXPRESS_ONE_BASED_INDEXING, INDETERMINATE) - express_getitem(v1, 2 - EXPRESS_ONE_BASED_INDEXING, INDETERMINATE) * express_getitem(v2, 1 - EXPRESS_ONE_BASED_INDEXING, INDETERMINATE)])
+        mag = 0.0
+        for i in range(1, 3 + 1):
+            mag = mag + express_getitem(getattr(res, 'DirectionRatios', INDETERMINATE), i - EXPRESS_ONE_BASED_INDEXING, INDETERMINATE) * express_getitem(getattr(res, 'DirectionRatios', INDETERMINATE), i - EXPRESS_ONE_BASED_INDEXING, INDETERMINATE)
+        if mag > 0.0:
+            result = IfcVector(Orientation=res, Magnitude=sqrt(mag))
+        else:
+            result = IfcVector(Orientation=arg1, Magnitude=0.0)
+        return result
+def IfcCurveDim(curve):
+    if 'ifc4x2.ifcline' in typeof(curve):
+        return getattr(getattr(curve, 'Pnt', INDETERMINATE), 'Dim', INDETERMINATE)
+    if 'ifc4x2.ifcconic' in typeof(curve):
+        return getattr(getattr(curve, 'Position', INDETERMINATE), 'Dim', INDETERMINATE)
+    if 'ifc4x2.ifcpolyline' in typeof(curve):
+        return getattr(express_getitem(getattr(curve, 'Points', INDETERMINATE), 1 - EXPRESS_ONE_BASED_INDEXING, INDETERMINATE), 'Dim', INDETERMINATE)
+    if 'ifc4x2.ifctrimmedcurve' in typeof(curve):
+        return IfcCurveDim(getattr(curve, 'BasisCurve', INDETERMINATE))
+    if 'ifc4x2.ifccompositecurve' in typeof(curve):
+        return getattr(express_getitem(getattr(curve, 'Segments', INDETERMINATE), 1 - EXPRESS_ONE_BASED_INDEXING, INDETERMINATE), 'Dim', INDETERMINATE)
+    if 'ifc4x2.ifcbsplinecurve' in typeof(curve):
+        return getattr(express_getitem(getattr(curve, 'ControlPointsList', INDETERMINATE), 1 - EXPRESS_ONE_BASED_INDEXING, INDETERMINATE), 'Dim', INDETERMINATE)
+    if 'ifc4x2.ifcoffsetcurve2d' in typeof(curve):
+        return 2
+    if 'ifc4x2.ifcoffsetcurve3d' in typeof(curve):
+        return 3
+    if 'ifc4x2.ifcoffsetcurvebydistances' in typeof(curve):
+        return 3
+    if 'ifc4x2.ifccurvesegment2d' in typeof(curve):
+        return 2
+    if 'ifc4x2.ifcalignmentcurve' in typeof(curve):
+        return 3
+    if 'ifc4x2.ifcpcurve' in typeof(curve):
+        return 3
+    if 'ifc4x2.ifcindexedpolycurve' in typeof(curve):
+        return getattr(getattr(curve, 'Points', INDETERMINATE), 'Dim', INDETERMINATE)
+    return None
+def IfcDeriveDimensionalExponents(unitelements):
+    result = IfcDimensionalExponents(0, 0, 0, 0, 0, 0, 0)
+    for i in range(loindex(unitelements), hiindex(unitelements) + 1):
+        result.LengthExponent = getattr(result, 'LengthExponent', INDETERMINATE) + getattr(express_getitem(unitelements, i - EXPRESS_ONE_BASED_INDEXING, INDETERMINATE), 'Exponent', INDETERMINATE) * getattr(getattr(getattr(express_getitem(unitelements, i - EXPRESS_ONE_BASED_INDEXING, INDETERMINATE), 'Unit', INDETERMINATE), 'Dimensions', INDETERMINATE), 'LengthExponent', INDETERMINATE)
+        result.MassExponent = getattr(result, 'MassExponent', INDETERMINATE) + getattr(express_getitem(unitelements, i - EXPRESS_ONE_BASED_INDEXING, INDETERMINATE), 'Exponent', INDETERMINATE) * getattr(getattr(getattr(express_getitem(unitelements, i - EXPRESS_ONE_BASED_INDEXING, INDETERMINATE), 'Unit', INDETERMINATE), 'Dimensions', INDETERMINATE), 'MassExponent', INDETERMINATE)
+        result.TimeExponent = getattr(result, 'TimeExponent', INDETERMINATE) + getattr(express_getitem(unitelements, i - EXPRESS_ONE_BASED_INDEXING, INDETERMINATE), 'Exponent', INDETERMINATE) * getattr(getattr(getattr(express_getitem(unitelements, i - EXPRESS_ONE_BASED_INDEXING, INDETERMINATE), 'Unit', INDETERMINATE), 'Dimensions', INDETERMINATE), 'TimeExponent', INDETERMINATE)
+        result.ElectricCurrentExponent = getattr(result, 'ElectricCurrentExponent', INDETERMINATE) + getattr(express_getitem(unitelements, i - EXPRESS_ONE_BASED_INDEXING, INDETERMINATE), 'Exponent', INDETERMINATE) * getattr(getattr(getattr(express_getitem(unitelements, i - EXPRESS_ONE_BASED_INDEXING, INDETERMINATE), 'Unit', INDETERMINATE), 'Dimensions', INDETERMINATE), 'ElectricCurrentExponent', INDETERMINATE)
+        result.ThermodynamicTemperatureExponent = getattr(result, 'ThermodynamicTemperatureExponent', INDETERMINATE) + getattr(express_getitem(unitelements, i - EXPRESS_ONE_BASED_INDEXING, INDETERMINATE), 'Exponent', INDETERMINATE) * getattr(getattr(getattr(express_getitem(unitelements, i - EXPRESS_ONE_BASED_INDEXING, INDETERMINATE), 'Unit', INDETERMINATE), 'Dimensions', INDETERMINATE), 'ThermodynamicTemperatureExponent', INDETERMINATE)
+        result.AmountOfSubstanceExponent = getattr(result, 'AmountOfSubstanceExponent', INDETERMINATE) + getattr(express_getitem(unitelements, i - EXPRESS_ONE_BASED_INDEXING, INDETERMINATE), 'Exponent', INDETERMINATE) * getattr(getattr(getattr(express_getitem(unitelements, i - EXPRESS_ONE_BASED_INDEXING, INDETERMINATE), 'Unit', INDETERMINATE), 'Dimensions', INDETERMINATE), 'AmountOfSubstanceExponent', INDETERMINATE)
+        result.LuminousIntensityExponent = getattr(result, 'LuminousIntensityExponent', INDETERMINATE) + getattr(express_getitem(unitelements, i - EXPRESS_ONE_BASED_INDEXING, INDETERMINATE), 'Exponent', INDETERMINATE) * getattr(getattr(getattr(express_getitem(unitelements, i - EXPRESS_ONE_BASED_INDEXING, INDETERMINATE), 'Unit', INDETERMINATE), 'Dimensions', INDETERMINATE), 'LuminousIntensityExponent', INDETERMINATE)
+    return result
+def IfcDimensionsForSiUnit(n):
+    if n == metre:
+        return IfcDimensionalExponents(1, 0, 0, 0, 0, 0, 0)
+    elif n == square_metre:
+        return IfcDimensionalExponents(2, 0, 0, 0, 0, 0, 0)
+    elif n == cubic_metre:
+        return IfcDimensionalExponents(3, 0, 0, 0, 0, 0, 0)
+    elif n == gram:
+        return IfcDimensionalExponents(0, 1, 0, 0, 0, 0, 0)
+    elif n == second:
+        return IfcDimensionalExponents(0, 0, 1, 0, 0, 0, 0)
+    elif n == ampere:
+        return IfcDimensionalExponents(0, 0, 0, 1, 0, 0, 0)
+    elif n == kelvin:
+        return IfcDimensionalExponents(0, 0, 0, 0, 1, 0, 0)
+    elif n == mole:
+        return IfcDimensionalExponents(0, 0, 0, 0, 0, 1, 0)
+    elif n == candela:
+        return IfcDimensionalExponents(0, 0, 0, 0, 0, 0, 1)
+    elif n == radian:
+        return IfcDimensionalExponents(0, 0, 0, 0, 0, 0, 0)
+    elif n == steradian:
+        return IfcDimensionalExponents(0, 0, 0, 0, 0, 0, 0)
+    elif n == hertz:
+        return IfcDimensionalExponents(0, 0, -1, 0, 0, 0, 0)
+    elif n == newton:
+        return IfcDimensionalExponents(1, 1, -2, 0, 0, 0, 0)
+    elif n == pascal:
+        return IfcDimensionalExponents(-1, 1, -2, 0, 0, 0, 0)
+    elif n == joule:
+        return IfcDimensionalExponents(2, 1, -2, 0, 0, 0, 0)
+    elif n == watt:
+        return IfcDimensionalExponents(2, 1, -3, 0, 0, 0, 0)
+    elif n == coulomb:
+        return IfcDimensionalExponents(0, 0, 1, 1, 0, 0, 0)
+    elif n == volt:
+        return IfcDimensionalExponents(2, 1, -3, -1, 0, 0, 0)
+    elif n == farad:
+        return IfcDimensionalExponents(-2, -1, 4, 2, 0, 0, 0)
+    elif n == ohm:
+        return IfcDimensionalExponents(2, 1, -3, -2, 0, 0, 0)
+    elif n == siemens:
+        return IfcDimensionalExponents(-2, -1, 3, 2, 0, 0, 0)
+    elif n == weber:
+        return IfcDimensionalExponents(2, 1, -2, -1, 0, 0, 0)
+    elif n == tesla:
+        return IfcDimensionalExponents(0, 1, -2, -1, 0, 0, 0)
+    elif n == henry:
+        return IfcDimensionalExponents(2, 1, -2, -2, 0, 0, 0)
+    elif n == degree_celsius:
+        return IfcDimensionalExponents(0, 0, 0, 0, 1, 0, 0)
+    elif n == lumen:
+        return IfcDimensionalExponents(0, 0, 0, 0, 0, 0, 1)
+    elif n == lux:
+        return IfcDimensionalExponents(-2, 0, 0, 0, 0, 0, 1)
+    elif n == becquerel:
+        return IfcDimensionalExponents(0, 0, -1, 0, 0, 0, 0)
+    elif n == gray:
+        return IfcDimensionalExponents(2, 0, -2, 0, 0, 0, 0)
+    elif n == sievert:
+        return IfcDimensionalExponents(2, 0, -2, 0, 0, 0, 0)
+    else:
+        return IfcDimensionalExponents(0, 0, 0, 0, 0, 0, 0)
+def IfcDotProduct(arg1, arg2):
+    if not exists(arg1) or not exists(arg2):
+        scalar = None
+    elif getattr(arg1, 'Dim', INDETERMINATE) != getattr(arg2, 'Dim', INDETERMINATE):
+        scalar = None
+    else:
+        vec1 = IfcNormalise(arg1)
+        vec2 = IfcNormalise(arg2)
+        ndim = getattr(arg1, 'Dim', INDETERMINATE)
+        scalar = 0.0
+        for i in range(1, ndim + 1):
+            scalar = scalar + express_getitem(getattr(vec1, 'DirectionRatios', INDETERMINATE), i - EXPRESS_ONE_BASED_INDEXING, INDETERMINATE) * express_getitem(getattr(vec2, 'DirectionRatios', INDETERMINATE), i - EXPRESS_ONE_BASED_INDEXING, INDETERMINATE)
+    return scalar
+def IfcFirstProjAxis(zaxis, arg):
+    if not exists(zaxis):
+        return None
+    else:
+        z = IfcNormalise(zaxis)
+        if not exists(arg):
+            if getattr(z, 'DirectionRatios', INDETERMINATE) != [1.0, 0.0, 0.0]:
+                v = IfcDirection(DirectionRatios=[1.0, 0.0, 0.0])
+            else:
+                v = IfcDirection(DirectionRatios=[0.0, 1.0, 0.0])
+        else:
+            if getattr(arg, 'Dim', INDETERMINATE) != 3:
+                return None
+            if getattr(IfcCrossProduct(arg, z), 'Magnitude', INDETERMINATE) == 0.0:
+                return None
+            else:
+                v = IfcNormalise(arg)
+        xvec = IfcScalarTimesVector(IfcDotProduct(v, z), z)
+        xaxis = getattr(IfcVectorDifference(v, xvec), 'Orientation', INDETERMINATE)
+        xaxis = IfcNormalise(xaxis)
+    return xaxis
+def IfcGetBasisSurface(c):
+    surfs = []
+    if 'ifc4x2.ifcpcurve' in typeof(c):
+        surfs = [getattr(c, 'BasisSurface', INDETERMINATE)]
+    elif 'ifc4x2.ifcsurfacecurve' in typeof(c):
+        n = sizeof(getattr(c, 'AssociatedGeometry', INDETERMINATE))
+        for i in range(1, n + 1):
+            surfs = surfs + IfcAssociatedSurface(express_getitem(getattr(c, 'AssociatedGeometry', INDETERMINATE), i - EXPRESS_ONE_BASED_INDEXING, INDETERMINATE))
+    if 'ifc4x2.ifccompositecurveonsurface' in typeof(c):
+        n = sizeof(getattr(c, 'Segments', INDETERMINATE))
+        surfs = IfcGetBasisSurface(getattr(express_getitem(getattr(c, 'Segments', INDETERMINATE), 1 - EXPRESS_ONE_BASED_INDEXING, INDETERMINATE), 'ParentCurve', INDETERMINATE))
+        if n > 1:
+            for i in range(2, n + 1):
+                surfs = surfs * IfcGetBasisSurface(getattr(express_getitem(getattr(c, 'Segments', INDETERMINATE), 1 - EXPRESS_ONE_BASED_INDEXING, INDETERMINATE), 'ParentCurve', INDETERMINATE))
+    return surfs
+def IfcListToArray(lis, low, u):
+    n = sizeof(lis)
+    if n != u - low + 1:
+        return None
+    else:
+        res = [express_getitem(lis, 1 - EXPRESS_ONE_BASED_INDEXING, INDETERMINATE)] * n
+        for i in range(2, n + 1):
+            temp = list(res)
+            temp[low + i - 1 - EXPRESS_ONE_BASED_INDEXING] = express_getitem(lis, i - EXPRESS_ONE_BASED_INDEXING, INDETERMINATE)
+            res = temp
+        return res
+def IfcMakeArrayOfArray(lis, low1, u1, low2, u2):
+    if u1 - low1 + 1 != sizeof(lis):
+        return None
+    if u2 - low2 + 1 != sizeof(express_getitem(lis, 1 - EXPRESS_ONE_BASED_INDEXING, INDETERMINATE)):
+        return None
+    res = [IfcListToArray(express_getitem(lis, 1 - EXPRESS_ONE_BASED_INDEXING, INDETERMINATE), low2, u2)] * u1 - low1 + 1
+    for i in range(2, hiindex(lis) + 1):
+        if u2 - low2 + 1 != sizeof(express_getitem(lis, i - EXPRESS_ONE_BASED_INDEXING, INDETERMINATE)):
+            return None
+        temp = list(res)
+        temp[low1 + i - 1 - EXPRESS_ONE_BASED_INDEXING] = IfcListToArray(express_getitem(lis, i - EXPRESS_ONE_BASED_INDEXING, INDETERMINATE), low2, u2)
+        res = temp
+    return res
+def IfcMlsTotalThickness(layerset):
+    max = getattr(express_getitem(getattr(layerset, 'MaterialLayers', INDETERMINATE), 1 - EXPRESS_ONE_BASED_INDEXING, INDETERMINATE), 'LayerThickness', INDETERMINATE)
+    if sizeof(getattr(layerset, 'MaterialLayers', INDETERMINATE)) > 1:
+        for i in range(2, hiindex(getattr(layerset, 'MaterialLayers', INDETERMINATE)) + 1):
+            max = max + getattr(express_getitem(getattr(layerset, 'MaterialLayers', INDETERMINATE), i - EXPRESS_ONE_BASED_INDEXING, INDETERMINATE), 'LayerThickness', INDETERMINATE)
+    return max
+def IfcNormalise(arg):
+    v = IfcDirection(DirectionRatios=[1.0, 0.0])
+    vec = IfcVector(Orientation=IfcDirection(DirectionRatios=[1.0, 0.0]), Magnitude=1.0)
+    result = v
+    if not exists(arg):
+        return None
+    else:
+        if 'ifc4x2.ifcvector' in typeof(arg):
+            ndim = getattr(arg, 'Dim', INDETERMINATE)
+            v.DirectionRatios = getattr(getattr(arg, 'Orientation', INDETERMINATE), 'DirectionRatios', INDETERMINATE)
+            vec.Magnitude = getattr(arg, 'Magnitude', INDETERMINATE)
+            vec.Orientation = v
+            if getattr(arg, 'Magnitude', INDETERMINATE) == 0.0:
+                return None
+            else:
+                vec.Magnitude = 1.0
+        else:
+            ndim = getattr(arg, 'Dim', INDETERMINATE)
+            v.DirectionRatios = getattr(arg, 'DirectionRatios', INDETERMINATE)
+        mag = 0.0
+        for i in range(1, ndim + 1):
+            mag = mag + express_getitem(getattr(v, 'DirectionRatios', INDETERMINATE), i - EXPRESS_ONE_BASED_INDEXING, INDETERMINATE) * express_getitem(getattr(v, 'DirectionRatios', INDETERMINATE), i - EXPRESS_ONE_BASED_INDEXING, INDETERMINATE)
+        if mag > 0.0:
+            mag = sqrt(mag)
+            for i in range(1, ndim + 1):
+                temp = list(getattr(v, 'DirectionRatios', INDETERMINATE))
+                temp[i - EXPRESS_ONE_BASED_INDEXING] = express_getitem(getattr(v, 'DirectionRatios', INDETERMINATE), i - EXPRESS_ONE_BASED_INDEXING, INDETERMINATE) / mag
+                v.DirectionRatios = temp
+            if 'ifc4x2.ifcvector' in typeof(arg):
+                vec.Orientation = v
+                result = vec
+            else:
+                result = v
+        else:
+            return None
+    return result
+def IfcOrthogonalComplement(vec):
+    if not exists(vec) or getattr(vec, 'Dim', INDETERMINATE) != 2:
+        return None
+    else:
+        result = IfcDirection(DirectionRatios=[-express_getitem(getattr(vec, 'DirectionRatios', INDETERMINATE), 2 - EXPRESS_ONE_BASED_INDEXING, INDETERMINATE), express_getitem(getattr(vec, 'DirectionRatios', INDETERMINATE), 1 - EXPRESS_ONE_BASED_INDEXING, INDETERMINATE)])
+        return result
+def IfcPointListDim(pointlist):
+    if 'ifc4x2.ifccartesianpointlist2d' in typeof(pointlist):
+        return 2
+    if 'ifc4x2.ifccartesianpointlist3d' in typeof(pointlist):
+        return 3
+    return None
+def IfcScalarTimesVector(scalar, vec):
+    if not exists(scalar) or not exists(vec):
+        return None
+    else:
+        if 'ifc4x2.ifcvector' in typeof(vec):
+            v = getattr(vec, 'Orientation', INDETERMINATE)
+            mag = scalar * getattr(vec, 'Magnitude', INDETERMINATE)
+        else:
+            v = vec
+            mag = scalar
+        if mag < 0.0:
+            for i in range(1, sizeof(getattr(v, 'DirectionRatios', INDETERMINATE)) + 1):
+                temp = list(getattr(v, 'DirectionRatios', INDETERMINATE))
+                temp[i - EXPRESS_ONE_BASED_INDEXING] = -express_getitem(getattr(v, 'DirectionRatios', INDETERMINATE), i - EXPRESS_ONE_BASED_INDEXING, INDETERMINATE)
+                v.DirectionRatios = temp
+            mag = -mag
+        result = IfcVector(Orientation=IfcNormalise(v), Magnitude=mag)
+    return result
+def IfcSecondProjAxis(zaxis, xaxis, arg):
+    if not exists(arg):
+        v = IfcDirection(DirectionRatios=[0.0, 1.0, 0.0])
+    else:
+        v = arg
+    temp = IfcScalarTimesVector(IfcDotProduct(v, zaxis), zaxis)
+    yaxis = IfcVectorDifference(v, temp)
+    temp = IfcScalarTimesVector(IfcDotProduct(v, xaxis), xaxis)
+    yaxis = IfcVectorDifference(yaxis, temp)
+    yaxis = IfcNormalise(yaxis)
+    return getattr(yaxis, 'Orientation', INDETERMINATE)
+def IfcVectorDifference(arg1, arg2):
+    if (not exists(arg1) or not exists(arg2)) or getattr(arg1, 'Dim', INDETERMINATE) != getattr(arg2, 'Dim', INDETERMINATE):
+        return None
+    else:
+        if 'ifc4x2.ifcvector' in typeof(arg1):
+            mag1 = getattr(arg1, 'Magnitude', INDETERMINATE)
+            vec1 = getattr(arg1, 'Orientation', INDETERMINATE)
+        else:
+            mag1 = 1.0
+            vec1 = arg1
+        if 'ifc4x2.ifcvector' in typeof(arg2):
+            mag2 = getattr(arg2, 'Magnitude', INDETERMINATE)
+            vec2 = getattr(arg2, 'Orientation', INDETERMINATE)
+        else:
+            mag2 = 1.0
+            vec2 = arg2
+        vec1 = IfcNormalise(vec1)
+        vec2 = IfcNormalise(vec2)
+        ndim = sizeof(getattr(vec1, 'DirectionRatios', INDETERMINATE))
+        mag = 0.0
+        res = IfcDirection(DirectionRatios=[0.0] * ndim)
+        for i in range(1, ndim + 1):
+            temp = list(getattr(res, 'DirectionRatios', INDETERMINATE))
+            temp[i - EXPRESS_ONE_BASED_INDEXING] = mag1 * express_getitem(getattr(vec1, 'DirectionRatios', INDETERMINATE), i - EXPRESS_ONE_BASED_INDEXING, INDETERMINATE) - mag2 * express_getitem(getattr(vec2, 'DirectionRatios', INDETERMINATE), i - EXPRESS_ONE_BASED_INDEXING, INDETERMINATE)
+            res.DirectionRatios = temp
+            mag = mag + express_getitem(getattr(res, 'DirectionRatios', INDETERMINATE), i - EXPRESS_ONE_BASED_INDEXING, INDETERMINATE) * express_getitem(getattr(res, 'DirectionRatios', INDETERMINATE), i - EXPRESS_ONE_BASED_INDEXING, INDETERMINATE)
+        if mag > 0.0:
+            result = IfcVector(Orientation=res, Magnitude=sqrt(mag))
+        else:
+            result = IfcVector(Orientation=vec1, Magnitude=0.0)
+    return result
@@ -43,60 +43,180 @@ def get_total_quantity(root_element):
 
 
 def calculate_applied_value(root_element, cost_value, category_filter=None):
-    if cost_value.ArithmeticOperator and cost_value.Components:
-        component_values = []
-        for component in cost_value.Components:
-            component_values.append(calculate_applied_value(root_element, component, category_filter))
-        if cost_value.ArithmeticOperator == "ADD":
-            return sum(component_values)
-        result = component_values.pop(0)
-        if cost_value.ArithmeticOperator == "DIVIDE":
-            for value in component_values:
-                try:
-                    result /= value
-                except ZeroDivisionError:
-                    pass
-        elif cost_value.ArithmeticOperator == "MULTIPLY":
-            for value in component_values:
-                result *= value
-        elif cost_value.ArithmeticOperator == "SUBTRACT":
-            for value in component_values:
-                result -= value
+    return CostEvaluator().get_applied_value(root_element, cost_value)
+
+
+def sum_child_root_elements(root_element, category_filter=None):
+    return CostEvaluator().get_child_sum(root_element, category_filter)
+
+
+def get_cost_values(root_element):
+    if root_element.is_a("IfcCostItem"):
+        return root_element.CostValues or []
+    elif root_element.is_a("IfcConstructionResource"):
+        return root_element.BaseCosts or []
+    return []
+
+
+def get_parent(root_element):
+    for rel in getattr(root_element, "Nests", None) or []:
+        return rel.RelatingObject
+
+
+class CostEvaluator:
+    """Calculates the values of cost items and construction resources
+
+    Every applied value and every sum of nested cost items is memoised, so
+    evaluating all rows of a cost schedule visits each cost value once instead
+    of recalculating the nested items for every parent. When a cost value,
+    cost quantity, or the nesting of an item changes, call invalidate() with
+    the changed element so that it and its parents are recalculated on
+    demand. The other memoised values are kept.
+
+    Example:
+
+    .. code:: python
+
+        evaluator = ifcopenshell.util.cost.CostEvaluator()
+        for row in evaluator.get_table(cost_schedule):
+            print(row["Name"], row["TotalCost"])
+
+        ifcopenshell.api.run("cost.edit_cost_value", model, cost_value=value, attributes={"AppliedValue": 5.0})
+        evaluator.invalidate(value)
+        evaluator.get_total_cost(cost_item)
+    """
+
+    def __init__(self):
+        self.applied_values = {}  # root element id -> {cost value id: value}
+        self.child_sums = {}  # root element id -> {category: value}
+        self.owners = {}  # cost value or quantity id -> root element
+
+    def get_applied_value(self, root_element, cost_value):
+        applied_values = self.applied_values.setdefault(root_element.id(), {})
+        result = applied_values.get(cost_value.id())
+        if result is None:
+            result = applied_values[cost_value.id()] = self.calculate_applied_value(root_element, cost_value)
         return result
-    if cost_value.Category is None:
-        return get_primitive_applied_value(cost_value.AppliedValue)
-    elif cost_value.Category == "*":
-        if root_element.IsNestedBy:
-            return sum_child_root_elements(root_element)
-        else:
+
+    def calculate_applied_value(self, root_element, cost_value):
+        self.owners[cost_value.id()] = root_element
+        if cost_value.ArithmeticOperator and cost_value.Components:
+            component_values = [self.get_applied_value(root_element, c) for c in cost_value.Components]
+            if cost_value.ArithmeticOperator == "ADD":
+                return sum(component_values)
+            result = component_values.pop(0)
+            if cost_value.ArithmeticOperator == "DIVIDE":
+                for value in component_values:
+                    try:
+                        result /= value
+                    except ZeroDivisionError:
+                        pass
+            elif cost_value.ArithmeticOperator == "MULTIPLY":
+                for value in component_values:
+                    result *= value
+            elif cost_value.ArithmeticOperator == "SUBTRACT":
+                for value in component_values:
+                    result -= value
+            return result
+        if cost_value.Category is None:
             return get_primitive_applied_value(cost_value.AppliedValue)
-    elif cost_value.Category:
-        if root_element.IsNestedBy:
-            return sum_child_root_elements(root_element, category_filter=cost_value.Category)
-        else:
+        elif cost_value.Category == "*":
+            if root_element.IsNestedBy:
+                return self.get_child_sum(root_element)
+            return get_primitive_applied_value(cost_value.AppliedValue)
+        elif cost_value.Category:
+            if root_element.IsNestedBy:
+                return self.get_child_sum(root_element, category_filter=cost_value.Category)
             return get_primitive_applied_value(cost_value.AppliedValue)
-    return 0
+        return 0
+
+    def get_child_sum(self, root_element, category_filter=None):
+        child_sums = self.child_sums.setdefault(root_element.id(), {})
+        result = child_sums.get(category_filter)
+        if result is None:
+            result = child_sums[category_filter] = sum(
+                self.get_total_cost(child_root_element, category_filter)
+                for rel in root_element.IsNestedBy
+                for child_root_element in rel.RelatedObjects
+            )
+        return result
 
+    def get_total_cost(self, root_element, category_filter=None):
+        """Returns the applied values of an element multiplied by its quantity
+
+        This is the amount that the element contributes to the sum of its
+        parent, optionally only counting cost values of a category.
+        """
+        quantity = get_total_quantity(root_element) or 1.0
+        if root_element.is_a("IfcCostItem"):
+            for cost_quantity in root_element.CostQuantities or []:
+                self.owners[cost_quantity.id()] = root_element
+        result = 0
+        for cost_value in get_cost_values(root_element):
+            if category_filter and cost_value.Category != category_filter:
+                continue
+            applied_value = self.get_applied_value(root_element, cost_value)
+            if cost_value.UnitBasis:
+                result += quantity / cost_value.UnitBasis.ValueComponent.wrappedValue * applied_value
+            else:
+                result += quantity * applied_value
+        return result
 
-def sum_child_root_elements(root_element, category_filter=None):
-    result = 0
-    for rel in root_element.IsNestedBy:
-        for child_root_element in rel.RelatedObjects:
-            if root_element.is_a("IfcCostItem"):
-                values = child_root_element.CostValues
-            elif root_element.is_a("IfcConstructionResource"):
-                values = child_root_element.BaseCosts
-            for child_cost_value in values or []:
-                if category_filter and child_cost_value.Category != category_filter:
-                    continue
-                child_applied_value = calculate_applied_value(child_root_element, child_cost_value)
-                child_quantity = get_total_quantity(child_root_element) or 1.0
-                if child_cost_value.UnitBasis:
-                    value_component = child_cost_value.UnitBasis.ValueComponent.wrappedValue
-                    result += child_quantity / value_component * child_applied_value
-                else:
-                    result += child_quantity * child_applied_value
-    return result
+    def evaluate(self, cost_schedule) -> None:
+        """Calculates all values of a cost schedule bottom-up
+
+        Nested cost items are evaluated before their parents, so every value
+        is calculated exactly once and without deep recursion.
+        """
+        for cost_item in reversed(list(get_schedule_cost_items(cost_schedule))):
+            for cost_value in get_cost_values(cost_item):
+                self.get_applied_value(cost_item, cost_value)
+
+    def invalidate(self, element=None) -> None:
+        """Forgets the memoised values affected by a changed element
+
+        :param element: A changed IfcCostItem, IfcConstructionResource,
+            IfcCostValue, or cost quantity. If the element has not been
+            evaluated before, or is not provided, all values are forgotten.
+        """
+        if element is None:
+            root_element = None
+        elif element.is_a("IfcCostItem") or element.is_a("IfcConstructionResource"):
+            root_element = element
+        else:
+            root_element = self.owners.get(element.id())
+        if root_element is None:
+            self.applied_values.clear()
+            self.child_sums.clear()
+            return
+        while root_element:
+            self.applied_values.pop(root_element.id(), None)
+            self.child_sums.pop(root_element.id(), None)
+            root_element = get_parent(root_element)
+
+    def get_table(self, cost_schedule) -> list[dict]:
+        """Returns the values of every cost item in a cost schedule
+
+        :return: A row per cost item, in the order of the schedule, with the
+            item's id, parent id, Identification, Name, TotalCostQuantity,
+            TotalAppliedValue (the sum of its cost values), and TotalCost.
+        """
+        self.evaluate(cost_schedule)
+        rows = []
+        for cost_item in get_schedule_cost_items(cost_schedule):
+            parent = get_parent(cost_item)
+            rows.append(
+                {
+                    "id": cost_item.id(),
+                    "parent": parent.id() if parent else None,
+                    "Identification": cost_item.Identification,
+                    "Name": cost_item.Name,
+                    "TotalCostQuantity": get_total_quantity(cost_item),
+                    "TotalAppliedValue": sum(self.get_applied_value(cost_item, v) for v in cost_item.CostValues or []),
+                    "TotalCost": self.get_total_cost(cost_item),
+                }
+            )
+        return rows
 
 
 def serialise_cost_value(cost_value):
@@ -30,15 +30,17 @@ Available flags:
 - ``--rules``: Also check express rules.
 - ``--json``: Produce JSON output.
 - ``--fields``: Output more detailed information about failed entities (available only with ``--json``).
+- ``--jobs=N``: Validate instances in N worker processes.
 """
 
 import os
 import sys
 import json
 import functools
+import multiprocessing
 
 from collections import namedtuple
-from typing import Union, Iterator, Any, Optional
+from typing import Union, Iterator, Any, Optional, Callable
 from logging import Logger
 
 import ifcopenshell
@@ -256,13 +258,95 @@ def assert_valid(
         return True
 
 
-def log_internal_cpp_errors(filename: str, logger: Logger) -> None:
+def compile_validator(attr_type: attribute_types, schema: schema_definition) -> Callable[[Any], bool]:
+    """Compiles an attribute type into a predicate, equivalent to assert_valid() with no_throw
+
+    The schema type tree is interpreted once, so that validating a value is
+    only a few Python operations. The predicate may raise on values which are
+    not even of the right shape (e.g. calling len() on a number), in which case
+    callers should fall back to assert_valid() to obtain the actual error.
+    """
+    while isinstance(attr_type, named_type):
+        attr_type = attr_type.declared_type()
+
+    if isinstance(attr_type, type_declaration):
+        # Entity instance values are checked against the type declaration
+        # itself, other values against the flattened underlying type.
+        name = attr_type.name()
+        underlying_type = attr_type
+        while isinstance(underlying_type, (named_type, type_declaration)):
+            underlying_type = underlying_type.declared_type()
+        validate_underlying = compile_validator(underlying_type, schema)
+        entity_instance = ifcopenshell.entity_instance
+
+        def validate_type_declaration(val):
+            if isinstance(val, entity_instance):
+                return val.is_a(name)
+            return validate_underlying(val)
+
+        return validate_type_declaration
+    elif isinstance(attr_type, simple_type):
+        simple_type_python = simple_type_python_mapping[attr_type.declared_type()]
+        if type(simple_type_python) == set:
+            return simple_type_python.__contains__
+        return lambda val: type(val) is simple_type_python
+    elif isinstance(attr_type, entity_type):
+        name = attr_type.name()
+        entity_instance = ifcopenshell.entity_instance
+        return lambda val: isinstance(val, entity_instance) and val.is_a(name)
+    elif isinstance(attr_type, select_type):
+        members = frozenset(get_select_members(schema, attr_type))
+        wrapped_validators: dict[str, Optional[Callable[[Any], bool]]] = {}
+        entity_instance = ifcopenshell.entity_instance
+
+        def validate_select(val):
+            if not isinstance(val, entity_instance):
+                return False
+            value_type = val.is_a()
+            if value_type not in members:
+                return False
+            # Members which are not entities wrap a value that must also be valid
+            validate_wrapped = wrapped_validators.get(value_type, False)
+            if validate_wrapped is False:
+                declaration = schema.declaration_by_name(value_type)
+                if isinstance(declaration, entity_type):
+                    validate_wrapped = None
+                else:
+                    validate_wrapped = compile_validator(declaration, schema)
+                wrapped_validators[value_type] = validate_wrapped
+            return validate_wrapped is None or validate_wrapped(val.wrappedValue)
+
+        return validate_select
+    elif isinstance(attr_type, enumeration_type):
+        items = frozenset(attr_type.enumeration_items())
+        return items.__contains__
+    elif isinstance(attr_type, aggregation_type):
+        b1, b2 = attr_type.bound1(), attr_type.bound2()
+        validate_element = compile_validator(attr_type.type_of_element(), schema)
+
+        def validate_aggregation(val):
+            n = len(val)
+            if n < b1 or (b2 != -1 and n > b2):
+                return False
+            for v in val:
+                if not validate_element(v):
+                    return False
+            return True
+
+        return validate_aggregation
+
+    # Let assert_valid() report the unsupported type when there is a value
+    return lambda val: False
+
+
+def log_internal_cpp_errors(filename: str, logger: Logger, log: Optional[str] = None) -> None:
     import re
     import bisect
 
     chr_offset_re = re.compile(r"at offset (\d+)\s*")
 
-    log = ifcopenshell.get_log()
+    if log is None:
+        log = ifcopenshell.get_log()
     msgs = list(map(json.loads, filter(None, log.split("\n"))))
     chr_offsets = [chr_offset_re.findall(m["message"]) for m in msgs]
     if chr_offsets:
@@ -305,7 +389,280 @@ def get_entity_attributes(schema: schema_definition, entity: str) -> tuple[entit
     return entity_attrs
 
 
-def validate(f: Union[ifcopenshell.file, str], logger: Logger, express_rules=False) -> None:
+# Per entity: the attributes, whether they are derived, a compiled validator per
+# attribute and the inverse attributes as (attribute, name, bound1, bound2).
+entity_validator = namedtuple("entity_validator", ("entity", "attributes", "derived", "validators", "inverses"))
+entity_validator_map: dict[tuple[str, str], entity_validator] = {}
+
+
+def get_entity_validator(schema: schema_definition, entity: str) -> entity_validator:
+    cache_key = schema.name(), entity
+    from_cache = entity_validator_map.get(cache_key)
+    if from_cache:
+        return from_cache
+
+    ent, attrs = get_entity_attributes(schema, entity)
+    v = entity_validator_map[cache_key] = entity_validator(
+        ent,
+        attrs,
+        tuple(ent.derived()),
+        tuple(compile_validator(attr.type_of_attribute(), schema) for attr in attrs),
+        tuple((attr, attr.name(), attr.bound1(), attr.bound2()) for attr in ent.all_inverse_attributes()),
+    )
+    return v
+
+
+def validate_instance(inst: ifcopenshell.entity_instance, schema: schema_definition, logger: Logger) -> None:
+    """Validates the attribute values and inverse attribute cardinalities of a single instance
+
+    Uniqueness of GlobalIds is checked separately by validate(), as it
+    depends on the other instances in the file.
+    """
+    entity, attrs, derived, validators, inverses = get_entity_validator(schema, inst.is_a())
+
+    if entity.is_abstract():
+        e = "Entity %s is abstract" % entity.name()
+        if hasattr(logger, "set_state"):
+            logger.set_state("attribute", None)
+            logger.error(e)
+        else:
+            logger.error("For instance:\n    %s\n%s", inst, e)
+
+    has_invalid_value = False
+    values = [None] * len(attrs)
+    for i in range(len(attrs)):
+        try:
+            values[i] = inst[i]
+            pass
+        except:
+            if hasattr(logger, "set_state"):
+                logger.set_state("attribute", f"{entity.name()}.{attrs[i].name()}")
+                logger.error("Invalid attribute value")
+            else:
+                logger.error(
+                    "For instance:\n    %s\n    %s\nInvalid attribute value for %s.%s",
+                    inst,
+                    annotate_inst_attr_pos(inst, i),
+                    entity,
+                    attrs[i],
+                )
+            has_invalid_value = True
+
+    if not has_invalid_value:
+        for i, (attr, val, is_derived) in enumerate(zip(attrs, values, derived)):
+            if is_derived and not isinstance(val, ifcopenshell.ifcopenshell_wrapper.attribute_value_derived):
+                if hasattr(logger, "set_state"):
+                    logger.set_state("attribute", f"{entity.name()}.{attr.name()}")
+                    logger.error("Attribute is derived in subtype")
+                else:
+                    logger.error(
+                        "For instance:\n    %s\n    %s\nWith attribute:\n    %s\nDerived in subtype\n",
+                        inst,
+                        annotate_inst_attr_pos(inst, i),
+                        attr,
+                    )
+
+            if val is None and not attr.optional() and not is_derived:
+                if hasattr(logger, "set_state"):
+                    logger.set_state("attribute", f"{entity.name()}.{attr.name()}")
+                    logger.error("Attribute not optional")
+                else:
+                    logger.error(
+                        "For instance:\n    %s\n    %s\nWith attribute:\n    %s\nNot optional\n",
+                        inst,
+                        annotate_inst_attr_pos(inst, i),
+                        attr,
+                    )
+
+            if val is not None and not is_derived:
+                try:
+                    if validators[i](val):
+                        continue
+                except Exception:
+                    pass
+                # Interpret the schema again to report why the value is invalid
+                attr_type = attr.type_of_attribute()
+                try:
+                    assert_valid(attr_type, val, schema, attr=attr)
+                except ValidationError as e:
+                    if hasattr(logger, "set_state"):
+                        logger.set_state("attribute", e.attribute)
+                        logger.error(str(e))
+                    else:
+                        logger.error(
+                            "For instance:\n    %s\n    %s\n%s",
+                            inst,
+                            annotate_inst_attr_pos(inst, i),
+                            e,
+                        )
+
+    for attr, name, b1, b2 in inverses:
+        try:
+            val = getattr(inst, name)
+        except Exception as e:
+            if hasattr(logger, "set_state"):
+                logger.set_state("attribute", f"{entity.name()}.{attr.name()}")
+                logger.error(str(e))
+            else:
+                logger.error("For instance:\n    %s\n%s", inst, e)
+            continue
+        if (b1, b2) == (-1, -1):
+            if len(val) == 1:
+                continue
+        elif len(val) >= b1 and (b2 == -1 or len(val) <= b2):
+            continue
+        try:
+            assert_valid_inverse(attr, val, schema)
+        except ValidationError as e:
+            if hasattr(logger, "set_state"):
+                logger.set_state("attribute", f"{entity.name()}.{attr.name()}")
+                logger.error(str(e))
+            else:
+                logger.error("For instance:\n    %s\n%s", inst, e)
+
+
+def log_duplicate_guid(
+    inst: ifcopenshell.entity_instance, previous_element: ifcopenshell.entity_instance, logger: Logger
+) -> None:
+    rule = "Rule IfcRoot.UR1:\n    The attribute GlobalId should be unique"
+    logger.error(
+        "On instance:\n    %s\n   %s\n%s\nViolated by:\n    %s\n    %s",
+        inst,
+        annotate_inst_attr_pos(inst, 0),
+        rule,
+        previous_element,
+        annotate_inst_attr_pos(previous_element, 0),
+    )
+
+
+instance_reference = namedtuple("instance_reference", ("id",))
+_validation_context = None
+
+
+class recording_logger:
+    """Records log statements in a worker process, to be replayed on the actual logger
+
+    Entity instances are recorded by id and other objects by their string
+    representation, so that the statements can be sent back to the parent.
+    """
+
+    def __init__(self):
+        self.statements = []
+
+    @staticmethod
+    def to_picklable(value: Any) -> Any:
+        if isinstance(value, ifcopenshell.entity_instance):
+            return instance_reference(value.id())
+        elif value is None or isinstance(value, (str, int, float)):
+            return value
+        return str(value)
+
+    def log(self, level, message, *args):
+        self.statements.append(("log", level, message, tuple(map(self.to_picklable, args))))
+
+    def debug(self, message, *args):
+        self.log("debug", message, *args)
+
+    def info(self, message, *args):
+        self.log("info", message, *args)
+
+    def warning(self, message, *args):
+        self.log("warning", message, *args)
+
+    def error(self, message, *args):
+        self.log("error", message, *args)
+
+
+class recording_state_logger(recording_logger):
+    def set_state(self, key, value):
+        self.statements.append(("set_state", key, self.to_picklable(value)))
+
+
+def replay_statements(f: ifcopenshell.file, statements: list[tuple], logger: Logger) -> None:
+    def from_picklable(value):
+        if isinstance(value, instance_reference):
+            return f.by_id(value.id)
+        return value
+
+    for statement in statements:
+        if statement[0] == "set_state":
+            logger.set_state(statement[1], from_picklable(statement[2]))
+        else:
+            getattr(logger, statement[1])(statement[2], *map(from_picklable, statement[3]))
+
+
+def validate_in_parallel(f: ifcopenshell.file, filename: Optional[str], logger: Logger, jobs: int) -> str:
+    """Validates instances in worker processes, see validate()
+
+    :return: The internal C++ log output of the workers
+    """
+    global _validation_context
+    has_state = hasattr(logger, "set_state")
+    ids = list(f.wrapped_data.entity_names())
+    chunk_size = max(1, -(-len(ids) // (jobs * 4)))
+    chunks = [(ids[i : i + chunk_size], has_state) for i in range(0, len(ids), chunk_size)]
+
+    if "fork" in multiprocessing.get_all_start_methods():
+        # Forked workers inherit the already loaded file
+        _validation_context = f
+        pool = multiprocessing.get_context("fork").Pool(jobs, _init_validation_worker, (None,))
+    elif filename:
+        pool = multiprocessing.get_context("spawn").Pool(jobs, _init_validation_worker, (filename,))
+    else:
+        raise ValueError("Validating with multiple jobs on this platform requires the filepath of the model")
+
+    guids = []
+    logs = []
+    try:
+        with pool:
+            # Chunks are processed in order, so statements are replayed as in a serial run
+            for statements, chunk_guids, log in pool.imap(_validate_chunk, chunks):
+                replay_statements(f, statements, logger)
+                guids.extend(chunk_guids)
+                logs.append(log)
+    finally:
+        _validation_context = None
+
+    used_guids: dict[str, int] = {}
+    for inst_id, guid in guids:
+        if guid is not None and guid in used_guids:
+            inst = f.by_id(inst_id)
+            if has_state:
+                logger.set_state("instance", inst)
+                logger.set_state("attribute", None)
+            log_duplicate_guid(inst, f.by_id(used_guids[guid]), logger)
+        else:
+            used_guids[guid] = inst_id
+    return "\n".join(logs)
+
+
+def _init_validation_worker(filepath: Optional[str]) -> None:
+    global _validation_context
+    ifcopenshell.ifcopenshell_wrapper.set_feature("use_attribute_value_derived", True)
+    if filepath:
+        ifcopenshell.ifcopenshell_wrapper.set_log_format_json()
+        _validation_context = ifcopenshell.open(filepath)
+    # Parse errors were already logged by the parent process
+    ifcopenshell.get_log()
+
+
+def _validate_chunk(args: tuple[list[int], bool]) -> tuple[list[tuple], list[tuple[int, Optional[str]]], str]:
+    ids, has_state = args
+    f = _validation_context
+    schema = ifcopenshell.ifcopenshell_wrapper.schema_by_name(f.schema_identifier)
+    logger = recording_state_logger() if has_state else recording_logger()
+    guids = []
+    for inst_id in ids:
+        inst = f[inst_id]
+        if has_state:
+            logger.set_state("instance", inst)
+        if hasattr(inst, "GlobalId"):
+            guids.append((inst_id, inst.GlobalId))
+        validate_instance(inst, schema, logger)
+    return logger.statements, guids, ifcopenshell.get_log()
+
+
+def validate(f: Union[ifcopenshell.file, str], logger: Logger, express_rules=False, jobs: int = 1) -> None:
     """
     For an IFC population model `f` (or filepath to such a file) validate whether the entity attribute values are correctly supplied. As this
     is a function that is applied after a file has been parsed, certain types of errors in syntax, duplicate
@@ -324,6 +681,11 @@ def validate(f: Union[ifcopenshell.file, str], logger: Logger, express_rules=Fal
     It is recommended to supply the path to the file, so that internal C++ errors reported during the parse stage
     are also captured.
 
+    If `jobs` is greater than one, instances are validated in this many worker processes. Workers are forked
+    where supported, otherwise each worker opens the file again, which requires `f` to be a filepath. Log
+    statements are replayed on the logger in the same instance order as a serial run, except that duplicate
+    GlobalIds are reported afterwards in a single pass over the whole file.
+
     Example:
 
     .. code:: python
@@ -372,117 +734,23 @@ def validate(f: Union[ifcopenshell.file, str], logger: Logger, express_rules=Fal
 
     schema = ifcopenshell.ifcopenshell_wrapper.schema_by_name(f.schema_identifier)
     used_guids: dict[str, ifcopenshell.entity_instance] = dict()
+    worker_log = None
 
-    for inst in f:
-        if hasattr(logger, "set_state"):
-            logger.set_state("instance", inst)
-
-        if hasattr(inst, "GlobalId"):
-            guid = inst.GlobalId
-            if guid is not None and guid in used_guids:
-                rule = "Rule IfcRoot.UR1:\n    The attribute GlobalId should be unique"
-                previous_element = used_guids[guid]
-                logger.error(
-                    "On instance:\n    %s\n   %s\n%s\nViolated by:\n    %s\n    %s",
-                    inst,
-                    annotate_inst_attr_pos(inst, 0),
-                    rule,
-                    previous_element,
-                    annotate_inst_attr_pos(previous_element, 0),
-                )
-            else:
-                used_guids[guid] = inst
-
-        entity, attrs = get_entity_attributes(schema, inst.is_a())
-
-        if entity.is_abstract():
-            e = "Entity %s is abstract" % entity.name()
+    if jobs > 1:
+        worker_log = validate_in_parallel(f, filename, logger, jobs)
+    else:
+        for inst in f:
             if hasattr(logger, "set_state"):
-                logger.set_state("attribute", None)
-                logger.error(e)
-            else:
-                logger.error("For instance:\n    %s\n%s", inst, e)
+                logger.set_state("instance", inst)
 
-        has_invalid_value = False
-        values = [None] * len(attrs)
-        for i in range(len(attrs)):
-            try:
-                values[i] = inst[i]
-                pass
-            except:
-                if hasattr(logger, "set_state"):
-                    logger.set_state("attribute", f"{entity.name()}.{attrs[i].name()}")
-                    logger.error("Invalid attribute value")
+            if hasattr(inst, "GlobalId"):
+                guid = inst.GlobalId
+                if guid is not None and guid in used_guids:
+                    log_duplicate_guid(inst, used_guids[guid], logger)
                 else:
-                    logger.error(
-                        "For instance:\n    %s\n    %s\nInvalid attribute value for %s.%s",
-                        inst,
-                        annotate_inst_attr_pos(inst, i),
-                        entity,
-                        attrs[i],
-                    )
-                has_invalid_value = True
-
-        if not has_invalid_value:
-            for i, (attr, val, is_derived) in enumerate(zip(attrs, values, entity.derived())):
-                if is_derived and not isinstance(val, ifcopenshell.ifcopenshell_wrapper.attribute_value_derived):
-                    if hasattr(logger, "set_state"):
-                        logger.set_state("attribute", f"{entity.name()}.{attr.name()}")
-                        logger.error("Attribute is derived in subtype")
-                    else:
-                        logger.error(
-                            "For instance:\n    %s\n    %s\nWith attribute:\n    %s\nDerived in subtype\n",
-                            inst,
-                            annotate_inst_attr_pos(inst, i),
-                            attr,
-                        )
-
-                if val is None and not attr.optional() and not is_derived:
-                    if hasattr(logger, "set_state"):
-                        logger.set_state("attribute", f"{entity.name()}.{attr.name()}")
-                        logger.error("Attribute not optional")
-                    else:
-                        logger.error(
-                            "For instance:\n    %s\n    %s\nWith attribute:\n    %s\nNot optional\n",
-                            inst,
-                            annotate_inst_attr_pos(inst, i),
-                            attr,
-                        )
+                    used_guids[guid] = inst
 
-                if val is not None and not is_derived:
-                    attr_type = attr.type_of_attribute()
-                    try:
-                        assert_valid(attr_type, val, schema, attr=attr)
-                    except ValidationError as e:
-                        if hasattr(logger, "set_state"):
-                            logger.set_state("attribute", e.attribute)
-                            logger.error(str(e))
-                        else:
-                            logger.error(
-                                "For instance:\n    %s\n    %s\n%s",
-                                inst,
-                                annotate_inst_attr_pos(inst, i),
-                                e,
-                            )
-
-        for attr in entity.all_inverse_attributes():
-            try:
-                val = getattr(inst, attr.name())
-            except Exception as e:
-                if hasattr(logger, "set_state"):
-                    logger.set_state("attribute", f"{entity.name()}.{attr.name()}")
-                    logger.error(str(e))
-                else:
-                    logger.error("For instance:\n    %s\n%s", inst, e)
-                continue
-            try:
-                assert_valid_inverse(attr, val, schema)
-            except ValidationError as e:
-                if hasattr(logger, "set_state"):
-                    logger.set_state("attribute", f"{entity.name()}.{attr.name()}")
-                    logger.error(str(e))
-                else:
-                    logger.error("For instance:\n    %s\n%s", inst, e)
+            validate_instance(inst, schema, logger)
 
     if filename:
         # IfcOpenShell uses lazy-loading, so entity instance
@@ -490,7 +758,8 @@ def validate(f: Union[ifcopenshell.file, str], logger: Logger, express_rules=Fal
         # Re capturing the log when validate() is finished
         # iterating over every instance so that all attribute counts
         # are verified.
-        log_internal_cpp_errors(filename, logger)
+        log = ifcopenshell.get_log()
+        log_internal_cpp_errors(filename, logger, log if worker_log is None else worker_log + "\n" + log)
 
     # Restore the original value for 'use_attribute_value_derived'
     ifcopenshell.ifcopenshell_wrapper.set_feature("use_attribute_value_derived", attribute_value_derived_org)
@@ -508,6 +777,7 @@ if __name__ == "__main__":
 
     filenames = [x for x in sys.argv[1:] if not x.startswith("--")]
     flags = set(x for x in sys.argv[1:] if x.startswith("--"))
+    jobs = next((int(x.split("=")[1]) for x in flags if x.startswith("--jobs=")), 1)
 
     for fn in filenames:
         if "--json" in flags:
@@ -517,7 +787,7 @@ if __name__ == "__main__":
             logger.setLevel(logging.DEBUG)
 
         print("Validating", fn, file=sys.stderr)
-        validate(fn, logger, "--rules" in flags)
+        validate(fn, logger, "--rules" in flags, jobs=jobs)
 
         if "--json" in flags:
             sys.stdout.reconfigure(encoding="utf-8")
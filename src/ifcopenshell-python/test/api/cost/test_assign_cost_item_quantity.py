@@ -0,0 +1,110 @@
+# IfcOpenShell - IFC toolkit and geometry engine
+# Copyright (C) 2024 Dion Moult <dion@thinkmoult.com>
+#
+# This file is part of IfcOpenShell.
+#
+# IfcOpenShell is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# IfcOpenShell is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with IfcOpenShell.  If not, see <http://www.gnu.org/licenses/>.
+
+import test.bootstrap
+import ifcopenshell.api
+
+
+class TestAssignCostItemQuantity(test.bootstrap.IFC4):
+    def create_slab(self, volume):
+        slab = ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcSlab")
+        qto = ifcopenshell.api.run("pset.add_qto", self.file, product=slab, name="Qto_SlabBaseQuantities")
+        ifcopenshell.api.run("pset.edit_qto", self.file, qto=qto, properties={"NetVolume": volume, "Width": 0.2})
+        return slab
+
+    def create_cost_item(self):
+        schedule = ifcopenshell.api.run("cost.add_cost_schedule", self.file)
+        return ifcopenshell.api.run("cost.add_cost_item", self.file, cost_schedule=schedule)
+
+    def get_quantity(self, product, name):
+        qto = product.IsDefinedBy[0].RelatingPropertyDefinition
+        return [q for q in qto.Quantities if q.Name == name][0]
+
+    def test_assigning_a_quantity_by_name(self):
+        item = self.create_cost_item()
+        slab1 = self.create_slab(42.0)
+        slab2 = self.create_slab(24.0)
+        ifcopenshell.api.run(
+            "cost.assign_cost_item_quantity", self.file, cost_item=item, products=[slab1, slab2], prop_name="NetVolume"
+        )
+        assert set(item.CostQuantities) == {
+            self.get_quantity(slab1, "NetVolume"),
+            self.get_quantity(slab2, "NetVolume"),
+        }
+        assert len(item.Controls) == 1
+        assert set(item.Controls[0].RelatedObjects) == {slab1, slab2}
+
+    def test_quantity_names_are_case_insensitive(self):
+        item = self.create_cost_item()
+        slab = self.create_slab(42.0)
+        ifcopenshell.api.run(
+            "cost.assign_cost_item_quantity", self.file, cost_item=item, products=[slab], prop_name="netvolume"
+        )
+        assert item.CostQuantities == (self.get_quantity(slab, "NetVolume"),)
+
+    def test_counting_products_without_a_quantity_name(self):
+        item = self.create_cost_item()
+        slab1 = self.create_slab(42.0)
+        slab2 = self.create_slab(24.0)
+        ifcopenshell.api.run("cost.assign_cost_item_quantity", self.file, cost_item=item, products=[slab1, slab2])
+        assert len(item.CostQuantities) == 1
+        assert item.CostQuantities[0].is_a("IfcQuantityCount")
+        assert item.CostQuantities[0].CountValue == 2
+        assert set(item.Controls[0].RelatedObjects) == {slab1, slab2}
+
+    def test_already_controlled_products_are_not_assigned_again(self):
+        item = self.create_cost_item()
+        slab1 = self.create_slab(42.0)
+        slab2 = self.create_slab(24.0)
+        ifcopenshell.api.run("control.assign_control", self.file, relating_control=item, related_object=slab1)
+        ifcopenshell.api.run("cost.assign_cost_item_quantity", self.file, cost_item=item, products=[slab1, slab2])
+        ifcopenshell.api.run("cost.assign_cost_item_quantity", self.file, cost_item=item, products=[slab1, slab1])
+        assert len(self.file.by_type("IfcRelAssignsToControl")) == 2  # Including the item assigned to its schedule
+        assert len(item.Controls) == 1
+        assert sorted(o.id() for o in item.Controls[0].RelatedObjects) == sorted([slab1.id(), slab2.id()])
+        assert item.CostQuantities[0].CountValue == 2
+
+    def test_adding_quantities_of_more_products(self):
+        item = self.create_cost_item()
+        slab1 = self.create_slab(42.0)
+        slab2 = self.create_slab(24.0)
+        ifcopenshell.api.run(
+            "cost.assign_cost_item_quantity", self.file, cost_item=item, products=[slab1], prop_name="NetVolume"
+        )
+        ifcopenshell.api.run(
+            "cost.assign_cost_item_quantity", self.file, cost_item=item, products=[slab2], prop_name="NetVolume"
+        )
+        assert set(item.CostQuantities) == {
+            self.get_quantity(slab1, "NetVolume"),
+            self.get_quantity(slab2, "NetVolume"),
+        }
+        assert set(item.Controls[0].RelatedObjects) == {slab1, slab2}
+
+    def test_quantities_are_not_mixed_with_an_existing_quantity_of_another_name(self):
+        item = self.create_cost_item()
+        slab1 = self.create_slab(42.0)
+        slab2 = self.create_slab(24.0)
+        ifcopenshell.api.run(
+            "cost.assign_cost_item_quantity", self.file, cost_item=item, products=[slab1], prop_name="Width"
+        )
+        ifcopenshell.api.run(
+            "cost.assign_cost_item_quantity", self.file, cost_item=item, products=[slab2], prop_name="NetVolume"
+        )
+        assert item.CostQuantities == (self.get_quantity(slab1, "Width"),)
+        # The product is still controlled by the cost item
+        assert set(item.Controls[0].RelatedObjects) == {slab1, slab2}
@@ -0,0 +1,73 @@
+# IfcOpenShell - IFC toolkit and geometry engine
+# Copyright (C) 2024 Dion Moult <dion@thinkmoult.com>
+#
+# This file is part of IfcOpenShell.
+#
+# IfcOpenShell is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# IfcOpenShell is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with IfcOpenShell.  If not, see <http://www.gnu.org/licenses/>.
+
+import datetime
+import test.bootstrap
+import ifcopenshell.api
+import ifcopenshell.util.sequence
+
+
+class TestAddTasks(test.bootstrap.IFC4):
+    def test_adding_root_tasks(self):
+        ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcProject")
+        schedule = ifcopenshell.api.run("sequence.add_work_schedule", self.file)
+        tasks = ifcopenshell.api.run(
+            "sequence.add_tasks",
+            self.file,
+            work_schedule=schedule,
+            tasks=[{"attributes": {"Name": "Foo"}}, {"attributes": {"Name": "Bar"}}],
+        )
+        assert [t.Name for t in tasks] == ["Foo", "Bar"]
+        assert set(ifcopenshell.util.sequence.get_root_tasks(schedule)) == set(tasks)
+        for task in tasks:
+            assert task.IsMilestone is False
+            assert task.PredefinedType == "NOTDEFINED"
+            assert task.TaskTime is None
+
+    def test_adding_subtasks(self):
+        parent = ifcopenshell.api.run("sequence.add_task", self.file, identification="A")
+        ifcopenshell.api.run("sequence.add_task", self.file, parent_task=parent)
+        tasks = ifcopenshell.api.run("sequence.add_tasks", self.file, parent_task=parent, tasks=[{}, {}])
+        assert len(parent.IsNestedBy) == 1
+        assert len(parent.IsNestedBy[0].RelatedObjects) == 3
+        assert set(tasks) <= set(parent.IsNestedBy[0].RelatedObjects)
+        assert [t.Identification for t in tasks] == ["A.2", "A.3"]
+
+    def test_assigning_calendars(self):
+        ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcProject")
+        calendar = ifcopenshell.api.run("sequence.add_work_calendar", self.file)
+        calendar2 = ifcopenshell.api.run("sequence.add_work_calendar", self.file)
+        tasks = ifcopenshell.api.run(
+            "sequence.add_tasks",
+            self.file,
+            tasks=[{"calendar": calendar}, {"calendar": calendar}, {"calendar": calendar2}, {}],
+        )
+        assert len(calendar.Controls) == 1
+        assert set(calendar.Controls[0].RelatedObjects) == set(tasks[0:2])
+        assert calendar2.Controls[0].RelatedObjects == (tasks[2],)
+        assert not tasks[3].HasAssignments
+
+    def test_adding_task_times(self):
+        tasks = ifcopenshell.api.run(
+            "sequence.add_tasks",
+            self.file,
+            tasks=[{"task_time": {"ScheduleStart": datetime.date(2000, 1, 1), "ScheduleDuration": "P2D"}}],
+        )
+        assert tasks[0].TaskTime.ScheduleStart == "2000-01-01T09:00:00"
+        assert tasks[0].TaskTime.ScheduleDuration == "P2D"
+        assert tasks[0].TaskTime.ScheduleFinish == "2000-01-02T17:00:00"
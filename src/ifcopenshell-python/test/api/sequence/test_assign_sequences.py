@@ -0,0 +1,96 @@
+# IfcOpenShell - IFC toolkit and geometry engine
+# Copyright (C) 2024 Dion Moult <dion@thinkmoult.com>
+#
+# This file is part of IfcOpenShell.
+#
+# IfcOpenShell is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# IfcOpenShell is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with IfcOpenShell.  If not, see <http://www.gnu.org/licenses/>.
+
+import pytest
+import datetime
+import test.bootstrap
+import ifcopenshell.api
+
+
+class TestAssignSequences(test.bootstrap.IFC4):
+    def test_assigning_sequences(self):
+        task, task2, task3 = [self._create_task("P1D") for i in range(3)]
+        rels = ifcopenshell.api.run(
+            "sequence.assign_sequences",
+            self.file,
+            sequences=[
+                {"relating_process": task, "related_process": task2},
+                {"relating_process": task2, "related_process": task3, "sequence_type": "START_START"},
+            ],
+        )
+        assert [r.is_a() for r in rels] == ["IfcRelSequence", "IfcRelSequence"]
+        assert rels[0].RelatingProcess == task
+        assert rels[0].RelatedProcess == task2
+        assert rels[0].SequenceType == "FINISH_START"
+        assert rels[1].SequenceType == "START_START"
+
+    def test_not_duplicating_existing_sequences(self):
+        task, task2 = [self._create_task("P1D") for i in range(2)]
+        rel = ifcopenshell.api.run("sequence.assign_sequence", self.file, relating_process=task, related_process=task2)
+        rels = ifcopenshell.api.run(
+            "sequence.assign_sequences", self.file, sequences=[{"relating_process": task, "related_process": task2}]
+        )
+        assert rels == [rel]
+        assert len(self.file.by_type("IfcRelSequence")) == 1
+
+    def test_assigning_lag_times(self):
+        task, task2 = [self._create_task("P1D") for i in range(2)]
+        rel = ifcopenshell.api.run(
+            "sequence.assign_sequences",
+            self.file,
+            sequences=[{"relating_process": task, "related_process": task2, "lag_value": "P1D"}],
+        )[0]
+        assert rel.TimeLag.LagValue.wrappedValue == "P1D"
+        assert rel.TimeLag.DurationType == "WORKTIME"
+
+    def test_cascading_a_chain_of_tasks_once(self):
+        tasks = [self._create_task("P1D") for i in range(3)]
+        ifcopenshell.api.run(
+            "sequence.assign_sequences",
+            self.file,
+            sequences=[
+                {"relating_process": tasks[1], "related_process": tasks[2]},
+                {"relating_process": tasks[0], "related_process": tasks[1], "lag_value": "P1D"},
+            ],
+        )
+        assert tasks[0].TaskTime.ScheduleStart == "2000-01-01T09:00:00"
+        assert tasks[1].TaskTime.ScheduleStart == "2000-01-03T09:00:00"
+        assert tasks[2].TaskTime.ScheduleStart == "2000-01-04T09:00:00"
+
+    def test_catching_cyclic_relationships(self):
+        task, task2 = [self._create_task("P1D") for i in range(2)]
+        with pytest.raises(RecursionError):
+            ifcopenshell.api.run(
+                "sequence.assign_sequences",
+                self.file,
+                sequences=[
+                    {"relating_process": task, "related_process": task2},
+                    {"relating_process": task2, "related_process": task},
+                ],
+            )
+
+    def _create_task(self, duration):
+        task = ifcopenshell.api.run("sequence.add_task", self.file)
+        task_time = ifcopenshell.api.run("sequence.add_task_time", self.file, task=task)
+        ifcopenshell.api.run(
+            "sequence.edit_task_time",
+            self.file,
+            task_time=task_time,
+            attributes={"ScheduleStart": datetime.date(2000, 1, 1), "ScheduleDuration": duration},
+        )
+        return task
@@ -0,0 +1,223 @@
+# IfcOpenShell - IFC toolkit and geometry engine
+# Copyright (C) 2024 Thomas Krijnen <thomas@aecgeeks.com>
+#
+# This file is part of IfcOpenShell.
+#
+# IfcOpenShell is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# IfcOpenShell is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with IfcOpenShell.  If not, see <http://www.gnu.org/licenses/>.
+
+import numpy
+import pytest
+import ifcopenshell
+import ifcopenshell.api
+import ifcopenshell.draw
+import test.bootstrap
+from dataclasses import replace
+
+SVG_DATA = (
+    '<svg xmlns="http://www.w3.org/2000/svg" xmlns:ifc="http://www.ifcopenshell.org/ns">'
+    '<g ifc:name="Elevation" ifc:plane="[[1,0,0,0],[0,0,1,0],[0,1,0,0],[0,0,0,1]]" '
+    'ifc:matrix3="[[1,0,0],[0,1,0],[0,0,1]]"><path d="M0,0 L1,1"/></g></svg>'
+)
+
+
+class TestDrawTiles(test.bootstrap.IFC4):
+    @pytest.mark.parametrize(
+        "settings",
+        [{"auto_elevation": True}, {"auto_section": True}, {"drawing_guid": "0123456789012345678901"}],
+    )
+    def test_the_drawing_cache_is_only_supported_for_floor_plans(self, tmp_path, settings):
+        settings = ifcopenshell.draw.draw_settings(drawing_cache=str(tmp_path), **settings)
+        with pytest.raises(ValueError):
+            ifcopenshell.draw.main(settings, [self.file])
+
+    def test_the_geometry_cache_cannot_be_shared_between_tile_processes(self):
+        settings = ifcopenshell.draw.draw_settings(tile_size=5.0, cache=True, jobs=2)
+        with pytest.raises(ValueError):
+            ifcopenshell.draw.main(settings, [self.file])
+
+    def test_a_single_tile_is_not_clipped(self):
+        assert ifcopenshell.draw.stitch_tiles([SVG_DATA], [(-1.0e6, -1.0e6, 1.0e6, 1.0e6)]) == SVG_DATA
+
+    def test_the_drawing_cache_uses_a_fixed_grid_and_prunes_unused_tiles(self, tmp_path):
+        ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcProject")
+        ifcopenshell.api.run("unit.assign_unit", self.file)
+        for x in (0.0, 60.0):
+            wall = self.file.createIfcWall(ifcopenshell.guid.new())
+            matrix = numpy.eye(4)
+            matrix[0][3] = x
+            ifcopenshell.api.run("geometry.edit_object_placement", self.file, product=wall, matrix=matrix)
+            wall.Representation = self.file.createIfcProductDefinitionShape(
+                Representations=[
+                    self.file.createIfcShapeRepresentation(Items=[self.file.createIfcCartesianPoint((0.0, 0.0))])
+                ]
+            )
+
+        settings = ifcopenshell.draw.draw_settings(drawing_cache=str(tmp_path))
+        grid_settings = replace(settings, tile_size=ifcopenshell.draw.DRAWING_CACHE_TILE_SIZE)
+        tiles = ifcopenshell.draw.partition_tiles(grid_settings, [self.file])
+        assert len(tiles) == 2
+        keys = ifcopenshell.draw.get_tile_cache_keys(grid_settings, [self.file], tiles)
+        for key in keys:
+            (tmp_path / (key + ".svg")).write_text(SVG_DATA)
+        (tmp_path / ("0" * 32 + ".svg")).write_text(SVG_DATA)
+        (tmp_path / "notes.txt").write_text("")
+
+        # Every tile is loaded from the cache, so nothing is drawn
+        assert ifcopenshell.draw.main(settings, [self.file])
+        assert sorted(p.name for p in tmp_path.iterdir()) == sorted([k + ".svg" for k in keys] + ["notes.txt"])
+
+
+class TestPartitionTiles(test.bootstrap.IFC4):
+    def setup_model(self):
+        ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcProject")
+        ifcopenshell.api.run("unit.assign_unit", self.file)  # Millimetres
+        model = ifcopenshell.api.run("context.add_context", self.file, context_type="Model")
+        self.body = ifcopenshell.api.run(
+            "context.add_context",
+            self.file,
+            context_type="Model",
+            context_identifier="Body",
+            target_view="MODEL_VIEW",
+            parent=model,
+        )
+
+    def create_wall(self, x, length=1.0):
+        wall = ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcWall")
+        matrix = numpy.eye(4)
+        matrix[0][3] = x
+        ifcopenshell.api.run("geometry.edit_object_placement", self.file, product=wall, matrix=matrix)
+        representation = ifcopenshell.api.run(
+            "geometry.add_wall_representation", self.file, context=self.body, length=length, height=3.0
+        )
+        ifcopenshell.api.run("geometry.assign_representation", self.file, product=wall, representation=representation)
+        return wall
+
+    def test_partitioning_in_metres_without_tessellating(self):
+        self.setup_model()
+        walls = [self.create_wall(0.0), self.create_wall(40.0)]
+        settings = ifcopenshell.draw.draw_settings(tiles=2)
+        tiles = ifcopenshell.draw.partition_tiles(settings, [self.file])
+        assert [bounds[2] for bounds, element_ids in tiles if bounds[0] < 0.0] == pytest.approx([20.5, 20.5])
+        for bounds, element_ids in tiles:
+            assert element_ids == [[walls[0].id()]] if bounds[0] < 0.0 else [[walls[1].id()]]
+
+    def test_elements_crossing_a_tile_boundary_are_in_every_tile_they_overlap(self):
+        self.setup_model()
+        walls = [self.create_wall(0.0, length=8.0), self.create_wall(40.0)]
+        settings = ifcopenshell.draw.draw_settings(tile_size=5.0)
+        tiles = ifcopenshell.draw.partition_tiles(settings, [self.file])
+        assert [bounds[2] for bounds, element_ids in tiles[:2]] == [5.0, 10.0]
+        assert all(walls[0].id() in tile_element_ids for bounds, (tile_element_ids,) in tiles[:2])
+        assert walls[1].id() not in tiles[0][1][0]
+        assert walls[1].id() in tiles[-1][1][0]
+
+    def create_mapped_wall(self):
+        # A 1m square profile and solid, each offset by 10m, mapped from an origin offset by 10m and scaled by 3
+        f = self.file
+        wall = ifcopenshell.api.run("root.create_entity", f, ifc_class="IfcWall")
+        ifcopenshell.api.run("geometry.edit_object_placement", f, product=wall)
+        profile = f.createIfcRectangleProfileDef(
+            "AREA", None, f.createIfcAxis2Placement2D(f.createIfcCartesianPoint((10000.0, 0.0))), 1000.0, 1000.0
+        )
+        solid = f.createIfcExtrudedAreaSolid(
+            profile,
+            f.createIfcAxis2Placement3D(f.createIfcCartesianPoint((10000.0, 0.0, 0.0))),
+            f.createIfcDirection((0.0, 0.0, 1.0)),
+            1000.0,
+        )
+        mapped_representation = f.createIfcShapeRepresentation(self.body, "Body", "SweptSolid", [solid])
+        representation_map = f.createIfcRepresentationMap(
+            f.createIfcAxis2Placement3D(f.createIfcCartesianPoint((10000.0, 0.0, 0.0))), mapped_representation
+        )
+        target = f.createIfcCartesianTransformationOperator3D(
+            LocalOrigin=f.createIfcCartesianPoint((0.0, 0.0, 0.0)), Scale=3.0
+        )
+        item = f.createIfcMappedItem(representation_map, target)
+        representation = f.createIfcShapeRepresentation(self.body, "Body", "MappedRepresentation", [item])
+        ifcopenshell.api.run("geometry.assign_representation", f, product=wall, representation=representation)
+        return wall
+
+    def test_bounds_are_composed_along_nested_mapped_items(self):
+        self.setup_model()
+        wall = self.create_mapped_wall()
+        x0, y0, x1, y1 = ifcopenshell.draw.get_plan_bounds(wall, 0.001, {})
+        # The profile spans 29.5m to 30.5m in the map, which is scaled to 88.5m to 91.5m
+        assert x0 <= 88.5 and x1 >= 91.5
+        assert y0 <= -1.5 and y1 >= 1.5
+        assert x0 > 40.0
+
+    def test_a_nested_mapped_item_is_drawn_in_the_tile_containing_it(self):
+        self.setup_model()
+        wall = self.create_wall(0.0)
+        mapped_wall = self.create_mapped_wall()
+        settings = ifcopenshell.draw.draw_settings(tile_size=50.0)
+        tiles = ifcopenshell.draw.partition_tiles(settings, [self.file])
+        tile_bounds = [bounds for bounds, (element_ids,) in tiles if mapped_wall.id() in element_ids]
+        assert tile_bounds
+        assert any(x0 <= 88.5 and x1 >= 91.5 for x0, y0, x1, y1 in tile_bounds)
+        assert all(x0 >= 50.0 for x0, y0, x1, y1 in tile_bounds)
+        assert all(mapped_wall.id() not in element_ids for bounds, (element_ids,) in tiles if bounds[2] <= 50.0)
+
+    def test_unbounded_elements_are_in_every_tile(self):
+        self.setup_model()
+        walls = [self.create_wall(0.0), self.create_wall(40.0)]
+        f = self.file
+        line = f.createIfcLine(
+            f.createIfcCartesianPoint((0.0, 0.0)), f.createIfcVector(f.createIfcDirection((1.0, 0.0)), 1.0)
+        )
+        annotation = ifcopenshell.api.run("root.create_entity", f, ifc_class="IfcAnnotation")
+        representation = f.createIfcShapeRepresentation(self.body, "Annotation", "Curve2D", [line])
+        ifcopenshell.api.run("geometry.assign_representation", f, product=annotation, representation=representation)
+        tiles = ifcopenshell.draw.partition_tiles(ifcopenshell.draw.draw_settings(tiles=2), [self.file])
+        assert len(tiles) > 1
+        assert all(annotation.id() in element_ids for bounds, (element_ids,) in tiles)
+
+    def test_excluding_entities(self):
+        self.setup_model()
+        wall = self.create_wall(0.0)
+        settings = ifcopenshell.draw.draw_settings(tiles=2, exclude_entities="IfcWall")
+        assert ifcopenshell.draw.partition_tiles(settings, [self.file]) == []
+
+
+class TestGetTileCacheKeys(test.bootstrap.IFC4):
+    def get_keys(self, wall):
+        settings = ifcopenshell.draw.draw_settings(drawing_cache="cache")
+        return ifcopenshell.draw.get_tile_cache_keys(settings, [self.file], [((0.0, 0.0, 1.0, 1.0), [[wall.id()]])])
+
+    def test_a_cached_tile_is_stale_if_a_material_style_changes(self):
+        wall = self.file.createIfcWall(ifcopenshell.guid.new())
+        material = ifcopenshell.api.run("material.add_material", self.file, name="Concrete")
+        ifcopenshell.api.run("material.assign_material", self.file, products=[wall], material=material)
+        keys = self.get_keys(wall)
+
+        context = self.file.createIfcGeometricRepresentationContext(ContextType="Model")
+        style = ifcopenshell.api.run("style.add_style", self.file, name="Grey")
+        ifcopenshell.api.run("style.assign_material_style", self.file, material=material, style=style, context=context)
+        assert self.get_keys(wall) != keys
+        keys = self.get_keys(wall)
+
+        ifcopenshell.api.run(
+            "style.add_surface_style",
+            self.file,
+            style=style,
+            ifc_class="IfcSurfaceStyleShading",
+            attributes={"SurfaceColour": {"Name": None, "Red": 0.5, "Green": 0.5, "Blue": 0.5}},
+        )
+        assert self.get_keys(wall) != keys
+
+    def test_a_cached_tile_is_reused_if_nothing_changes(self):
+        wall = self.file.createIfcWall(ifcopenshell.guid.new())
+        material = ifcopenshell.api.run("material.add_material", self.file, name="Concrete")
+        ifcopenshell.api.run("material.assign_material", self.file, products=[wall], material=material)
+        assert self.get_keys(wall) == self.get_keys(wall)
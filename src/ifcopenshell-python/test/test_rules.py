@@ -40,5 +40,42 @@ def test_file(filename):
         assert len(results) == 0
 
 
+def test_compiled_rules_are_cached(tmp_path):
+    rule_executor = ifcopenshell.express.rule_executor
+    rule_executor.rule_set_cache.clear()
+    rules = rule_executor.get_rules("IFC4", cache_dir=str(tmp_path))
+    assert rule_executor.get_rules("IFC4", cache_dir=str(tmp_path)) is rules
+    assert len(list(tmp_path.glob("IFC4.*.rules.pyc"))) == 1
+
+    # A new process would load the bytecode from disk instead
+    rule_executor.rule_set_cache.clear()
+    cached_rules = rule_executor.get_rules("IFC4", cache_dir=str(tmp_path))
+    assert cached_rules is not rules
+    assert cached_rules.type_rules.keys() == rules.type_rules.keys()
+    assert len(cached_rules.entity_rules) == len(rules.entity_rules)
+
+
+def test_profiling_rules():
+    file = ifcopenshell.open(os.path.join(os.path.dirname(__file__), "fixtures/rules/fail-2-projects-ifc2x3.ifc"))
+    logger = ifcopenshell.validate.json_logger()
+    profile = ifcopenshell.express.rule_executor.rule_profile()
+    ifcopenshell.express.rule_executor.run(file, logger, profile)
+    report = profile.report()
+    assert report
+    assert all(invocations > 0 and duration >= 0 for _, invocations, duration in report)
+    assert [r[2] for r in report] == sorted((r[2] for r in report), reverse=True)
+
+
+@pytest.mark.parametrize("schema", ["IFC2X3", "IFC4", "IFC4X3"])
+def test_derived_rules_are_up_to_date(schema):
+    import ifcopenshell.express.derived_compiler
+
+    rules_dir = os.path.join(os.path.dirname(ifcopenshell.express.rule_executor.__file__), "rules")
+    with open(os.path.join(rules_dir, f"{schema}.py")) as f:
+        derived = ifcopenshell.express.derived_compiler.compile_derived(f.read())
+    with open(os.path.join(rules_dir, "derived", f"{schema}.py")) as f:
+        assert f.read() == derived
+
+
 if __name__ == "__main__":
     pytest.main(["-sx", __file__])
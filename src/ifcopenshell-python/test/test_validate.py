@@ -41,5 +41,51 @@ def test_file(file):
         assert len(logger.statements) == 0
 
 
+@pytest.mark.parametrize(
+    "file",
+    glob.glob(os.path.join(os.path.dirname(__file__), "fixtures/validate/*.ifc")),
+)
+def test_file_with_multiple_jobs(file):
+    logger = ifcopenshell.validate.json_logger()
+    try:
+        ifcopenshell.validate.validate(file, logger)
+    except ifcopenshell.SchemaError as e:
+        pytest.skip()
+    parallel_logger = ifcopenshell.validate.json_logger()
+    ifcopenshell.validate.validate(file, parallel_logger, jobs=2)
+    # Duplicate GlobalIds are reported in a separate pass, so only compare the messages
+    assert sorted(x["message"] for x in parallel_logger.statements) == sorted(x["message"] for x in logger.statements)
+
+
+@pytest.mark.parametrize(
+    "file",
+    glob.glob(os.path.join(os.path.dirname(__file__), "fixtures/validate/*.ifc")),
+)
+def test_compiled_validators_match_assert_valid(file):
+    try:
+        f = ifcopenshell.open(file)
+    except Exception:
+        pytest.skip()
+    schema = ifcopenshell.ifcopenshell_wrapper.schema_by_name(f.schema_identifier)
+    for inst in f:
+        validator = ifcopenshell.validate.get_entity_validator(schema, inst.is_a())
+        for i, (attr, is_derived) in enumerate(zip(validator.attributes, validator.derived)):
+            try:
+                val = inst[i]
+            except Exception:
+                continue
+            if val is None or is_derived:
+                continue
+            try:
+                expected = ifcopenshell.validate.assert_valid(attr.type_of_attribute(), val, schema, attr=attr)
+            except ifcopenshell.validate.ValidationError:
+                expected = False
+            try:
+                result = validator.validators[i](val)
+            except Exception:
+                result = False
+            assert bool(result) is expected
+
+
 if __name__ == "__main__":
     pytest.main(["-sx", __file__])
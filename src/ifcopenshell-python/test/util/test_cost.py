@@ -0,0 +1,92 @@
+# IfcOpenShell - IFC toolkit and geometry engine
+# Copyright (C) 2024 Dion Moult <dion@thinkmoult.com>
+#
+# This file is part of IfcOpenShell.
+#
+# IfcOpenShell is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# IfcOpenShell is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with IfcOpenShell.  If not, see <http://www.gnu.org/licenses/>.
+
+import test.bootstrap
+import ifcopenshell.api
+import ifcopenshell.util.cost as subject
+
+
+class CostScheduleTest(test.bootstrap.IFC4):
+    def create_schedule(self):
+        self.schedule = ifcopenshell.api.run("cost.add_cost_schedule", self.file)
+        self.parent = ifcopenshell.api.run("cost.add_cost_item", self.file, cost_schedule=self.schedule)
+        self.parent_value = ifcopenshell.api.run("cost.add_cost_value", self.file, parent=self.parent)
+        ifcopenshell.api.run(
+            "cost.edit_cost_value", self.file, cost_value=self.parent_value, attributes={"Category": "*"}
+        )
+        self.child1 = ifcopenshell.api.run("cost.add_cost_item", self.file, cost_item=self.parent)
+        self.child1_value = self.add_value(self.child1, 5.0)
+        self.quantity = ifcopenshell.api.run("cost.add_cost_item_quantity", self.file, cost_item=self.child1)
+        self.quantity.CountValue = 2.0
+        self.child2 = ifcopenshell.api.run("cost.add_cost_item", self.file, cost_item=self.parent)
+        self.child2_value = self.add_value(self.child2, 3.0)
+
+    def add_value(self, cost_item, value):
+        cost_value = ifcopenshell.api.run("cost.add_cost_value", self.file, parent=cost_item)
+        ifcopenshell.api.run(
+            "cost.edit_cost_value", self.file, cost_value=cost_value, attributes={"AppliedValue": value}
+        )
+        return cost_value
+
+
+class TestCalculateAppliedValue(CostScheduleTest):
+    def test_run(self):
+        self.create_schedule()
+        assert subject.calculate_applied_value(self.child1, self.child1_value) == 5.0
+        assert subject.calculate_applied_value(self.parent, self.parent_value) == 13.0
+
+
+class TestCostEvaluator(CostScheduleTest):
+    def test_evaluating_a_schedule(self):
+        self.create_schedule()
+        evaluator = subject.CostEvaluator()
+        evaluator.evaluate(self.schedule)
+        assert evaluator.get_applied_value(self.parent, self.parent_value) == 13.0
+        assert evaluator.get_total_cost(self.child1) == 10.0
+
+    def test_recalculating_a_changed_value(self):
+        self.create_schedule()
+        evaluator = subject.CostEvaluator()
+        evaluator.evaluate(self.schedule)
+        ifcopenshell.api.run(
+            "cost.edit_cost_value", self.file, cost_value=self.child2_value, attributes={"AppliedValue": 4.0}
+        )
+        assert evaluator.get_applied_value(self.parent, self.parent_value) == 13.0
+        evaluator.invalidate(self.child2_value)
+        assert evaluator.get_applied_value(self.parent, self.parent_value) == 14.0
+
+    def test_recalculating_a_changed_quantity(self):
+        self.create_schedule()
+        evaluator = subject.CostEvaluator()
+        evaluator.evaluate(self.schedule)
+        self.quantity.CountValue = 3.0
+        evaluator.invalidate(self.quantity)
+        assert evaluator.get_applied_value(self.parent, self.parent_value) == 18.0
+
+    def test_getting_a_table_of_cost_items(self):
+        self.create_schedule()
+        table = subject.CostEvaluator().get_table(self.schedule)
+        nested_ids = [c.id() for c in subject.get_nested_cost_items(self.parent)]
+        assert [row["id"] for row in table] == [self.parent.id()] + nested_ids
+        rows = {row["id"]: row for row in table}
+        assert rows[self.parent.id()]["parent"] is None
+        assert rows[self.parent.id()]["TotalCost"] == 13.0
+        assert rows[self.child1.id()]["parent"] == self.parent.id()
+        assert rows[self.child1.id()]["TotalCostQuantity"] == 2.0
+        assert rows[self.child1.id()]["TotalAppliedValue"] == 5.0
+        assert rows[self.child1.id()]["TotalCost"] == 10.0
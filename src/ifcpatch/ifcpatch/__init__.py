@@ -19,6 +19,7 @@
 # along with IfcPatch.  If not, see <http://www.gnu.org/licenses/>.
 
 import os
+import sys
 import shutil
 import ifcopenshell
 import logging
@@ -26,8 +27,16 @@ import typing
 import inspect
 import collections
 import importlib
+import tempfile
+import time
+import ifcpatch.stream
 from typing import Union
 
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
 
 def execute(args: dict) -> Union[ifcopenshell.file, str]:
     """Execute a patch recipe
@@ -41,8 +50,11 @@ def execute(args: dict) -> Union[ifcopenshell.file, str]:
     :type args: dict
     :param input: A filepath to the incoming IFC file.
     :type input: str
-    :param file: An IFC model to apply the patch recipe to.
-    :type file: ifcopenshell.file.file
+    :param file: An IFC model to apply the patch recipe to. If omitted and
+        the recipe supports streaming, the input is patched record by record
+        without loading it, and the result is the filepath of the patched
+        output. If omitted otherwise, the input is loaded first.
+    :type file: ifcopenshell.file.file,optional
     :param recipe: The name of the recipe. This is the same as the filename of
         the recipe. E.g. "ExtractElements".
     :type recipe: str
@@ -67,21 +79,127 @@ def execute(args: dict) -> Union[ifcopenshell.file, str]:
             "arguments": [".IfcWall"],
         })
         ifcpatch.write(output, "output.ifc")
+
+        # Patch a large model without loading it, if the recipe supports it
+        output = ifcpatch.execute({"input": "input.ifc", "recipe": "RegenerateGlobalIds", "arguments": []})
+        ifcpatch.write(output, "output.ifc")
     """
     if "log" in args:
         logging.basicConfig(filename=args["log"], filemode="a", level=logging.DEBUG)
     logger = logging.getLogger("IFCPatch")
     recipes = getattr(__import__("ifcpatch.recipes.{}".format(args["recipe"])), "recipes")
     recipe = getattr(recipes, args["recipe"])
+    file = args.get("file")
+    if file is None and not is_streamable(args["recipe"]):
+        file = ifcopenshell.open(args["input"])
     if recipe.Patcher.__init__.__doc__ is not None:
-        patcher = recipe.Patcher(args.get("input"), args["file"], logger, *args["arguments"])
+        patcher = recipe.Patcher(args.get("input"), file, logger, *args["arguments"])
     else:
-        patcher = recipe.Patcher(args.get("input"), args["file"], logger, args["arguments"])
+        patcher = recipe.Patcher(args.get("input"), file, logger, args["arguments"])
+    if file is None:
+        return _execute_stream(patcher, args["input"])
     patcher.patch()
     output = getattr(patcher, "file_patched", patcher.file)
     return output
 
 
+def execute_pipeline(args: dict) -> Union[ifcopenshell.file, str]:
+    """Execute multiple patch recipes in order on a single model
+
+    The input is only loaded once, and every recipe patches the output of the
+    previous one in memory. This avoids parsing and writing the model for
+    each recipe, and recipes benefit from the inverse and type indexes the
+    model has already built. If a recipe outputs a serialised model, it is
+    loaded again for the next recipe, so such recipes are best run last.
+
+    :param args: A dictionary of arguments, corresponding to the parameters
+        listed subsequent to this in this docstring.
+    :type args: dict
+    :param input: A filepath to the incoming IFC file.
+    :type input: str
+    :param file: An IFC model to apply the patch recipes to. If omitted, the
+        input is loaded.
+    :type file: ifcopenshell.file.file,optional
+    :param recipes: A list of dictionaries, each with the "recipe" name and
+        its "arguments", as they would be passed to execute().
+    :type recipes: list[dict]
+    :param log: A filepath to a logfile.
+    :type log: str,optional
+    :param report: An optional list which is populated with a (recipe,
+        duration in seconds, peak memory in bytes) tuple for each recipe. Peak
+        memory is that of the process so far, and None where it is unavailable.
+    :type report: list,optional
+    :return: The result of the last patch.
+    :rtype: ifcopenshell.file.file,str
+
+    Example:
+
+    .. code:: python
+
+        output = ifcpatch.execute_pipeline({
+            "input": "input.ifc",
+            "recipes": [
+                {"recipe": "ResetAbsoluteCoordinates", "arguments": []},
+                {"recipe": "RegenerateGlobalIds", "arguments": [True]},
+                {"recipe": "RecycleNonRootedElements", "arguments": []},
+            ],
+        })
+        ifcpatch.write(output, "output.ifc")
+    """
+    logger = logging.getLogger("IFCPatch")
+    output = args.get("file") or ifcopenshell.open(args["input"])
+    for i, step in enumerate(args["recipes"]):
+        if isinstance(output, str):
+            if os.path.exists(output):
+                output = ifcopenshell.open(output)
+            else:
+                output = ifcopenshell.file.from_string(output)
+        start = time.perf_counter()
+        output = execute(
+            {
+                "input": args.get("input"),
+                "file": output,
+                "recipe": step["recipe"],
+                "arguments": step.get("arguments", []),
+                **({"log": args["log"]} if "log" in args else {}),
+            }
+        )
+        duration = time.perf_counter() - start
+        peak_memory = get_peak_memory()
+        logger.info("Step %s: %s took %.2fs, peak memory %s", i + 1, step["recipe"], duration, peak_memory)
+        if args.get("report") is not None:
+            args["report"].append((step["recipe"], duration, peak_memory))
+    return output
+
+
+def get_peak_memory() -> Union[int, None]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def is_streamable(recipe: str) -> bool:
+    """Checks whether a recipe can patch a model without loading it
+
+    :param recipe: The name of the recipe. E.g. "RegenerateGlobalIds".
+    :type recipe: str
+    :return: True if the recipe Patcher implements stream()
+    :rtype: bool
+    """
+    recipes = getattr(__import__("ifcpatch.recipes.{}".format(recipe)), "recipes")
+    return hasattr(getattr(recipes, recipe).Patcher, "stream")
+
+
+def _execute_stream(patcher, filepath: str) -> str:
+    fd, output = tempfile.mkstemp(suffix=".ifc")
+    os.close(fd)
+    with ifcpatch.stream.reader(filepath) as reader, ifcpatch.stream.writer(output, reader.header) as writer:
+        patcher.stream(reader, writer)
+    return output
+
+
 def write(output: Union[ifcopenshell.file, str], filepath: str) -> None:
     """Write the output of an IFC patch to a file
 
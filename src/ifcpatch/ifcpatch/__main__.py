@@ -18,6 +18,7 @@
 # You should have received a copy of the GNU Lesser General Public License
 # along with IfcPatch.  If not, see <http://www.gnu.org/licenses/>.
 
+import json
 import argparse
 import ifcpatch
 import ifcopenshell
@@ -25,16 +26,38 @@ import ifcopenshell
 parser = argparse.ArgumentParser(description="Patches IFC files to fix badly formatted data")
 parser.add_argument("-i", "--input", type=str, required=True, help="The IFC file to patch")
 parser.add_argument("-o", "--output", type=str, help="The output file to save the patched IFC")
-parser.add_argument("-r", "--recipe", type=str, required=True, help="Name of the recipe to use when patching")
+group = parser.add_mutually_exclusive_group(required=True)
+group.add_argument("-r", "--recipe", type=str, help="Name of the recipe to use when patching")
+group.add_argument(
+    "-p",
+    "--pipeline",
+    type=str,
+    help='A JSON file listing recipes to run in order, e.g. [{"recipe": "PurgeData", "arguments": []}]',
+)
 parser.add_argument("-l", "--log", type=str, help="Specify a log file", default="ifcpatch.log")
-parser.add_argument("-a", "--arguments", nargs="+", help="Specify custom arguments to the patch recipe")
+parser.add_argument("-a", "--arguments", nargs="+", default=[], help="Specify custom arguments to the patch recipe")
+parser.add_argument(
+    "-s", "--stream", action="store_true", help="Patch without loading the IFC file, if the recipe supports it"
+)
 args = vars(parser.parse_args())
 
-print("# Loading IFC file ...")
-args["file"] = ifcopenshell.open(args["input"])
+if args.pop("stream") and args["recipe"] and ifcpatch.is_streamable(args["recipe"]):
+    print("# Streaming IFC file ...")
+else:
+    print("# Loading IFC file ...")
+    args["file"] = ifcopenshell.open(args["input"])
 
 print("# Patching ...")
-output = ifcpatch.execute(args)
+if args["pipeline"]:
+    with open(args["pipeline"]) as f:
+        args["recipes"] = json.load(f)
+    args["report"] = []
+    output = ifcpatch.execute_pipeline(args)
+    for recipe, duration, peak_memory in args["report"]:
+        memory = "unknown" if peak_memory is None else f"{peak_memory / 1024 / 1024:.0f} MB"
+        print(f"# {recipe}: {duration:.2f}s, peak memory {memory}")
+else:
+    output = ifcpatch.execute(args)
 
 print("# Writing patched file ...")
 if not args["output"]:
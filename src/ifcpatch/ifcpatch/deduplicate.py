@@ -0,0 +1,129 @@
+# IfcPatch - IFC patching utiliy
+# Copyright (C) 2020, 2021 Dion Moult <dion@thinkmoult.com>
+#
+# This file is part of IfcPatch.
+#
+# IfcPatch is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# IfcPatch is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with IfcPatch.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Structural deduplication of IFC instances shared by the optimisation recipes
+
+Instances are hashed bottom-up: an instance is only keyed once everything it
+references has been keyed, and references are canonicalised to the id of the
+representative of the referenced instance. Two instances that only differ by
+referencing different, but identical, instances therefore receive the same key
+and a single pass finds all duplicates.
+"""
+
+from typing import Any, Iterable, Iterator
+import ifcopenshell
+
+# Marks a reference in a key, so that it cannot be confused with a plain value
+REFERENCE = object()
+
+
+def iter_references(value: Any) -> Iterator[ifcopenshell.entity_instance]:
+    if isinstance(value, ifcopenshell.entity_instance):
+        if value.id():
+            yield value
+    elif isinstance(value, tuple):
+        for v in value:
+            yield from iter_references(v)
+
+
+def get_duplicates(file: ifcopenshell.file, exclude: Iterable[str] = ()) -> dict[int, ifcopenshell.entity_instance]:
+    """Finds instances that are structurally identical to another instance
+
+    :param file: The IFC model to search
+    :param exclude: IFC classes whose instances are never merged. They are
+        still rewritten to reference the representatives of their duplicates.
+    :return: A mapping of the ids of duplicate instances to the
+        representative instance that should replace them.
+    """
+    representatives = {}  # id -> representative id, for every keyed instance
+    excluded = set()
+    for ifc_class in exclude:
+        excluded.update(e.id() for e in file.by_type(ifc_class))
+
+    def canonicalise(value):
+        if isinstance(value, ifcopenshell.entity_instance):
+            if i := value.id():
+                # Unkeyed references are either excluded or part of a cycle
+                return (REFERENCE, representatives.get(i, i))
+            return (value.is_a(), canonicalise(value.wrappedValue))
+        elif isinstance(value, tuple):
+            return tuple(map(canonicalise, value))
+        return value
+
+    keys = {}
+    duplicates = {}
+    visiting = set()
+    for root in file:
+        if root.id() in representatives or root.id() in excluded:
+            continue
+        # Iterative depth-first traversal, so that instances are keyed in post-order
+        values = tuple(root)
+        stack = [(root, values, iter_references(values))]
+        visiting.add(root.id())
+        while stack:
+            inst, values, references = stack[-1]
+            for ref in references:
+                i = ref.id()
+                if i not in representatives and i not in visiting and i not in excluded:
+                    ref_values = tuple(ref)
+                    stack.append((ref, ref_values, iter_references(ref_values)))
+                    visiting.add(i)
+                    break
+            else:
+                stack.pop()
+                visiting.discard(inst.id())
+                key = (inst.is_a(), canonicalise(values))
+                representative = keys.setdefault(key, inst)
+                representatives[inst.id()] = representative.id()
+                if representative is not inst:
+                    duplicates[inst.id()] = representative
+    return duplicates
+
+
+def replace_duplicates(file: ifcopenshell.file, duplicates: dict[int, ifcopenshell.entity_instance]) -> None:
+    """Rewrites all references to duplicates to reference their representative
+
+    Every referencing instance is only visited once, regardless of how many
+    duplicates it references. The duplicates themselves are left orphaned.
+    """
+    referrers = {}
+    for i in duplicates:
+        for inverse in file.get_inverse(file.by_id(i)):
+            if inverse.id() not in duplicates:
+                referrers[inverse.id()] = inverse
+
+    is_duplicate = lambda v: isinstance(v, ifcopenshell.entity_instance) and v.id() in duplicates
+    get_representative = lambda v: duplicates[v.id()]
+    for inst in referrers.values():
+        for i, value in enumerate(inst):
+            if any(ref.id() in duplicates for ref in iter_references(value)):
+                inst[i] = inst.walk(is_duplicate, get_representative, value)
+
+
+def to_string(file: ifcopenshell.file, removed: Iterable[int]) -> str:
+    """Serialises the model without the removed instances
+
+    This is much faster than removing orphaned instances from the model one
+    by one, as the inverse bookkeeping of the model is not updated.
+    """
+    removed = set(removed)
+    return "\n".join(
+        line
+        for line in file.wrapped_data.to_string().split("\n")
+        if not (line.startswith("#") and int(line[1 : line.index("=")]) in removed)
+    )
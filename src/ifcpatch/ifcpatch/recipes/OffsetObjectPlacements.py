@@ -88,21 +88,23 @@ class Patcher:
         self.az = az
         if self.ay is not None:
             self.angle_type = "3D"
-        elif self.ay is not None:
+        elif self.ax is not None:
             self.angle_type = "2D"
         else:
             self.angle_type = None
 
     def patch(self):
-        absolute_placements = []
-
+        # Placements are often shared deep in the placement tree, so their
+        # absolute placement is only resolved once
+        self.absolute_placements = {}
+        absolute_placements = {}
         for product in self.file.by_type("IfcProduct"):
             if not product.ObjectPlacement:
                 continue
             absolute_placement = self.get_absolute_placement(product.ObjectPlacement)
             if absolute_placement.is_a("IfcLocalPlacement"):
-                absolute_placements.append(absolute_placement)
-        absolute_placements = set(absolute_placements)
+                absolute_placements[absolute_placement.id()] = absolute_placement
+        absolute_placements = list(absolute_placements.values())
 
         translate = self.identity_matrix()
         rotate = self.identity_matrix()
@@ -125,15 +127,26 @@ class Patcher:
         else:
             transformation = rotate @ translate
 
-        for placement in absolute_placements:
-            placement.RelativePlacement = self.get_relative_placement(
-                transformation @ ifcopenshell.util.placement.get_local_placement(placement)
-            )
+        if not absolute_placements:
+            return
+
+        # Transform all placements at once, (n, 4, 4) matrices
+        matrices = np.array([ifcopenshell.util.placement.get_local_placement(p) for p in absolute_placements])
+        matrices = transformation @ matrices
+        origins = matrices[:, 0:3, 3]
+        z_axes = matrices[:, 0:3, 2] / np.linalg.norm(matrices[:, 0:3, 2], axis=1)[:, None]
+        x_axes = matrices[:, 0:3, 0] / np.linalg.norm(matrices[:, 0:3, 0], axis=1)[:, None]
+        for placement, origin, z_axis, x_axis in zip(absolute_placements, origins, z_axes, x_axes):
+            placement.RelativePlacement = self.create_ifc_axis_2_placement_3d(origin, z_axis, x_axis)
 
     def get_absolute_placement(self, object_placement):
-        if object_placement.PlacementRelTo:
-            return self.get_absolute_placement(object_placement.PlacementRelTo)
-        return object_placement
+        if (absolute_placement := self.absolute_placements.get(object_placement.id())) is None:
+            if object_placement.PlacementRelTo:
+                absolute_placement = self.get_absolute_placement(object_placement.PlacementRelTo)
+            else:
+                absolute_placement = object_placement
+            self.absolute_placements[object_placement.id()] = absolute_placement
+        return absolute_placement
 
     def identity_matrix(self):
         return np.eye(4)
@@ -159,17 +172,6 @@ class Patcher:
         transformation[1][1] = math.cos(angle)
         return transformation
 
-    def get_relative_placement(self, m):
-        x = np.array((m[0][0], m[1][0], m[2][0]))
-        z = np.array((m[0][2], m[1][2], m[2][2]))
-        o = np.array((m[0][3], m[1][3], m[2][3]))
-        object_matrix = ifcopenshell.util.placement.a2p(o, z, x)
-        return self.create_ifc_axis_2_placement_3d(
-            object_matrix[:, 3][0:3],
-            object_matrix[:, 2][0:3],
-            object_matrix[:, 0][0:3],
-        )
-
     def create_ifc_axis_2_placement_3d(self, point, up, forward):
         return self.file.createIfcAxis2Placement3D(
             self.file.createIfcCartesianPoint(point.tolist()),
@@ -17,7 +17,7 @@
 # along with IfcPatch.  If not, see <http://www.gnu.org/licenses/>.
 
 import ifcopenshell
-import ifcopenshell.util.element
+import ifcpatch.deduplicate
 
 
 class Patcher:
@@ -37,8 +37,8 @@ class Patcher:
         can usually be solved through other means. Consult the BlenderBIM Add-on
         documentation on dealing with large models for more details.
 
-        Warning: this optimise recipe is very, very slow. Please consider using
-        RecycleNonRootedElements instead.
+        Unlike RecycleNonRootedElements, this also merges identical rooted
+        elements.
 
         Example:
 
@@ -49,52 +49,8 @@ class Patcher:
         self.src = src
         self.file = file
         self.logger = logger
-        self.optimized_file = ifcopenshell.file(schema=self.file.schema)
 
     def patch(self):
-        from toposort import toposort_flatten as toposort
-
-        def generate_instances_and_references():
-            """
-            Generator which yields an entity id and
-            the set of all of its references contained in its attributes.
-            """
-            for inst in self.file:
-                yield inst.id(), set(i.id() for i in self.file.traverse(inst)[1:] if i.id())
-
-        instance_mapping = {}
-
-        def map_value(v):
-            """
-            Recursive function which replicates an entity instance, with
-            its attributes, mapping references to already registered
-            instances. Indeed, because of the toposort we know that
-            forward attribute value instances are mapped before the instances
-            that reference them.
-            """
-            if isinstance(v, (list, tuple)):
-                # lists are recursively traversed
-                return type(v)(map(map_value, v))
-            elif isinstance(v, ifcopenshell.entity_instance):
-                if v.id() == 0:
-                    # express simple types are not part of the toposort and just copied
-                    return self.optimized_file.create_entity(v.is_a(), v[0])
-
-                return instance_mapping[v]
-            else:
-                # a plain python value can just be returned
-                return v
-
-        info_to_id = {}
-
-        for id in toposort(dict(generate_instances_and_references())):
-            inst = self.file[id]
-            info = inst.get_info(include_identifier=False, recursive=True, return_type=frozenset)
-            if info in info_to_id:
-                mapped = instance_mapping[inst] = instance_mapping[self.file[info_to_id[info]]]
-
-            else:
-                info_to_id[info] = id
-                instance_mapping[inst] = self.optimized_file.create_entity(inst.is_a(), *map(map_value, inst))
-
-        self.file = self.optimized_file
+        duplicates = ifcpatch.deduplicate.get_duplicates(self.file)
+        ifcpatch.deduplicate.replace_duplicates(self.file, duplicates)
+        self.file = ifcopenshell.file.from_string(ifcpatch.deduplicate.to_string(self.file, duplicates.keys()))
@@ -16,8 +16,7 @@
 # You should have received a copy of the GNU Lesser General Public License
 # along with IfcPatch.  If not, see <http://www.gnu.org/licenses/>.
 
-from collections import deque
-import ifcopenshell.util.element
+import ifcpatch.deduplicate
 
 
 class Patcher:
@@ -37,7 +36,9 @@ class Patcher:
         can usually be solved through other means. Consult the BlenderBIM Add-on
         documentation on dealing with large models for more details.
 
-        This patch may be run multiple times with diminishing returns.
+        Duplicates are found bottom-up, so elements which only become
+        duplicates once the elements they reference are merged are recycled in
+        the same run. Running the patch again has no further effect.
 
         Example:
 
@@ -50,27 +51,6 @@ class Patcher:
         self.logger = logger
 
     def patch(self):
-        deleted = []
-        hashes = {}
-        for element in self.file:
-            if element.is_a("IfcRoot"):
-                continue
-            h = hash(tuple(element))
-            if h in hashes:
-                for inverse in self.file.get_inverse(element):
-                    ifcopenshell.util.element.replace_attribute(inverse, element, hashes[h])
-                deleted.append(element.id())
-            else:
-                hashes[h] = element
-        deleted.sort()
-        deleted_q = deque(deleted)
-        new = ""
-        for line in self.file.wrapped_data.to_string().split("\n"):
-            try:
-                if int(line.split("=")[0][1:]) != deleted_q[0]:
-                    new += line + "\n"
-                else:
-                    deleted_q.popleft()
-            except:
-                new += line + "\n"
-        self.file = new
+        duplicates = ifcpatch.deduplicate.get_duplicates(self.file, exclude=["IfcRoot"])
+        ifcpatch.deduplicate.replace_duplicates(self.file, duplicates)
+        self.file = ifcpatch.deduplicate.to_string(self.file, duplicates.keys())
@@ -17,6 +17,9 @@
 # along with IfcPatch.  If not, see <http://www.gnu.org/licenses/>.
 
 import ifcopenshell
+import ifcopenshell.guid
+import ifcopenshell.util.schema
+import ifcpatch.stream
 from logging import Logger
 
 
@@ -32,6 +35,9 @@ class Patcher:
 
         This will regenerate new GlobalIds for the entire model.
 
+        This recipe supports streaming, so large models can be patched without
+        loading them by omitting the file.
+
         :param only_duplicates: If set to True, new GlobalIds will only be
             generated for duplicate IDs. This is a safe thing to run to ensure
             IFCs are valid. If False, all GlobalIds will be regenerated.
@@ -46,6 +52,9 @@ class Patcher:
 
             # Regenerate only duplicate GlobalIds
             ifcpatch.execute({"input": "input.ifc", "file": model, "recipe": "RegenerateGlobalIds", "arguments": [True]})
+
+            # Regenerate all GlobalIds without loading the model
+            output = ifcpatch.execute({"input": "input.ifc", "recipe": "RegenerateGlobalIds", "arguments": []})
         """
         self.src = src
         self.file = file
@@ -53,28 +62,52 @@ class Patcher:
         self.only_duplicates = only_duplicates
 
     def patch(self):
-        if self.only_duplicates:
-            duplicates = 0
-            invalid_ids = 0
-
-            guids = set()
-            for element in self.file.by_type("IfcRoot"):
-                if element.GlobalId in guids:
-                    element.GlobalId = ifcopenshell.guid.new()
-                    duplicates += 1
-                elif len(element.GlobalId) != 22 or element.GlobalId[0] not in "0123":
-                    element.GlobalId = ifcopenshell.guid.new()
-                    invalid_ids += 1
-                else:
-                    try:
-                        ifcopenshell.guid.expand(element.GlobalId)
-                    except:
-                        element.GlobalId = ifcopenshell.guid.new()
-                    invalid_ids += 1
-                guids.add(element.GlobalId)
-
-            print("Replaced %s duplicate GlobalIds" % duplicates)
-            print("Replaced %s invalid GlobalIds" % invalid_ids)
+        self.guids = set()
+        self.duplicates = 0
+        self.invalid_ids = 0
+        for element in self.file.by_type("IfcRoot"):
+            if (global_id := self.regenerate(element.GlobalId)) != element.GlobalId:
+                element.GlobalId = global_id
+        self.report()
+
+    def stream(self, reader: ifcpatch.stream.reader, writer: ifcpatch.stream.writer) -> None:
+        self.guids = set()
+        self.duplicates = 0
+        self.invalid_ids = 0
+        schema = ifcopenshell.ifcopenshell_wrapper.schema_by_name(reader.schema)
+        root = schema.declaration_by_name("IfcRoot")
+        rooted = {d.name().upper() for d in ifcopenshell.util.schema.get_subtypes(root)}
+        for _, ifc_class, record in reader:
+            if ifc_class.upper() in rooted:
+                # The GlobalId is always the first attribute of rooted elements
+                start = record.index("(") + 1
+                if record[start] == "'":
+                    end = record.index("'", start + 1)
+                    global_id = record[start + 1 : end]
+                    if (new_global_id := self.regenerate(global_id)) != global_id:
+                        record = f"{record[:start + 1]}{new_global_id}{record[end:]}"
+            writer.write(record)
+        self.report()
+
+    def regenerate(self, global_id: str) -> str:
+        if not self.only_duplicates:
+            return ifcopenshell.guid.new()
+        if global_id in self.guids:
+            global_id = ifcopenshell.guid.new()
+            self.duplicates += 1
+        elif len(global_id) != 22 or global_id[0] not in "0123":
+            global_id = ifcopenshell.guid.new()
+            self.invalid_ids += 1
         else:
-            for element in self.file.by_type("IfcRoot"):
-                element.GlobalId = ifcopenshell.guid.new()
+            try:
+                ifcopenshell.guid.expand(global_id)
+            except:
+                global_id = ifcopenshell.guid.new()
+                self.invalid_ids += 1
+        self.guids.add(global_id)
+        return global_id
+
+    def report(self) -> None:
+        if self.only_duplicates:
+            print("Replaced %s duplicate GlobalIds" % self.duplicates)
+            print("Replaced %s invalid GlobalIds" % self.invalid_ids)
@@ -16,6 +16,10 @@
 # You should have received a copy of the GNU Lesser General Public License
 # along with IfcPatch.  If not, see <http://www.gnu.org/licenses/>.
 
+import time
+import numpy as np
+import ifcopenshell
+
 
 class Patcher:
     def __init__(self, src, file, logger, mode="geometry", a=None, b=None, c=None, d=None):
@@ -98,9 +102,15 @@ class Patcher:
         self.args = [x for x in [a, b, c, d] if x is not None]
 
     def patch(self):
+        start = time.perf_counter()
         placement_coord_ids = set()
         for placement in self.file.by_type("IfcObjectPlacement"):
-            [placement_coord_ids.add(e.id()) for e in self.file.traverse(placement) if e.is_a("IfcCartesianPoint")]
+            # Placements that are referenced are collected separately
+            for value in placement:
+                for reference in self.get_references(value):
+                    if not reference.is_a("IfcObjectPlacement"):
+                        traversed = self.file.traverse(reference)
+                        placement_coord_ids.update(e.id() for e in traversed if e.is_a("IfcCartesianPoint"))
 
         # Arbitrary threshold based on experience
         self.threshold = 1000000
@@ -113,49 +123,63 @@ class Patcher:
         # assumes that absolute coordinates are easily recognisable based on
         # having a large absolute value above a threshold. This is not always
         # the case, but is very fast to run, and works for most cases.
-        offset_point = None
+        self.offset_point = None
         if self.args and len(self.args) >= 3:
-            offset_point = (float(self.args[0]), float(self.args[1]), float(self.args[2]))
+            self.offset_point = np.array((float(self.args[0]), float(self.args[1]), float(self.args[2])))
         try:
             point_lists = self.file.by_type("IfcCartesianPointList3D")
         except:
             # IFC2X3 does not have IfcCartesianPointList3D
             point_lists = []
+        total_points = 0
         for point_list in point_lists:
-            coord_list = [None] * len(point_list.CoordList)
-            for i, point in enumerate(point_list.CoordList):
-                if len(point) == 2 or not self.is_point_far_away(point):
-                    coord_list[i] = point
-                    continue
-                if not offset_point:
-                    offset_point = (-point[0], -point[1], -point[2])
-                    self.logger.info(f"Resetting absolute coordinates by {point}")
-                point = (point[0] + offset_point[0], point[1] + offset_point[1], point[2] + offset_point[2])
-                coord_list[i] = point
-            point_list.CoordList = coord_list
-        for point in self.file.by_type("IfcCartesianPoint"):
-            if len(point.Coordinates) == 2 or not self.is_point_far_away(point):
-                continue
+            coord_list = np.array(point_list.CoordList, dtype=float).reshape((-1, 3))
+            total_points += len(coord_list)
+            if self.reset_coordinates(coord_list, np.ones(len(coord_list), dtype=bool)).any():
+                point_list.CoordList = coord_list.tolist()
+
+        points = self.file.by_type("IfcCartesianPoint")
+        total_points += len(points)
+        # Reading by index avoids the attribute name lookup for every point
+        coordinates = [p[0] for p in points]
+        is_3d = np.array([len(c) == 3 for c in coordinates], dtype=bool)
+        if is_3d.any():
+            points = [p for p, eligible in zip(points, is_3d) if eligible]
+            coord_list = np.array([c for c, eligible in zip(coordinates, is_3d) if eligible], dtype=float)
             if self.mode == "geometry":
-                if point.id() in placement_coord_ids:
-                    continue
+                eligible = np.array([p.id() not in placement_coord_ids for p in points], dtype=bool)
             elif self.mode == "placement":
-                if point.id() not in placement_coord_ids:
-                    continue
-            if not offset_point:
-                offset_point = (-point.Coordinates[0], -point.Coordinates[1], -point.Coordinates[2])
-                self.logger.info(f"Resetting absolute coordinates by {point}")
-            point.Coordinates = (
-                point.Coordinates[0] + offset_point[0],
-                point.Coordinates[1] + offset_point[1],
-                point.Coordinates[2] + offset_point[2],
-            )
-
-    def is_point_far_away(self, point):
-        if hasattr(point, "Coordinates"):
-            return (
-                abs(point.Coordinates[0]) > self.threshold
-                or abs(point.Coordinates[1]) > self.threshold
-                or abs(point.Coordinates[2]) > self.threshold
-            )
-        return abs(point[0]) > self.threshold or abs(point[1]) > self.threshold or abs(point[2]) > self.threshold
+                eligible = np.array([p.id() in placement_coord_ids for p in points], dtype=bool)
+            else:
+                eligible = np.ones(len(points), dtype=bool)
+            far_away = self.reset_coordinates(coord_list, eligible)
+            for i in np.flatnonzero(far_away):
+                points[i].Coordinates = coord_list[i].tolist()
+
+        duration = max(time.perf_counter() - start, 1e-9)
+        self.logger.info(f"Checked {total_points} points in {duration:.2f}s ({total_points / duration:.0f} points/s)")
+
+    def get_references(self, value):
+        if isinstance(value, ifcopenshell.entity_instance):
+            if value.id():
+                yield value
+        elif isinstance(value, tuple):
+            for v in value:
+                yield from self.get_references(v)
+
+    def reset_coordinates(self, coord_list: np.ndarray, eligible: np.ndarray) -> np.ndarray:
+        """Offsets the eligible coordinates that are far away in place
+
+        :return: A boolean mask of the coordinates that were offset
+        """
+        far_away = eligible & self.is_point_far_away(coord_list)
+        if far_away.any():
+            if self.offset_point is None:
+                point = coord_list[np.argmax(far_away)]
+                self.offset_point = -point
+                self.logger.info(f"Resetting absolute coordinates by {point.tolist()}")
+            coord_list[far_away] += self.offset_point
+        return far_away
+
+    def is_point_far_away(self, coord_list: np.ndarray) -> np.ndarray:
+        return (np.abs(coord_list) > self.threshold).any(axis=1)
@@ -17,68 +17,460 @@
 # along with IfcPatch.  If not, see <http://www.gnu.org/licenses/>.
 
 
+import re
+import array
+import multiprocessing
+import ifcopenshell
+import ifcopenshell.util.schema
+import ifcpatch.stream
+from typing import Callable, Iterable, Iterator, Optional, Union
+
+# Matches quoted strings as a whole, so that references inside them are skipped
+TOKEN_PATTERN = re.compile(r"'(?:[^']|'')*'|[()]|#(\d+)")
+
+
 class Patcher:
-    def __init__(self, src, file, logger, output_dir=None):
+    def __init__(self, src, file, logger, output_dir=None, jobs=1):
         """Split an IFC model into multiple models based on building storey
 
         The new IFC model names will be named after the storey name in the
         format of {i}-{name}.ifc, where {i} is an ascending number starting from
         0 and {name} is the name of the storey.
 
+        The model is partitioned once: resources shared by all storeys (such as
+        the spatial structure, contexts and units) are collected a single time,
+        and all storey models are then written in a single pass over the model.
+
+        This recipe supports streaming. If the file is omitted, the model is
+        not loaded. Instead, the input is read twice: once to index the
+        references between instances, and once to write the storey models.
+
         :param output_dir: Specifies an output directory where the new IFC models will be saved.
         :type output_dir: str
+        :param jobs: The number of processes to write the storey models with.
+        :type jobs: int
 
         Example:
 
         .. code:: python
 
             ifcpatch.execute({"input": "input.ifc", "file": model, "recipe": "SplitByBuildingStorey", "arguments": ["C:/.../output_files"]})
+
+            # Write the storey models using 4 processes
+            ifcpatch.execute({"input": "input.ifc", "file": model, "recipe": "SplitByBuildingStorey", "arguments": ["C:/.../output_files", 4]})
+
+            # Split a large model without loading it
+            ifcpatch.execute({"input": "input.ifc", "recipe": "SplitByBuildingStorey", "arguments": ["C:/.../output_files"]})
         """
         self.src = src
         self.file = file
         self.logger = logger
         self.output_dir = output_dir
+        self.jobs = int(jobs)
 
     def patch(self):
-        import ifcopenshell
-        from shutil import copyfile
-
-        storeys = self.file.by_type("IfcBuildingStorey")
-        for i, storey in enumerate(storeys):
-            dest = (
-                "{}-{}.ifc".format(i, storey.Name)
-                if self.output_dir == None
-                else "{}/{}-{}.ifc".format(self.output_dir, i, storey.Name)
-            )
-            copyfile(self.src, dest)
-            old_ifc = ifcopenshell.open(dest)
-            new_ifc = ifcopenshell.file(schema=self.file.schema)
-            if self.file.schema == "IFC2X3":
-                elements = old_ifc.by_type("IfcProject") + old_ifc.by_type("IfcProduct")
+        self.storeys = self.file.by_type("IfcBuildingStorey")
+        storey_indices = {}
+        for i, storey in enumerate(self.storeys):
+            storey_indices.setdefault(storey.GlobalId, []).append(i)
+
+        self.elements = set()
+        self.storey_elements = [set() for _ in self.storeys]
+        for element in self.file.by_type("IfcElement"):
+            self.elements.add(element.id())
+            if element.ContainedInStructure:
+                structure = element.ContainedInStructure[0].RelatingStructure
+                if structure.is_a("IfcBuildingStorey"):
+                    for i in storey_indices[structure.GlobalId]:
+                        self.storey_elements[i].add(element.id())
+
+        # Elements are only included in the model of the storey they are
+        # contained in, so references to them from other instances are removed
+        self.referrers = {r.id() for e in self.elements for r in self.file.get_inverse(self.file.by_id(e))}
+
+        if self.file.schema == "IFC2X3":
+            products = self.file.by_type("IfcProject") + self.file.by_type("IfcProduct")
+        else:
+            products = self.file.by_type("IfcContext") + self.file.by_type("IfcProduct")
+        self.shared = self.get_closure([p for p in products if p.id() not in self.elements])
+
+        self.owners: dict[int, list[int]] = {}
+        for i, element_ids in enumerate(self.storey_elements):
+            for instance_id in self.get_closure([self.file.by_id(e) for e in element_ids], self.shared):
+                self.owners.setdefault(instance_id, []).append(i)
+
+        self.write_all_storeys(self.file.schema)
+
+    def stream(self, reader: ifcpatch.stream.reader, writer: ifcpatch.stream.writer) -> None:
+        schema = ifcopenshell.ifcopenshell_wrapper.schema_by_name(reader.schema)
+        self.index = ReferenceIndex()
+        storey_records = []
+        containers = {}
+        for instance_id, ifc_class, record in reader:
+            # The patched output is the unchanged input, as when the model is loaded
+            writer.write(record)
+            self.index.add(instance_id, ifc_class, get_references(record))
+            if ifc_class.upper() == "IFCBUILDINGSTOREY":
+                storey_records.append(record)
+            elif ifc_class.upper() == "IFCRELCONTAINEDINSPATIALSTRUCTURE":
+                related_elements, relating_structure = get_containment(record)
+                for element_id in related_elements:
+                    containers.setdefault(element_id, relating_structure)
+
+        # Only storeys are loaded, to decode their names and GlobalIds
+        storeys = ifcopenshell.file.from_string(
+            "".join(reader.header) + "\n".join(storey_records) + "\nENDSEC;\nEND-ISO-10303-21;\n"
+        )
+        self.storeys = storeys.by_type("IfcBuildingStorey")
+        storey_global_ids = {storey.id(): storey.GlobalId for storey in self.storeys}
+        storey_indices = {}
+        for i, storey in enumerate(self.storeys):
+            storey_indices.setdefault(storey.GlobalId, []).append(i)
+
+        get_codes = lambda name: self.index.get_codes(get_subtypes(schema, name))
+        element_codes = get_codes("IfcElement")
+        item_codes = get_codes("IfcRepresentationItem")
+        product_codes = get_codes("IfcProduct") | get_codes("IfcProject" if reader.schema == "IFC2X3" else "IfcContext")
+
+        self.elements = IdSet()
+        self.storey_elements = [set() for _ in self.storeys]
+        for element_id in self.index.get_ids(element_codes):
+            self.elements.add(element_id)
+            if (global_id := storey_global_ids.get(containers.get(element_id))) is not None:
+                for i in storey_indices[global_id]:
+                    self.storey_elements[i].add(element_id)
+
+        # Only the inverses that the closure traverses are indexed
+        styled_item_codes = get_codes("IfcStyledItem")
+        self.index.build_inverses({c: None for c in product_codes} | {c: styled_item_codes for c in item_codes})
+        self.referrers = IdSet()
+        for element_id in self.index.get_ids(element_codes):
+            for referrer in self.index.get_inverses(element_id):
+                self.referrers.add(referrer)
+
+        self.shared = IdSet()
+        products = [i for i in self.index.get_ids(product_codes) if i not in self.elements]
+        self.get_stream_closure(products, item_codes, self.shared.add)
+
+        self.owners = IdOwners()
+        for i, element_ids in enumerate(self.storey_elements):
+            add = lambda instance_id: instance_id not in self.shared and self.owners.add(instance_id, i)
+            self.get_stream_closure(element_ids, item_codes, add)
+
+        self.write_all_storeys(reader.schema)
+
+    def write_all_storeys(self, schema: str) -> None:
+        header = ifcopenshell.file(schema=schema).wrapped_data.to_string()
+        self.header = header[: header.index("DATA;") + len("DATA;")] + "\n"
+
+        if self.jobs > 1 and "fork" in multiprocessing.get_all_start_methods():
+            global _split_context
+            _split_context = self
+            try:
+                with multiprocessing.get_context("fork").Pool(self.jobs) as pool:
+                    pool.map(_write_storeys, [range(i, len(self.storeys), self.jobs) for i in range(self.jobs)])
+            finally:
+                _split_context = None
+        else:
+            self.write_storeys(range(len(self.storeys)))
+
+    def get_closure(self, products: list[ifcopenshell.entity_instance], shared: set[int] = frozenset()) -> set[int]:
+        """Collects the products, their relationships and everything they reference
+
+        The traversal stops at elements, which are only included as products.
+        Instances which are already shared by all storeys are skipped.
+        """
+        closure = set()
+        queue = []
+        for product in products:
+            queue.append(product)
+            queue.extend(self.file.get_inverse(product))
+        while queue:
+            inst = queue.pop()
+            if inst.id() in closure or inst.id() in shared:
+                continue
+            closure.add(inst.id())
+            if inst.is_a("IfcRepresentationItem"):
+                queue.extend(inst.StyledByItem)
+            for reference in self.file.traverse(inst, max_levels=1)[1:]:
+                if reference.id() and reference.id() not in self.elements:
+                    queue.append(reference)
+        return closure
+
+    def get_stream_closure(self, products: Iterable[int], item_codes: set[int], add: Callable[[int], bool]) -> None:
+        """Collects the same closure as get_closure from the reference index
+
+        Each step id in the closure is passed to add, which returns False if
+        it was already collected, so that its references are not traversed.
+        """
+        queue = []
+        for product in products:
+            queue.append(product)
+            queue.extend(self.index.get_inverses(product))
+        while queue:
+            instance_id = queue.pop()
+            if instance_id not in self.index or not add(instance_id):
+                continue
+            if self.index.is_a(instance_id, item_codes):
+                queue.extend(self.index.get_inverses(instance_id))
+            for reference in self.index.get_references(instance_id):
+                if reference not in self.elements:
+                    queue.append(reference)
+
+    def get_records(self) -> Iterator[tuple[int, Union[str, ifcopenshell.entity_instance]]]:
+        """Yields each step id with its record, or with its instance if the model is loaded"""
+        if self.file is None:
+            with ifcpatch.stream.reader(self.src) as reader:
+                for instance_id, _, record in reader:
+                    yield instance_id, record
+        else:
+            for inst in self.file:
+                yield inst.id(), inst
+
+    def write_storeys(self, indices: range) -> None:
+        writers = {i: ifcpatch.stream.writer(self.get_filepath(i), [self.header]) for i in indices}
+        is_excluded = {i: self.get_excluded_predicate(i) for i in indices}
+        try:
+            for instance_id, inst in self.get_records():
+                storeys = writers.keys() if instance_id in self.shared else self.owners.get(instance_id, ())
+                record = None
+                for i in storeys:
+                    if i not in writers:
+                        continue
+                    if record is None:
+                        record = inst if isinstance(inst, str) else inst.to_string() + ";"
+                    if instance_id in self.referrers:
+                        writers[i].write(remove_references(record, is_excluded[i]))
+                    else:
+                        writers[i].write(record)
+        finally:
+            for writer in writers.values():
+                writer.close()
+
+    def get_excluded_predicate(self, i: int):
+        storey_elements = self.storey_elements[i]
+        return lambda reference: reference in self.elements and reference not in storey_elements
+
+    def get_filepath(self, i: int) -> str:
+        name = self.storeys[i].Name
+        if self.output_dir == None:
+            return "{}-{}.ifc".format(i, name)
+        return "{}/{}-{}.ifc".format(self.output_dir, i, name)
+
+
+_split_context = None
+
+
+def _write_storeys(indices: range) -> None:
+    _split_context.write_storeys(indices)
+
+
+def get_subtypes(schema, ifc_class: str) -> set[str]:
+    declaration = schema.declaration_by_name(ifc_class)
+    return {d.name().upper() for d in ifcopenshell.util.schema.get_subtypes(declaration)}
+
+
+def get_references(record: str) -> list[int]:
+    return [int(m.group(1)) for m in TOKEN_PATTERN.finditer(record, record.index("(")) if m.group(1)]
+
+
+def get_containment(record: str) -> tuple[list[int], Optional[int]]:
+    """Gets the RelatedElements and RelatingStructure of a containment record
+
+    The related elements are the only references in an aggregate, and the
+    relating structure is the last attribute.
+    """
+    related_elements = []
+    relating_structure = None
+    depth = 0
+    for match in TOKEN_PATTERN.finditer(record, record.index("(")):
+        token = match.group()
+        if token == "(":
+            depth += 1
+        elif token == ")":
+            depth -= 1
+        elif match.group(1):
+            if depth == 2:
+                related_elements.append(int(match.group(1)))
             else:
-                elements = old_ifc.by_type("IfcContext") + old_ifc.by_type("IfcProduct")
-            inverse_elements = []
-            for element in elements:
-                if element.is_a("IfcElement") and not self.is_in_storey(element, storey):
-                    element.Representation = None
+                relating_structure = int(match.group(1))
+    return related_elements, relating_structure
+
+
+def resize(values: array.array, size: int, fill: int = 0) -> None:
+    """Grows an array indexed by step id, so that ids up to size - 1 fit"""
+    if size > len(values):
+        size = max(size, len(values) * 2)
+        values.frombytes(bytes([fill]) * ((size - len(values)) * values.itemsize))
+
+
+class IdSet:
+    """A set of step ids, stored as one byte per id
+
+    SPF files are usually numbered contiguously, so this is much smaller than
+    a set of integers.
+    """
+
+    def __init__(self):
+        self.flags = array.array("B")
+
+    def add(self, instance_id: int) -> bool:
+        resize(self.flags, instance_id + 1)
+        if self.flags[instance_id]:
+            return False
+        self.flags[instance_id] = 1
+        return True
+
+    def __contains__(self, instance_id: int) -> bool:
+        return instance_id < len(self.flags) and self.flags[instance_id] == 1
+
+
+class IdOwners:
+    """The storey indices that each step id belongs to
+
+    Most instances belong to a single storey, which is stored in an array.
+    Only instances belonging to several storeys are stored in a dictionary.
+    """
+
+    NONE = -1
+    SEVERAL = -2
+
+    def __init__(self):
+        self.owners = array.array("i")
+        self.several: dict[int, list[int]] = {}
+
+    def add(self, instance_id: int, owner: int) -> bool:
+        resize(self.owners, instance_id + 1, fill=0xFF)
+        current = self.owners[instance_id]
+        if current == self.NONE:
+            self.owners[instance_id] = owner
+        elif current == owner:
+            return False
+        elif current == self.SEVERAL:
+            if owner in self.several[instance_id]:
+                return False
+            self.several[instance_id].append(owner)
+        else:
+            self.owners[instance_id] = self.SEVERAL
+            self.several[instance_id] = [current, owner]
+        return True
+
+    def get(self, instance_id: int, default=()) -> Iterable[int]:
+        if instance_id >= len(self.owners) or (owner := self.owners[instance_id]) == self.NONE:
+            return default
+        elif owner == self.SEVERAL:
+            return self.several[instance_id]
+        return (owner,)
+
+
+class ReferenceIndex:
+    """The classes and references of every instance in an SPF file
+
+    Everything is stored in flat arrays indexed by step id, instead of as
+    entity instances, so the index of a model is a small fraction of the
+    size of the loaded model.
+    """
+
+    def __init__(self):
+        self.class_codes: dict[str, int] = {}
+        self.classes = array.array("H")  # 0 if there is no instance with that id
+        self.starts = array.array("q")
+        self.ends = array.array("q")
+        self.references = array.array("q")
+        self.inverse_starts = array.array("q")
+        self.inverses = array.array("q")
+
+    def add(self, instance_id: int, ifc_class: str, references: list[int]) -> None:
+        ifc_class = ifc_class.upper()
+        if (code := self.class_codes.get(ifc_class)) is None:
+            code = self.class_codes[ifc_class] = len(self.class_codes) + 1
+        for values in (self.classes, self.starts, self.ends):
+            resize(values, instance_id + 1)
+        self.classes[instance_id] = code
+        self.starts[instance_id] = len(self.references)
+        self.references.extend(references)
+        self.ends[instance_id] = len(self.references)
+
+    def __contains__(self, instance_id: int) -> bool:
+        return instance_id < len(self.classes) and self.classes[instance_id] != 0
+
+    def is_a(self, instance_id: int, codes: set[int]) -> bool:
+        return self.classes[instance_id] in codes
+
+    def get_codes(self, ifc_classes: set[str]) -> set[int]:
+        return {code for ifc_class, code in self.class_codes.items() if ifc_class in ifc_classes}
+
+    def get_ids(self, codes: set[int]) -> list[int]:
+        return [instance_id for instance_id, code in enumerate(self.classes) if code in codes]
+
+    def get_references(self, instance_id: int) -> array.array:
+        return self.references[self.starts[instance_id] : self.ends[instance_id]]
+
+    def get_inverses(self, instance_id: int) -> array.array:
+        if instance_id + 1 >= len(self.inverse_starts):
+            return array.array("q")
+        return self.inverses[self.inverse_starts[instance_id] : self.inverse_starts[instance_id + 1]]
+
+    def build_inverses(self, referrer_codes: dict[int, Optional[set[int]]]) -> None:
+        """Indexes the inverse references of some classes of instances
+
+        :param referrer_codes: Maps the class code of referenced instances to
+            the class codes of the referrers to index, or None for all.
+        """
+        counts = array.array("q", bytes(8 * (len(self.classes) + 1)))
+        for _, reference in self.get_kept_references(referrer_codes):
+            counts[reference + 1] += 1
+        for i in range(1, len(counts)):
+            counts[i] += counts[i - 1]
+        self.inverse_starts = counts
+        self.inverses = array.array("q", bytes(8 * counts[-1]))
+        positions = array.array("q", counts)
+        for referrer, reference in self.get_kept_references(referrer_codes):
+            self.inverses[positions[reference]] = referrer
+            positions[reference] += 1
+
+    def get_kept_references(self, referrer_codes: dict[int, Optional[set[int]]]) -> Iterator[tuple[int, int]]:
+        classes = self.classes
+        total_classes = len(classes)
+        for referrer, code in enumerate(classes):
+            if not code:
+                continue
+            for reference in self.references[self.starts[referrer] : self.ends[referrer]]:
+                if reference >= total_classes or (reference_code := classes[reference]) not in referrer_codes:
                     continue
-                if element.is_a("IfcElement"):
-                    styled_rep_items = [
-                        i for i in old_ifc.traverse(element) if i.is_a("IfcRepresentationItem") and i.StyledByItem
-                    ]
-                    [new_ifc.add(i.StyledByItem[0]) for i in styled_rep_items]
-                new_ifc.add(element)
-                inverse_elements.extend(old_ifc.get_inverse(element))
-            for inverse_element in inverse_elements:
-                new_ifc.add(inverse_element)
-            for element in new_ifc.by_type("IfcElement"):
-                if not self.is_in_storey(element, storey):
-                    new_ifc.remove(element)
-            new_ifc.write(dest)
-
-    def is_in_storey(self, element, storey):
-        return (
-            element.ContainedInStructure
-            and element.ContainedInStructure[0].RelatingStructure.is_a("IfcBuildingStorey")
-            and element.ContainedInStructure[0].RelatingStructure.GlobalId == storey.GlobalId
-        )
+                if (codes := referrer_codes[reference_code]) is None or code in codes:
+                    yield referrer, reference
+
+
+def remove_references(record: str, is_excluded) -> str:
+    """Removes excluded references from an SPF record
+
+    References in aggregates are dropped from the aggregate, other references
+    are replaced by $, similar to what happens when removing an instance.
+    """
+    result = []
+    depth = 0
+    position = 0
+    for match in TOKEN_PATTERN.finditer(record, record.index("(")):
+        token = match.group()
+        if token == "(":
+            depth += 1
+        elif token == ")":
+            depth -= 1
+        elif match.group(1) and is_excluded(int(match.group(1))):
+            result.append(record[position : match.start()])
+            position = match.end()
+            if depth == 1:
+                result.append("$")
+                continue
+            # Drop the comma after the reference, or before it if it is the last item
+            rest = record[position:]
+            if rest.lstrip().startswith(","):
+                position += len(rest) - len(rest.lstrip()) + 1
+            else:
+                while result and not result[-1].strip():
+                    result.pop()
+                if result and result[-1].rstrip().endswith(","):
+                    result[-1] = result[-1].rstrip()[:-1]
+    result.append(record[position:])
+    return "".join(result)
@@ -16,13 +16,16 @@
 # You should have received a copy of the GNU Lesser General Public License
 # along with IfcPatch.  If not, see <http://www.gnu.org/licenses/>.
 
+import hashlib
+import collections
 import ifcopenshell
-import ifcopenshell.api
 import ifcopenshell.geom
 import ifcopenshell.util.selector
-import ifcopenshell.util.shape
 import ifcopenshell.util.representation
+import ifcopenshell.util.unit
 import multiprocessing
+import numpy as np
+import numpy.typing as npt
 from logging import Logger
 
 
@@ -34,6 +37,7 @@ class Patcher:
         logger: Logger,
         query: str = "IfcBeam",
         force_faceted_brep: bool = False,
+        instance_meshes: bool = False,
     ):
         """Convert element body representations to tessellations or faceted breps
 
@@ -47,21 +51,28 @@ class Patcher:
 
         :param query: Query string to filter out elements to convert, defaults to "IfcBeam"
         :type query: str
-        :param force_faceted_brep: Force using IfcFacetedBreps instead of IfcPolygonalFaceSets,
+        :param force_faceted_brep: Force using IfcFacetedBreps instead of IfcTriangulatedFaceSets,
             defaults to `False`
         :type force_faceted_brep: bool
+        :param instance_meshes: Share identical meshes between elements using
+            mapped items instead of duplicating them, defaults to `False`
+        :type instance_meshes: bool
 
         Example:
 
         .. code:: python
 
             ifcpatch.execute({"input": "input.ifc", "file": model, "recipe": "TessellateElements", "arguments": ["IfcBeam", False]})
+
+            # Identical meshes are only stored once
+            ifcpatch.execute({"input": "input.ifc", "file": model, "recipe": "TessellateElements", "arguments": ["IfcBeam", False, True]})
         """
         self.src = src
         self.file = file
         self.logger = logger
         self.query = query
         self.force_faceted_brep = force_faceted_brep
+        self.instance_meshes = instance_meshes
 
     def patch(self):
         context = ifcopenshell.util.representation.get_context(self.file, "Model", "Body", "MODEL_VIEW")
@@ -74,29 +85,80 @@ class Patcher:
         settings.set(settings.STRICT_TOLERANCE, True)
         settings.set_context_ids([context.id()])
         iterator = ifcopenshell.geom.iterator(settings, self.file, multiprocessing.cpu_count(), include=elements)
+        meshes = {}
         replacements = {}
         if iterator.initialize():
             while True:
                 shape = iterator.get()
-                element = self.file.by_guid(shape.guid)
-                v = [[x.tolist() for x in ifcopenshell.util.shape.get_vertices(shape.geometry)]]
-                f = [ifcopenshell.util.shape.get_faces(shape.geometry)]
-                replacements[element] = (v, f)
+                vertices = np.frombuffer(shape.geometry.verts_buffer).reshape((-1, 3))
+                faces = np.frombuffer(shape.geometry.faces_buffer, dtype=np.int32).reshape((-1, 3))
+                # Meshes are in local coordinates, so identical buffers can be shared between elements
+                key = hashlib.blake2b(vertices.tobytes() + faces.tobytes()).digest()
+                meshes.setdefault(key, (vertices, faces))
+                replacements[self.file.by_id(shape.id)] = key
                 if not iterator.next():
                     break
 
         # Do the replacements outside the iterator to prevent messing up iterator state.
-        for element, geometry in replacements.items():
-            v, f = geometry
-            mesh = ifcopenshell.api.run(
-                "geometry.add_mesh_representation",
-                self.file,
-                context=context,
-                vertices=v,
-                faces=f,
-                force_faceted_brep=self.force_faceted_brep,
-            )
-            representations = element.Representation.Representations
-            representations = [r for r in representations if r.ContextOfItems != context]
-            representations.append(mesh)
-            element.Representation.Representations = representations
+        self.context = context
+        self.unit_scale = ifcopenshell.util.unit.calculate_unit_scale(self.file)
+        self.use_faceted_brep = self.force_faceted_brep or self.file.schema == "IFC2X3"
+        self.mapping_target = None
+        usages = collections.Counter(replacements.values())
+
+        representation_maps = {}
+        for element, key in replacements.items():
+            if self.instance_meshes and usages[key] > 1:
+                if (representation_map := representation_maps.get(key)) is None:
+                    representation = self.create_representation(*meshes[key])
+                    representation_map = representation_maps[key] = self.create_representation_map(representation)
+                representation = self.create_mapped_representation(representation_map)
+            else:
+                representation = self.create_representation(*meshes[key])
+            element_representations = element.Representation.Representations
+            element_representations = [r for r in element_representations if r.ContextOfItems != context]
+            element_representations.append(representation)
+            element.Representation.Representations = element_representations
+
+    def create_representation(self, vertices: npt.NDArray[np.float64], faces: npt.NDArray[np.int32]):
+        """Creates a mesh representation directly from the iterator buffers
+
+        Unlike geometry.add_mesh_representation, coordinates are converted for
+        the whole mesh at once and triangles are stored as the coordinate index
+        of a single IfcTriangulatedFaceSet rather than as one entity each.
+        """
+        coordinates = (vertices / self.unit_scale).tolist()
+        if self.use_faceted_brep:
+            points = [self.file.createIfcCartesianPoint(co) for co in coordinates]
+            ifc_faces = [
+                self.file.createIfcFace(
+                    [self.file.createIfcFaceOuterBound(self.file.createIfcPolyLoop([points[v] for v in f]), True)]
+                )
+                for f in faces.tolist()
+            ]
+            item = self.file.createIfcFacetedBrep(self.file.createIfcClosedShell(ifc_faces))
+            representation_type = "Brep"
+        else:
+            point_list = self.file.createIfcCartesianPointList3D(coordinates)
+            item = self.file.createIfcTriangulatedFaceSet(point_list, None, None, (faces + 1).tolist())
+            representation_type = "Tessellation"
+        return self.file.createIfcShapeRepresentation(
+            self.context, self.context.ContextIdentifier, representation_type, [item]
+        )
+
+    def create_representation_map(self, representation: ifcopenshell.entity_instance) -> ifcopenshell.entity_instance:
+        if self.mapping_target is None:
+            zero = self.file.createIfcCartesianPoint((0.0, 0.0, 0.0))
+            x_axis = self.file.createIfcDirection((1.0, 0.0, 0.0))
+            z_axis = self.file.createIfcDirection((0.0, 0.0, 1.0))
+            self.mapping_origin = self.file.createIfcAxis2Placement3D(zero, z_axis, x_axis)
+            self.mapping_target = self.file.createIfcCartesianTransformationOperator3D(None, None, zero, None, None)
+        return self.file.createIfcRepresentationMap(self.mapping_origin, representation)
+
+    def create_mapped_representation(
+        self, representation_map: ifcopenshell.entity_instance
+    ) -> ifcopenshell.entity_instance:
+        mapped_item = self.file.createIfcMappedItem(representation_map, self.mapping_target)
+        return self.file.createIfcShapeRepresentation(
+            self.context, self.context.ContextIdentifier, "MappedRepresentation", [mapped_item]
+        )
@@ -0,0 +1,139 @@
+# IfcPatch - IFC patching utiliy
+# Copyright (C) 2020, 2021 Dion Moult <dion@thinkmoult.com>
+#
+# This file is part of IfcPatch.
+#
+# IfcPatch is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# IfcPatch is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with IfcPatch.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Reading and writing SPF records without loading a model
+
+Recipes that can process a model record by record define a ``stream(reader,
+writer)`` method on their Patcher. When ifcpatch.execute() is called without
+a loaded model, the records of the input file are passed through the reader
+and the patched records are written to a temporary file as they are emitted,
+so that neither the input nor the output model are ever held in memory.
+
+Recipes which need random access to the input may use
+``ifcopenshell.open(path, should_stream=True)`` alongside the reader.
+"""
+
+import re
+from typing import Iterator, Optional
+
+RECORD_PATTERN = re.compile(r"#(\d+)\s*=\s*([A-Za-z0-9_]+)\s*\(")
+
+# Complete strings and comments are matched as a whole, so that any ; inside
+# them is skipped. A lone quote or comment opener means that the string or
+# comment continues on the next line.
+STATEMENT_PATTERN = re.compile(r"'(?:[^']|'')*'|/\*.*?\*/|;|'|/\*", re.DOTALL)
+
+
+class reader:
+    """Iterates over the (step id, IFC class, record) tuples of an SPF file
+
+    The IFC class is in upper case, as it appears in the file. Records are
+    returned without comments, surrounding whitespace or a trailing newline,
+    but are otherwise unchanged, including records and strings which span
+    multiple lines. A ValueError is raised for anything in the data section
+    which is not a simple entity instance, instead of skipping it.
+    """
+
+    def __init__(self, filepath: str):
+        self.filepath = filepath
+        self.file = open(filepath, "r", encoding="ascii", errors="surrogateescape")
+        self.line_number = 0
+        self.statements = self.read_statements()
+        self.header = []
+        self.schema = None
+        for statement, text in self.statements:
+            self.header.append(text)
+            if statement.startswith("FILE_SCHEMA"):
+                self.schema = statement.split("'")[1]
+            elif statement[:-1].rstrip() == "DATA":
+                self.header.append("\n")
+                break
+
+    def __iter__(self) -> Iterator[tuple[int, str, str]]:
+        for statement, _ in self.statements:
+            if match := RECORD_PATTERN.match(statement):
+                yield int(match.group(1)), match.group(2), statement
+            elif statement[:-1].rstrip() == "ENDSEC":
+                break
+            else:
+                raise ValueError(f"Unsupported record before line {self.line_number} of {self.filepath}: {statement}")
+
+    def read_statements(self) -> Iterator[tuple[str, str]]:
+        """Yields each ;-terminated statement without and with its comments"""
+        text = ""
+        for line in self.file:
+            self.line_number += 1
+            text += line
+            while (end := self.find_statement_end(text)) is not None:
+                yield self.remove_comments(text[:end]), text[:end]
+                text = text[end:]
+        if self.remove_comments(text):
+            raise ValueError(f"Unterminated statement at the end of {self.filepath}: {text.strip()}")
+
+    def find_statement_end(self, text: str) -> Optional[int]:
+        for match in STATEMENT_PATTERN.finditer(text):
+            token = match.group()
+            if token == ";":
+                return match.end()
+            elif token in ("'", "/*"):
+                return None
+        return None
+
+    def remove_comments(self, text: str) -> str:
+        if "/*" not in text:
+            return text.strip()
+        result = []
+        position = 0
+        for match in STATEMENT_PATTERN.finditer(text):
+            if match.group().startswith("/*"):
+                result.append(text[position : match.start()])
+                position = match.end()
+        result.append(text[position:])
+        return "".join(result).strip()
+
+    def close(self) -> None:
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class writer:
+    """Writes SPF records to a file as they are emitted"""
+
+    def __init__(self, filepath: str, header: list[str]):
+        self.filepath = filepath
+        self.file = open(filepath, "w", encoding="ascii", errors="surrogateescape")
+        self.file.writelines(header)
+
+    def write(self, record: str) -> None:
+        self.file.write(record)
+        self.file.write("\n")
+
+    def close(self) -> None:
+        self.file.write("ENDSEC;\nEND-ISO-10303-21;\n")
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,84 @@
+# IfcOpenShell - IFC toolkit and geometry engine
+# Copyright (C) 2024 Dion Moult <dion@thinkmoult.com>
+#
+# This file is part of IfcOpenShell.
+#
+# IfcOpenShell is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# IfcOpenShell is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with IfcOpenShell.  If not, see <http://www.gnu.org/licenses/>.
+import numpy as np
+import ifcpatch
+import ifcopenshell
+import ifcopenshell.util.placement
+import test.bootstrap
+
+
+class TestOffsetObjectPlacements(test.bootstrap.IFC4):
+    def create_placement(self, location=(0.0, 0.0, 0.0), x_axis=(1.0, 0.0, 0.0), relative_to=None):
+        return self.file.createIfcLocalPlacement(
+            relative_to,
+            self.file.createIfcAxis2Placement3D(
+                self.file.createIfcCartesianPoint(location),
+                self.file.createIfcDirection((0.0, 0.0, 1.0)),
+                self.file.createIfcDirection(x_axis),
+            ),
+        )
+
+    def create_wall(self, placement):
+        return self.file.createIfcWall(ifcopenshell.guid.new(), ObjectPlacement=placement)
+
+    def get_matrix(self, element):
+        return ifcopenshell.util.placement.get_local_placement(element.ObjectPlacement)
+
+    def test_run(self):
+        wall = self.create_wall(self.create_placement((1.0, 2.0, 3.0)))
+        ifcpatch.execute({"file": self.file, "recipe": "OffsetObjectPlacements", "arguments": [10, 20, 30]})
+        expected = np.eye(4)
+        expected[0:3, 3] = (11.0, 22.0, 33.0)
+        assert np.allclose(self.get_matrix(wall), expected)
+
+    def test_rotating_in_plan(self):
+        wall = self.create_wall(self.create_placement((1.0, 0.0, 3.0)))
+        ifcpatch.execute({"file": self.file, "recipe": "OffsetObjectPlacements", "arguments": [10, 0, 0, True, 90]})
+        # Only providing ax rotates around the Z axis, before translating
+        expected = np.array([[0, -1, 0, 10], [1, 0, 0, 1], [0, 0, 1, 3], [0, 0, 0, 1]])
+        assert np.allclose(self.get_matrix(wall), expected)
+
+    def test_translating_before_rotating(self):
+        wall = self.create_wall(self.create_placement((1.0, 0.0, 0.0)))
+        ifcpatch.execute({"file": self.file, "recipe": "OffsetObjectPlacements", "arguments": [10, 0, 0, False, 90]})
+        assert np.allclose(self.get_matrix(wall)[0:3, 3], (0.0, 11.0, 0.0))
+
+    def test_only_absolute_placements_are_transformed_once(self):
+        site_placement = self.create_placement((5.0, 0.0, 0.0))
+        storey_placement = self.create_placement((0.0, 0.0, 3.0), relative_to=site_placement)
+        wall_placement = self.create_placement((1.0, 0.0, 0.0), x_axis=(0.0, 1.0, 0.0), relative_to=storey_placement)
+        site = self.file.createIfcSite(ifcopenshell.guid.new(), ObjectPlacement=site_placement)
+        storey = self.file.createIfcBuildingStorey(ifcopenshell.guid.new(), ObjectPlacement=storey_placement)
+        # Both walls share the same chain of placements
+        wall1 = self.create_wall(wall_placement)
+        wall2 = self.create_wall(wall_placement)
+        storey_relative_placement = storey_placement.RelativePlacement
+        wall_relative_placement = wall_placement.RelativePlacement
+        before = {e: self.get_matrix(e) for e in (site, storey, wall1, wall2)}
+        total_placements = len(self.file.by_type("IfcAxis2Placement3D"))
+
+        ifcpatch.execute({"file": self.file, "recipe": "OffsetObjectPlacements", "arguments": [0, 10, 0, True, 90]})
+
+        transformation = np.array([[0, -1, 0, 0], [1, 0, 0, 10], [0, 0, 1, 0], [0, 0, 0, 1]])
+        for element, matrix in before.items():
+            assert np.allclose(self.get_matrix(element), transformation @ matrix)
+        # Relative placements are untouched, as they move with what they are relative to
+        assert storey_placement.RelativePlacement == storey_relative_placement
+        assert wall_placement.RelativePlacement == wall_relative_placement
+        # The shared site placement is only replaced once
+        assert len(self.file.by_type("IfcAxis2Placement3D")) == total_placements + 1
@@ -0,0 +1,46 @@
+# IfcOpenShell - IFC toolkit and geometry engine
+# Copyright (C) 2024 Dion Moult <dion@thinkmoult.com>
+#
+# This file is part of IfcOpenShell.
+#
+# IfcOpenShell is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# IfcOpenShell is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with IfcOpenShell.  If not, see <http://www.gnu.org/licenses/>.
+
+import ifcpatch
+import ifcopenshell
+import ifcopenshell.api
+import test.bootstrap
+
+
+class TestOptimise(test.bootstrap.IFC4):
+    def test_run(self):
+        for _ in range(2):
+            location = self.file.createIfcCartesianPoint((1.0, 2.0, 3.0))
+            relative_placement = self.file.createIfcAxis2Placement3D(location)
+            self.file.createIfcLocalPlacement(RelativePlacement=relative_placement)
+        wall = ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcWall")
+        pset = ifcopenshell.api.run("pset.add_pset", self.file, product=wall, name="Foo_Bar")
+        ifcopenshell.api.run("pset.edit_pset", self.file, pset=pset, properties={"Foo": "Bar", "Baz": "Bar"})
+
+        output = ifcpatch.execute({"file": self.file, "recipe": "Optimise", "arguments": []})
+
+        assert len(output.by_type("IfcCartesianPoint")) == 1
+        assert len(output.by_type("IfcAxis2Placement3D")) == 1
+        assert len(output.by_type("IfcLocalPlacement")) == 1
+        # Properties only differ by name, so are not merged
+        assert len(output.by_type("IfcPropertySingleValue")) == 2
+        assert len(output.by_type("IfcWall")) == 1
+
+
+class TestOptimiseIFC2X3(test.bootstrap.IFC2X3, TestOptimise):
+    pass
@@ -0,0 +1,50 @@
+# IfcOpenShell - IFC toolkit and geometry engine
+# Copyright (C) 2024 Dion Moult <dion@thinkmoult.com>
+#
+# This file is part of IfcOpenShell.
+#
+# IfcOpenShell is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# IfcOpenShell is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with IfcOpenShell.  If not, see <http://www.gnu.org/licenses/>.
+
+import ifcpatch
+import ifcopenshell
+import ifcopenshell.api
+import test.bootstrap
+
+
+class TestRecycleNonRootedElements(test.bootstrap.IFC4):
+    def test_run(self):
+        placements = []
+        for _ in range(2):
+            location = self.file.createIfcCartesianPoint((1.0, 2.0, 3.0))
+            relative_placement = self.file.createIfcAxis2Placement3D(location)
+            placements.append(self.file.createIfcLocalPlacement(RelativePlacement=relative_placement))
+        for placement in placements:
+            wall = ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcWall")
+            wall.ObjectPlacement = placement
+        self.file.createIfcCartesianPoint((4.0, 5.0, 6.0))
+
+        output = ifcpatch.execute({"file": self.file, "recipe": "RecycleNonRootedElements", "arguments": []})
+        output = ifcopenshell.file.from_string(output)
+
+        # Placements only become identical once their points are merged
+        assert len(output.by_type("IfcCartesianPoint")) == 2
+        assert len(output.by_type("IfcAxis2Placement3D")) == 1
+        assert len(output.by_type("IfcLocalPlacement")) == 1
+        walls = output.by_type("IfcWall")
+        assert len(walls) == 2
+        assert walls[0].ObjectPlacement == walls[1].ObjectPlacement
+
+
+class TestRecycleNonRootedElementsIFC2X3(test.bootstrap.IFC2X3, TestRecycleNonRootedElements):
+    pass
@@ -46,6 +46,21 @@ class TestRegenerateGlobalIds(test.bootstrap.IFC4):
         assert len(new_guids) == 3
         assert len(new_guids.intersection(used_guids)) == 2
 
+    def test_streaming_without_loading_the_model(self, tmp_path):
+        wall1 = ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcWall")
+        wall2 = ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcWall")
+        wall1.GlobalId = wall2.GlobalId
+        filepath = str(tmp_path / "input.ifc")
+        self.file.write(filepath)
+
+        assert ifcpatch.is_streamable("RegenerateGlobalIds")
+        output = ifcpatch.execute({"input": filepath, "recipe": "RegenerateGlobalIds", "arguments": [True]})
+        ifcpatch.write(output, filepath)
+        ifc = ifcopenshell.open(filepath)
+        assert len(ifc.by_type("IfcWall")) == 2
+        assert len({e.GlobalId for e in ifc.by_type("IfcWall")}) == 2
+        assert wall2.GlobalId in {e.GlobalId for e in ifc.by_type("IfcWall")}
+
 
 class TestRegenerateGlobalIdsIFC2X3(test.bootstrap.IFC2X3, TestRegenerateGlobalIds):
     pass
@@ -0,0 +1,53 @@
+# IfcOpenShell - IFC toolkit and geometry engine
+# Copyright (C) 2024 Dion Moult <dion@thinkmoult.com>
+#
+# This file is part of IfcOpenShell.
+#
+# IfcOpenShell is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# IfcOpenShell is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with IfcOpenShell.  If not, see <http://www.gnu.org/licenses/>.
+
+import ifcpatch
+import ifcopenshell
+import test.bootstrap
+
+
+class TestResetAbsoluteCoordinates(test.bootstrap.IFC4):
+    def test_run(self):
+        near = self.file.createIfcCartesianPoint((1.0, 2.0, 3.0))
+        far = self.file.createIfcCartesianPoint((2000000.0, 3000000.0, 10.0))
+        far2 = self.file.createIfcCartesianPoint((2000010.0, 3000020.0, 10.0))
+        point_2d = self.file.createIfcCartesianPoint((2000000.0, 3000000.0))
+        location = self.file.createIfcCartesianPoint((2000000.0, 3000000.0, 0.0))
+        self.file.createIfcLocalPlacement(None, self.file.createIfcAxis2Placement3D(location))
+
+        ifcpatch.execute({"file": self.file, "recipe": "ResetAbsoluteCoordinates", "arguments": []})
+
+        assert near.Coordinates == (1.0, 2.0, 3.0)
+        # The offset is determined by the first large coordinate
+        assert far.Coordinates == (0.0, 0.0, 0.0)
+        assert far2.Coordinates == (10.0, 20.0, 0.0)
+        assert point_2d.Coordinates == (2000000.0, 3000000.0)
+        # Only geometry is reset by default
+        assert location.Coordinates == (2000000.0, 3000000.0, 0.0)
+
+    def test_point_lists_with_a_manual_offset_and_threshold(self):
+        point_list = self.file.createIfcCartesianPointList3D(((1.0, 2.0, 3.0), (2000.0, 0.0, 0.0)))
+        location = self.file.createIfcCartesianPoint((2000.0, 3000.0, 0.0))
+        self.file.createIfcLocalPlacement(None, self.file.createIfcAxis2Placement3D(location))
+
+        ifcpatch.execute(
+            {"file": self.file, "recipe": "ResetAbsoluteCoordinates", "arguments": ["placement", -1000, -1000, 0, 1000]}
+        )
+
+        assert point_list.CoordList == ((1.0, 2.0, 3.0), (1000.0, -1000.0, 0.0))
+        assert location.Coordinates == (1000.0, 2000.0, 0.0)
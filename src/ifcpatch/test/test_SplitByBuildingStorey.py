@@ -0,0 +1,110 @@
+# IfcOpenShell - IFC toolkit and geometry engine
+# Copyright (C) 2024 Dion Moult <dion@thinkmoult.com>
+#
+# This file is part of IfcOpenShell.
+#
+# IfcOpenShell is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# IfcOpenShell is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with IfcOpenShell.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import ifcpatch
+import ifcopenshell
+import ifcopenshell.api
+import ifcopenshell.util.element
+import test.bootstrap
+from ifcpatch.recipes.SplitByBuildingStorey import remove_references
+
+
+class TestSplitByBuildingStorey(test.bootstrap.IFC4):
+    def setup_storeys(self, names=("Ground", "First")):
+        ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcProject")
+        building = ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcBuilding")
+        storeys = []
+        walls = []
+        for name in names:
+            storey = ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcBuildingStorey", name=name)
+            ifcopenshell.api.run("aggregate.assign_object", self.file, products=[storey], relating_object=building)
+            wall = ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcWall")
+            ifcopenshell.api.run("spatial.assign_container", self.file, products=[wall], relating_structure=storey)
+            storeys.append(storey)
+            walls.append(wall)
+        # A property set shared by elements on different storeys
+        pset = ifcopenshell.api.run("pset.add_pset", self.file, product=walls[0], name="Foo_Bar")
+        ifcopenshell.api.run("pset.edit_pset", self.file, pset=pset, properties={"Foo": "Bar"})
+        self.file.by_type("IfcRelDefinesByProperties")[0].RelatedObjects = walls
+        return storeys, walls
+
+    def test_run(self, tmp_path):
+        storeys, walls = self.setup_storeys()
+        ifcpatch.execute({"file": self.file, "recipe": "SplitByBuildingStorey", "arguments": [str(tmp_path)]})
+        self.assert_split(tmp_path, walls)
+
+    def test_writing_in_parallel(self, tmp_path):
+        storeys, walls = self.setup_storeys()
+        ifcpatch.execute({"file": self.file, "recipe": "SplitByBuildingStorey", "arguments": [str(tmp_path), 2]})
+        self.assert_split(tmp_path, walls)
+
+    def test_sharing_a_relationship_between_three_storeys(self, tmp_path):
+        names = ("Ground", "First", "Second")
+        storeys, walls = self.setup_storeys(names)
+        ifcpatch.execute({"file": self.file, "recipe": "SplitByBuildingStorey", "arguments": [str(tmp_path)]})
+        self.assert_split(tmp_path, walls, names)
+
+    def test_streaming_without_loading_the_model(self, tmp_path):
+        names = ("Ground", "First", "Second")
+        storeys, walls = self.setup_storeys(names)
+        filepath = str(tmp_path / "input.ifc")
+        self.file.write(filepath)
+        assert ifcpatch.is_streamable("SplitByBuildingStorey")
+        output = ifcpatch.execute({"input": filepath, "recipe": "SplitByBuildingStorey", "arguments": [str(tmp_path)]})
+        self.assert_split(tmp_path, walls, names)
+        assert len(ifcopenshell.open(output).by_type("IfcWall")) == 3
+
+    def test_streaming_in_parallel(self, tmp_path):
+        storeys, walls = self.setup_storeys()
+        filepath = str(tmp_path / "input.ifc")
+        self.file.write(filepath)
+        ifcpatch.execute({"input": filepath, "recipe": "SplitByBuildingStorey", "arguments": [str(tmp_path), 2]})
+        self.assert_split(tmp_path, walls)
+
+    def assert_split(self, path, walls, names=("Ground", "First")):
+        for i, (name, wall) in enumerate(zip(names, walls)):
+            filepath = os.path.join(path, f"{i}-{name}.ifc")
+            with open(filepath) as f:
+                records = [l.strip() for l in f if l.startswith("#")]
+            assert all(r.endswith(";") and ",)" not in r for r in records)
+            output = ifcopenshell.open(filepath)
+            assert [e.GlobalId for e in output.by_type("IfcWall")] == [wall.GlobalId]
+            assert len(output.by_type("IfcBuildingStorey")) == len(names)
+            new_wall = output.by_type("IfcWall")[0]
+            assert ifcopenshell.util.element.get_container(new_wall).Name == name
+            assert ifcopenshell.util.element.get_pset(new_wall, "Foo_Bar")["Foo"] == "Bar"
+
+
+class TestRemoveReferences:
+    def test_replacing_references_outside_of_aggregates(self):
+        assert remove_references("#9=IFCFOO(#1,#5);", lambda r: r == 5) == "#9=IFCFOO(#1,$);"
+
+    def test_removing_references_from_aggregates(self):
+        is_excluded = lambda r: r in (5, 6)
+        assert remove_references("#9=IFCFOO((#1,#5,#6));", is_excluded) == "#9=IFCFOO((#1));"
+        assert remove_references("#9=IFCFOO((#5,#6,#1));", is_excluded) == "#9=IFCFOO((#1));"
+        assert remove_references("#9=IFCFOO((#5,#1,#6,#2));", is_excluded) == "#9=IFCFOO((#1,#2));"
+        assert remove_references("#9=IFCFOO((#5,#6));", is_excluded) == "#9=IFCFOO(());"
+
+    def test_ignoring_references_in_strings(self):
+        assert remove_references("#9=IFCFOO('#5,',(#1,#5));", lambda r: r == 5) == "#9=IFCFOO('#5,',(#1));"
+
+
+class TestSplitByBuildingStoreyIFC2X3(test.bootstrap.IFC2X3, TestSplitByBuildingStorey):
+    pass
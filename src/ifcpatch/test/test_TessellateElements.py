@@ -0,0 +1,99 @@
+# IfcPatch - IFC patching utiliy
+# Copyright (C) 2024 Dion Moult <dion@thinkmoult.com>
+#
+# This file is part of IfcPatch.
+#
+# IfcPatch is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# IfcPatch is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with IfcPatch.  If not, see <http://www.gnu.org/licenses/>.
+
+import pytest
+import numpy as np
+import ifcpatch
+import ifcopenshell
+import ifcopenshell.api
+import ifcopenshell.util.representation
+import test.bootstrap
+
+
+class TestTessellateElements(test.bootstrap.IFC4):
+    def setup_walls(self, lengths):
+        ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcProject")
+        ifcopenshell.api.run("unit.assign_unit", self.file)
+        model = ifcopenshell.api.run("context.add_context", self.file, context_type="Model")
+        body = ifcopenshell.api.run(
+            "context.add_context",
+            self.file,
+            context_type="Model",
+            context_identifier="Body",
+            target_view="MODEL_VIEW",
+            parent=model,
+        )
+        walls = []
+        for i, length in enumerate(lengths):
+            wall = ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcWall")
+            matrix = np.eye(4)
+            matrix[0][3] = i * 5.0
+            ifcopenshell.api.run("geometry.edit_object_placement", self.file, product=wall, matrix=matrix)
+            representation = ifcopenshell.api.run(
+                "geometry.add_wall_representation", self.file, context=body, length=length, height=3.0
+            )
+            ifcopenshell.api.run(
+                "geometry.assign_representation", self.file, product=wall, representation=representation
+            )
+            walls.append(wall)
+        return walls
+
+    def get_body(self, element):
+        return ifcopenshell.util.representation.get_representation(element, "Model", "Body", "MODEL_VIEW")
+
+    def test_run(self):
+        walls = self.setup_walls([1.0, 1.0, 2.0])
+        ifcpatch.execute({"file": self.file, "recipe": "TessellateElements", "arguments": ["IfcWall"]})
+        assert len(self.file.by_type("IfcTriangulatedFaceSet")) == 3
+        for wall in walls:
+            representation = self.get_body(wall)
+            assert representation.RepresentationType == "Tessellation"
+            assert len(representation.Items) == 1
+            face_set = representation.Items[0]
+            assert face_set.is_a("IfcTriangulatedFaceSet")
+            # The coordinate index is 1-based
+            coord_index = np.array(face_set.CoordIndex)
+            assert coord_index.shape[1] == 3
+            assert coord_index.min() == 1
+            assert coord_index.max() == len(face_set.Coordinates.CoordList)
+            # Coordinates are converted back to project units
+            coordinates = np.array(face_set.Coordinates.CoordList)
+            assert coordinates[:, 2].max() == pytest.approx(3000.0)
+        assert len(self.file.by_type("IfcRepresentationMap")) == 0
+
+    def test_instancing_identical_meshes(self):
+        walls = self.setup_walls([1.0, 1.0, 2.0])
+        ifcpatch.execute({"file": self.file, "recipe": "TessellateElements", "arguments": ["IfcWall", False, True]})
+        assert len(self.file.by_type("IfcTriangulatedFaceSet")) == 2
+        assert len(self.file.by_type("IfcRepresentationMap")) == 1
+        representation_map = self.file.by_type("IfcRepresentationMap")[0]
+        assert representation_map.MappedRepresentation.RepresentationType == "Tessellation"
+        for wall in walls[0:2]:
+            representation = self.get_body(wall)
+            assert representation.RepresentationType == "MappedRepresentation"
+            assert representation.Items[0].MappingSource == representation_map
+        # Unique meshes are not mapped
+        assert self.get_body(walls[2]).RepresentationType == "Tessellation"
+
+    def test_forcing_faceted_breps(self):
+        walls = self.setup_walls([1.0])
+        ifcpatch.execute({"file": self.file, "recipe": "TessellateElements", "arguments": ["IfcWall", True]})
+        representation = self.get_body(walls[0])
+        assert representation.RepresentationType == "Brep"
+        assert representation.Items[0].is_a("IfcFacetedBrep")
+        assert len(self.file.by_type("IfcTriangulatedFaceSet")) == 0
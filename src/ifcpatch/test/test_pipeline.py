@@ -0,0 +1,53 @@
+# IfcOpenShell - IFC toolkit and geometry engine
+# Copyright (C) 2024 Dion Moult <dion@thinkmoult.com>
+#
+# This file is part of IfcOpenShell.
+#
+# IfcOpenShell is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# IfcOpenShell is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with IfcOpenShell.  If not, see <http://www.gnu.org/licenses/>.
+
+import ifcpatch
+import ifcopenshell
+import ifcopenshell.api
+import test.bootstrap
+
+
+class TestExecutePipeline(test.bootstrap.IFC4):
+    def test_run(self):
+        wall1 = ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcWall")
+        wall2 = ifcopenshell.api.run("root.create_entity", self.file, ifc_class="IfcWall")
+        wall1.GlobalId = wall2.GlobalId
+        self.file.createIfcCartesianPoint((0.0, 0.0, 0.0))
+        self.file.createIfcCartesianPoint((0.0, 0.0, 0.0))
+
+        report = []
+        output = ifcpatch.execute_pipeline(
+            {
+                "file": self.file,
+                "recipes": [
+                    # This outputs a string, which is loaded for the next recipe
+                    {"recipe": "RecycleNonRootedElements", "arguments": []},
+                    {"recipe": "RegenerateGlobalIds", "arguments": [True]},
+                ],
+                "report": report,
+            }
+        )
+
+        assert len(output.by_type("IfcCartesianPoint")) == 1
+        assert len({e.GlobalId for e in output.by_type("IfcWall")}) == 2
+        assert [r[0] for r in report] == ["RecycleNonRootedElements", "RegenerateGlobalIds"]
+        assert all(duration >= 0 for _, duration, _ in report)
+
+
+class TestExecutePipelineIFC2X3(test.bootstrap.IFC2X3, TestExecutePipeline):
+    pass
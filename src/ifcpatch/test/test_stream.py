@@ -0,0 +1,73 @@
+# IfcPatch - IFC patching utiliy
+# Copyright (C) 2024 Dion Moult <dion@thinkmoult.com>
+#
+# This file is part of IfcPatch.
+#
+# IfcPatch is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# IfcPatch is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with IfcPatch.  If not, see <http://www.gnu.org/licenses/>.
+
+import pytest
+import ifcpatch.stream
+
+HEADER = """ISO-10303-21;
+HEADER;
+/* A comment; with a semicolon */
+FILE_DESCRIPTION(('ViewDefinition [CoordinationView]'),'2;1');
+FILE_NAME('','',(''),(''),'','','');
+FILE_SCHEMA(('IFC4'));
+ENDSEC;
+DATA;
+"""
+
+FOOTER = """ENDSEC;
+END-ISO-10303-21;
+"""
+
+
+def read(tmp_path, data):
+    filepath = tmp_path / "input.ifc"
+    filepath.write_text(HEADER + data + FOOTER)
+    with ifcpatch.stream.reader(str(filepath)) as reader:
+        return reader.schema, list(reader)
+
+
+class TestReader:
+    def test_reading_records(self, tmp_path):
+        schema, records = read(tmp_path, "#1=IFCPROJECT('0',$,$,$,$,$,$,$,$);\n#2 = IFCWALL('1',$,$,$,$,$,$,$,$);\n")
+        assert schema == "IFC4"
+        assert records == [
+            (1, "IFCPROJECT", "#1=IFCPROJECT('0',$,$,$,$,$,$,$,$);"),
+            (2, "IFCWALL", "#2 = IFCWALL('1',$,$,$,$,$,$,$,$);"),
+        ]
+
+    def test_skipping_comments(self, tmp_path):
+        data = "/* A comment */\n#1=IFCWALL('0',$,/* inline */$,$,$,$,$,$,$);\n/* A\nmulti-line comment */#2=IFCWALL('1',$,$,$,$,$,$,$,$);\n"
+        schema, records = read(tmp_path, data)
+        assert [r[2] for r in records] == [
+            "#1=IFCWALL('0',$,$,$,$,$,$,$,$);",
+            "#2=IFCWALL('1',$,$,$,$,$,$,$,$);",
+        ]
+
+    def test_keeping_strings_unchanged(self, tmp_path):
+        data = "#1=IFCWALL('0',$,'a;\n  b',$,$,$,$,$,$);\n#2=IFCWALL('1',$,'it''s /* not a comment */',$,$,$,$,$,$);\n"
+        schema, records = read(tmp_path, data)
+        assert records[0][2] == "#1=IFCWALL('0',$,'a;\n  b',$,$,$,$,$,$);"
+        assert records[1][2] == "#2=IFCWALL('1',$,'it''s /* not a comment */',$,$,$,$,$,$);"
+
+    def test_reading_several_records_on_a_line(self, tmp_path):
+        schema, records = read(tmp_path, "#1=IFCWALL('0',$,$,$,$,$,$,$,$);#2=IFCWALL('1',$,$,$,$,$,$,$,$);\n")
+        assert [r[0] for r in records] == [1, 2]
+
+    def test_raising_an_error_for_unsupported_records(self, tmp_path):
+        with pytest.raises(ValueError):
+            read(tmp_path, "#1=(IFCWALL('0',$,$,$,$,$,$,$,$));\n")
@@ -39,15 +39,38 @@ parser.add_argument(
 parser.add_argument(
     "-o", "--output", help="Output file (supported for all types of reporting except Console)"
 )
+parser.add_argument("-j", "--jobs", type=int, help="Number of processes used for validation", default=1)
+parser.add_argument("--timings", help="Print the time spent validating each specification", action="store_true")
+parser.add_argument(
+    "--stream",
+    help="Stream every failure to a .jsonl, .sqlite, .db or .bcf file, keeping only a sample in memory for the reporter",
+)
+parser.add_argument(
+    "--sample-size", type=int, help="Number of failures per requirement kept when streaming", default=100
+)
 args = parser.parse_args()
 
+sink = None
+if args.stream:
+    if args.stream.lower().endswith(".jsonl"):
+        sink = reporter.JsonLines(args.stream, sample_size=args.sample_size)
+    elif args.stream.lower().endswith((".sqlite", ".db")):
+        sink = reporter.Sqlite(args.stream, sample_size=args.sample_size)
+    elif args.stream.lower().endswith(".bcf"):
+        sink = reporter.BcfStream(args.stream, sample_size=args.sample_size)
+    else:
+        parser.error("The stream must be a .jsonl, .sqlite, .db or .bcf file")
+
 start = time.time()
 specs = ids.open(args.ids)
 ifc = ifcopenshell.open(args.ifc)
 print("Finished loading:", time.time() - start)
 start = time.time()
-specs.validate(ifc)
+specs.validate(ifc, filepath=args.ifc, jobs=args.jobs, sink=sink)
 print("Finished validating:", time.time() - start)
+if args.timings:
+    for specification in sorted(specs.specifications, key=lambda s: s.duration, reverse=True):
+        print(f"{specification.duration:.3f}s - {specification.name}")
 start = time.time()
 
 if args.reporter == "Console":
@@ -55,9 +78,9 @@ if args.reporter == "Console":
 elif args.reporter == "Txt":
     engine = reporter.Txt(specs)
 elif args.reporter == "Json":
-    engine = reporter.Json(specs)
+    engine = reporter.Json(specs, stream=sink)
 elif args.reporter == "Html":
-    engine = reporter.Html(specs)
+    engine = reporter.Html(specs, stream=sink)
 elif args.reporter == "Ods":
     engine = reporter.Ods(specs, excel_safe=args.excel_safe)
 elif args.reporter == "Bcf":
@@ -19,12 +19,13 @@
 from __future__ import annotations
 import re
 import builtins
+import operator
 import ifcopenshell.util.unit
 import ifcopenshell.util.element
 import ifcopenshell.util.classification
 from functools import lru_cache
 from xmlschema.validators import identities
-from typing import Union, Optional, Any, Literal, TYPE_CHECKING, TypedDict
+from typing import Union, Optional, Any, Callable, Literal, TYPE_CHECKING, TypedDict
 from logging import Logger
 
 if TYPE_CHECKING:
@@ -58,6 +59,61 @@ def get_psets(element):
     return ifcopenshell.util.element.get_psets(element)
 
 
+def get_related_objects(
+    ifc_file: ifcopenshell.file, relationship: str, attribute: str = "RelatedObjects"
+) -> list[ifcopenshell.entity_instance]:
+    results = []
+    for rel in ifc_file.by_type(relationship):
+        related = getattr(rel, attribute)
+        if isinstance(related, tuple):
+            results.extend(related)
+        elif related is not None:
+            results.append(related)
+    return results
+
+
+def with_type_occurrences(elements: list[ifcopenshell.entity_instance]) -> list[ifcopenshell.entity_instance]:
+    """Adds the occurrences of any types, which inherit relationships from their type"""
+    results = {}
+    for element in elements:
+        if not element.is_a("IfcObjectDefinition"):
+            continue
+        results[element] = None
+        if element.is_a("IfcTypeObject"):
+            results.update(dict.fromkeys(ifcopenshell.util.element.get_types(element)))
+    return list(results)
+
+
+def get_classification_name(reference: ifcopenshell.entity_instance) -> Optional[str]:
+    while reference is not None:
+        if reference.is_a("IfcClassification"):
+            return reference.Name
+        reference = getattr(reference, "ReferencedSource", None)
+
+
+@lru_cache
+def get_entities_with_attribute(schema_name: str, name: Union[str, Restriction]) -> list[str]:
+    """Returns the topmost entities in the schema which have a matching attribute"""
+    results = []
+    schema = ifcopenshell.ifcopenshell_wrapper.schema_by_name(schema_name)
+    entities = {entity.name(): entity for entity in schema.entities()}
+
+    def ignore_subtypes(entity):
+        for subentity in entity.subtypes():
+            # entity might be already removed as .entities() order is not hierarchical
+            if entities.pop(subentity.name(), None):
+                ignore_subtypes(subentity)
+
+    while entities:
+        entity_name, entity = entities.popitem()
+        for attribute in entity.attributes():
+            if attribute.name() == name:
+                results.append(entity_name)
+                # e.g. if IfcRoot already has .Name, it's safe not to check all it's subtypes attributes
+                ignore_subtypes(entity)
+    return results
+
+
 Cardinality = Literal["required", "optional", "prohibited"]
 
 
@@ -72,6 +128,7 @@ class Facet:
     def __init__(self, *parameters):
         self.status = None
         self.failures: list[FacetFailure] = []
+        self.total_failures = 0
         for i, name in enumerate(self.parameters):
             setattr(self, name.replace("@", ""), parameters[i])
 
@@ -152,6 +209,28 @@ class Facet:
     def get_usage(self) -> Cardinality:
         return self.cardinality
 
+    def get_key(self) -> Optional[tuple]:
+        """Returns a hashable key shared by facets which always give the same result
+
+        :return: The key, or None if the facet has parameters which cannot be hashed.
+        """
+        key = [type(self).__name__]
+        for name in self.parameters:
+            if name == "@instructions":
+                continue
+            value = getattr(self, name.replace("@", ""), None)
+            if isinstance(value, Restriction):
+                value = value.get_key()
+            elif isinstance(value, list):
+                value = tuple(v.get_key() if isinstance(v, Restriction) else v for v in value)
+            key.append(value)
+        key = tuple(key)
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
     def __call__(self, inst: ifcopenshell.entity_instance, logger: Optional[Logger] = None) -> Result:
         raise NotImplementedError
 
@@ -239,22 +318,13 @@ class Attribute(Facet):
             return super().filter(ifc_file, elements)
 
         results = []
-        schema = ifcopenshell.ifcopenshell_wrapper.schema_by_name(ifc_file.schema)
-        entities = {entity.name(): entity for entity in schema.entities()}
-
-        def ignore_subtypes(entity):
-            for subentity in entity.subtypes():
-                # entity might be already removed as .entities() order is not hierarchical
-                if entities.pop(subentity.name(), None):
-                    ignore_subtypes(subentity)
-
-        while entities:
-            entity_name, entity = entities.popitem()
-            for attribute in entity.attributes():
-                if attribute.name() == self.name:
-                    results.extend(ifc_file.by_type(entity_name, include_subtypes=True))
-                    # e.g. if IfcRoot already has .Name, it's safe not to check all it's subtypes attributes
-                    ignore_subtypes(entity)
+        if isinstance(self.name, str):
+            entity_names = get_entities_with_attribute(ifc_file.schema, self.name)
+        else:
+            # Restrictions are not hashable
+            entity_names = get_entities_with_attribute.__wrapped__(ifc_file.schema, self.name)
+        for entity_name in entity_names:
+            results.extend(ifc_file.by_type(entity_name, include_subtypes=True))
 
         # TODO: perhaps we should consider value in the filter
 
@@ -373,7 +443,15 @@ class Classification(Facet):
     ) -> list[ifcopenshell.entity_instance]:
         if isinstance(elements, list):
             return super().filter(ifc_file, elements)
-        return ifc_file.by_type("IfcObjectDefinition")
+        if self.cardinality != "required":
+            return ifc_file.by_type("IfcObjectDefinition")
+        # Only elements (or types of elements) associated with a reference in a
+        # matching system may pass, whether directly or through inheritance.
+        results = []
+        for rel in ifc_file.by_type("IfcRelAssociatesClassification"):
+            if self.system is None or self.system == get_classification_name(rel.RelatingClassification):
+                results.extend(rel.RelatedObjects)
+        return with_type_occurrences(results)
 
     def __call__(self, inst: ifcopenshell.entity_instance, logger: Optional[Logger] = None) -> ClassificationResult:
         if self.cardinality == "optional":
@@ -437,7 +515,29 @@ class PartOf(Facet):
     ) -> list[ifcopenshell.entity_instance]:
         if isinstance(elements, list):
             return super().filter(ifc_file, elements)
-        return list(ifc_file)  # Lazy
+        if self.cardinality != "required":
+            return list(ifc_file)  # Lazy
+        if self.relation == "IFCRELAGGREGATES":
+            results = get_related_objects(ifc_file, "IfcRelAggregates")
+        elif self.relation == "IFCRELASSIGNSTOGROUP":
+            results = get_related_objects(ifc_file, "IfcRelAssignsToGroup")
+        elif self.relation == "IFCRELNESTS":
+            results = get_related_objects(ifc_file, "IfcRelNests")
+        elif self.relation == "IFCRELCONTAINEDINSPATIALSTRUCTURE":
+            # Parts of aggregates and nests may be indirectly contained
+            results = get_related_objects(ifc_file, "IfcRelContainedInSpatialStructure", "RelatedElements")
+            results.extend(get_related_objects(ifc_file, "IfcRelAggregates"))
+            results.extend(get_related_objects(ifc_file, "IfcRelNests"))
+        elif self.relation == "IFCRELVOIDSELEMENT IFCRELFILLSELEMENT":
+            results = get_related_objects(ifc_file, "IfcRelVoidsElement", "RelatedOpeningElement")
+            results.extend(get_related_objects(ifc_file, "IfcRelFillsElement", "RelatedBuildingElement"))
+        elif not self.relation:
+            results = get_related_objects(ifc_file, "IfcRelAggregates")
+            results.extend(get_related_objects(ifc_file, "IfcRelContainedInSpatialStructure", "RelatedElements"))
+            results.extend(get_related_objects(ifc_file, "IfcRelAssignsToGroup"))
+        else:
+            return list(ifc_file)
+        return list(dict.fromkeys(results))
 
     def asdict(self, clause_type: str) -> dict[str, Any]:
         results = super().asdict(clause_type)
@@ -643,13 +743,34 @@ class Property(Facet):
     ) -> list[ifcopenshell.entity_instance]:
         if isinstance(elements, list):
             return super().filter(ifc_file, elements)
-        if ifc_file.schema == "IFC2X3":
-            return ifc_file.by_type("IfcObjectDefinition")
-        return (
-            ifc_file.by_type("IfcObjectDefinition")
-            + ifc_file.by_type("IfcMaterialDefinition")
-            + ifc_file.by_type("IfcProfileDef")
-        )
+        if self.cardinality != "required":
+            if ifc_file.schema == "IFC2X3":
+                return ifc_file.by_type("IfcObjectDefinition")
+            return (
+                ifc_file.by_type("IfcObjectDefinition")
+                + ifc_file.by_type("IfcMaterialDefinition")
+                + ifc_file.by_type("IfcProfileDef")
+            )
+
+        # Start from property sets with a matching name and follow them to
+        # the occurrences, types (and their occurrences), materials and profiles
+        results = []
+        for definition in ifc_file.by_type("IfcPropertySetDefinition"):
+            if getattr(definition, "Name", None) is None or not self.propertySet == definition.Name:
+                continue
+            rels = getattr(definition, "DefinesOccurrence", None) or getattr(definition, "PropertyDefinitionOf", ())
+            for rel in rels:
+                results.extend(rel.RelatedObjects)
+            results.extend(getattr(definition, "DefinesType", None) or [])
+        results = with_type_occurrences(results)
+        if ifc_file.schema != "IFC2X3":
+            for definition in ifc_file.by_type("IfcMaterialProperties"):
+                if definition.Name is not None and self.propertySet == definition.Name:
+                    results.append(definition.Material)
+            for definition in ifc_file.by_type("IfcProfileProperties"):
+                if definition.Name is not None and self.propertySet == definition.Name:
+                    results.append(definition.ProfileDefinition)
+        return list(dict.fromkeys(results))
 
     def __call__(self, inst: ifcopenshell.entity_instance, logger: Optional[Logger] = None) -> PropertyResult:
         if self.cardinality == "optional":
@@ -910,7 +1031,9 @@ class Material(Facet):
     ) -> list[ifcopenshell.entity_instance]:
         if isinstance(elements, list):
             return super().filter(ifc_file, elements)
-        return ifc_file.by_type("IfcObjectDefinition")
+        if self.cardinality != "required":
+            return ifc_file.by_type("IfcObjectDefinition")
+        return with_type_occurrences(get_related_objects(ifc_file, "IfcRelAssociatesMaterial"))
 
     def __call__(self, inst: ifcopenshell.entity_instance, logger: Optional[Logger] = None) -> MaterialResult:
         if self.cardinality == "optional":
@@ -970,10 +1093,26 @@ class Material(Facet):
 
 
 class Restriction:
+    bound_operators = {
+        "maxExclusive": operator.lt,
+        "maxInclusive": operator.le,
+        "minExclusive": operator.gt,
+        "minInclusive": operator.ge,
+    }
+
     def __init__(self, options=None, base="string"):
         self.base = base
         self.options = options or {}
 
+    @property
+    def options(self) -> dict[str, Any]:
+        return self._options
+
+    @options.setter
+    def options(self, value: dict[str, Any]) -> None:
+        self._options = value
+        self._predicates = None
+
     def parse(self, ids_dict):
         if not ids_dict:
             return self
@@ -988,6 +1127,7 @@ class Restriction:
                 self.options[key] = value["@value"]
             else:
                 self.options[key] = [v["@value"] for v in value]
+        self._predicates = None
         return self
 
     def asdict(self) -> dict[str, Any]:
@@ -1005,39 +1145,86 @@ class Restriction:
     def __eq__(self, other):
         if other is None:
             return False
+        predicates = self._predicates
+        if predicates is None:
+            predicates = self.compile()
+        for predicate in predicates:
+            if not predicate(other):
+                return False
+        return True
+
+    def __getstate__(self):
+        # Compiled predicates are closures and are rebuilt on demand
+        state = self.__dict__.copy()
+        state["_predicates"] = None
+        return state
+
+    def compile(self) -> list[Callable[[Any], bool]]:
+        """Compiles the options into predicates which are reused for every comparison
+
+        This happens automatically on the first comparison. If you modify the
+        options dictionary in place afterwards, call this again to recompile.
+        """
+        predicates = []
         for constraint, value in self.options.items():
             if constraint == "enumeration":
-                if other not in [cast_to_value(v, other) for v in value]:
-                    return False
+                predicates.append(self.compile_enumeration(value))
             elif constraint == "pattern":
-                if not isinstance(other, str):
-                    return False
-                value = value if isinstance(value, list) else [value]
-                for pattern in value:
-                    if re.compile(identities.translate_pattern(pattern)).fullmatch(other) is None:
-                        return False
-            elif constraint == "length":
-                if len(str(other)) != int(value):
-                    return False
-            elif constraint == "maxLength":
-                if len(str(other)) > int(value):
-                    return False
-            elif constraint == "minLength":
-                if len(str(other)) < int(value):
-                    return False
-            elif constraint == "maxExclusive":
-                if float(other) >= float(value):
-                    return False
-            elif constraint == "maxInclusive":
-                if float(other) > float(value):
-                    return False
-            elif constraint == "minExclusive":
-                if float(other) <= float(value):
-                    return False
-            elif constraint == "minInclusive":
-                if float(other) < float(value):
+                predicates.append(self.compile_pattern(value))
+            elif constraint in ("length", "maxLength", "minLength"):
+                predicates.append(self.compile_length(constraint, int(value)))
+            elif constraint in self.bound_operators:
+                predicates.append(self.compile_bound(self.bound_operators[constraint], float(value)))
+        self._predicates = predicates
+        return predicates
+
+    def compile_enumeration(self, values: list) -> Callable[[Any], bool]:
+        # Enumeration values are cast to the type of the compared value, so
+        # the cast options are cached once per compared type.
+        casts = {}
+
+        def predicate(other):
+            options = casts.get(type(other))
+            if options is None:
+                options = [cast_to_value(v, other) for v in values]
+                try:
+                    options = frozenset(options)
+                except TypeError:
+                    pass
+                casts[type(other)] = options
+            return other in options
+
+        return predicate
+
+    def compile_pattern(self, value: Union[str, list[str]]) -> Callable[[Any], bool]:
+        patterns = value if isinstance(value, list) else [value]
+        matchers = [re.compile(identities.translate_pattern(p)).fullmatch for p in patterns]
+
+        def predicate(other):
+            if not isinstance(other, str):
+                return False
+            for matcher in matchers:
+                if matcher(other) is None:
                     return False
-        return True
+            return True
+
+        return predicate
+
+    def compile_length(self, constraint: str, length: int) -> Callable[[Any], bool]:
+        if constraint == "length":
+            return lambda other: len(str(other)) == length
+        elif constraint == "maxLength":
+            return lambda other: len(str(other)) <= length
+        return lambda other: len(str(other)) >= length
+
+    def compile_bound(self, compare: Callable[[float, float], bool], bound: float) -> Callable[[Any], bool]:
+        return lambda other: compare(float(other), bound)
+
+    def get_key(self) -> tuple:
+        options = []
+        for constraint, value in self.options.items():
+            options.append((constraint, tuple(value) if isinstance(value, list) else value))
+        return ("Restriction", self.base, tuple(sorted(options)))
 
     def __str__(self):
         return str(self.options)
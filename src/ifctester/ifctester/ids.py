@@ -18,7 +18,9 @@
 
 from __future__ import annotations
 import os
+import time
 import datetime
+import multiprocessing
 import ifcopenshell
 from xmlschema import XMLSchema
 from xmlschema import etree_tostring
@@ -37,10 +39,14 @@ from .facet import (
     Cardinality,
     FacetFailure,
 )
-from typing import List, Optional, Union, overload, Literal
+from typing import List, Optional, Union, overload, Literal, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .reporter import Stream
 
 cwd = os.path.dirname(os.path.realpath(__file__))
 schema = None
+_validation_context = None
 
 
 @overload
@@ -139,7 +145,24 @@ class Ids:
         ET.ElementTree(get_schema().encode(self.asdict())).write(filepath, encoding="utf-8", xml_declaration=True)
         return get_schema().is_valid(filepath)
 
-    def validate(self, ifc_file: ifcopenshell.file, filter_version=False, filepath: Optional[str] = None) -> None:
+    def validate(
+        self,
+        ifc_file: ifcopenshell.file,
+        filter_version=False,
+        filepath: Optional[str] = None,
+        jobs: int = 1,
+        sink: Optional[Stream] = None,
+    ) -> None:
+        """Validates a model against all specifications
+
+        :param jobs: If greater than one, candidate elements are checked in
+            this many worker processes. Workers are forked where supported,
+            otherwise each worker opens the model from ``filepath``.
+        :param sink: An optional :class:`ifctester.reporter.Stream` which
+            receives results as they are produced. Specifications then only
+            keep counters and the sample of failures chosen by the sink,
+            instead of every applicable and failed element.
+        """
         if filepath:
             self.filepath = filepath
             self.filename = os.path.basename(filepath)
@@ -147,9 +170,130 @@ class Ids:
             self.filepath = self.filename = None
         get_pset.cache_clear()
         get_psets.cache_clear()
-        for specification in self.specifications:
-            specification.reset_status()
-            specification.validate(ifc_file, filter_version=filter_version)
+
+        if sink is not None:
+            sink.start(self)
+
+        # The sink is closed even if validation fails, so no files are left open
+        try:
+            specifications = []
+            for specification in self.specifications:
+                specification.reset_status()
+                if filter_version and ifc_file.schema not in specification.ifcVersion:
+                    continue
+                specifications.append(specification)
+
+            # Specifications with identical applicability share a broadphase filter
+            candidates = {}
+            element_specifications = {}
+            for specification in specifications:
+                start = time.perf_counter()
+                key = specification.get_applicability_key()
+                if key is None:
+                    elements = specification.filter(ifc_file)
+                elif key not in candidates:
+                    elements = candidates[key] = specification.filter(ifc_file)
+                else:
+                    elements = candidates[key]
+                for element in elements:
+                    element_specifications.setdefault(element, []).append(specification)
+                specification.duration += time.perf_counter() - start
+            del candidates
+
+            # Each candidate is visited once, so facet results can be shared
+            # between all specifications checking the same element.
+            if jobs > 1 and len(element_specifications) > jobs:
+                self.check_in_parallel(ifc_file, element_specifications, jobs, filepath, sink)
+            else:
+                for element, element_specs in element_specifications.items():
+                    results = {}
+                    for specification in element_specs:
+                        start = time.perf_counter()
+                        specification.check(element, results, sink)
+                        specification.duration += time.perf_counter() - start
+
+            for specification in specifications:
+                specification.finalise()
+
+            if sink is not None:
+                sink.finish()
+        finally:
+            if sink is not None:
+                sink.close()
+
+    def check_in_parallel(
+        self,
+        ifc_file: ifcopenshell.file,
+        element_specifications: dict[ifcopenshell.entity_instance, list[Specification]],
+        jobs: int,
+        filepath: Optional[str] = None,
+        sink: Optional[Stream] = None,
+    ) -> None:
+        global _validation_context
+        indices = {id(s): i for i, s in enumerate(self.specifications)}
+        items = [(e.id(), [indices[id(s)] for s in specs]) for e, specs in element_specifications.items()]
+        chunk_size = -(-len(items) // (jobs * 4))
+        chunks = [items[i : i + chunk_size] for i in range(0, len(items), chunk_size)]
+
+        if "fork" in multiprocessing.get_all_start_methods():
+            # Forked workers inherit the already loaded model
+            _validation_context = (self, ifc_file)
+            pool = multiprocessing.get_context("fork").Pool(jobs)
+        elif filepath:
+            pool = multiprocessing.get_context("spawn").Pool(jobs, _init_validation_worker, (self, filepath))
+        else:
+            raise ValueError("Validating with multiple jobs on this platform requires the filepath of the model")
+
+        try:
+            with pool:
+                # Results are merged in order so reports are identical to a serial run
+                for results in pool.imap(_check_elements, chunks):
+                    for spec_index, applicable, total_failed, failures, duration in results:
+                        specification = self.specifications[spec_index]
+                        specification.duration += duration
+                        specification.total_failed += total_failed
+                        for element_id in applicable:
+                            specification.add_applicable(ifc_file.by_id(element_id), sink)
+                        for facet, facet_failures in zip(specification.requirements, failures):
+                            for element_id, reason in facet_failures:
+                                specification.add_failure(facet, ifc_file.by_id(element_id), reason, sink)
+        finally:
+            _validation_context = None
+
+
+def _init_validation_worker(ids: Ids, filepath: str) -> None:
+    global _validation_context
+    _validation_context = (ids, ifcopenshell.open(filepath))
+
+
+def _check_elements(items: list[tuple[int, list[int]]]) -> list[tuple[int, list[int], int, list[list], float]]:
+    ids, ifc_file = _validation_context
+    specifications = {}
+    # Specifications are copied from the parent, so their duration already
+    # includes the parent's time. Only the time spent here is returned.
+    durations = {}
+    for element_id, spec_indices in items:
+        element = ifc_file.by_id(element_id)
+        results = {}
+        for spec_index in spec_indices:
+            specification = ids.specifications[spec_index]
+            if spec_index not in specifications:
+                # Workers only report what was found in this chunk
+                specification.reset_status()
+                specifications[spec_index] = specification
+            start = time.perf_counter()
+            specification.check(element, results)
+            durations[spec_index] = durations.get(spec_index, 0.0) + time.perf_counter() - start
+    return [
+        (
+            spec_index,
+            [e.id() for e in specification.applicable_entities],
+            specification.total_failed,
+            [[(f["element"].id(), f["reason"]) for f in facet.failures] for facet in specification.requirements],
+            durations[spec_index],
+        )
+        for spec_index, specification in specifications.items()
+    ]
 
 
 class Specification:
@@ -174,7 +318,12 @@ class Specification:
         self.instructions = instructions
 
         self.applicable_entities: list[ifcopenshell.entity_instance] = []
+        self.failed_entities: set[ifcopenshell.entity_instance] = set()
+        self.total_applicable = 0
+        self.total_failed = 0
         self.status = None
+        self.duration = 0.0
+        self.facet_keys: dict[int, Optional[tuple]] = {}
 
     def asdict(self):
         results = {
@@ -238,15 +387,27 @@ class Specification:
     def reset_status(self):
         self.applicable_entities.clear()
         self.failed_entities: set[ifcopenshell.entity_instance] = set()
+        self.total_applicable = 0
+        self.total_failed = 0
         for facet in self.requirements:
             facet.status = None
             facet.failures.clear()
+            facet.total_failures = 0
         self.status = None
+        self.duration = 0.0
+        self.facet_keys = {}
 
     def validate(self, ifc_file: ifcopenshell.file, filter_version=False) -> None:
         if filter_version and ifc_file.schema not in self.ifcVersion:
             return
 
+        start = time.perf_counter()
+        for element in self.filter(ifc_file):
+            self.check(element)
+        self.finalise()
+        self.duration += time.perf_counter() - start
+
+    def filter(self, ifc_file: ifcopenshell.file) -> list[ifcopenshell.entity_instance]:
         elements = None
 
         # This is a broadphase filter of applicability. We almost never want to
@@ -254,42 +415,90 @@ class Specification:
         for i, facet in enumerate(self.applicability):
             elements = facet.filter(ifc_file, elements)
 
-        for element in elements or []:
-            is_applicable = True
-            for facet in self.applicability:
-                if isinstance(facet, Entity):
-                    continue
-                if not bool(facet(element)):
-                    is_applicable = False
-                    break
-            if not is_applicable:
+        return elements or []
+
+    def get_applicability_key(self) -> Optional[tuple]:
+        keys = tuple(facet.get_key() for facet in self.applicability)
+        if None in keys:
+            return None
+        return keys
+
+    def check(
+        self, element: ifcopenshell.entity_instance, results: Optional[dict] = None, sink: Optional[Stream] = None
+    ) -> None:
+        """Checks a single element which passed the broadphase filter
+
+        :param results: An optional dictionary of facet results for this
+            element, shared between specifications so that identical facets
+            are only evaluated once per element.
+        :param sink: An optional stream which receives the results instead
+            of this specification storing them.
+        """
+        for facet in self.applicability:
+            if isinstance(facet, Entity):
                 continue
+            if not bool(self.evaluate(facet, element, results)):
+                return
+        self.add_applicable(element, sink)
+        is_failed = False
+        for facet in self.requirements:
+            result = self.evaluate(facet, element, results)
+            is_pass = bool(result)
+            if self.maxOccurs != 0:  # This is a required or optional specification
+                if not is_pass:
+                    is_failed = True
+                    self.add_failure(facet, element, str(result), sink)
+            else:  # This is a prohibited specification
+                if is_pass:
+                    is_failed = True
+                    self.add_failure(facet, element, str(result), sink)
+        if is_failed:
+            self.total_failed += 1
+
+    def add_applicable(self, element: ifcopenshell.entity_instance, sink: Optional[Stream] = None) -> None:
+        self.total_applicable += 1
+        if sink is None:
             self.applicable_entities.append(element)
-            for facet in self.requirements:
-                result = facet(element)
-                is_pass = bool(result)
-                if self.maxOccurs != 0:  # This is a required or optional specification
-                    if not is_pass:
-                        self.failed_entities.add(element)
-                        facet.failures.append(FacetFailure(element=element, reason=str(result)))
-                else:  # This is a prohibited specification
-                    if is_pass:
-                        self.failed_entities.add(element)
-                        facet.failures.append(FacetFailure(element=element, reason=str(result)))
+        else:
+            sink.add_applicable(self, element)
+
+    def add_failure(
+        self, facet: Facet, element: ifcopenshell.entity_instance, reason: str, sink: Optional[Stream] = None
+    ) -> None:
+        facet.total_failures += 1
+        if sink is None:
+            self.failed_entities.add(element)
+            facet.failures.append(FacetFailure(element=element, reason=reason))
+        else:
+            sink.add_failure(self, facet, element, reason)
+
+    def evaluate(self, facet: Facet, element: ifcopenshell.entity_instance, results: Optional[dict] = None):
+        if results is None:
+            return facet(element)
+        # Keys are computed once per facet and validation, not once per element
+        if (key := self.facet_keys.get(id(facet), False)) is False:
+            key = self.facet_keys[id(facet)] = facet.get_key()
+        if key is None:
+            return facet(element)
+        result = results.get(key)
+        if result is None:
+            result = results[key] = facet(element)
+        return result
 
+    def finalise(self) -> None:
         self.status = True
         for facet in self.requirements:
-            facet.status = not bool(facet.failures)
+            facet.status = not facet.total_failures
             if not facet.status:
                 self.status = False
 
         if self.minOccurs != 0:  # Required specification
-            if not self.applicable_entities:
+            if not self.total_applicable:
                 self.status = False
                 for facet in self.requirements:
                     facet.status = False
         elif self.maxOccurs == 0:  # Prohibited specification
-            if self.applicable_entities and not self.requirements:
+            if self.total_applicable and not self.requirements:
                 self.status = False
 
     def get_usage(self) -> Cardinality:
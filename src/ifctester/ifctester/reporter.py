@@ -21,6 +21,9 @@ import os
 import re
 import sys
 import math
+import json
+import sqlite3
+import zipfile
 import logging
 import datetime
 import ifcopenshell
@@ -28,7 +31,7 @@ import ifcopenshell.util.unit
 import ifcopenshell.util.element
 from .ids import Specification, Ids
 from .facet import Facet, FacetFailure
-from typing import TypedDict, Union, Literal, Optional
+from typing import TypedDict, Union, Literal, Optional, Callable
 
 cwd = os.path.dirname(os.path.realpath(__file__))
 
@@ -118,6 +121,80 @@ ResultsFailedEntity = TypedDict(
 )
 
 
+class StreamSpecification(TypedDict):
+    status: bool
+    total_applicable: int
+    total_failed: int
+    requirements: list[StreamRequirement]
+
+
+class StreamRequirement(TypedDict):
+    status: bool
+    total_fail: int
+    failed_entities: list[ResultsFailedEntity]
+
+
+def get_failed_entity(element: ifcopenshell.entity_instance, reason: str) -> ResultsFailedEntity:
+    return ResultsFailedEntity(
+        {
+            "reason": reason,
+            "element": str(element),
+            "element_type": str(ifcopenshell.util.element.get_type(element)),
+            "class": element.is_a(),
+            "predefined_type": ifcopenshell.util.element.get_predefined_type(element),
+            "name": getattr(element, "Name", None),
+            "description": getattr(element, "Description", None),
+            "id": element.id(),
+            "global_id": getattr(element, "GlobalId", None),
+            "tag": getattr(element, "Tag", None),
+        }
+    )
+
+
+def get_specification_summary(
+    specification: Specification, report_failed_entities: Callable[[Facet], list], limit: Optional[int] = None
+) -> StreamSpecification:
+    return StreamSpecification(
+        status=specification.status,
+        total_applicable=specification.total_applicable,
+        total_failed=specification.total_failed,
+        requirements=[
+            StreamRequirement(
+                status=requirement.status,
+                total_fail=requirement.total_failures,
+                failed_entities=report_failed_entities(requirement)[0:limit],
+            )
+            for requirement in specification.requirements
+        ],
+    )
+
+
+def add_bcf_topic(bcfxml, element: ifcopenshell.entity_instance, reason: str, description: str, unit_scale: float):
+    """Adds a topic with viewpoints of a failed element and returns its topic handler"""
+    import numpy as np
+    import ifcopenshell.util.placement
+
+    title_components = []
+    for title_component in [
+        element.is_a(),
+        getattr(element, "Name", "") or "Unnamed",
+        reason or "No reason",
+        getattr(element, "GlobalId", ""),
+        getattr(element, "Tag", ""),
+    ]:
+        if title_component:
+            title_components.append(title_component)
+    title = " - ".join(title_components)
+    topic = bcfxml.add_topic(title, description, "IfcTester")
+    if getattr(element, "ObjectPlacement", None):
+        placement = ifcopenshell.util.placement.get_local_placement(element.ObjectPlacement)
+        location = [(o * unit_scale) + 5.0 for o in placement[:, 3][:3]]
+        viewpoint = topic.add_viewpoint_from_point_and_guids(np.array(location), element.GlobalId)
+    if element.is_a("IfcElement"):
+        topic.add_viewpoint(element)
+    return topic
+
+
 class Console(Reporter):
     def __init__(self, ids: Ids, use_colour=True):
         super().__init__(ids)
@@ -154,8 +231,8 @@ class Console(Reporter):
             self.print("[UNTESTED] ", end="")
 
         self.set_style("bold")
-        total = len(specification.applicable_entities)
-        total_successes = total - len(specification.failed_entities)
+        total = specification.total_applicable
+        total_successes = total - specification.total_failed
         self.print(f"({total_successes}/{total}) ", end="")
 
         if specification.minOccurs != 0:
@@ -179,14 +256,14 @@ class Console(Reporter):
 
         for requirement in specification.requirements:
             self.set_style("reset")
-            self.set_style("red") if requirement.failures else self.set_style("green")
+            self.set_style("red") if requirement.total_failures else self.set_style("green")
             self.print(" " * 8 + requirement.to_string("requirement", specification, requirement))
             self.set_style("reset")
             for failure in requirement.failures[0:10]:
                 self.print(" " * 12, end="")
                 self.report_reason(failure)
-            if len(requirement.failures) > 10:
-                self.print(" " * 12 + f"... {len(requirement.failures)} in total ...")
+            if requirement.total_failures > 10:
+                self.print(" " * 12 + f"... {requirement.total_failures} in total ...")
         self.set_style("reset")
 
     def report_reason(self, failure: FacetFailure) -> None:
@@ -230,9 +307,19 @@ class Txt(Console):
 
 
 class Json(Reporter):
-    def __init__(self, ids: Ids):
+    """Reports the results as JSON
+
+    :param stream: An optional stream which the IDS was validated with. The
+        totals and failures are then read back from the stream, such as a
+        :class:`JsonLines` or :class:`Sqlite` file, instead of from memory.
+    """
+
+    entity_limit: Optional[int] = None
+
+    def __init__(self, ids: Ids, stream: Optional[Stream] = None):
         super().__init__(ids)
         self.results = Results()
+        self.stream = stream
 
     def report(self) -> Results:
         self.results["title"] = self.ids.info.get("title", "Untitled IDS")
@@ -247,8 +334,11 @@ class Json(Reporter):
         total_checks_pass = 0
         status = True
         self.results["specifications"] = []
-        for specification in self.ids.specifications:
-            specification_report = self.report_specification(specification)
+        summaries = [None] * len(self.ids.specifications)
+        if self.stream:
+            summaries = self.stream.read_summary(self.entity_limit)
+        for specification, summary in zip(self.ids.specifications, summaries):
+            specification_report = self.report_specification(specification, summary)
             self.results["specifications"].append(specification_report)
             total_specifications += 1
             total_specifications_pass += 1 if specification_report["status"] else 0
@@ -279,14 +369,18 @@ class Json(Reporter):
         )
         return self.results
 
-    def report_specification(self, specification: Specification) -> ResultsSpecification:
+    def report_specification(
+        self, specification: Specification, summary: Optional[StreamSpecification] = None
+    ) -> ResultsSpecification:
+        if summary is None:
+            summary = get_specification_summary(specification, self.report_failed_entities)
         applicability = [a.to_string("applicability") for a in specification.applicability]
-        total_applicable = len(specification.applicable_entities)
+        total_applicable = summary["total_applicable"]
         total_checks = 0
         total_checks_pass = 0
         requirements = []
-        for requirement in specification.requirements:
-            total_fail = len(requirement.failures)
+        for requirement, requirement_summary in zip(specification.requirements, summary["requirements"]):
+            total_fail = requirement_summary["total_fail"]
             total_pass = total_applicable - total_fail
             percent_pass = math.floor((total_pass / total_applicable) * 100) if total_applicable else "N/A"
             total_checks += total_applicable
@@ -294,15 +388,15 @@ class Json(Reporter):
             requirements.append(
                 ResultsRequirement(
                     description=requirement.to_string("requirement", specification, requirement),
-                    status=requirement.status,
-                    failed_entities=self.report_failed_entities(requirement),
+                    status=requirement_summary["status"],
+                    failed_entities=requirement_summary["failed_entities"],
                     total_applicable=total_applicable,
                     total_pass=total_pass,
                     total_fail=total_fail,
                     percent_pass=percent_pass,
                 )
             )
-        total_applicable_pass = total_applicable - len(specification.failed_entities)
+        total_applicable_pass = total_applicable - summary["total_failed"]
         percent_applicable_pass = (
             math.floor((total_applicable_pass / total_applicable) * 100) if total_applicable else "N/A"
         )
@@ -312,7 +406,7 @@ class Json(Reporter):
             name=specification.name,
             description=specification.description,
             instructions=specification.instructions,
-            status=specification.status,
+            status=summary["status"],
             total_applicable=total_applicable,
             total_applicable_pass=total_applicable_pass,
             total_applicable_fail=total_applicable - total_applicable_pass,
@@ -327,50 +421,32 @@ class Json(Reporter):
         )
 
     def report_failed_entities(self, requirement: Facet) -> list[ResultsFailedEntity]:
-        return [
-            ResultsFailedEntity(
-                {
-                    "reason": f["reason"],
-                    "element": str(f["element"]),
-                    "element_type": str(ifcopenshell.util.element.get_type(f["element"])),
-                    "class": f["element"].is_a(),
-                    "predefined_type": ifcopenshell.util.element.get_predefined_type(f["element"]),
-                    "name": getattr(f["element"], "Name", None),
-                    "description": getattr(f["element"], "Description", None),
-                    "id": f["element"].id(),
-                    "global_id": getattr(f["element"], "GlobalId", None),
-                    "tag": getattr(f["element"], "Tag", None),
-                }
-            )
-            for f in requirement.failures
-        ]
+        return [get_failed_entity(f["element"], f["reason"]) for f in requirement.failures]
 
     def to_string(self) -> str:
-        import json
-
         return json.dumps(self.results)
 
     def to_file(self, filepath: str) -> None:
-        import json
-
         with open(filepath, "w", encoding="utf-8") as outfile:
             return json.dump(self.results, outfile, ensure_ascii=False)
 
 
 class Html(Json):
-    def __init__(self, ids: Ids):
-        super().__init__(ids)
+    entity_limit = 100
+
+    def __init__(self, ids: Ids, stream: Optional[Stream] = None):
+        super().__init__(ids, stream)
 
     def report(self) -> None:
         super().report()
-        entity_limit = 100
         for spec in self.results["specifications"]:
             for requirement in spec["requirements"]:
-                total = len(requirement["failed_entities"])
-                requirement["failed_entities"] = requirement["failed_entities"][0:entity_limit]
-                requirement["has_omitted"] = total > entity_limit
+                # Streamed results may only contain a sample of the failures
+                total = requirement["total_fail"]
+                requirement["failed_entities"] = requirement["failed_entities"][0 : self.entity_limit]
+                requirement["has_omitted"] = total > len(requirement["failed_entities"])
                 requirement["total_entities"] = total
-                requirement["total_omitted"] = total - entity_limit
+                requirement["total_omitted"] = total - len(requirement["failed_entities"])
 
     def to_string(self) -> str:
         import pystache
@@ -532,8 +608,6 @@ class Bcf(Json):
         return [FacetFailure(f) for f in requirement.failures]
 
     def to_file(self, filepath: str) -> None:
-        import numpy as np
-        import ifcopenshell.util.placement
         from bcf.v2.bcfxml import BcfXml
 
         unit_scale = None
@@ -546,25 +620,317 @@ class Bcf(Json):
                     continue
                 for failure in requirement["failed_entities"]:
                     element = failure["element"]
-                    title_components = []
-                    for title_component in [
-                        element.is_a(),
-                        getattr(element, "Name", "") or "Unnamed",
-                        failure.get("reason", "No reason"),
-                        getattr(element, "GlobalId", ""),
-                        getattr(element, "Tag", ""),
-                    ]:
-                        if title_component:
-                            title_components.append(title_component)
-                    title = " - ".join(title_components)
+                    if unit_scale is None:
+                        unit_scale = ifcopenshell.util.unit.calculate_unit_scale(element.wrapped_data.file)
                     description = f'{specification["name"]} - {requirement["description"]}'
-                    topic = bcfxml.add_topic(title, description, "IfcTester")
-                    if getattr(element, "ObjectPlacement", None):
-                        placement = ifcopenshell.util.placement.get_local_placement(element.ObjectPlacement)
-                        if unit_scale is None:
-                            unit_scale = ifcopenshell.util.unit.calculate_unit_scale(element.wrapped_data.file)
-                        location = [(o * unit_scale) + 5.0 for o in placement[:, 3][:3]]
-                        viewpoint = topic.add_viewpoint_from_point_and_guids(np.array(location), element.GlobalId)
-                    if element.is_a("IfcElement"):
-                        topic.add_viewpoint(element)
+                    add_bcf_topic(bcfxml, element, failure.get("reason"), description, unit_scale)
         bcfxml.save_project(filepath)
+
+
+class Stream:
+    """Receives validation results as they are produced
+
+    Pass a stream as the ``sink`` when validating an IDS. Specifications then
+    only keep counters, and each requirement keeps at most ``sample_size``
+    failures, so memory no longer grows with the number of failures. Any
+    other reporter can still be used afterwards to summarise the counters
+    and sampled failures. The :class:`Json` and :class:`Html` reporters can
+    instead be given the stream, to summarise what it has written.
+
+    Subclass this and override :meth:`add_failure` (calling ``super()``) to
+    write every failure somewhere, such as :class:`JsonLines`,
+    :class:`Sqlite` or :class:`BcfStream`. Files are released in
+    :meth:`close`, which is called even if validation fails.
+    """
+
+    def __init__(self, sample_size: int = 100):
+        self.sample_size = sample_size
+        self.ids: Optional[Ids] = None
+        self.indices: dict[int, tuple[int, int]] = {}
+
+    def start(self, ids: Ids) -> None:
+        self.ids = ids
+        self.indices = {}
+        for i, specification in enumerate(ids.specifications):
+            for j, requirement in enumerate(specification.requirements):
+                self.indices[id(requirement)] = (i, j)
+
+    def add_applicable(self, specification: Specification, element: ifcopenshell.entity_instance) -> None:
+        pass
+
+    def add_failure(
+        self, specification: Specification, requirement: Facet, element: ifcopenshell.entity_instance, reason: str
+    ) -> None:
+        if len(requirement.failures) < self.sample_size:
+            requirement.failures.append(FacetFailure(element=element, reason=reason))
+
+    def finish(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    def read_summary(self, limit: Optional[int] = None) -> list[StreamSpecification]:
+        """Reads back the totals and failures of every specification
+
+        :param limit: The maximum number of failed entities per requirement.
+        """
+
+        def report_failed_entities(requirement: Facet) -> list[ResultsFailedEntity]:
+            return [get_failed_entity(f["element"], f["reason"]) for f in requirement.failures]
+
+        return [get_specification_summary(s, report_failed_entities, limit) for s in self.ids.specifications]
+
+
+class JsonLines(Stream):
+    """Writes every failure as a line of JSON
+
+    Each ``failure`` line is a failed entity as reported by :class:`Json`,
+    with the index of its specification and requirement. Once validation has
+    finished, a ``specification`` and ``requirement`` line with the totals
+    is written for every specification and requirement.
+    """
+
+    def __init__(self, filepath: str, sample_size: int = 100):
+        super().__init__(sample_size)
+        self.filepath = filepath
+        self.file = None
+
+    def start(self, ids: Ids) -> None:
+        super().start(ids)
+        self.file = open(self.filepath, "w", encoding="utf-8")
+
+    def add_failure(
+        self, specification: Specification, requirement: Facet, element: ifcopenshell.entity_instance, reason: str
+    ) -> None:
+        super().add_failure(specification, requirement, element, reason)
+        failure = get_failed_entity(element, reason)
+        failure["type"] = "failure"
+        failure["specification"], failure["requirement"] = self.indices[id(requirement)]
+        self.file.write(json.dumps(failure, ensure_ascii=False) + "\n")
+
+    def finish(self) -> None:
+        for i, specification in enumerate(self.ids.specifications):
+            self.write_line(
+                type="specification",
+                specification=i,
+                status=specification.status,
+                total_applicable=specification.total_applicable,
+                total_failed=specification.total_failed,
+            )
+            for j, requirement in enumerate(specification.requirements):
+                self.write_line(
+                    type="requirement",
+                    specification=i,
+                    requirement=j,
+                    status=requirement.status,
+                    total_fail=requirement.total_failures,
+                )
+        self.close()
+
+    def close(self) -> None:
+        if self.file:
+            self.file.close()
+            self.file = None
+
+    def write_line(self, **line) -> None:
+        self.file.write(json.dumps(line, ensure_ascii=False) + "\n")
+
+    def read_summary(self, limit: Optional[int] = None) -> list[StreamSpecification]:
+        specifications = {}
+        requirements = {}
+        failures = {}
+        with open(self.filepath, "r", encoding="utf-8") as f:
+            for line in f:
+                line = json.loads(line)
+                line_type = line.pop("type")
+                i = line.pop("specification")
+                if line_type == "specification":
+                    specifications[i] = StreamSpecification(requirements=[], **line)
+                    continue
+                j = line.pop("requirement")
+                if line_type == "requirement":
+                    requirements[i, j] = StreamRequirement(failed_entities=failures.get((i, j), []), **line)
+                else:
+                    requirement_failures = failures.setdefault((i, j), [])
+                    if limit is None or len(requirement_failures) < limit:
+                        requirement_failures.append(ResultsFailedEntity(line))
+        for (i, j), requirement in sorted(requirements.items()):
+            specifications[i]["requirements"].append(requirement)
+        return [specifications[i] for i in sorted(specifications)]
+
+
+class Sqlite(Stream):
+    """Writes every failure as a row in a SQLite database
+
+    Failures are stored in a ``failures`` table and inserted in batches.
+    The ``specifications`` and ``requirements`` tables hold the totals once
+    validation has finished.
+    """
+
+    batch_size = 10000
+
+    def __init__(self, filepath: str, sample_size: int = 100):
+        super().__init__(sample_size)
+        self.filepath = filepath
+        self.db = None
+        self.rows = []
+
+    def start(self, ids: Ids) -> None:
+        super().start(ids)
+        self.db = sqlite3.connect(self.filepath)
+        self.db.executescript(
+            """
+            DROP TABLE IF EXISTS failures;
+            DROP TABLE IF EXISTS requirements;
+            DROP TABLE IF EXISTS specifications;
+            CREATE TABLE specifications (
+                id INTEGER PRIMARY KEY, name TEXT, status INTEGER, total_applicable INTEGER, total_failed INTEGER
+            );
+            CREATE TABLE requirements (
+                specification INTEGER, requirement INTEGER, description TEXT, status INTEGER, total_fail INTEGER
+            );
+            CREATE TABLE failures (
+                specification INTEGER, requirement INTEGER, reason TEXT, element TEXT, element_type TEXT,
+                class TEXT, predefined_type TEXT, name TEXT, description TEXT, id INTEGER, global_id TEXT, tag TEXT
+            );
+            """
+        )
+
+    def add_failure(
+        self, specification: Specification, requirement: Facet, element: ifcopenshell.entity_instance, reason: str
+    ) -> None:
+        super().add_failure(specification, requirement, element, reason)
+        failure = get_failed_entity(element, reason)
+        self.rows.append((*self.indices[id(requirement)], *failure.values()))
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        self.db.executemany("INSERT INTO failures VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", self.rows)
+        self.rows.clear()
+
+    def close(self) -> None:
+        if self.db:
+            self.db.close()
+            self.db = None
+        self.rows.clear()
+
+    def finish(self) -> None:
+        self.flush()
+        for i, specification in enumerate(self.ids.specifications):
+            self.db.execute(
+                "INSERT INTO specifications VALUES (?, ?, ?, ?, ?)",
+                (
+                    i,
+                    specification.name,
+                    specification.status,
+                    specification.total_applicable,
+                    specification.total_failed,
+                ),
+            )
+            for j, requirement in enumerate(specification.requirements):
+                self.db.execute(
+                    "INSERT INTO requirements VALUES (?, ?, ?, ?, ?)",
+                    (
+                        i,
+                        j,
+                        requirement.to_string("requirement", specification, requirement),
+                        requirement.status,
+                        requirement.total_failures,
+                    ),
+                )
+        self.db.commit()
+        self.close()
+
+    def read_summary(self, limit: Optional[int] = None) -> list[StreamSpecification]:
+        db = sqlite3.connect(self.filepath)
+        try:
+            specifications = []
+            for i, status, total_applicable, total_failed in db.execute(
+                "SELECT id, status, total_applicable, total_failed FROM specifications ORDER BY id"
+            ):
+                requirements = []
+                for j, requirement_status, total_fail in db.execute(
+                    "SELECT requirement, status, total_fail FROM requirements WHERE specification = ? "
+                    "ORDER BY requirement",
+                    (i,),
+                ).fetchall():
+                    cursor = db.execute(
+                        "SELECT reason, element, element_type, class, predefined_type, name, description, id, "
+                        "global_id, tag FROM failures WHERE specification = ? AND requirement = ? LIMIT ?",
+                        (i, j, -1 if limit is None else limit),
+                    )
+                    keys = [d[0] for d in cursor.description]
+                    failed_entities = [ResultsFailedEntity(zip(keys, row)) for row in cursor]
+                    requirements.append(
+                        StreamRequirement(
+                            status=bool(requirement_status), total_fail=total_fail, failed_entities=failed_entities
+                        )
+                    )
+                specifications.append(
+                    StreamSpecification(
+                        status=bool(status),
+                        total_applicable=total_applicable,
+                        total_failed=total_failed,
+                        requirements=requirements,
+                    )
+                )
+            return specifications
+        finally:
+            db.close()
+
+
+class BcfStream(Stream):
+    """Writes every failure as a BCF topic
+
+    Every topic is written to the BCF archive as soon as its failure is
+    produced and is then discarded, so memory does not grow with the number
+    of failures. The archive is complete once validation has finished.
+    """
+
+    def __init__(self, filepath: str, sample_size: int = 100):
+        super().__init__(sample_size)
+        self.filepath = filepath
+        self.bcfxml = None
+        self.zip_file = None
+        self.descriptions: dict[int, str] = {}
+        self.unit_scale = None
+
+    def start(self, ids: Ids) -> None:
+        from bcf.v2.bcfxml import BcfXml
+        from bcf.xml_parser import XmlParserSerializer
+
+        super().start(ids)
+        xml_handler = XmlParserSerializer()
+        self.bcfxml = BcfXml.create_new(ids.info.get("title", "Untitled IDS"), xml_handler)
+        self.zip_file = zipfile.ZipFile(self.filepath, "w", zipfile.ZIP_DEFLATED)
+        self.zip_file.writestr("bcf.version", xml_handler.serialize(self.bcfxml.version))
+        self.zip_file.writestr("project.bcfp", xml_handler.serialize(self.bcfxml.project_info))
+        self.descriptions = {}
+        self.unit_scale = None
+
+    def add_failure(
+        self, specification: Specification, requirement: Facet, element: ifcopenshell.entity_instance, reason: str
+    ) -> None:
+        super().add_failure(specification, requirement, element, reason)
+        description = self.descriptions.get(id(requirement))
+        if description is None:
+            description = self.descriptions[id(requirement)] = (
+                f'{specification.name} - {requirement.to_string("requirement", specification, requirement)}'
+            )
+        if self.unit_scale is None:
+            self.unit_scale = ifcopenshell.util.unit.calculate_unit_scale(element.wrapped_data.file)
+        topic = add_bcf_topic(self.bcfxml, element, reason, description, self.unit_scale)
+        topic.save(self.zip_file)
+        del self.bcfxml.topics[topic.guid]
+
+    def finish(self) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self.zip_file:
+            self.zip_file.close()
+            self.zip_file = None
+        self.bcfxml = None
+        self.descriptions = {}
@@ -828,6 +828,22 @@ class TestClassification:
         facet = Classification(system="Foobaz", value="X")
         run("Occurrences override the type classification per system 3/3", facet=facet, inst=wall, expected=True)
 
+    def test_broadphase_filtering_only_returns_classified_elements(self):
+        ifc = ifcopenshell.file()
+        # The project is associated with the classification system itself
+        project = ifc.createIfcProject()
+        system = ifcopenshell.api.run("classification.add_classification", ifc, classification="Foobar")
+        wall = ifcopenshell.api.run("root.create_entity", ifc, ifc_class="IfcWall")
+        slab = ifcopenshell.api.run("root.create_entity", ifc, ifc_class="IfcSlab")
+        wall_type = ifcopenshell.api.run("root.create_entity", ifc, ifc_class="IfcWallType")
+        ifcopenshell.api.run("type.assign_type", ifc, related_objects=[wall], relating_type=wall_type)
+        ifcopenshell.api.run(
+            "classification.add_reference", ifc, products=[wall_type], identification="1", classification=system
+        )
+        assert set(Classification(system="Foobar").filter(ifc, None)) == {project, wall, wall_type}
+        assert Classification(system="Foobaz").filter(ifc, None) == []
+        assert slab in Classification(system="Foobar", cardinality="optional").filter(ifc, None)
+
 
 class TestProperty:
     def test_creating_a_property_facet(self):
@@ -1239,6 +1255,26 @@ class TestProperty:
         ifcopenshell.api.run("unit.assign_unit", ifc, units=[lengthunit, areaunit, volumeunit, timeunit])
         return ifc
 
+    def test_broadphase_filtering_only_returns_elements_with_the_property_set(self):
+        ifc = self.setup_ifc()
+        wall = ifcopenshell.api.run("root.create_entity", ifc, ifc_class="IfcWall")
+        slab = ifcopenshell.api.run("root.create_entity", ifc, ifc_class="IfcSlab")
+        wall_type = ifcopenshell.api.run("root.create_entity", ifc, ifc_class="IfcWallType")
+        ifcopenshell.api.run("type.assign_type", ifc, related_objects=[wall], relating_type=wall_type)
+        ifcopenshell.api.run("pset.add_pset", ifc, product=wall_type, name="Foo_Bar")
+        ifcopenshell.api.run("pset.add_pset", ifc, product=slab, name="Foo_Baz")
+        material = ifcopenshell.api.run("material.add_material", ifc)
+        ifcopenshell.api.run("pset.add_pset", ifc, product=material, name="Foo_Bar")
+        assert set(Property(propertySet="Foo_Bar", baseName="Foo").filter(ifc, None)) == {wall, wall_type, material}
+        restriction = Restriction(options={"pattern": "Foo_.*"})
+        assert set(Property(propertySet=restriction, baseName="Foo").filter(ifc, None)) == {
+            wall,
+            wall_type,
+            slab,
+            material,
+        }
+        assert slab in Property(propertySet="Foo_Bar", baseName="Foo", cardinality="prohibited").filter(ifc, None)
+
 
 class TestMaterial:
     def test_creating_a_material_facet(self):
@@ -1394,6 +1430,17 @@ class TestMaterial:
         facet = Material(value="Foo")
         run("Occurrences can override materials from their types", facet=facet, inst=element, expected=True)
 
+    def test_broadphase_filtering_only_returns_elements_with_a_material(self):
+        ifc = ifcopenshell.file()
+        wall = ifcopenshell.api.run("root.create_entity", ifc, ifc_class="IfcWall")
+        slab = ifcopenshell.api.run("root.create_entity", ifc, ifc_class="IfcSlab")
+        wall_type = ifcopenshell.api.run("root.create_entity", ifc, ifc_class="IfcWallType")
+        ifcopenshell.api.run("type.assign_type", ifc, related_objects=[wall], relating_type=wall_type)
+        material = ifcopenshell.api.run("material.add_material", ifc)
+        ifcopenshell.api.run("material.assign_material", ifc, products=[wall_type], material=material)
+        assert set(Material().filter(ifc, None)) == {wall, wall_type}
+        assert slab in Material(cardinality="prohibited").filter(ifc, None)
+
 
 class TestPartOf:
     def test_creating_a_partof_facet(self):
@@ -1556,6 +1603,18 @@ class TestPartOf:
         facet = PartOf(relation="IFCRELNESTS", name="IFCFURNITURE")
         run("Nesting may be indirect", facet=facet, inst=subsubelement, expected=True)
 
+    def test_broadphase_filtering_only_returns_elements_with_the_relationship(self):
+        ifc = ifcopenshell.file()
+        element = ifcopenshell.api.run("root.create_entity", ifc, ifc_class="IfcElementAssembly")
+        subelement = ifcopenshell.api.run("root.create_entity", ifc, ifc_class="IfcWall")
+        group = ifcopenshell.api.run("root.create_entity", ifc, ifc_class="IfcGroup")
+        member = ifcopenshell.api.run("root.create_entity", ifc, ifc_class="IfcSlab")
+        ifcopenshell.api.run("aggregate.assign_object", ifc, products=[subelement], relating_object=element)
+        ifcopenshell.api.run("group.assign_group", ifc, products=[member], group=group)
+        assert PartOf(name="IFCELEMENTASSEMBLY", relation="IFCRELAGGREGATES").filter(ifc, None) == [subelement]
+        assert PartOf(name="IFCGROUP", relation="IFCRELASSIGNSTOGROUP").filter(ifc, None) == [member]
+        assert set(PartOf(name="IFCELEMENTASSEMBLY").filter(ifc, None)) == {subelement, member}
+
 
 class TestRestriction:
     def test_creating_a_restriction(self):
@@ -1582,6 +1641,28 @@ class TestRestriction:
         assert restriction != "AB"
         assert restriction != "01"
 
+    def test_enumerations_are_cast_to_the_compared_type(self):
+        restriction = Restriction(options={"enumeration": ["1", "2.5"]}, base="double")
+        assert restriction == 1
+        assert restriction == 2.5
+        assert restriction != 3
+        assert restriction == "1"
+        assert restriction != "2"
+
+    def test_restrictions_are_compiled_once(self, monkeypatch):
+        patterns = []
+        translate_pattern = ifctester.facet.identities.translate_pattern
+        monkeypatch.setattr(
+            ifctester.facet.identities, "translate_pattern", lambda p: patterns.append(p) or translate_pattern(p)
+        )
+        restriction = Restriction(options={"pattern": "[A-Z]{2}[0-9]{2}"})
+        assert restriction == "AB01"
+        assert restriction != "AB"
+        assert patterns == ["[A-Z]{2}[0-9]{2}"]
+        restriction.options = {"pattern": "[0-9]+"}
+        assert restriction == "42"
+        assert patterns == ["[A-Z]{2}[0-9]{2}", "[0-9]+"]
+
     def test_filtering_using_restrictions(self):
         set_facet("restriction")
 
@@ -18,9 +18,10 @@
 
 import os
 import pytest
+import sqlite3
 import xmlschema
 import ifcopenshell
-from ifctester import ids
+from ifctester import ids, reporter
 from typing import Optional
 
 
@@ -249,6 +250,259 @@ class TestIds:
         assert spec.requirements[0].failures[0]["element"] == wall
         assert spec2.requirements[0].failures[0]["element"] == wall
 
+    def test_identical_facets_are_evaluated_once_per_element(self):
+        calls = []
+
+        class CountingAttribute(ids.Attribute):
+            def __call__(self, inst, logger=None):
+                calls.append(inst)
+                return super().__call__(inst, logger)
+
+        specs = ids.Ids(title="Title")
+        for name in ("Name", "Name2"):
+            spec = ids.Specification(name=name)
+            spec.applicability.append(ids.Entity(name="IFCWALL"))
+            spec.requirements.append(CountingAttribute(name="Name", value="Waldo"))
+            specs.specifications.append(spec)
+
+        model = ifcopenshell.file()
+        wall = model.createIfcWall()
+        waldo = model.createIfcWall(Name="Waldo")
+        specs.validate(model)
+
+        assert sorted(calls, key=lambda e: e.id()) == [wall, waldo]
+        for spec in specs.specifications:
+            assert spec.status is False
+            assert set(spec.applicable_entities) == {wall, waldo}
+            assert [f["element"] for f in spec.requirements[0].failures] == [wall]
+            assert spec.duration > 0
+
+    def test_validating_again_resets_timings_and_facet_keys(self):
+        key_calls = []
+
+        class CountingAttribute(ids.Attribute):
+            def get_key(self):
+                key_calls.append(self)
+                return super().get_key()
+
+        specs = ids.Ids(title="Title")
+        for name in ("Name", "Name2"):
+            spec = ids.Specification(name=name)
+            spec.applicability.append(ids.Entity(name="IFCWALL"))
+            spec.requirements.append(CountingAttribute(name="Name", value="Waldo"))
+            specs.specifications.append(spec)
+
+        model = ifcopenshell.file()
+        for i in range(10):
+            model.createIfcWall(Name="Waldo" if i % 2 else None)
+        specs.validate(model)
+        for spec in specs.specifications:
+            spec.duration = 100.0
+        key_calls.clear()
+        specs.validate(model)
+
+        assert all(0 < spec.duration < 100.0 for spec in specs.specifications)
+        # Once per specification, instead of once per wall
+        assert len(key_calls) == 2
+
+    def test_validating_with_multiple_jobs(self):
+        specs = ids.Ids(title="Title")
+        spec = ids.Specification(name="Name")
+        spec.applicability.append(ids.Entity(name="IFCWALL"))
+        spec.requirements.append(ids.Attribute(name="Name", value="Waldo"))
+        specs.specifications.append(spec)
+
+        spec2 = ids.Specification(name="Description")
+        spec2.applicability.append(ids.Entity(name="IFCWALL"))
+        spec2.requirements.append(ids.Attribute(name="Description", value="Foobar"))
+        specs.specifications.append(spec2)
+
+        model = ifcopenshell.file()
+        walls = [model.createIfcWall(Name="Waldo" if i % 2 else None, Description="Foobar") for i in range(20)]
+
+        def get_results():
+            return [
+                (
+                    s.status,
+                    list(s.applicable_entities),
+                    [(f["element"], f["reason"]) for f in s.requirements[0].failures],
+                )
+                for s in specs.specifications
+            ]
+
+        specs.validate(model)
+        expected = get_results()
+        specs.validate(model, jobs=2)
+        assert get_results() == expected
+        assert spec.status is False
+        assert set(spec.applicable_entities) == set(walls)
+        assert spec2.status is True
+
+    def test_parallel_workers_only_report_their_own_duration(self):
+        specs = ids.Ids(title="Title")
+        spec = ids.Specification(name="Name")
+        spec.applicability.append(ids.Entity(name="IFCWALL"))
+        spec.requirements.append(ids.Attribute(name="Name", value="Waldo"))
+        specs.specifications.append(spec)
+        model = ifcopenshell.file()
+        wall = model.createIfcWall()
+
+        # As if the parent spent 100 seconds filtering before forking
+        spec.duration = 100.0
+        ids._validation_context = (specs, model)
+        try:
+            results = ids._check_elements([(wall.id(), [0])])
+        finally:
+            ids._validation_context = None
+        assert len(results) == 1
+        assert 0 < results[0][4] < 100.0
+
+    def test_streaming_results_only_keeps_a_sample_of_failures(self, tmp_path):
+        specs = ids.Ids(title="Title")
+        spec = ids.Specification(name="Name")
+        spec.applicability.append(ids.Entity(name="IFCWALL"))
+        spec.requirements.append(ids.Attribute(name="Name", value="Waldo"))
+        specs.specifications.append(spec)
+
+        model = ifcopenshell.file()
+        for i in range(20):
+            model.createIfcWall(Name="Waldo" if i % 4 == 0 else "Foo")
+
+        filepath = str(tmp_path / "results.sqlite")
+        specs.validate(model, sink=reporter.Sqlite(filepath, sample_size=3))
+        assert spec.status is False
+        assert spec.applicable_entities == []
+        assert spec.total_applicable == 20
+        assert spec.total_failed == 15
+        assert spec.requirements[0].total_failures == 15
+        assert len(spec.requirements[0].failures) == 3
+
+        results = reporter.Json(specs).report()
+        requirement = results["specifications"][0]["requirements"][0]
+        assert requirement["total_fail"] == 15
+        assert requirement["total_pass"] == 5
+        assert len(requirement["failed_entities"]) == 3
+
+        db = sqlite3.connect(filepath)
+        assert db.execute("SELECT COUNT(*) FROM failures").fetchone() == (15,)
+        assert db.execute("SELECT total_applicable, total_failed FROM specifications").fetchone() == (20, 15)
+        db.close()
+
+    @pytest.mark.parametrize("filename", ["results.jsonl", "results.sqlite"])
+    def test_reporting_a_summary_from_a_stream(self, tmp_path, filename):
+        specs = ids.Ids(title="Title")
+        spec = ids.Specification(name="Name")
+        spec.applicability.append(ids.Entity(name="IFCWALL"))
+        spec.requirements.append(ids.Attribute(name="Name", value="Waldo"))
+        specs.specifications.append(spec)
+
+        model = ifcopenshell.file()
+        for i in range(20):
+            model.createIfcWall(Name="Waldo" if i % 4 == 0 else "Foo")
+
+        filepath = str(tmp_path / filename)
+        stream_class = reporter.JsonLines if filename.endswith(".jsonl") else reporter.Sqlite
+        stream = stream_class(filepath, sample_size=3)
+        specs.validate(model, sink=stream)
+
+        # Every failure is read back from the stream, not only the sample
+        results = reporter.Json(specs, stream=stream).report()
+        assert results["status"] is False
+        assert results["total_checks_fail"] == 15
+        specification = results["specifications"][0]
+        assert specification["total_applicable"] == 20
+        assert specification["total_applicable_fail"] == 15
+        requirement = specification["requirements"][0]
+        assert requirement["status"] is False
+        assert requirement["total_fail"] == 15
+        assert len(requirement["failed_entities"]) == 15
+        assert requirement["failed_entities"][0]["class"] == "IfcWall"
+        assert requirement["failed_entities"][0]["name"] == "Foo"
+
+        summary = stream.read_summary(limit=5)
+        assert len(summary[0]["requirements"][0]["failed_entities"]) == 5
+
+    @pytest.mark.parametrize("filename", [None, "results.jsonl", "results.sqlite", "results.bcf"])
+    def test_summarising_a_specification_with_mixed_requirement_statuses(self, tmp_path, filename):
+        specs = ids.Ids(title="Title")
+        spec = ids.Specification(name="Name")
+        spec.applicability.append(ids.Entity(name="IFCWALL"))
+        spec.requirements.append(ids.Attribute(name="Name", value="Waldo"))
+        spec.requirements.append(ids.Attribute(name="Name"))
+        specs.specifications.append(spec)
+
+        model = ifcopenshell.file()
+        model.createIfcWall(Name="Foo")
+        model.createIfcWall(Name="Waldo")
+
+        if filename is None:
+            stream = reporter.Stream()
+        elif filename.endswith(".bcf"):
+            pytest.importorskip("bcf")
+            stream = reporter.BcfStream(str(tmp_path / filename))
+        else:
+            stream_class = reporter.JsonLines if filename.endswith(".jsonl") else reporter.Sqlite
+            stream = stream_class(str(tmp_path / filename))
+        specs.validate(model, sink=stream)
+
+        summary = stream.read_summary()
+        assert len(summary) == 1
+        assert summary[0]["status"] is False
+        assert summary[0]["total_applicable"] == 2
+        assert summary[0]["total_failed"] == 1
+        assert [r["status"] for r in summary[0]["requirements"]] == [False, True]
+        assert [r["total_fail"] for r in summary[0]["requirements"]] == [1, 0]
+        assert [len(r["failed_entities"]) for r in summary[0]["requirements"]] == [1, 0]
+
+    def test_streaming_failures_to_bcf_writes_topics_as_they_are_produced(self, tmp_path):
+        pytest.importorskip("bcf")
+        from bcf.v2.bcfxml import BcfXml
+
+        specs = ids.Ids(title="Title")
+        spec = ids.Specification(name="Name")
+        spec.applicability.append(ids.Entity(name="IFCWALL"))
+        spec.requirements.append(ids.Attribute(name="Name", value="Waldo"))
+        specs.specifications.append(spec)
+
+        model = ifcopenshell.file()
+        for i in range(20):
+            model.createIfcWall(ifcopenshell.guid.new(), Name="Waldo" if i % 4 == 0 else "Foo")
+
+        filepath = str(tmp_path / "results.bcf")
+        stream = reporter.BcfStream(filepath, sample_size=3)
+
+        topic_counts = []
+        add_failure = stream.add_failure
+
+        def count_topics(*args):
+            add_failure(*args)
+            topic_counts.append(len(stream.bcfxml.topics))
+
+        stream.add_failure = count_topics
+        specs.validate(model, sink=stream)
+        assert topic_counts == [0] * 15
+        assert stream.zip_file is None
+
+        bcfxml = BcfXml.load(filepath)
+        assert bcfxml.project.name == "Title"
+        assert len(bcfxml.topics) == 15
+        assert all(topic.topic.title.startswith("IfcWall - Foo") for topic in bcfxml.topics.values())
+        bcfxml.close()
+
+    @pytest.mark.parametrize("filename", ["results.jsonl", "results.sqlite"])
+    def test_streams_are_closed_if_validation_fails(self, tmp_path, filename):
+        specs = ids.Ids(title="Title")
+        spec = ids.Specification(name="Name")
+        spec.applicability.append(ids.Entity(name="IFCWALL"))
+        specs.specifications.append(spec)
+
+        stream_class = reporter.JsonLines if filename.endswith(".jsonl") else reporter.Sqlite
+        stream = stream_class(str(tmp_path / filename))
+        with pytest.raises(AttributeError):
+            specs.validate(None, filter_version=True, sink=stream)
+        assert getattr(stream, "file", None) is None
+        assert getattr(stream, "db", None) is None
+
 
 class TestSpecification:
     def test_create_specification_with_minimal_information(self):